@@ -4,19 +4,30 @@ This library provides clients and associated models for communicating with Azure
 from an IoT device.
 """
 
-# Import all exposed items in subpackages to expose them via this package
-from .iothub import *
-from .provisioning import *
-from .common import *  # TODO: do we really want to do this?
-
-# Import the subpackages themselves in order to set the __all__
-from . import iothub
-from . import provisioning
-from . import common
+import sys
+import threading
+import importlib
 
 # Import the module to generate missing documentation
 from . import patch_documentation
 
+# Items exposed by this package, by the subpackage they come from
+_iothub_names = [
+    "IoTHubDeviceClient",
+    "IoTHubModuleClient",
+    "Message",
+    "MethodRequest",
+    "MethodResponse",
+    "InboxOptions",
+]
+_provisioning_names = ["ProvisioningDeviceClient", "RegistrationResult"]
+_common_names = ["X509", "ProxyOptions", "OfflineStoreOptions", "RetryPolicy"]
+
+_subpackage_names = {
+    "iothub": _iothub_names,
+    "provisioning": _provisioning_names,
+    "common": _common_names,  # TODO: do we really want to do this?
+}
 
 # TODO: remove this chunk of commented code if we truly no longer want to take this approach
 
@@ -31,15 +42,65 @@ from . import patch_documentation
 # enable logging with level "DEBUG" in a python terminal and do
 # "import azure.iot.device". The delta between the newly generated output
 # and the existing content of "patch_documentation.py" should be appended to
-# the function "execute_patch_for_sync" in "patch_documentation.py".
+# the function "execute_patch_for_sync_iothub" or "execute_patch_for_sync_provisioning"
+# in "patch_documentation.py".
 # Once done please again omment out the "patch.add_shims" lines below.
 
 # patch.add_shims_for_inherited_methods(IoTHubDeviceClient)  # noqa: F405
 # patch.add_shims_for_inherited_methods(IoTHubModuleClient)  # noqa: F405
 # patch.add_shims_for_inherited_methods(ProvisioningDeviceClient)  # noqa: F405
-patch_documentation.execute_patch_for_sync()
+_patches = {
+    "iothub": patch_documentation.execute_patch_for_sync_iothub,
+    "provisioning": patch_documentation.execute_patch_for_sync_provisioning,
+}
+_patched_subpackages = set()
+_patch_lock = threading.Lock()
+
+
+def _import_subpackage(subpackage):
+    """Import a subpackage, and patch its clients the first time"""
+    module = importlib.import_module("." + subpackage, __name__)
+    with _patch_lock:
+        if subpackage not in _patched_subpackages:
+            if subpackage in _patches:
+                _patches[subpackage]()
+            _patched_subpackages.add(subpackage)
+    return module
+
+
+if sys.version_info >= (3, 7):
+    # Import the subpackages (and everything they need, like the protocol libraries) only once an
+    # item from them is first used, so that importing this package is fast.  This relies on
+    # module __getattr__ (PEP 562).
+    _name_subpackages = dict(
+        (name, subpackage) for subpackage, names in _subpackage_names.items() for name in names
+    )
+
+    def __getattr__(name):
+        subpackage = _name_subpackages.get(name)
+        if subpackage is not None:
+            value = getattr(_import_subpackage(subpackage), name)
+            # Later accesses don't need to go through __getattr__
+            globals()[name] = value
+            return value
+        if name in _subpackage_names:
+            return _import_subpackage(name)
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | set(__all__))
+
+
+else:
+    # Import all exposed items in subpackages to expose them via this package
+    from .iothub import *  # noqa: F401, F403
+    from .provisioning import *  # noqa: F401, F403
+    from .common import *  # noqa: F401, F403
+
+    for _subpackage in _subpackage_names:
+        _import_subpackage(_subpackage)
 
 
 # iothub and common subpackages are still showing up in intellisense
 
-__all__ = iothub.__all__ + provisioning.__all__ + common.__all__
+__all__ = _iothub_names + _provisioning_names + _common_names
@@ -4,17 +4,22 @@ This library provides asynchronous clients for communicating with Azure IoT serv
 from an IoT device.
 """
 
-# Import all exposed items in aio subpackages to expose them via this package
-from azure.iot.device.iothub.aio import *
-from azure.iot.device.provisioning.aio import *
-
-# Import the subpackages themselves in order to set the __all__
-import azure.iot.device.iothub.aio
-import azure.iot.device.provisioning.aio
+import sys
+import threading
+import importlib
 
 # Import the module to generate missing documentation
 from . import patch_documentation
 
+# Items exposed by this package, by the aio subpackage they come from
+_iothub_names = ["IoTHubDeviceClient", "IoTHubModuleClient"]
+_provisioning_names = ["ProvisioningDeviceClient"]
+
+_subpackage_names = {
+    "azure.iot.device.iothub.aio": _iothub_names,
+    "azure.iot.device.provisioning.aio": _provisioning_names,
+}
+
 
 # TODO: remove this chunk of commented code if we truly no longer want to take this approach
 
@@ -28,14 +33,58 @@ from . import patch_documentation
 # enable logging with level "DEBUG" in a python terminal and do
 # "import azure.iot.device". The delta between the newly generated output
 # and the existing content of "patch_documentation.py" should be appended to
-# the function "execute_patch_for_sync" in "patch_documentation.py".
+# the function "execute_patch_for_async_iothub" or "execute_patch_for_async_provisioning"
+# in "patch_documentation.py".
 # Once done please again omment out the "patch.add_shims" lines below.
 
 # patch.add_shims_for_inherited_methods(IoTHubDeviceClient)  # noqa: F405
 # patch.add_shims_for_inherited_methods(IoTHubModuleClient)  # noqa: F405
 # patch.add_shims_for_inherited_methods(ProvisioningDeviceClient)  # noqa: F405
+_patches = {
+    "azure.iot.device.iothub.aio": patch_documentation.execute_patch_for_async_iothub,
+    "azure.iot.device.provisioning.aio": patch_documentation.execute_patch_for_async_provisioning,
+}
+_patched_subpackages = set()
+_patch_lock = threading.Lock()
+
+
+def _import_subpackage(subpackage):
+    """Import an aio subpackage, and patch its clients the first time"""
+    module = importlib.import_module(subpackage)
+    with _patch_lock:
+        if subpackage not in _patched_subpackages:
+            _patches[subpackage]()
+            _patched_subpackages.add(subpackage)
+    return module
+
+
+if sys.version_info >= (3, 7):
+    # Import the aio subpackages only once an item from them is first used (PEP 562), so that
+    # importing this package is fast.  See azure.iot.device.
+    _name_subpackages = dict(
+        (name, subpackage) for subpackage, names in _subpackage_names.items() for name in names
+    )
+
+    def __getattr__(name):
+        subpackage = _name_subpackages.get(name)
+        if subpackage is None:
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+        value = getattr(_import_subpackage(subpackage), name)
+        # Later accesses don't need to go through __getattr__
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(__all__))
+
+
+else:
+    # Import all exposed items in aio subpackages to expose them via this package
+    from azure.iot.device.iothub.aio import *  # noqa: F401, F403
+    from azure.iot.device.provisioning.aio import *  # noqa: F401, F403
 
+    for _subpackage in _subpackage_names:
+        _import_subpackage(_subpackage)
 
-patch_documentation.execute_patch_for_async()
 
-__all__ = azure.iot.device.iothub.aio.__all__ + azure.iot.device.provisioning.aio.__all__
+__all__ = _iothub_names + _provisioning_names
@@ -7,7 +7,7 @@
 Currently we have to do like this so that we don't use exec anywhere"""
 
 
-def execute_patch_for_async():
+def execute_patch_for_async_iothub():
     from azure.iot.device.iothub.aio.async_clients import IoTHubDeviceClient as IoTHubDeviceClient_
 
     async def connect(self):
@@ -78,6 +78,12 @@ def execute_patch_for_async():
     send_message.__doc__ = IoTHubDeviceClient_.send_message.__doc__
     setattr(IoTHubDeviceClient_, "send_message", send_message)
 
+    async def send_message_batch(self, messages, max_in_flight=20):
+        return await super(IoTHubDeviceClient_, self).send_message_batch(messages, max_in_flight)
+
+    send_message_batch.__doc__ = IoTHubDeviceClient_.send_message_batch.__doc__
+    setattr(IoTHubDeviceClient_, "send_message_batch", send_message_batch)
+
     async def send_method_response(self, method_response):
         return await super(IoTHubDeviceClient_, self).send_method_response(method_response)
 
@@ -189,6 +195,12 @@ def execute_patch_for_async():
     send_message.__doc__ = IoTHubModuleClient_.send_message.__doc__
     setattr(IoTHubModuleClient_, "send_message", send_message)
 
+    async def send_message_batch(self, messages, max_in_flight=20):
+        return await super(IoTHubModuleClient_, self).send_message_batch(messages, max_in_flight)
+
+    send_message_batch.__doc__ = IoTHubModuleClient_.send_message_batch.__doc__
+    setattr(IoTHubModuleClient_, "send_message_batch", send_message_batch)
+
     async def send_method_response(self, method_response):
         return await super(IoTHubModuleClient_, self).send_method_response(method_response)
 
@@ -230,6 +242,9 @@ def execute_patch_for_async():
         "create_from_x509_certificate",
         classmethod(create_from_x509_certificate),
     )
+
+
+def execute_patch_for_async_provisioning():
     from azure.iot.device.provisioning.aio.async_provisioning_device_client import (
         ProvisioningDeviceClient as ProvisioningDeviceClient_,
     )
@@ -263,3 +278,8 @@ def execute_patch_for_async():
         "create_from_x509_certificate",
         classmethod(create_from_x509_certificate),
     )
+
+
+def execute_patch_for_async():
+    execute_patch_for_async_iothub()
+    execute_patch_for_async_provisioning()
@@ -5,6 +5,6 @@ This package provides shared modules for use with various Azure IoT device-side
 INTERNAL USAGE ONLY
 """
 
-from .models import X509, ProxyOptions
+from .models import X509, ProxyOptions, OfflineStoreOptions, RetryPolicy
 
-__all__ = ["X509", "ProxyOptions"]
+__all__ = ["X509", "ProxyOptions", "OfflineStoreOptions", "RetryPolicy"]
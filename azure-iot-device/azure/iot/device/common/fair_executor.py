@@ -0,0 +1,138 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains an executor which runs work items from many submitters in parallel,
+while sharing its workers fairly between the submitters.
+"""
+
+import collections
+import logging
+import threading
+from concurrent.futures import Future
+from six.moves import queue
+
+logger = logging.getLogger(__name__)
+
+
+class FairExecutor(object):
+    """
+    An executor which runs submitted functions on a bounded pool of worker threads.
+
+    Every submission is made on behalf of a key (e.g. the client making a request).  Pending work
+    items are queued per key, and idle workers take work from the keys in round-robin order, so a
+    key which submits a burst of work can't starve the other keys.  Work items from the same key
+    can still run in parallel with each other.  The total number of work items waiting for a
+    worker is bounded.
+    """
+
+    def __init__(self, max_workers, max_queue_size, thread_name):
+        """
+        Initializer for FairExecutor
+
+        :param int max_workers: Maximum number of functions running at the same time.
+        :param int max_queue_size: Maximum number of functions waiting for a worker.  Functions
+            which an idle (or new) worker takes right away are not counted, so with 0, functions
+            are only refused while every worker is busy.
+        :param str thread_name: Name given to all the worker threads.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size cannot be negative")
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._thread_name = thread_name
+        self._lock = threading.Lock()
+        self._work_available = threading.Condition(self._lock)
+        self._queues = {}  # key -> deque of pending work items
+        self._ready_keys = collections.deque()  # keys with pending work items, in service order
+        self._queued_count = 0
+        self._idle_worker_count = 0
+        # Number of workers woken up (or started) for a work item, which haven't taken one yet
+        self._wakeup_count = 0
+        self._workers = []
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) to run on a worker thread on behalf of the given key.
+
+        :returns: A concurrent.futures.Future for the result of the call.
+        :raises: queue.Full if no worker is free and the maximum number of work items are
+            already waiting for one.
+        """
+        future = Future()
+        with self._lock:
+            worker_available = self._idle_worker_count or len(self._workers) < self.max_workers
+            waiting_count = self._queued_count - self._wakeup_count
+            if not worker_available and waiting_count >= self.max_queue_size:
+                raise queue.Full("Too many pending work items ({})".format(waiting_count))
+            key_queue = self._queues.get(key)
+            if key_queue is None:
+                key_queue = self._queues[key] = collections.deque()
+                self._ready_keys.append(key)
+            key_queue.append((future, fn, args, kwargs))
+            self._queued_count += 1
+
+            if self._idle_worker_count:
+                # The woken worker is no longer counted as idle, so that further submissions
+                # wake (or start) other workers
+                self._idle_worker_count -= 1
+                self._wakeup_count += 1
+                self._work_available.notify()
+            elif len(self._workers) < self.max_workers:
+                self._wakeup_count += 1
+                self._start_worker()
+        return future
+
+    def _start_worker(self):
+        logger.debug("Starting {} worker {}".format(self._thread_name, len(self._workers) + 1))
+        worker = threading.Thread(target=self._worker_proc, name=self._thread_name)
+        worker.daemon = True
+        self._workers.append(worker)
+        worker.start()
+
+    def _get_next_work_item(self):
+        """
+        Take the oldest work item of the next key in round-robin order.  Must be called with the
+        lock held, and only if there is at least one pending work item.
+        """
+        key = self._ready_keys.popleft()
+        key_queue = self._queues[key]
+        work_item = key_queue.popleft()
+        if key_queue:
+            # More work for this key, but it goes to the back of the line
+            self._ready_keys.append(key)
+        else:
+            del self._queues[key]
+        self._queued_count -= 1
+        return work_item
+
+    def _worker_proc(self):
+        # Workers are started for a work item, just like idle workers are woken up for one
+        woken_up = True
+        while True:
+            with self._lock:
+                if woken_up:
+                    self._wakeup_count -= 1
+                while not self._queued_count:
+                    self._idle_worker_count += 1
+                    self._work_available.wait()
+                    self._wakeup_count -= 1
+                work_item = self._get_next_work_item()
+            woken_up = False
+            self._run_work_item(*work_item)
+            # Don't keep the work item alive while waiting for the next one
+            work_item = None
+
+    @staticmethod
+    def _run_work_item(future, fn, args, kwargs):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
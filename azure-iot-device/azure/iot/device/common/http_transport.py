@@ -9,19 +9,182 @@ import uuid
 import threading
 import json
 import ssl
+import socket
+import time
+import collections
+from concurrent.futures import Future
 from . import transport_exceptions as exceptions
-from .pipeline import pipeline_thread
-from six.moves import http_client
+from . import handle_exceptions, ssl_context_cache
+from .fair_executor import FairExecutor
+from six.moves import http_client, queue
 
 logger = logging.getLogger(__name__)
 
+# Default maximum number of idle keep-alive connections kept open per host
+DEFAULT_POOL_SIZE = 4
+# Default maximum number of HTTPS requests running at the same time, across all transports
+# sharing an executor
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+# Default maximum number of HTTPS requests waiting for one of the running requests to finish
+DEFAULT_MAX_QUEUED_REQUESTS = 1000
+# Default number of seconds an idle keep-alive connection is kept before being closed.
+# This is kept well below the idle timeout of the service so that pooled connections are
+# rarely closed by the server before we reuse them.
+DEFAULT_IDLE_TIMEOUT = 60
+# Methods which can be sent again if the connection fails while waiting for the response.
+# Others (e.g. the POST invoking a method on a device) may already have been acted on.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"])
+
+
+class _RequestNotSentError(Exception):
+    """
+    The request could not be written to the connection.  The server didn't get a complete
+    request, so it is safe to send the request again, whatever its method.
+    """
+
+    def __init__(self, cause):
+        super(_RequestNotSentError, self).__init__(cause)
+        self.cause = cause
+
+
+class PooledHTTPSConnection(http_client.HTTPSConnection):
+    """
+    An HTTPSConnection which resumes a previous TLS session, if provided one, when connecting.
+    Resuming a session skips most of the work of a full TLS handshake.
+    """
+
+    def __init__(self, host, context, tls_session=None):
+        # HTTPSConnection is an old-style class on Python 2.7, so super() can't be used
+        http_client.HTTPSConnection.__init__(self, host, context=context)
+        self.tls_session = tls_session
+
+    def connect(self):
+        if self.tls_session is None or not hasattr(ssl.SSLSocket, "session"):
+            # Nothing to resume, or session resumption is not supported (Python < 3.6)
+            return http_client.HTTPSConnection.connect(self)
+        # Open the TCP connection, then do the TLS handshake ourselves so the session can be passed
+        http_client.HTTPConnection.connect(self)
+        self.sock = self._context.wrap_socket(
+            self.sock, server_hostname=self.host, session=self.tls_session
+        )
+        logger.debug("TLS session reused: {}".format(self.sock.session_reused))
+
+
+_shared_executors = {}
+_shared_executors_lock = threading.Lock()
+
+
+def _get_shared_executor(max_concurrent_requests, max_queued_requests):
+    """
+    Get the executor shared by all transports using the given limits, creating it if necessary.
+    """
+    key = (max_concurrent_requests, max_queued_requests)
+    with _shared_executors_lock:
+        executor = _shared_executors.get(key)
+        if executor is None:
+            logger.debug("Creating http executor with {} workers".format(max_concurrent_requests))
+            executor = _shared_executors[key] = FairExecutor(
+                max_workers=max_concurrent_requests,
+                max_queue_size=max_queued_requests,
+                thread_name="azure_iot_http",
+            )
+    return executor
+
+
+class HTTPSConnectionPool(object):
+    """
+    A pool of keep-alive HTTPS connections to a single host.
+
+    Idle connections are handed out most recently used first, and are closed once they have been
+    idle for longer than the idle timeout.  The TLS session of the most recent connection is
+    kept so that new connections can resume it.
+    """
+
+    def __init__(
+        self, hostname, ssl_context, max_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT
+    ):
+        """
+        Initializer for HTTPSConnectionPool
+
+        :param str hostname: Hostname of the remote host.
+        :param ssl_context: The SSLContext used for all connections to the host.
+        :param int max_size: Maximum number of idle connections kept open.
+        :param float idle_timeout: Number of seconds a connection can stay idle before it is closed.
+        """
+        self._hostname = hostname
+        self._ssl_context = ssl_context
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.tls_session = None
+        self._idle_connections = collections.deque()  # (connection, time it became idle)
+        self._lock = threading.Lock()
+
+    def _evict_expired_connections(self):
+        # Connections are appended as they become idle, so the oldest are on the left
+        now = time.time()
+        while self._idle_connections and (now - self._idle_connections[0][1] > self.idle_timeout):
+            logger.debug("Closing idle https connection")
+            self._idle_connections.popleft()[0].close()
+
+    def get_connection(self):
+        """
+        Get a connection to the host, reusing an idle connection if there is one.
+
+        :returns: Tuple of the connection and a bool indicating if it is a reused connection.
+        """
+        with self._lock:
+            self._evict_expired_connections()
+            if self._idle_connections:
+                return self._idle_connections.pop()[0], True
+            tls_session = self.tls_session
+        logger.debug("creating an https connection")
+        return (
+            PooledHTTPSConnection(
+                self._hostname, context=self._ssl_context, tls_session=tls_session
+            ),
+            False,
+        )
+
+    def release_connection(self, connection):
+        """
+        Return a connection to the pool once its response has been read in full.  The connection
+        is closed instead if the pool is full.
+        """
+        session = getattr(getattr(connection, "sock", None), "session", None)
+        with self._lock:
+            if session is not None:
+                self.tls_session = session
+            self._evict_expired_connections()
+            if len(self._idle_connections) < self.max_size:
+                self._idle_connections.append((connection, time.time()))
+                return
+        connection.close()
+
+    def clear(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            while self._idle_connections:
+                self._idle_connections.pop()[0].close()
+
 
 class HTTPTransport(object):
     """
     A wrapper class that provides an implementation-agnostic HTTP interface.
     """
 
-    def __init__(self, hostname, server_verification_cert=None, x509_cert=None, cipher=None):
+    def __init__(
+        self,
+        hostname,
+        server_verification_cert=None,
+        x509_cert=None,
+        cipher=None,
+        pool_size=None,
+        idle_timeout=DEFAULT_IDLE_TIMEOUT,
+        max_concurrent_requests=DEFAULT_MAX_CONCURRENT_REQUESTS,
+        max_queued_requests=DEFAULT_MAX_QUEUED_REQUESTS,
+    ):
         """
         Constructor to instantiate an HTTP protocol wrapper.
 
@@ -29,49 +192,42 @@ class HTTPTransport(object):
         :param str server_verification_cert: Certificate which can be used to validate a server-side TLS connection (optional).
         :param str cipher: Cipher string in OpenSSL cipher list format (optional)
         :param x509_cert: Certificate which can be used to authenticate connection to a server in lieu of a password (optional).
+        :param int pool_size: Maximum number of idle keep-alive connections kept open (optional).
+            Defaults to max_concurrent_requests.
+        :param float idle_timeout: Number of seconds an idle keep-alive connection is kept open (optional).
+        :param int max_concurrent_requests: Maximum number of requests sent at the same time (optional).
+            Transports using the same limits share their worker threads, which are handed out fairly
+            between the transports.
+        :param int max_queued_requests: Maximum number of requests waiting to be sent (optional).
         """
         self._hostname = hostname
         self._server_verification_cert = server_verification_cert
         self._x509_cert = x509_cert
         self._cipher = cipher
         self._ssl_context = self._create_ssl_context()
+        if pool_size is None:
+            pool_size = max_concurrent_requests
+        self._connection_pool = HTTPSConnectionPool(
+            hostname, self._ssl_context, max_size=pool_size, idle_timeout=idle_timeout
+        )
+        self._executor = _get_shared_executor(max_concurrent_requests, max_queued_requests)
 
     def _create_ssl_context(self):
         """
-        This method creates the SSLContext object used to authenticate the connection. The generated context is used by the http_client and is necessary when authenticating using a self-signed X509 cert or trusted X509 cert
+        This method gets the SSLContext object used to authenticate the connection. The context is used by the http_client and is necessary when authenticating using a self-signed X509 cert or trusted X509 cert.
+        The context is shared with other transports using the same certificates and cipher.
         """
-        logger.debug("creating a SSL context")
-        ssl_context = ssl.SSLContext(protocol=ssl.PROTOCOL_TLSv1_2)
-
-        if self._server_verification_cert:
-            ssl_context.load_verify_locations(cadata=self._server_verification_cert)
-        else:
-            ssl_context.load_default_certs()
+        return ssl_context_cache.get_ssl_context(
+            server_verification_cert=self._server_verification_cert,
+            cipher=self._cipher,
+            x509_cert=self._x509_cert,
+        )
 
-        if self._cipher:
-            try:
-                ssl_context.set_ciphers(self._cipher)
-            except ssl.SSLError as e:
-                # TODO: custom error with more detail?
-                raise e
-
-        if self._x509_cert is not None:
-            logger.debug("configuring SSL context with client-side certificate and key")
-            ssl_context.load_cert_chain(
-                self._x509_cert.certificate_file,
-                self._x509_cert.key_file,
-                self._x509_cert.pass_phrase,
-            )
-
-        ssl_context.verify_mode = ssl.CERT_REQUIRED
-        ssl_context.check_hostname = True
-
-        return ssl_context
-
-    @pipeline_thread.invoke_on_http_thread_nowait
     def request(self, method, path, callback, body="", headers={}, query_params=""):
         """
-        This method creates a connection to a remote host, sends a request to that host, and then waits for and reads the response from that request.
+        This method queues a request to the remote host and returns immediately.  On an HTTP worker
+        thread, the request is sent over a pooled keep-alive connection (connecting first if there is
+        no idle connection), and then the response to that request is read.
 
         :param str method: The request method (e.g. "POST")
         :param str path: The path for the URL
@@ -79,15 +235,34 @@ class HTTPTransport(object):
         :param str body: The body of the HTTP request to be sent following the headers.
         :param dict headers: A dictionary that provides extra HTTP headers to be sent with the request.
         :param str query_params: The optional query parameters to be appended at the end of the URL.
+
+        :returns: A concurrent.futures.Future which completes once the callback has been called.
         """
+        try:
+            return self._executor.submit(
+                self, self._run_request, method, path, callback, body, headers, query_params
+            )
+        except queue.Full as e:
+            logger.error("Too many pending https requests.  Failing request")
+            callback(
+                error=exceptions.ProtocolClientError(
+                    message="Too many pending HTTPS requests", cause=e
+                )
+            )
+            future = Future()
+            future.set_result(None)
+            return future
+
+    def _run_request(self, method, path, callback, body, headers, query_params):
+        try:
+            self._request(method, path, callback, body, headers, query_params)
+        except Exception as e:
+            handle_exceptions.handle_background_exception(e)
+
+    def _request(self, method, path, callback, body, headers, query_params):
         # Sends a complete request to the server
         logger.info("sending https request.")
         try:
-            logger.debug("creating an https connection")
-            connection = http_client.HTTPSConnection(self._hostname, context=self._ssl_context)
-            logger.debug("connecting to host tcp socket")
-            connection.connect()
-            logger.debug("connection succeeded")
             url = "https://{hostname}/{path}{query_params}".format(
                 hostname=self._hostname,
                 path=path,
@@ -96,18 +271,20 @@ class HTTPTransport(object):
             logger.debug("Sending Request to HTTP URL: {}".format(url))
             logger.debug("HTTP Headers: {}".format(headers))
             logger.debug("HTTP Body: {}".format(body))
-            connection.request(method, url, body=body, headers=headers)
-            response = connection.getresponse()
-            status_code = response.status
-            reason = response.reason
-            response_string = response.read()
-
-            logger.debug("response received")
-            logger.debug("closing connection to https host")
-            connection.close()
-            logger.debug("connection closed")
+            connection, reused = self._connection_pool.get_connection()
+            try:
+                response_obj = self._send_request(connection, method, url, body, headers)
+            except _RequestNotSentError as e:
+                if not reused or not isinstance(e.cause, (http_client.BadStatusLine, socket.error)):
+                    raise e.cause
+                response_obj = self._resend_request(e.cause, method, url, body, headers)
+            except (http_client.BadStatusLine, socket.error) as e:
+                # The server may have received the request before the connection failed, so it
+                # is only sent again if doing so has no further effect.
+                if not reused or method.upper() not in IDEMPOTENT_METHODS:
+                    raise
+                response_obj = self._resend_request(e, method, url, body, headers)
             logger.info("https request sent, and response received.")
-            response_obj = {"status_code": status_code, "reason": reason, "resp": response_string}
             callback(response=response_obj)
         except Exception as e:
             logger.error("Error in HTTP Transport: {}".format(e))
@@ -116,3 +293,49 @@ class HTTPTransport(object):
                     message="Unexpected HTTPS failure during connect", cause=e
                 )
             )
+
+    def _resend_request(self, error, method, url, body, headers):
+        """
+        Send a request which failed on a reused connection again, on a new connection.
+        """
+        # The server closed the keep-alive connection while it was idle.  Any other idle
+        # connections are likely to be stale as well, so start over with a new one.
+        logger.info("Pooled https connection is stale ({}).  Reconnecting".format(error))
+        self._connection_pool.clear()
+        connection, _ = self._connection_pool.get_connection()
+        try:
+            return self._send_request(connection, method, url, body, headers)
+        except _RequestNotSentError as e:
+            raise e.cause
+
+    def _send_request(self, connection, method, url, body, headers):
+        """
+        Send a request on the given connection and read the response.  The connection is
+        returned to the pool afterwards if it can be kept alive, and closed otherwise.
+
+        :raises: _RequestNotSentError if the request could not be written to the connection.
+        """
+        try:
+            try:
+                if getattr(connection, "sock", None) is None:
+                    logger.debug("connecting to host tcp socket")
+                    connection.connect()
+                    logger.debug("connection succeeded")
+                connection.request(method, url, body=body, headers=headers)
+            except Exception as e:
+                raise _RequestNotSentError(e)
+            response = connection.getresponse()
+            status_code = response.status
+            reason = response.reason
+            response_string = response.read()
+            logger.debug("response received")
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close:
+            logger.debug("closing connection to https host")
+            connection.close()
+        else:
+            self._connection_pool.release_connection(connection)
+        return {"status_code": status_code, "reason": reason, "resp": response_string}
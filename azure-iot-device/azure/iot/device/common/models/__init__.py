@@ -5,3 +5,5 @@ This package provides object models for use within the Azure Provisioning Device
 
 from .x509 import X509
 from .proxy_options import ProxyOptions
+from .offline_store_options import OfflineStoreOptions
+from .retry_policy import RetryPolicy
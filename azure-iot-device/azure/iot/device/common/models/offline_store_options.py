@@ -0,0 +1,88 @@
+# --------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""
+This module represents offline store options to enable storing telemetry on disk while disconnected.
+"""
+
+# Overflow policies
+DROP_OLDEST = "drop_oldest"
+REJECT_NEW = "reject_new"
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024
+DEFAULT_MAX_IN_FLIGHT = 32
+
+
+class OfflineStoreOptions(object):
+    """
+    A class containing various options to store outgoing telemetry on disk while the client is
+    disconnected, and to send it, in order, once the client connects again. Stored telemetry
+    survives a restart of the process.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_size=DEFAULT_MAX_SIZE,
+        max_age=None,
+        overflow_policy=DROP_OLDEST,
+        segment_size=DEFAULT_SEGMENT_SIZE,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    ):
+        """
+        Initializer for offline store options.
+        :param str path: Path of the directory in which the stored telemetry is kept. The directory
+         is created if it does not exist. It must not be shared between clients.
+        :param int max_size: (optional) Maximum number of bytes of stored telemetry. Defaults to 64MB.
+        :param float max_age: (optional) Number of seconds after which stored telemetry is discarded
+         instead of sent. If not provided, stored telemetry does not expire.
+        :param str overflow_policy: (optional) What to do when max_size is reached. Either
+         "drop_oldest" (default) to discard the oldest stored telemetry, or "reject_new" to fail new
+         telemetry.
+        :param int segment_size: (optional) Size in bytes of the files the stored telemetry is split
+         into. Space is reclaimed one file at a time. Defaults to 4MB.
+        :param int max_in_flight: (optional) Maximum number of stored messages being sent at the
+         same time after reconnecting. Defaults to 32.
+
+        :raises: ValueError if given an invalid overflow_policy, or if max_size is not at least
+         twice the segment_size.
+        """
+        if overflow_policy not in (DROP_OLDEST, REJECT_NEW):
+            raise ValueError("Invalid overflow_policy: {}".format(overflow_policy))
+        if max_size < 2 * segment_size:
+            raise ValueError("max_size must be at least twice the segment_size")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self._path = path
+        self._max_size = max_size
+        self._max_age = max_age
+        self._overflow_policy = overflow_policy
+        self._segment_size = segment_size
+        self._max_in_flight = max_in_flight
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def max_age(self):
+        return self._max_age
+
+    @property
+    def overflow_policy(self):
+        return self._overflow_policy
+
+    @property
+    def segment_size(self):
+        return self._segment_size
+
+    @property
+    def max_in_flight(self):
+        return self._max_in_flight
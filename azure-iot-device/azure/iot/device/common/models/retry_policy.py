@@ -0,0 +1,203 @@
+# --------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""
+This module represents a policy for retrying failed operations and reconnecting after a
+connection is lost.
+"""
+
+import random
+import threading
+import time
+
+# Python 2.7 has no monotonic clock
+_clock = getattr(time, "monotonic", time.time)
+
+# Kinds of operations the retry policy applies to
+PUBLISH = "publish"
+SUBSCRIBE = "subscribe"
+UNSUBSCRIBE = "unsubscribe"
+CONNECT = "connect"
+
+DEFAULT_INITIAL_INTERVAL = 1.0
+DEFAULT_MAX_INTERVAL = 60.0
+
+
+class RetryPolicy(object):
+    """
+    A class containing options for how the client waits before retrying failed operations and
+    before reconnecting after the connection is lost.
+
+    The time between attempts grows exponentially, up to max_interval. With jitter (the default),
+    each wait is picked at random between initial_interval and three times the previous wait
+    ("decorrelated jitter"), so that many clients which lose their connection at the same time
+    don't all retry at the same time.
+    """
+
+    def __init__(
+        self,
+        initial_interval=DEFAULT_INITIAL_INTERVAL,
+        max_interval=DEFAULT_MAX_INTERVAL,
+        jitter=True,
+        max_retries=None,
+        max_retries_per_op=None,
+        retry_budget=None,
+        retry_budget_refill_rate=1.0,
+    ):
+        """
+        Initializer for RetryPolicy
+
+        :param float initial_interval: (optional) Number of seconds to wait before the first
+         retry. Defaults to 1 second.
+        :param float max_interval: (optional) Maximum number of seconds to wait between attempts.
+         Defaults to 60 seconds.
+        :param bool jitter: (optional) Whether to randomize the waits. Defaults to True. If False,
+         the wait doubles after each attempt.
+        :param int max_retries: (optional) Maximum number of times an operation is retried before
+         it fails. If not provided, operations are retried until they succeed. Reconnecting is
+         never limited.
+        :param dict max_retries_per_op: (optional) Maximum number of retries for specific kinds
+         of operations, overriding max_retries. Keys are "publish", "subscribe" or "unsubscribe".
+        :param int retry_budget: (optional) Maximum number of operation retries the client can
+         make in a burst. Retries made once the budget is used up fail the operation instead.
+         If not provided, retries are not limited this way.
+        :param float retry_budget_refill_rate: (optional) Number of retries per second added back
+         to the retry budget. Defaults to 1.
+
+        :raises: ValueError if given an invalid interval, number of retries or retry budget.
+        """
+        if initial_interval <= 0:
+            raise ValueError("initial_interval must be greater than 0")
+        if max_interval < initial_interval:
+            raise ValueError("max_interval cannot be less than initial_interval")
+        if max_retries is not None and max_retries < 0:
+            raise ValueError("max_retries cannot be negative")
+        max_retries_per_op = dict(max_retries_per_op or {})
+        for op_kind, op_max_retries in max_retries_per_op.items():
+            if op_kind not in (PUBLISH, SUBSCRIBE, UNSUBSCRIBE):
+                raise ValueError("Invalid operation kind in max_retries_per_op: {}".format(op_kind))
+            if op_max_retries is not None and op_max_retries < 0:
+                raise ValueError("max_retries_per_op values cannot be negative")
+        if retry_budget is not None and retry_budget < 1:
+            raise ValueError("retry_budget must be at least 1")
+        if retry_budget_refill_rate <= 0:
+            raise ValueError("retry_budget_refill_rate must be greater than 0")
+        self._initial_interval = initial_interval
+        self._max_interval = max_interval
+        self._jitter = jitter
+        self._max_retries = max_retries
+        self._max_retries_per_op = max_retries_per_op
+        self._retry_budget = retry_budget
+        self._retry_budget_refill_rate = retry_budget_refill_rate
+
+    @property
+    def initial_interval(self):
+        return self._initial_interval
+
+    @property
+    def max_interval(self):
+        return self._max_interval
+
+    @property
+    def jitter(self):
+        return self._jitter
+
+    @property
+    def max_retries(self):
+        return self._max_retries
+
+    @property
+    def max_retries_per_op(self):
+        return dict(self._max_retries_per_op)
+
+    @property
+    def retry_budget(self):
+        return self._retry_budget
+
+    @property
+    def retry_budget_refill_rate(self):
+        return self._retry_budget_refill_rate
+
+    def get_max_retries(self, op_kind):
+        """
+        Get the maximum number of retries for a kind of operation.
+
+        :param str op_kind: The kind of operation.
+
+        :returns: The maximum number of retries, or None if not limited.
+        """
+        if op_kind == CONNECT:
+            return None
+        return self._max_retries_per_op.get(op_kind, self._max_retries)
+
+    def get_retry_interval(self, op_kind, retry_count, previous_interval=None):
+        """
+        Get the number of seconds to wait before the next attempt of an operation.
+
+        :param str op_kind: The kind of operation.
+        :param int retry_count: The number of times the operation has already been retried.
+        :param float previous_interval: (optional) The wait before the previous attempt, if any.
+
+        :returns: The number of seconds to wait, or None if the operation should not be retried
+         again.
+        """
+        max_retries = self.get_max_retries(op_kind)
+        if max_retries is not None and retry_count >= max_retries:
+            return None
+        if self._jitter:
+            if previous_interval is None:
+                previous_interval = self._initial_interval
+            interval = random.uniform(self._initial_interval, previous_interval * 3)
+        else:
+            # Cap the exponent so that the interval can't overflow
+            interval = self._initial_interval * (2 ** min(retry_count, 64))
+        return min(interval, self._max_interval)
+
+    def create_retry_budget(self):
+        """
+        Create a new retry budget, to be used by a single client.
+
+        :returns: A RetryBudget
+        """
+        return RetryBudget(self._retry_budget, self._retry_budget_refill_rate)
+
+
+class RetryBudget(object):
+    """
+    A token bucket which limits how many retries can be made in a burst.  Each retry takes a
+    token, and tokens are added back at a steady rate.
+    """
+
+    def __init__(self, capacity, refill_rate):
+        """
+        Initializer for RetryBudget
+
+        :param int capacity: Maximum number of tokens in the bucket, or None if not limited.
+        :param float refill_rate: Number of tokens added to the bucket per second.
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._tokens = capacity
+        self._last_refill = _clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+        Take a token from the bucket, if there is one.
+
+        :returns: True if a token was taken, False if the budget is used up.
+        """
+        if self.capacity is None:
+            return True
+        with self._lock:
+            now = _clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate
+            )
+            self._last_refill = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
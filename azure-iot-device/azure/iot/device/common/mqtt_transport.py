@@ -13,6 +13,7 @@ import traceback
 import weakref
 import socket
 from . import transport_exceptions as exceptions
+from . import ssl_context_cache
 import socks
 
 logger = logging.getLogger(__name__)
@@ -51,6 +52,13 @@ paho_rc_to_error = {
 # to make sure the connection is still open.
 DEFAULT_KEEPALIVE = 60
 
+# Interval, in seconds, at which Paho's keepalive and retry processing runs when the
+# client is driven by an event loop.  This matches what the Paho thread does.
+MISC_LOOP_INTERVAL = 1
+
+# TLS session resumption needs Python 3.6+
+TLS_SESSION_RESUMPTION_SUPPORTED = hasattr(ssl.SSLSocket, "session")
+
 
 def _create_error_from_connack_rc_code(rc):
     """
@@ -77,6 +85,33 @@ def _create_error_from_rc_code(rc):
         return exceptions.ProtocolClientError("Unknown CONNACK rc=={}".format(rc))
 
 
+class _SessionResumingSSLContext(object):
+    """
+    Wraps the SSLContext given to Paho, so that each new connection (i.e. a reconnect, or a
+    reconnect to reauthorize) resumes the TLS session of the previous connection instead of
+    doing a full handshake.  The first connection resumes the latest session of any other
+    transport sharing the SSLContext and connecting to the same host, if there is one.  If the
+    server doesn't accept the session, a full handshake is done.
+    """
+
+    def __init__(self, ssl_context):
+        self.ssl_context = ssl_context
+        self.session = None
+
+    def __getattr__(self, name):
+        return getattr(self.ssl_context, name)
+
+    def wrap_socket(self, sock, **kwargs):
+        session = self.session
+        if session is None:
+            session = ssl_context_cache.get_tls_session(
+                self.ssl_context, kwargs.get("server_hostname")
+            )
+        if session is not None:
+            kwargs["session"] = session
+        return self.ssl_context.wrap_socket(sock, **kwargs)
+
+
 class MQTTTransport(object):
     """
     A wrapper class that provides an implementation-agnostic MQTT message broker interface.
@@ -101,6 +136,7 @@ class MQTTTransport(object):
         websockets=False,
         cipher=None,
         proxy_options=None,
+        event_loop=None,
     ):
         """
         Constructor to instantiate an MQTT protocol wrapper.
@@ -112,6 +148,9 @@ class MQTTTransport(object):
         :param bool websockets: Indicates whether or not to enable a websockets connection in the Transport.
         :param str cipher: Cipher string in OpenSSL cipher list format
         :param proxy_options: Options for sending traffic through proxy servers.
+        :param event_loop: An asyncio event loop to drive the network traffic on (optional).
+            If provided, the socket is registered with the loop instead of being serviced by a
+            Paho thread, and all calls into this object must be made on the loop's thread.
         """
         self._client_id = client_id
         self._hostname = hostname
@@ -122,6 +161,15 @@ class MQTTTransport(object):
         self._websockets = websockets
         self._cipher = cipher
         self._proxy_options = proxy_options
+        self._event_loop = event_loop
+        self._misc_timer = None
+        self._ssl_context = None
+
+        if event_loop and not hasattr(mqtt.Client, "on_socket_open"):
+            logger.warning(
+                "Installed Paho version cannot be driven by an event loop.  Using Paho thread instead"
+            )
+            self._event_loop = None
 
         self.on_mqtt_connected_handler = None
         self.on_mqtt_disconnected_handler = None
@@ -167,6 +215,9 @@ class MQTTTransport(object):
 
         # Configure TLS/SSL
         ssl_context = self._create_ssl_context()
+        if TLS_SESSION_RESUMPTION_SUPPORTED:
+            ssl_context = _SessionResumingSSLContext(ssl_context)
+        self._ssl_context = ssl_context
         mqtt_client.tls_set_context(context=ssl_context)
 
         # Set event handlers.  Use weak references back into this object to prevent
@@ -193,7 +244,10 @@ class MQTTTransport(object):
                     logger.warning(
                         "connection failed, but no on_mqtt_connection_failure_handler handler callback provided"
                     )
-            elif this.on_mqtt_connected_handler:
+                return
+
+            this._save_tls_session(client)
+            if this.on_mqtt_connected_handler:
                 try:
                     this.on_mqtt_connected_handler()
                 except Exception:
@@ -271,6 +325,9 @@ class MQTTTransport(object):
         mqtt_client.on_publish = on_publish
         mqtt_client.on_message = on_message
 
+        if self._event_loop:
+            self._set_event_loop_handlers(mqtt_client)
+
         # Set paho automatic-reconnect delay to 2 hours.  Ideally we would turn
         # paho auto-reconnect off entirely, but this is the best we can do.  Without
         # this, we run the risk of our auto-reconnect code and the paho auto-reconnect
@@ -281,6 +338,62 @@ class MQTTTransport(object):
         logger.debug("Created MQTT protocol client, assigned callbacks")
         return mqtt_client
 
+    def _set_event_loop_handlers(self, mqtt_client):
+        """
+        Assign the Paho socket callbacks used to drive the client from the event loop rather than
+        from a Paho thread.  Paho calls these whenever the socket is opened or closed, and whenever
+        it starts or stops having data waiting to be written.
+        """
+        self_weakref = weakref.ref(self)
+        loop = self._event_loop
+
+        def on_socket_readable():
+            this = self_weakref()
+            if this:
+                client = this._mqtt_client
+                rc = client.loop_read()
+                sock = client.socket()
+                # TLS can hold decrypted data which the selector will never report as readable
+                if not rc and sock and hasattr(sock, "pending") and sock.pending():
+                    loop.call_soon(on_socket_readable)
+
+        def on_socket_writable():
+            this = self_weakref()
+            if this:
+                this._mqtt_client.loop_write()
+
+        def on_misc_timer():
+            # Paho's keepalive and retry processing, which its own thread normally takes care of
+            this = self_weakref()
+            if this and this._mqtt_client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+                this._misc_timer = loop.call_later(MISC_LOOP_INTERVAL, on_misc_timer)
+
+        def on_socket_open(client, userdata, sock):
+            logger.debug("Registering socket with event loop")
+            this = self_weakref()
+            loop.add_reader(sock, on_socket_readable)
+            if this:
+                this._misc_timer = loop.call_later(MISC_LOOP_INTERVAL, on_misc_timer)
+
+        def on_socket_close(client, userdata, sock):
+            logger.debug("Unregistering socket from event loop")
+            this = self_weakref()
+            loop.remove_reader(sock)
+            if this and this._misc_timer:
+                this._misc_timer.cancel()
+                this._misc_timer = None
+
+        def on_socket_register_write(client, userdata, sock):
+            loop.add_writer(sock, on_socket_writable)
+
+        def on_socket_unregister_write(client, userdata, sock):
+            loop.remove_writer(sock)
+
+        mqtt_client.on_socket_open = on_socket_open
+        mqtt_client.on_socket_close = on_socket_close
+        mqtt_client.on_socket_register_write = on_socket_register_write
+        mqtt_client.on_socket_unregister_write = on_socket_unregister_write
+
     def _cleanup_transport_on_error(self):
         """
         After disconnecting because of an error, Paho was designed to keep the loop running and
@@ -317,37 +430,37 @@ class MQTTTransport(object):
 
         logger.debug("Done forcing paho disconnect")
 
-    def _create_ssl_context(self):
+    def _save_tls_session(self, mqtt_client):
         """
-        This method creates the SSLContext object used by Paho to authenticate the connection.
+        Keep the TLS session of the current connection, to resume it on the next connection.
         """
-        logger.debug("creating a SSL context")
-        ssl_context = ssl.SSLContext(protocol=ssl.PROTOCOL_TLSv1_2)
-
-        if self._server_verification_cert:
-            ssl_context.load_verify_locations(cadata=self._server_verification_cert)
-        else:
-            ssl_context.load_default_certs()
-
-        if self._cipher:
-            try:
-                ssl_context.set_ciphers(self._cipher)
-            except ssl.SSLError as e:
-                # TODO: custom error with more detail?
-                raise e
-
-        if self._x509_cert is not None:
-            logger.debug("configuring SSL context with client-side certificate and key")
-            ssl_context.load_cert_chain(
-                self._x509_cert.certificate_file,
-                self._x509_cert.key_file,
-                self._x509_cert.pass_phrase,
+        if not isinstance(self._ssl_context, _SessionResumingSSLContext):
+            return
+        sock = mqtt_client.socket()
+        # Over websockets, the TLS socket is wrapped by Paho's WebsocketWrapper
+        sock = getattr(sock, "_socket", sock)
+        session = getattr(sock, "session", None)
+        if session is not None:
+            logger.debug(
+                "saving TLS session (session reused: {})".format(
+                    getattr(sock, "session_reused", None)
+                )
+            )
+            self._ssl_context.session = session
+            ssl_context_cache.save_tls_session(
+                self._ssl_context.ssl_context, self._hostname, session
             )
 
-        ssl_context.verify_mode = ssl.CERT_REQUIRED
-        ssl_context.check_hostname = True
-
-        return ssl_context
+    def _create_ssl_context(self):
+        """
+        This method gets the SSLContext object used by Paho to authenticate the connection.
+        The context is shared with other transports using the same certificates and cipher.
+        """
+        return ssl_context_cache.get_ssl_context(
+            server_verification_cert=self._server_verification_cert,
+            cipher=self._cipher,
+            x509_cert=self._x509_cert,
+        )
 
     def connect(self, password=None):
         """
@@ -422,7 +535,8 @@ class MQTTTransport(object):
         logger.debug("_mqtt_client.connect returned rc={}".format(rc))
         if rc:
             raise _create_error_from_rc_code(rc)
-        self._mqtt_client.loop_start()
+        if not self._event_loop:
+            self._mqtt_client.loop_start()
 
     def reauthorize_connection(self, password=None):
         """
@@ -0,0 +1,470 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains a durable queue of MQTT publishes, used to store outgoing telemetry on
+disk while the client is disconnected.
+
+The queue is an append-only log split into segment files.  Each record holds a timestamp, the
+topic, and the payload of a publish, protected by a CRC so that a record torn by a crash is
+detected (and discarded) when the store is opened again.  Records are read back through a memory
+map of the segment file.  A small cursor file holds the position of the first record which has not
+been acknowledged yet.  Space is reclaimed a whole segment at a time, once every record in the
+segment has been acknowledged, has expired, or has been evicted to make room for new records.
+
+Delivery is at-least-once: the cursor is only persisted periodically, so records acknowledged
+shortly before a crash may be read again after a restart.
+"""
+
+import collections
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+import six
+from six.moves import queue
+from .models.offline_store_options import DROP_OLDEST, REJECT_NEW
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+CURSOR_FILE_NAME = "cursor"
+# Number of acknowledged records after which the cursor is persisted
+CURSOR_SYNC_INTERVAL = 100
+
+_CRC = struct.Struct("<I")
+# timestamp, topic length, payload length
+_RECORD_HEADER = struct.Struct("<dHI")
+_RECORD_PREFIX_SIZE = _CRC.size + _RECORD_HEADER.size
+# segment id, offset
+_CURSOR = struct.Struct("<QQ")
+
+StoredRecord = collections.namedtuple("StoredRecord", ["position", "timestamp", "topic", "payload"])
+
+_replace_file = getattr(os, "replace", os.rename)
+
+
+def _to_bytes(data):
+    """
+    Convert a topic or payload to bytes, in the same way paho does when it publishes it.
+
+    :raises: TypeError if data is not a string, a bytes-like object, an int, a float or None.
+    """
+    if isinstance(data, six.text_type):
+        return data.encode("utf-8")
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data)
+    elif isinstance(data, six.integer_types + (float,)):
+        return str(data).encode("ascii")
+    elif data is None:
+        return b""
+    else:
+        raise TypeError("payload must be a string, bytes, bytearray, int, float or None")
+
+
+def _read_record(buf, offset, size):
+    """
+    Read the record at the given offset of buf.
+
+    :returns: A tuple of (timestamp, topic, payload, end offset), or None if there is no valid
+        record at the offset.
+    """
+    if offset + _RECORD_PREFIX_SIZE > size:
+        return None
+    (crc,) = _CRC.unpack_from(buf, offset)
+    timestamp, topic_length, payload_length = _RECORD_HEADER.unpack_from(buf, offset + _CRC.size)
+    topic_start = offset + _RECORD_PREFIX_SIZE
+    payload_start = topic_start + topic_length
+    end = payload_start + payload_length
+    if end > size:
+        return None
+    if zlib.crc32(buf[offset + _CRC.size : end]) & 0xFFFFFFFF != crc:
+        return None
+    return timestamp, buf[topic_start:payload_start], buf[payload_start:end], end
+
+
+class _Segment(object):
+    def __init__(self, segment_id, path):
+        self.id = segment_id
+        self.path = path
+        self.size = 0
+        self.record_count = 0
+        self.consumed_count = 0
+        self.last_timestamp = None
+
+
+class OfflineStore(object):
+    """
+    A durable FIFO queue of MQTT publishes, stored in a directory on disk.
+
+    Records are handed out in order by read(), and must be acknowledged with ack() once they have
+    been delivered.  A reader which gives up on the records it has been handed out calls rewind()
+    to read them again, starting from the first unacknowledged record.
+
+    This object is not thread safe.
+
+    :ivar int dropped_count: Number of records evicted to make room for new records.
+    :ivar int expired_count: Number of records discarded because they were older than max_age.
+    """
+
+    def __init__(
+        self, path, max_size, max_age=None, overflow_policy=DROP_OLDEST, segment_size=4194304
+    ):
+        """
+        Initializer for OfflineStore.  Records left in the directory by a previous OfflineStore
+        are recovered.
+
+        :param str path: Directory holding the segment files.  Created if it doesn't exist.
+        :param int max_size: Maximum number of bytes of records kept on disk.
+        :param float max_age: Number of seconds after which records are discarded (optional).
+        :param str overflow_policy: "drop_oldest" or "reject_new".
+        :param int segment_size: Size in bytes after which a new segment file is started.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.overflow_policy = overflow_policy
+        self.segment_size = segment_size
+        self.dropped_count = 0
+        self.expired_count = 0
+
+        self._segments = collections.deque()  # oldest first; the last one is written to
+        self._cursor = (0, 0)  # position of the first unacknowledged record
+        self._read_position = (0, 0)  # position of the next record handed out by read()
+        self._pending = collections.deque()  # [position, end position, acked] in read order
+        self._unsynced_ack_count = 0
+        self._write_file = None
+        self._next_segment_id = 0
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        self._recover()
+
+    @property
+    def size(self):
+        """Number of bytes of records on disk"""
+        return sum(segment.size for segment in self._segments)
+
+    def __len__(self):
+        """Number of records on disk which have not been acknowledged"""
+        return sum(segment.record_count - segment.consumed_count for segment in self._segments)
+
+    def has_unread_records(self):
+        """Returns True if read() would return more records"""
+        if not self._segments:
+            return False
+        segment_id, offset = self._read_position
+        last_segment = self._segments[-1]
+        return segment_id < last_segment.id or offset < last_segment.size
+
+    def append(self, topic, payload):
+        """
+        Append a record to the end of the store.
+
+        :param str topic: The topic of the publish.
+        :param payload: The payload of the publish.  None is stored as an empty payload, and an
+            int or float as its string representation, as paho would send them.
+        :type payload: str, bytes, bytearray, memoryview, int, float or None
+
+        :raises: queue.Full if the record does not fit in max_size and cannot be made to fit by
+            the overflow policy.
+        :raises: TypeError if the payload is of any other type.
+        """
+        topic = _to_bytes(topic)
+        payload = _to_bytes(payload)
+        timestamp = time.time()
+        header = _RECORD_HEADER.pack(timestamp, len(topic), len(payload))
+        crc = zlib.crc32(payload, zlib.crc32(topic, zlib.crc32(header))) & 0xFFFFFFFF
+        record = b"".join([_CRC.pack(crc), header, topic, payload])
+
+        self._expire_segments(timestamp)
+        self._make_room(len(record))
+
+        segment = self._segments[-1] if self._segments else None
+        if segment is None or (segment.size and segment.size + len(record) > self.segment_size):
+            segment = self._start_segment()
+        elif self._write_file is None:
+            # Continue the last segment left by a previous OfflineStore
+            self._write_file = open(segment.path, "ab")
+        self._write_file.write(record)
+        self._write_file.flush()
+        segment.size += len(record)
+        segment.record_count += 1
+        segment.last_timestamp = timestamp
+
+    def read(self, max_count):
+        """
+        Hand out up to max_count records, in order, following the records already handed out.
+        Expired records are skipped.
+
+        :returns: A list of StoredRecord.
+        """
+        records = []
+        expiry = self._get_expiry(time.time())
+        while len(records) < max_count and self.has_unread_records():
+            segment_id, offset = self._read_position
+            segment = self._get_segment(segment_id)
+            if segment is None or offset >= segment.size:
+                # Move on to the next segment
+                self._read_position = self._get_next_position(segment_id)
+                continue
+            records.extend(self._read_segment(segment, offset, max_count - len(records), expiry))
+            if self._read_position == (segment_id, offset):
+                logger.error("Unreadable record in {} at {}".format(segment.path, offset))
+                break
+        self._commit()
+        return records
+
+    def ack(self, position):
+        """
+        Acknowledge the delivery of the record at the given position.
+        """
+        for entry in self._pending:
+            if entry[0] == position:
+                entry[2] = True
+                break
+        else:
+            # The record was evicted while it was being delivered
+            return
+        self._commit()
+
+    def rewind(self):
+        """
+        Forget about the records which have been handed out by read() but not acknowledged.  The
+        next read() starts again at the first unacknowledged record.
+        """
+        self._pending.clear()
+        self._read_position = self._cursor
+
+    def close(self):
+        """
+        Persist the cursor and close the segment being written to.
+        """
+        self._write_cursor()
+        if self._write_file:
+            self._write_file.close()
+            self._write_file = None
+
+    def _get_expiry(self, now):
+        return now - self.max_age if self.max_age is not None else None
+
+    def _get_segment(self, segment_id):
+        for segment in self._segments:
+            if segment.id == segment_id:
+                return segment
+        return None
+
+    def _get_next_position(self, segment_id):
+        for segment in self._segments:
+            if segment.id > segment_id:
+                return (segment.id, 0)
+        return (segment_id + 1, 0)
+
+    def _get_segment_path(self, segment_id):
+        return os.path.join(self.path, "{:020d}{}".format(segment_id, SEGMENT_SUFFIX))
+
+    def _read_segment(self, segment, offset, max_count, expiry):
+        records = []
+        with open(segment.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                while len(records) < max_count and offset < segment.size:
+                    record = _read_record(mapped, offset, segment.size)
+                    if record is None:
+                        break
+                    timestamp, topic, payload, end = record
+                    position = (segment.id, offset)
+                    if expiry is not None and timestamp < expiry:
+                        self.expired_count += 1
+                        self._pending.append([position, (segment.id, end), True])
+                    else:
+                        self._pending.append([position, (segment.id, end), False])
+                        records.append(
+                            StoredRecord(position, timestamp, topic.decode("utf-8"), payload)
+                        )
+                    offset = end
+                    self._read_position = (segment.id, offset)
+            finally:
+                mapped.close()
+        return records
+
+    def _commit(self):
+        """
+        Advance the cursor past the acknowledged records at the head of the pending list, and
+        delete the segments it has moved past.
+        """
+        while self._pending and self._pending[0][2]:
+            _, end, _ = self._pending.popleft()
+            segment = self._get_segment(end[0])
+            if segment:
+                segment.consumed_count += 1
+            self._cursor = end
+            self._unsynced_ack_count += 1
+
+        segment_deleted = False
+        while len(self._segments) > 1:
+            head = self._segments[0]
+            if self._cursor[0] == head.id and self._cursor[1] >= head.size:
+                self._cursor = (self._segments[1].id, 0)
+            elif self._cursor[0] <= head.id:
+                break
+            self._delete_segment(self._segments.popleft())
+            segment_deleted = True
+
+        if self._unsynced_ack_count and (
+            segment_deleted or not self._pending or self._unsynced_ack_count >= CURSOR_SYNC_INTERVAL
+        ):
+            self._write_cursor()
+
+    def _expire_segments(self, now):
+        expiry = self._get_expiry(now)
+        if expiry is None:
+            return
+        while len(self._segments) > 1 and self._segments[0].last_timestamp < expiry:
+            segment = self._segments[0]
+            logger.info("Discarding expired segment {}".format(segment.path))
+            self.expired_count += segment.record_count - segment.consumed_count
+            self._drop_head_segment()
+
+    def _make_room(self, record_size):
+        if self.size + record_size <= self.max_size:
+            return
+        if self.overflow_policy == REJECT_NEW:
+            raise queue.Full("Offline store is full ({} bytes)".format(self.size))
+        while len(self._segments) > 1 and self.size + record_size > self.max_size:
+            segment = self._segments[0]
+            logger.warning("Offline store is full.  Dropping segment {}".format(segment.path))
+            self.dropped_count += segment.record_count - segment.consumed_count
+            self._drop_head_segment()
+        if self.size + record_size > self.max_size:
+            raise queue.Full("Record of {} bytes does not fit in offline store".format(record_size))
+
+    def _drop_head_segment(self):
+        """
+        Delete the oldest segment, along with any records in it which haven't been acknowledged.
+        """
+        segment = self._segments.popleft()
+        self._delete_segment(segment)
+        next_position = (self._segments[0].id, 0)
+        if self._cursor[0] <= segment.id:
+            self._cursor = next_position
+            self._write_cursor()
+        if self._read_position[0] <= segment.id:
+            self._read_position = next_position
+        self._pending = collections.deque(
+            entry for entry in self._pending if entry[0][0] != segment.id
+        )
+
+    def _delete_segment(self, segment):
+        logger.debug("Deleting offline store segment {}".format(segment.path))
+        try:
+            os.remove(segment.path)
+        except OSError as e:
+            logger.warning("Failed to delete {}: {}".format(segment.path, e))
+
+    def _start_segment(self):
+        if self._write_file:
+            self._write_file.close()
+        segment = _Segment(self._next_segment_id, self._get_segment_path(self._next_segment_id))
+        self._next_segment_id += 1
+        logger.debug("Starting offline store segment {}".format(segment.path))
+        self._write_file = open(segment.path, "ab")
+        self._segments.append(segment)
+        return segment
+
+    def _write_cursor(self):
+        cursor_path = os.path.join(self.path, CURSOR_FILE_NAME)
+        temp_path = cursor_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_CURSOR.pack(*self._cursor))
+        _replace_file(temp_path, cursor_path)
+        self._unsynced_ack_count = 0
+
+    def _read_cursor(self):
+        cursor_path = os.path.join(self.path, CURSOR_FILE_NAME)
+        try:
+            with open(cursor_path, "rb") as f:
+                data = f.read()
+        except (IOError, OSError):
+            return (0, 0)
+        if len(data) != _CURSOR.size:
+            logger.warning("Ignoring invalid offline store cursor")
+            return (0, 0)
+        return _CURSOR.unpack(data)
+
+    def _scan_segment(self, segment):
+        """
+        Count the valid records in a segment file, and truncate any torn record at its end.
+        """
+        with open(segment.path, "r+b") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            offset = 0
+            if file_size:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    while True:
+                        record = _read_record(mapped, offset, file_size)
+                        if record is None:
+                            break
+                        segment.record_count += 1
+                        segment.last_timestamp = record[0]
+                        offset = record[3]
+                finally:
+                    mapped.close()
+            if offset < file_size:
+                logger.warning(
+                    "Truncating {} invalid bytes at the end of {}".format(
+                        file_size - offset, segment.path
+                    )
+                )
+                f.truncate(offset)
+        segment.size = offset
+
+    def _recover(self):
+        cursor = self._read_cursor()
+        segment_ids = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.path)
+            if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+        for segment_id in segment_ids:
+            segment = _Segment(segment_id, self._get_segment_path(segment_id))
+            self._next_segment_id = segment_id + 1
+            if segment_id < cursor[0]:
+                # Every record in the segment has been acknowledged
+                self._delete_segment(segment)
+                continue
+            self._scan_segment(segment)
+            if segment.size == 0:
+                self._delete_segment(segment)
+                continue
+            self._segments.append(segment)
+
+        if self._segments:
+            first_segment = self._segments[0]
+            if first_segment.id == cursor[0]:
+                self._cursor = (first_segment.id, min(cursor[1], first_segment.size))
+            else:
+                self._cursor = (first_segment.id, 0)
+            self._count_consumed_records(first_segment, self._cursor[1])
+            logger.info("Recovered {} stored records from {}".format(len(self), self.path))
+        else:
+            self._cursor = (self._next_segment_id, 0)
+        self._read_position = self._cursor
+
+    def _count_consumed_records(self, segment, cursor_offset):
+        with open(segment.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                offset = 0
+                while offset < cursor_offset:
+                    record = _read_record(mapped, offset, segment.size)
+                    if record is None:
+                        break
+                    segment.consumed_count += 1
+                    offset = record[3]
+            finally:
+                mapped.close()
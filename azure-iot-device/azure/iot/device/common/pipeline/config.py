@@ -7,10 +7,14 @@
 import logging
 import six
 import abc
-from azure.iot.device.common import models
+from azure.iot.device.common import models, http_transport
+from azure.iot.device.common.pipeline import pipeline_thread
 
 logger = logging.getLogger(__name__)
 
+# Executor group shared by pipelines using the asyncio engine without a group of their own
+DEFAULT_ASYNCIO_EXECUTOR_GROUP = "asyncio"
+
 
 @six.add_metaclass(abc.ABCMeta)
 class BasePipelineConfig(object):
@@ -19,7 +23,19 @@ class BasePipelineConfig(object):
     config files.
     """
 
-    def __init__(self, websockets=False, cipher="", proxy_options=None):
+    def __init__(
+        self,
+        websockets=False,
+        cipher="",
+        proxy_options=None,
+        offline_store_options=None,
+        executor_group=None,
+        pipeline_engine=pipeline_thread.THREAD_ENGINE,
+        http_max_concurrent_requests=http_transport.DEFAULT_MAX_CONCURRENT_REQUESTS,
+        http_max_queued_requests=http_transport.DEFAULT_MAX_QUEUED_REQUESTS,
+        retry_policy=None,
+        nonblocking_reauthorization=False,
+    ):
         """Initializer for BasePipelineConfig
 
         :param bool websockets: Enabling/disabling websockets in MQTT. This feature is relevant
@@ -29,10 +45,59 @@ class BasePipelineConfig(object):
         :type cipher: str or list(str)
         :param proxy_options: Details of proxy configuration
         :type proxy_options: :class:`azure.iot.device.common.models.ProxyOptions`
+        :param offline_store_options: Details of the on-disk store used for telemetry sent while
+            disconnected. If None, telemetry is not stored.
+        :type offline_store_options: :class:`azure.iot.device.common.models.OfflineStoreOptions`
+        :param executor_group: Optional name of the executor group the pipeline runs in.
+            Pipelines in the same group share a dedicated pipeline thread and callback thread.
+            If None, the pipeline shares the process-wide threads with every other pipeline using
+            the same pipeline engine.
+        :type executor_group: hashable
+        :param str pipeline_engine: The engine running the pipeline thread. Either "thread"
+            (default), or "asyncio" to run the pipeline thread as an asyncio event loop which
+            also drives the network traffic of the pipeline, instead of a separate protocol
+            thread per connection.
+        :param int http_max_concurrent_requests: Maximum number of HTTP requests sent at the same
+            time. Pipelines using the same HTTP limits share their HTTP worker threads, which are
+            handed out fairly between the pipelines.
+        :param int http_max_queued_requests: Maximum number of HTTP requests waiting to be sent.
+            Requests made while every HTTP worker is busy and the queue is full fail immediately.
+            With 0, requests are only accepted while a worker is free.
+        :param retry_policy: Policy for the waits before retrying failed operations and before
+            reconnecting. If None, fixed waits are used.
+        :type retry_policy: :class:`azure.iot.device.common.models.RetryPolicy`
+        :param bool nonblocking_reauthorization: If True, operations other than connect and
+            disconnect keep being sent while the connection is reauthorized (e.g. with a renewed
+            SAS token), instead of waiting for the reauthorization to complete.
+
+        :raises: ValueError if given an invalid pipeline_engine or HTTP request limit.
         """
         self.websockets = websockets
         self.cipher = self._sanitize_cipher(cipher)
         self.proxy_options = proxy_options
+        self.offline_store_options = offline_store_options
+        self.pipeline_engine = self._validate_pipeline_engine(pipeline_engine)
+        if executor_group is None and self.pipeline_engine == pipeline_thread.ASYNCIO_ENGINE:
+            # The process-wide group runs the thread engine, so asyncio pipelines which
+            # don't ask for a group of their own share a separate process-wide group.
+            executor_group = DEFAULT_ASYNCIO_EXECUTOR_GROUP
+        self.executor_group = executor_group
+        if http_max_concurrent_requests < 1:
+            raise ValueError("http_max_concurrent_requests must be at least 1")
+        if http_max_queued_requests < 0:
+            raise ValueError("http_max_queued_requests cannot be negative")
+        self.http_max_concurrent_requests = http_max_concurrent_requests
+        self.http_max_queued_requests = http_max_queued_requests
+        self.retry_policy = retry_policy
+        self.nonblocking_reauthorization = nonblocking_reauthorization
+
+    @staticmethod
+    def _validate_pipeline_engine(pipeline_engine):
+        """Validate the pipeline engine input
+        """
+        if pipeline_engine not in (pipeline_thread.THREAD_ENGINE, pipeline_thread.ASYNCIO_ENGINE):
+            raise ValueError("Invalid pipeline_engine: {}".format(pipeline_engine))
+        return pipeline_engine
 
     @staticmethod
     def _sanitize_cipher(cipher):
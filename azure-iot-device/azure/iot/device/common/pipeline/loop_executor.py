@@ -0,0 +1,89 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains an executor which runs functions on an asyncio event loop.
+
+It is used by the "asyncio" pipeline engine, where the pipeline thread of an executor group
+is an event loop.  Protocol clients running on that thread (e.g. the MQTT transport) register
+their sockets with the loop instead of starting threads of their own, so a single pipeline
+thread can service the network traffic of every pipeline in its group.
+
+This module requires Python 3.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+def _run_loop(loop, initializer):
+    asyncio.set_event_loop(loop)
+    if initializer:
+        initializer(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+        logger.debug("Event loop executor thread exiting")
+
+
+def _stop_loop(loop):
+    try:
+        loop.call_soon_threadsafe(loop.stop)
+    except RuntimeError:
+        # Loop is already closed
+        pass
+
+
+class EventLoopExecutor(object):
+    """
+    An executor with the same submit() interface as a single worker ThreadPoolExecutor,
+    which runs submitted functions, in order, on an asyncio event loop running in a
+    dedicated thread.
+
+    :ivar event_loop: The event loop that submitted functions run on.
+    """
+
+    def __init__(self, thread_name, initializer=None):
+        """
+        Initializer for EventLoopExecutor
+
+        :param str thread_name: Name of the thread running the event loop.
+        :param initializer: Optional function which is called with the event loop, on the event
+            loop thread, before the loop starts running.
+        """
+        self.event_loop = asyncio.new_event_loop()
+        thread = threading.Thread(
+            target=_run_loop, name=thread_name, args=(self.event_loop, initializer)
+        )
+        thread.daemon = True
+        thread.start()
+        # Stop the loop (and thus the thread) once nothing is using the executor anymore
+        weakref.finalize(self, _stop_loop, self.event_loop)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedule fn(*args, **kwargs) to run on the event loop.
+
+        :returns: A concurrent.futures.Future for the result of the call.
+        """
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        self.event_loop.call_soon_threadsafe(run)
+        return future
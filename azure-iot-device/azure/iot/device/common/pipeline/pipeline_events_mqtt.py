@@ -16,7 +16,7 @@ class IncomingMQTTMessageEvent(PipelineEvent):
         Initializer for IncomingMQTTMessageEvent objects.
 
         :param str topic: The name of the topic that the incoming message arrived on.
-        :param str payload: The payload of the message
+        :param bytes payload: The payload of the message, as read from the network
         """
         super(IncomingMQTTMessageEvent, self).__init__()
         self.topic = topic
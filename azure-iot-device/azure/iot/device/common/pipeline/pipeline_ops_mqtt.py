@@ -54,7 +54,7 @@ class MQTTPublishOperation(PipelineOperation):
     This operation is in the group of MQTT operations because its attributes are very specific to the MQTT protocol.
     """
 
-    def __init__(self, topic, payload, callback):
+    def __init__(self, topic, payload, callback, durable=False):
         """
         Initializer for MQTTPublishOperation objects.
 
@@ -63,12 +63,17 @@ class MQTTPublishOperation(PipelineOperation):
         :param Function callback: The function that gets called when this operation is complete or has failed.
           The callback function must accept A PipelineOperation object which indicates the specific operation which
           has completed or failed.
+        :param bool durable: (Optional) If True, the publish may be stored on disk while the pipeline is
+          disconnected, and sent once it is connected again.
         """
         super(MQTTPublishOperation, self).__init__(callback=callback)
         self.topic = topic
         self.payload = payload
+        self.durable = durable
         self.needs_connection = True
         self.retry_timer = None
+        self.retry_count = 0
+        self.retry_interval = None
 
 
 class MQTTSubscribeOperation(PipelineOperation):
@@ -92,6 +97,8 @@ class MQTTSubscribeOperation(PipelineOperation):
         self.needs_connection = True
         self.timeout_timer = None
         self.retry_timer = None
+        self.retry_count = 0
+        self.retry_interval = None
 
 
 class MQTTUnsubscribeOperation(PipelineOperation):
@@ -115,3 +122,5 @@ class MQTTUnsubscribeOperation(PipelineOperation):
         self.needs_connection = True
         self.timeout_timer = None
         self.retry_timer = None
+        self.retry_count = 0
+        self.retry_interval = None
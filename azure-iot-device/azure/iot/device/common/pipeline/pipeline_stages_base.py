@@ -13,13 +13,14 @@ import traceback
 import uuid
 import weakref
 from six.moves import queue
-import threading
 from . import pipeline_events_base
 from . import pipeline_ops_base, pipeline_ops_mqtt
 from . import pipeline_thread
 from . import pipeline_exceptions
-from azure.iot.device.common import handle_exceptions, transport_exceptions
+from azure.iot.device.common import handle_exceptions, timer_scheduler, transport_exceptions
 from azure.iot.device.common.callable_weak_method import CallableWeakMethod
+from azure.iot.device.common.offline_store import OfflineStore
+from azure.iot.device.common.models import retry_policy
 
 logger = logging.getLogger(__name__)
 
@@ -213,13 +214,21 @@ class PipelineRootStage(PipelineStage):
         self.on_disconnected_handler = None
         self.connected = False
         self.pipeline_configuration = pipeline_configuration
+        self.executor_group = getattr(pipeline_configuration, "executor_group", None)
+        # Keep the executors of our group alive for as long as this pipeline exists
+        self._executors = pipeline_thread.get_group_executors(
+            self.executor_group,
+            getattr(pipeline_configuration, "pipeline_engine", pipeline_thread.THREAD_ENGINE),
+        )
 
     def run_op(self, op):
         # CT-TODO: make this more elegant
         op.callback_stack[0] = pipeline_thread.invoke_on_callback_thread_nowait(
-            op.callback_stack[0]
+            op.callback_stack[0], group=self.executor_group
         )
-        pipeline_thread.invoke_on_pipeline_thread(super(PipelineRootStage, self).run_op)(op)
+        pipeline_thread.invoke_on_pipeline_thread(
+            super(PipelineRootStage, self).run_op, group=self.executor_group
+        )(op)
 
     def append_stage(self, new_stage):
         """
@@ -273,6 +282,185 @@ class PipelineRootStage(PipelineStage):
                 logger.warning("incoming pipeline event with no handler.  dropping.")
 
 
+class StoreAndForwardStage(PipelineStage):
+    """
+    This stage is responsible for storing durable MQTT publishes on disk while the pipeline is
+    disconnected, and for sending them, in order, once the pipeline is connected again.
+
+    A durable publish which arrives while the pipeline is disconnected (or while older publishes
+    are still waiting to be sent) is appended to the offline store and completed right away.
+    A durable publish which fails because the connection dropped while it was being sent is
+    stored as well.  Stored publishes survive a restart of the process, and are sent after the
+    next connection.
+
+    If the pipeline configuration has no offline_store_options, this stage passes all ops down.
+    """
+
+    def __init__(self):
+        super(StoreAndForwardStage, self).__init__()
+        self.store = None
+        self.replay_in_flight = 0
+        self.replay_failed = False
+        self.connecting = False
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _get_store(self):
+        """
+        Open the offline store the first time it is needed.  Returns None if there is no store.
+        """
+        if self.store is None:
+            options = self.pipeline_root.pipeline_configuration.offline_store_options
+            if options:
+                self.store = OfflineStore(
+                    path=options.path,
+                    max_size=options.max_size,
+                    max_age=options.max_age,
+                    overflow_policy=options.overflow_policy,
+                    segment_size=options.segment_size,
+                )
+        return self.store
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _run_op(self, op):
+        if (
+            isinstance(op, pipeline_ops_mqtt.MQTTPublishOperation)
+            and op.durable
+            and self._get_store() is not None
+        ):
+            if not self.pipeline_root.connected or self._has_backlog():
+                logger.debug(
+                    "{}({}): Not connected or stored publishes pending.  Storing.".format(
+                        self.name, op.name
+                    )
+                )
+                self._store_op(op)
+            else:
+
+                @pipeline_thread.runs_on_pipeline_thread
+                def store_on_connection_failure(op, error):
+                    if error and not self.pipeline_root.connected:
+                        logger.info(
+                            "{}({}): op failed with {} and we're not connected.  Storing.".format(
+                                self.name, op.name, error
+                            )
+                        )
+                        op.halt_completion()
+                        self._store_op(op)
+
+                op.add_callback(store_on_connection_failure)
+                self.send_op_down(op)
+
+        else:
+            self.send_op_down(op)
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _handle_pipeline_event(self, event):
+        # Let the event reach the root first, so that the pipeline is marked as connected
+        # before stored publishes are sent down.
+        self.send_event_up(event)
+        if (
+            isinstance(event, pipeline_events_base.ConnectedEvent)
+            and self._get_store() is not None
+        ):
+            self._send_stored_publishes()
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _has_backlog(self):
+        return self.replay_in_flight or self.replay_failed or self.store.has_unread_records()
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _store_op(self, op):
+        try:
+            self.store.append(op.topic, op.payload)
+        except queue.Full as e:
+            logger.error("{}({}): Offline store is full.  Failing.".format(self.name, op.name))
+            op.complete(
+                error=pipeline_exceptions.OperationError(message="Offline store is full", cause=e)
+            )
+            return
+        except (IOError, OSError) as e:
+            logger.error("{}({}): Failed to store op: {}".format(self.name, op.name, e))
+            op.complete(error=e)
+            return
+        except TypeError as e:
+            logger.error("{}({}): Payload cannot be stored: {}".format(self.name, op.name, e))
+            op.complete(error=e)
+            return
+        op.complete()
+
+        if self.pipeline_root.connected:
+            self._send_stored_publishes()
+        elif not self.connecting:
+            # Nothing else is going to connect the pipeline, so start a connection in the
+            # same way AutoConnectStage would have for the publish.
+            self.connecting = True
+
+            @pipeline_thread.runs_on_pipeline_thread
+            def on_connect_complete(op, error):
+                self.connecting = False
+                if error:
+                    logger.info(
+                        "{}({}): Connection failed.  Publishes stay stored: {}".format(
+                            self.name, op.name, error
+                        )
+                    )
+
+            logger.debug("{}: Stored op while disconnected.  Connecting.".format(self.name))
+            self.send_op_down(pipeline_ops_base.ConnectOperation(callback=on_connect_complete))
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _send_stored_publishes(self):
+        """
+        Send stored publishes down, keeping up to max_in_flight of them outstanding.
+        """
+        if self.replay_failed or not self.pipeline_root.connected:
+            return
+        max_in_flight = (
+            self.pipeline_root.pipeline_configuration.offline_store_options.max_in_flight
+        )
+        if self.replay_in_flight >= max_in_flight:
+            return
+        for record in self.store.read(max_in_flight - self.replay_in_flight):
+            self.replay_in_flight += 1
+            self.send_op_down(
+                pipeline_ops_mqtt.MQTTPublishOperation(
+                    topic=record.topic,
+                    payload=record.payload,
+                    callback=self._get_stored_publish_callback(record.position),
+                )
+            )
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _get_stored_publish_callback(self, position):
+        @pipeline_thread.runs_on_pipeline_thread
+        def on_stored_publish_complete(op, error):
+            self.replay_in_flight -= 1
+            if error and not self.pipeline_root.connected:
+                # Stop here.  Everything which hasn't been acknowledged is sent again after
+                # the next connection.
+                logger.info(
+                    "{}({}): Stored publish failed with {} and we're not connected.".format(
+                        self.name, op.name, error
+                    )
+                )
+                self.replay_failed = True
+            else:
+                if error:
+                    logger.error(
+                        "{}({}): Stored publish failed with {}.  Dropping it.".format(
+                            self.name, op.name, error
+                        )
+                    )
+                self.store.ack(position)
+
+            if self.replay_failed and not self.replay_in_flight:
+                self.store.rewind()
+                self.replay_failed = False
+            self._send_stored_publishes()
+
+        return on_stored_publish_complete
+
+
 class AutoConnectStage(PipelineStage):
     """
     This stage is responsible for ensuring that the protocol is connected when
@@ -367,19 +555,38 @@ class ConnectionLockStage(PipelineStage):
     time.  This way, we don't have to worry about cases like "what happens if we try to
     disconnect if we're in the middle of reauthorizing."  This stage will wait for the
     reauthorize to complete before letting the disconnect past.
+
+    If the pipeline is configured for nonblocking reauthorization, ops other than connect,
+    disconnect and reauthorize are not held up by a reauthorize.  They are sent on the new
+    connection as soon as it is opened, without waiting for it to be acknowledged, which MQTT
+    allows.
     """
 
     def __init__(self):
         super(ConnectionLockStage, self).__init__()
         self.queue = queue.Queue()
         self.blocked = False
+        self.blocked_by_reauthorize = False
 
     @pipeline_thread.runs_on_pipeline_thread
     def _run_op(self, op):
 
+        if (
+            self.blocked
+            and self.blocked_by_reauthorize
+            and self.pipeline_root.pipeline_configuration.nonblocking_reauthorization
+            and not self._is_connection_op(op)
+        ):
+            logger.debug(
+                "{}({}): pipeline is reauthorizing without blocking.  Sending op down.".format(
+                    self.name, op.name
+                )
+            )
+            self.send_op_down(op)
+
         # If this stage is currently blocked (because we're waiting for a connection, etc,
         # to complete), we queue up all operations until after the connect completes.
-        if self.blocked:
+        elif self.blocked:
             logger.info(
                 "{}({}): pipeline is blocked waiting for a prior connect/disconnect/reauthorize to complete.  queueing.".format(
                     self.name, op.name
@@ -402,11 +609,7 @@ class ConnectionLockStage(PipelineStage):
             )
             op.complete()
 
-        elif (
-            isinstance(op, pipeline_ops_base.DisconnectOperation)
-            or isinstance(op, pipeline_ops_base.ConnectOperation)
-            or isinstance(op, pipeline_ops_base.ReauthorizeConnectionOperation)
-        ):
+        elif self._is_connection_op(op):
             self._block(op)
 
             @pipeline_thread.runs_on_pipeline_thread
@@ -430,6 +633,14 @@ class ConnectionLockStage(PipelineStage):
         else:
             self.send_op_down(op)
 
+    @staticmethod
+    def _is_connection_op(op):
+        return (
+            isinstance(op, pipeline_ops_base.DisconnectOperation)
+            or isinstance(op, pipeline_ops_base.ConnectOperation)
+            or isinstance(op, pipeline_ops_base.ReauthorizeConnectionOperation)
+        )
+
     @pipeline_thread.runs_on_pipeline_thread
     def _block(self, op):
         """
@@ -437,6 +648,9 @@ class ConnectionLockStage(PipelineStage):
         """
         logger.debug("{}({}): blocking".format(self.name, op.name))
         self.blocked = True
+        self.blocked_by_reauthorize = isinstance(
+            op, pipeline_ops_base.ReauthorizeConnectionOperation
+        )
 
     @pipeline_thread.runs_on_pipeline_thread
     def _unblock(self, op, error):
@@ -446,6 +660,7 @@ class ConnectionLockStage(PipelineStage):
         """
         logger.debug("{}({}): unblocking and releasing queued ops.".format(self.name, op.name))
         self.blocked = False
+        self.blocked_by_reauthorize = False
         logger.info(
             "{}({}): processing {} items in queue".format(self.name, op.name, self.queue.qsize())
         )
@@ -669,7 +884,7 @@ class OpTimeoutStage(PipelineStage):
                 )
 
             logger.debug("{}({}): Creating timer".format(self.name, op.name))
-            op.timeout_timer = threading.Timer(self.timeout_intervals[type(op)], on_timeout)
+            op.timeout_timer = timer_scheduler.Timer(self.timeout_intervals[type(op)], on_timeout)
             op.timeout_timer.start()
 
             # Send the op down, but intercept the return of the op so we can
@@ -701,14 +916,20 @@ class RetryStage(PipelineStage):
 
     def __init__(self):
         super(RetryStage, self).__init__()
-        # Retry intervals are hardcoded for now. Later, they come in as an
-        # init param, probably via retry policy.
+        # Retry intervals used when the pipeline configuration has no retry policy
         self.retry_intervals = {
             pipeline_ops_mqtt.MQTTSubscribeOperation: 20,
             pipeline_ops_mqtt.MQTTUnsubscribeOperation: 20,
             pipeline_ops_mqtt.MQTTPublishOperation: 20,
         }
+        # Kind of each retried op, as known by the retry policy
+        self.retry_op_kinds = {
+            pipeline_ops_mqtt.MQTTSubscribeOperation: retry_policy.SUBSCRIBE,
+            pipeline_ops_mqtt.MQTTUnsubscribeOperation: retry_policy.UNSUBSCRIBE,
+            pipeline_ops_mqtt.MQTTPublishOperation: retry_policy.PUBLISH,
+        }
         self.ops_waiting_to_retry = []
+        self.retry_budget = None
 
     @pipeline_thread.runs_on_pipeline_thread
     def _run_op(self, op):
@@ -748,7 +969,17 @@ class RetryStage(PipelineStage):
         is where we check to see if a retry is necessary and set a "retry timer"
         which can be used to send the op down again.
         """
+        interval = None
         if self._should_retry(op, error):
+            interval = self._get_retry_interval(op)
+            if interval is None:
+                logger.warning(
+                    "{}({}): Op failed with {} and is not being retried again. Retries: {}".format(
+                        self.name, op.name, error, op.retry_count
+                    )
+                )
+
+        if interval is not None:
             self_weakref = weakref.ref(self)
 
             @pipeline_thread.invoke_on_pipeline_thread_nowait
@@ -762,7 +993,6 @@ class RetryStage(PipelineStage):
                 # retry functionality this time too
                 this.run_op(op)
 
-            interval = self.retry_intervals[type(op)]
             logger.warning(
                 "{}({}): Op needs retry with interval {} because of {}.  Setting timer.".format(
                     self.name, op.name, interval, error
@@ -772,7 +1002,7 @@ class RetryStage(PipelineStage):
             # if we don't keep track of this op, it might get collected.
             op.halt_completion()
             self.ops_waiting_to_retry.append(op)
-            op.retry_timer = threading.Timer(self.retry_intervals[type(op)], do_retry)
+            op.retry_timer = timer_scheduler.Timer(interval, do_retry)
             op.retry_timer.start()
 
         else:
@@ -780,6 +1010,30 @@ class RetryStage(PipelineStage):
                 op.retry_timer.cancel()
                 op.retry_timer = None
 
+    @pipeline_thread.runs_on_pipeline_thread
+    def _get_retry_interval(self, op):
+        """
+        Return the number of seconds to wait before retrying this op, or None if the op
+        is not to be retried again.
+        """
+        policy = self.pipeline_root.pipeline_configuration.retry_policy
+        if policy is None:
+            return self.retry_intervals[type(op)]
+
+        interval = policy.get_retry_interval(
+            self.retry_op_kinds[type(op)], op.retry_count, op.retry_interval
+        )
+        if interval is None:
+            return None
+        if self.retry_budget is None:
+            self.retry_budget = policy.create_retry_budget()
+        if not self.retry_budget.try_acquire():
+            logger.warning("{}({}): Retry budget is used up".format(self.name, op.name))
+            return None
+        op.retry_count += 1
+        op.retry_interval = interval
+        return interval
+
 
 transient_connect_errors = [
     pipeline_exceptions.OperationCancelled,
@@ -814,8 +1068,11 @@ class ReconnectStage(PipelineStage):
         super(ReconnectStage, self).__init__()
         self.reconnect_timer = None
         self.state = ReconnectState.NEVER_CONNECTED
-        # connect delay is hardcoded for now.  Later, this comes from a retry policy
+        # Reconnect delay used when the pipeline configuration has no retry policy
         self.reconnect_delay = 10
+        # Number of reconnect attempts since the connection was lost, and the last delay used
+        self.reconnect_count = 0
+        self.previous_reconnect_delay = None
         self.waiting_connect_ops = []
 
     @pipeline_thread.runs_on_pipeline_thread
@@ -930,6 +1187,8 @@ class ReconnectStage(PipelineStage):
                         )
                     )
                     self.state = ReconnectState.CONNECTED_OR_DISCONNECTED
+                    self.reconnect_count = 0
+                    self.previous_reconnect_delay = None
                     self._clear_reconnect_timer()
                     self._complete_waiting_connect_ops()
 
@@ -967,9 +1226,27 @@ class ReconnectStage(PipelineStage):
                     )
                 )
 
-        self.reconnect_timer = threading.Timer(self.reconnect_delay, on_reconnect_timer_expired)
+        self.reconnect_timer = timer_scheduler.Timer(
+            self._get_reconnect_delay(), on_reconnect_timer_expired
+        )
         self.reconnect_timer.start()
 
+    @pipeline_thread.runs_on_pipeline_thread
+    def _get_reconnect_delay(self):
+        """
+        Return the number of seconds to wait before the next reconnect attempt
+        """
+        policy = self.pipeline_root.pipeline_configuration.retry_policy
+        if policy is None:
+            return self.reconnect_delay
+
+        delay = policy.get_retry_interval(
+            retry_policy.CONNECT, self.reconnect_count, self.previous_reconnect_delay
+        )
+        self.reconnect_count += 1
+        self.previous_reconnect_delay = delay
+        return delay
+
     @pipeline_thread.runs_on_pipeline_thread
     def _clear_reconnect_timer(self):
         """
@@ -47,6 +47,8 @@ class HTTPTransportStage(PipelineStage):
                 server_verification_cert=op.server_verification_cert,
                 x509_cert=op.client_cert,
                 cipher=self.pipeline_root.pipeline_configuration.cipher,
+                max_concurrent_requests=self.pipeline_root.pipeline_configuration.http_max_concurrent_requests,
+                max_queued_requests=self.pipeline_root.pipeline_configuration.http_max_queued_requests,
             )
 
             self.pipeline_root.transport = self.transport
@@ -58,7 +60,7 @@ class HTTPTransportStage(PipelineStage):
             op.complete()
 
         elif isinstance(op, pipeline_ops_http.HTTPRequestAndResponseOperation):
-            # This will call down to the HTTP Transport with a request and also created a request callback. Because the HTTP Transport will run on the http transport thread, this call should be non-blocking to the pipline thread.
+            # This will call down to the HTTP Transport with a request and also created a request callback. Because the HTTP Transport will run on an http worker thread, this call should be non-blocking to the pipline thread.
             logger.debug(
                 "{}({}): Generating HTTP request and setting callback before completing.".format(
                     self.name, op.name
@@ -7,7 +7,6 @@
 import logging
 import six
 import traceback
-import threading
 import weakref
 from . import (
     pipeline_ops_base,
@@ -19,7 +18,7 @@ from . import (
     pipeline_events_base,
 )
 from azure.iot.device.common.mqtt_transport import MQTTTransport
-from azure.iot.device.common import handle_exceptions, transport_exceptions
+from azure.iot.device.common import handle_exceptions, timer_scheduler, transport_exceptions
 from azure.iot.device.common.callable_weak_method import CallableWeakMethod
 
 logger = logging.getLogger(__name__)
@@ -73,7 +72,7 @@ class MQTTTransportStage(PipelineStage):
         self_weakref = weakref.ref(self)
         op_weakref = weakref.ref(connection_op)
 
-        @pipeline_thread.invoke_on_pipeline_thread
+        @pipeline_thread.invoke_on_pipeline_thread_nowait
         def watchdog_function():
             this = self_weakref()
             op = op_weakref()
@@ -95,8 +94,7 @@ class MQTTTransportStage(PipelineStage):
                     )
                 )
 
-        connection_op.watchdog_timer = threading.Timer(WATCHDOG_INTERVAL, watchdog_function)
-        connection_op.watchdog_timer.daemon = True
+        connection_op.watchdog_timer = timer_scheduler.Timer(WATCHDOG_INTERVAL, watchdog_function)
         connection_op.watchdog_timer.start()
 
     @pipeline_thread.runs_on_pipeline_thread
@@ -125,6 +123,7 @@ class MQTTTransportStage(PipelineStage):
                 websockets=self.pipeline_root.pipeline_configuration.websockets,
                 cipher=self.pipeline_root.pipeline_configuration.cipher,
                 proxy_options=self.pipeline_root.pipeline_configuration.proxy_options,
+                event_loop=pipeline_thread.get_current_event_loop(),
             )
             self.transport.on_mqtt_connected_handler = CallableWeakMethod(
                 self, "_on_mqtt_connected"
@@ -7,7 +7,7 @@ import functools
 import logging
 import threading
 import traceback
-from multiprocessing.pool import ThreadPool
+import weakref
 from concurrent.futures import ThreadPoolExecutor
 from azure.iot.device.common import handle_exceptions
 
@@ -55,6 +55,28 @@ The intention of these decorators is to ensure the following:
   also to ensure that the pipline thread is not blocked while waiting for client
   code to execute.
 
+7. By default, every pipeline in the process shares the same pipeline and callback
+  threads.  A pipeline can instead be assigned to a named "executor group" (see the
+  `executor_group` pipeline configuration option), in which case it runs on its own
+  pair of pipeline and callback threads, shared only with other pipelines using the
+  same group.  Threads in a group keep the "pipeline" and "callback" names, so the
+  `runs_on_pipeline_thread` assertions work the same way for every group.  The group
+  a decorated function runs in is chosen when it is called:
+
+  a. If a group was passed explicitly (`PipelineRootStage` does this), use it.
+  b. If the function was decorated while running on a group's thread (e.g. a
+    completion closure or timer handler created inside the pipeline), use that group.
+  c. Otherwise, if the first argument is a pipeline stage, use the group from that
+    stage's pipeline configuration.
+  d. Otherwise, use the default, process-wide group.
+
+8. The pipeline thread of a group can either be a plain worker thread (the "thread"
+  engine) or a thread running an asyncio event loop (the "asyncio" engine).  With
+  the asyncio engine, protocol clients register their sockets with the loop of the
+  pipeline thread instead of running network threads of their own, so network events
+  are handled directly on the pipeline thread.  The callback thread is always a plain
+  worker thread, since it runs user code that may block.
+
 These decorators use concurrent.futures.Future and the ThreadPoolExecutor because:
 
 1. The thread pooling with a pool size of 1 gives us a single thread to run all
@@ -73,22 +95,114 @@ These decorators use concurrent.futures.Future and the ThreadPoolExecutor becaus
 """
 
 _executors = {}
+# Executors for named groups are only held weakly here.  Each PipelineRootStage keeps
+# strong references to the executors of its group, so the threads of a group go away
+# once the last pipeline using it is garbage collected.
+_group_executors = weakref.WeakValueDictionary()
+_executors_lock = threading.Lock()
+_thread_local = threading.local()
+
+# Sentinel used to tell "no group specified" apart from the default group (None)
+_UNSPECIFIED_GROUP = object()
+
+# Pipeline engines.  With the thread engine, the pipeline thread is a plain worker thread.
+# With the asyncio engine, the pipeline thread runs an asyncio event loop, and protocol
+# clients register their sockets with that loop rather than running their own threads.
+THREAD_ENGINE = "thread"
+ASYNCIO_ENGINE = "asyncio"
+
+
+def _create_executor(thread_name, group, use_event_loop):
+    if use_event_loop:
+        # Imported here because the event loop executor is only available on Python 3
+        from azure.iot.device.common.pipeline import loop_executor
+
+        def initializer(event_loop):
+            _thread_local.executor_group = group
+            _thread_local.event_loop = event_loop
+
+        return loop_executor.EventLoopExecutor(thread_name=thread_name, initializer=initializer)
+    else:
+        return ThreadPoolExecutor(max_workers=1)
 
 
-def _get_named_executor(thread_name):
+def _get_named_executor(thread_name, group=None, engine=None):
     """
-    Get a ThreadPoolExecutor object with the given name.  If no such executor exists,
-    this function will create on with a single worker and assign it to the provided
-    name.
+    Get an executor object with the given name in the given executor group.  If no such
+    executor exists, this function will create on with a single worker and assign it to the
+    provided name.  If an engine is given and the executor already exists, the executor must
+    have been created for that same engine.
     """
     global _executors
-    if thread_name not in _executors:
-        logger.debug("Creating {} executor".format(thread_name))
-        _executors[thread_name] = ThreadPoolExecutor(max_workers=1)
-    return _executors[thread_name]
+    use_event_loop = engine == ASYNCIO_ENGINE and thread_name == "pipeline"
+    if group is None:
+        executors = _executors
+        key = thread_name
+    else:
+        executors = _group_executors
+        key = (group, thread_name)
+    with _executors_lock:
+        executor = executors.get(key)
+        if executor is None:
+            logger.debug("Creating {} executor for group {}".format(thread_name, group))
+            executor = _create_executor(thread_name, group, use_event_loop)
+            executors[key] = executor
+        elif engine is not None and hasattr(executor, "event_loop") != use_event_loop:
+            raise ValueError(
+                "Executor group {} is already in use with a different pipeline engine".format(group)
+            )
+    return executor
+
+
+def get_group_executors(group, engine=THREAD_ENGINE):
+    """
+    Get the pipeline and callback executors used by the given executor group, creating
+    them if necessary.  Callers hold on to the returned list in order to keep the
+    group's threads alive.
+
+    :param group: The executor group, or None for the default group.
+    :param str engine: The pipeline engine the group runs, either THREAD_ENGINE or
+        ASYNCIO_ENGINE.
+    :returns: List of the group's executor objects.
+    :raises: ValueError if the group already exists with a different engine.
+    """
+    return [
+        _get_named_executor("pipeline", group, engine),
+        _get_named_executor("callback", group, engine),
+    ]
+
+
+def get_current_event_loop():
+    """
+    Get the event loop driving the current thread if it is the pipeline thread of a group
+    using the asyncio engine.
+
+    :returns: The asyncio event loop, or None if the current thread is not driven by one.
+    """
+    return getattr(_thread_local, "event_loop", None)
+
+
+def _get_current_group():
+    """
+    Get the executor group of the current thread, or _UNSPECIFIED_GROUP if the current
+    thread does not belong to an executor.
+    """
+    return getattr(_thread_local, "executor_group", _UNSPECIFIED_GROUP)
 
 
-def _invoke_on_executor_thread(func, thread_name, block=True):
+def _get_group_from_args(args):
+    """
+    Get the executor group for a call based on its first argument, which, for methods
+    decorated at class definition time, is the stage the method is being called on.
+    """
+    if args:
+        pipeline_root = getattr(args[0], "pipeline_root", None)
+        pipeline_configuration = getattr(pipeline_root, "pipeline_configuration", None)
+        return getattr(pipeline_configuration, "executor_group", None)
+    return None
+
+
+def _invoke_on_executor_thread(func, thread_name, block=True, group=_UNSPECIFIED_GROUP):
     """
     Return wrapper to run the function on a given thread.  If block==False,
     the call returns immediately without waiting for the decorated function to complete.
@@ -103,12 +217,22 @@ def _invoke_on_executor_thread(func, thread_name, block=True):
         function_name = str(func)
         function_has_name = False
 
+    if group is _UNSPECIFIED_GROUP:
+        group = _get_current_group()
+
     def wrapper(*args, **kwargs):
-        if threading.current_thread().name is not thread_name:
+        target_group = group if group is not _UNSPECIFIED_GROUP else _get_group_from_args(args)
+        current_group = _get_current_group()
+        # A thread that isn't owned by an executor (e.g. a test thread renamed to "pipeline")
+        # is treated as belonging to whatever group is being targeted.
+        if threading.current_thread().name is not thread_name or (
+            current_group is not _UNSPECIFIED_GROUP and current_group != target_group
+        ):
             logger.debug("Starting {} in {} thread".format(function_name, thread_name))
 
             def thread_proc():
                 threading.current_thread().name = thread_name
+                _thread_local.executor_group = target_group
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
@@ -126,7 +250,7 @@ def _invoke_on_executor_thread(func, thread_name, block=True):
                     raise
 
             # TODO: add a timeout here and throw exception on failure
-            future = _get_named_executor(thread_name).submit(thread_proc)
+            future = _get_named_executor(thread_name, target_group).submit(thread_proc)
             if block:
                 return future.result()
             else:
@@ -145,34 +269,25 @@ def _invoke_on_executor_thread(func, thread_name, block=True):
         return wrapper
 
 
-def invoke_on_pipeline_thread(func):
+def invoke_on_pipeline_thread(func, group=_UNSPECIFIED_GROUP):
     """
     Run the decorated function on the pipeline thread.
     """
-    return _invoke_on_executor_thread(func=func, thread_name="pipeline")
+    return _invoke_on_executor_thread(func=func, thread_name="pipeline", group=group)
 
 
-def invoke_on_pipeline_thread_nowait(func):
+def invoke_on_pipeline_thread_nowait(func, group=_UNSPECIFIED_GROUP):
     """
     Run the decorated function on the pipeline thread, but don't wait for it to complete
     """
-    return _invoke_on_executor_thread(func=func, thread_name="pipeline", block=False)
-
-
-def invoke_on_callback_thread_nowait(func):
-    """
-    Run the decorated function on the callback thread, but don't wait for it to complete
-    """
-    return _invoke_on_executor_thread(func=func, thread_name="callback", block=False)
+    return _invoke_on_executor_thread(func=func, thread_name="pipeline", block=False, group=group)
 
 
-def invoke_on_http_thread_nowait(func):
+def invoke_on_callback_thread_nowait(func, group=_UNSPECIFIED_GROUP):
     """
     Run the decorated function on the callback thread, but don't wait for it to complete
     """
-    # TODO: Refactor this since this is not in the pipeline thread anymore, so we need to pull this into common.
-    # Also, the max workers eventually needs to be a bigger number, so that needs to be fixed to allow for more than one HTTP Request a a time.
-    return _invoke_on_executor_thread(func=func, thread_name="azure_iot_http", block=False)
+    return _invoke_on_executor_thread(func=func, thread_name="callback", block=False, group=group)
 
 
 def _assert_executor_thread(func, thread_name):
@@ -209,6 +324,6 @@ def runs_on_pipeline_thread(func):
 
 def runs_on_http_thread(func):
     """
-    Decorator which marks a function as only running inside the http thread.
+    Decorator which marks a function as only running inside an http worker thread.
     """
     return _assert_executor_thread(func=func, thread_name="azure_iot_http")
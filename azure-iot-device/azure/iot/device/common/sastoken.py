@@ -50,12 +50,27 @@ class SasToken(object):
         self._uri = urllib.parse.quote_plus(uri)
         self._key = key
         self._key_name = key_name
+        # HMAC already keyed with the decoded key.  Each signature is made on a copy of it, so the
+        # key is only decoded and set up once.
+        self._signing_hmac = None
         self.ttl = ttl
         self.refresh()
 
     def __str__(self):
         return self._token
 
+    def needs_refresh(self, refresh_fraction):
+        """
+        Check if the SasToken should be refreshed before it is used again
+
+        :param float refresh_fraction: Fraction of the TTL after which the token is refreshed,
+         between 0 and 1.
+
+        :returns: True if at least refresh_fraction of the TTL has elapsed.
+        """
+        refresh_time = self.expiry_time - self.ttl * (1 - refresh_fraction)
+        return time.time() >= refresh_time
+
     def refresh(self):
         """
         Refresh the SasToken lifespan, giving it a new expiry time
@@ -71,8 +86,11 @@ class SasToken(object):
         """
         try:
             message = (self._uri + "\n" + str(self.expiry_time)).encode(self._encoding_type)
-            signing_key = base64.b64decode(self._key.encode(self._encoding_type))
-            signed_hmac = hmac.HMAC(signing_key, message, hashlib.sha256)
+            if self._signing_hmac is None:
+                signing_key = base64.b64decode(self._key.encode(self._encoding_type))
+                self._signing_hmac = hmac.HMAC(signing_key, digestmod=hashlib.sha256)
+            signed_hmac = self._signing_hmac.copy()
+            signed_hmac.update(message)
             signature = urllib.parse.quote(base64.b64encode(signed_hmac.digest()))
         except (TypeError, base64.binascii.Error) as e:
             raise SasTokenError("Unable to build SasToken from given values", e)
@@ -0,0 +1,155 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains a process-wide cache of the SSLContext objects used by the transports.
+
+Building an SSLContext means parsing the trust store (and the client certificate, if any), which
+is slow and takes a lot of memory.  Transports configured the same way share a single SSLContext
+instead, so many clients in one process cost no more than one.
+
+The latest TLS session established with each shared context is kept too, by server hostname, so
+that a transport connecting for the first time can resume it rather than doing a full handshake.
+This matters when one process (e.g. a protocol gateway) connects many device identities to the
+same hub: IoT Hub authenticates one identity per MQTT connection, so each needs its own
+connection, but they don't each need a full TLS handshake.
+"""
+
+import hashlib
+import logging
+import os
+import ssl
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Contexts are only kept while a transport is using them
+_ssl_contexts = weakref.WeakValueDictionary()
+_ssl_contexts_lock = threading.Lock()
+
+# {SSLContext: {server hostname: TLS session}}.  Sessions are only kept with their context.
+_tls_sessions = weakref.WeakKeyDictionary()
+_tls_sessions_lock = threading.Lock()
+
+
+def _hash(value):
+    if value is None:
+        return None
+    if not isinstance(value, bytes):
+        value = value.encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+
+def _file_version(path):
+    """Identify the contents of a file without reading it, so that a replaced file is noticed"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        # Let loading the file report the problem
+        return None
+    return (stat.st_mtime, stat.st_size)
+
+
+def _get_key(server_verification_cert, cipher, x509_cert):
+    if x509_cert is not None:
+        x509_key = (
+            x509_cert.certificate_file,
+            _file_version(x509_cert.certificate_file),
+            x509_cert.key_file,
+            _file_version(x509_cert.key_file),
+            _hash(x509_cert.pass_phrase),
+        )
+    else:
+        x509_key = None
+    return (_hash(server_verification_cert), cipher or None, x509_key)
+
+
+def _create_ssl_context(server_verification_cert, cipher, x509_cert):
+    logger.debug("creating a SSL context")
+    ssl_context = ssl.SSLContext(protocol=ssl.PROTOCOL_TLSv1_2)
+
+    if server_verification_cert:
+        ssl_context.load_verify_locations(cadata=server_verification_cert)
+    else:
+        ssl_context.load_default_certs()
+
+    if cipher:
+        try:
+            ssl_context.set_ciphers(cipher)
+        except ssl.SSLError as e:
+            # TODO: custom error with more detail?
+            raise e
+
+    if x509_cert is not None:
+        logger.debug("configuring SSL context with client-side certificate and key")
+        ssl_context.load_cert_chain(
+            x509_cert.certificate_file, x509_cert.key_file, x509_cert.pass_phrase
+        )
+
+    ssl_context.verify_mode = ssl.CERT_REQUIRED
+    ssl_context.check_hostname = True
+
+    return ssl_context
+
+
+def get_ssl_context(server_verification_cert=None, cipher=None, x509_cert=None):
+    """
+    Get an SSLContext which uses TLS 1.2, requires server certificates and checks hostnames.
+    The context is shared with every other caller using the same settings, so it must not be
+    modified.
+
+    :param str server_verification_cert: Certificate(s) trusted to validate the server (optional).
+        If not provided, the default certificates of the system are trusted.
+    :param str cipher: Cipher string in OpenSSL cipher list format (optional).
+    :param x509_cert: Certificate used to authenticate to the server (optional).
+    :type x509_cert: :class:`azure.iot.device.X509`
+
+    :returns: The SSLContext
+    :raises: ssl.SSLError if the settings are invalid.
+    """
+    key = _get_key(server_verification_cert, cipher, x509_cert)
+    with _ssl_contexts_lock:
+        ssl_context = _ssl_contexts.get(key)
+        if ssl_context is None:
+            ssl_context = _create_ssl_context(server_verification_cert, cipher, x509_cert)
+            _ssl_contexts[key] = ssl_context
+        else:
+            logger.debug("reusing a shared SSL context")
+        return ssl_context
+
+
+def get_tls_session(ssl_context, hostname):
+    """
+    Get the latest TLS session saved for connections to a server made with a shared context.
+
+    :param ssl_context: The SSLContext used for the connection.
+    :param str hostname: The hostname of the server.
+
+    :returns: The TLS session, or None if no session was saved.
+    """
+    with _tls_sessions_lock:
+        return _tls_sessions.get(ssl_context, {}).get(hostname)
+
+
+def save_tls_session(ssl_context, hostname, session):
+    """
+    Save the TLS session of a connection to a server, so that other connections to the same
+    server made with the same context can resume it.
+
+    :param ssl_context: The SSLContext used for the connection.
+    :param str hostname: The hostname of the server.
+    :param session: The TLS session of the connection.
+    :type session: :class:`ssl.SSLSession`
+    """
+    with _tls_sessions_lock:
+        _tls_sessions.setdefault(ssl_context, {})[hostname] = session
+
+
+def clear():
+    """Forget all cached contexts and TLS sessions.  Contexts in use are not affected"""
+    with _ssl_contexts_lock:
+        _ssl_contexts.clear()
+    with _tls_sessions_lock:
+        _tls_sessions.clear()
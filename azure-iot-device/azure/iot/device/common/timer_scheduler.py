@@ -0,0 +1,172 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains a scheduler which runs the timers of every client in the process from a
+single thread, instead of starting a new thread for every timer.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from azure.iot.device.common import handle_exceptions
+
+logger = logging.getLogger(__name__)
+
+# Python 2.7 has no monotonic clock
+_clock = getattr(time, "monotonic", time.time)
+
+# Cancelled timers are left in the heap and skipped when they come due.  The heap is rebuilt
+# without them once they make up more than half of it (and there are at least this many), so
+# that timers which are almost always cancelled (e.g. operation timeouts) don't pile up.
+MIN_CANCELLED_TIMERS_TO_COMPACT = 64
+
+
+class TimerScheduler(object):
+    """
+    Runs the functions of scheduled timers, in deadline order, on a single daemon thread.  The
+    thread is started when the first timer is scheduled.
+
+    Timer functions run on the scheduler thread, so they must return quickly.  Functions which
+    have real work to do should hand it off to another thread (e.g. the pipeline thread).  This
+    includes SAS token renewal: signing can be a blocking HTTP request (e.g. to the IoT Edge
+    workload API), so renewal is done on its own thread rather than in the timer function.
+    """
+
+    def __init__(self, thread_name="azure_iot_timer"):
+        self._thread_name = thread_name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._heap = []  # (deadline, sequence number, timer)
+        self._sequence = itertools.count()
+        self._cancelled_count = 0
+        self._thread = None
+
+    def __len__(self):
+        """Number of pending timers"""
+        with self._lock:
+            return len(self._heap) - self._cancelled_count
+
+    def schedule(self, timer):
+        """
+        Schedule a timer to run after its interval.
+
+        :param timer: The Timer to schedule.
+        """
+        deadline = _clock() + timer.interval
+        with self._lock:
+            heapq.heappush(self._heap, (deadline, next(self._sequence), timer))
+            if self._thread is None:
+                self._start_thread()
+            elif self._heap[0][2] is timer:
+                # The new timer is the next one due, so the scheduler thread needs to wait less
+                self._wakeup.notify()
+
+    def cancel(self, timer):
+        """
+        Cancel a scheduled timer.  This does nothing if the timer has already run or been
+        cancelled.
+
+        :param timer: The Timer to cancel.
+        """
+        with self._lock:
+            if timer._state != Timer.SCHEDULED:
+                return
+            timer._state = Timer.CANCELLED
+            self._cancelled_count += 1
+            if (
+                self._cancelled_count >= MIN_CANCELLED_TIMERS_TO_COMPACT
+                and self._cancelled_count * 2 > len(self._heap)
+            ):
+                self._heap = [entry for entry in self._heap if entry[2]._state == Timer.SCHEDULED]
+                heapq.heapify(self._heap)
+                self._cancelled_count = 0
+
+    def _start_thread(self):
+        logger.debug("Starting {} thread".format(self._thread_name))
+        self._thread = threading.Thread(target=self._thread_proc, name=self._thread_name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _get_next_due_timer(self):
+        """
+        Wait until the next timer is due, then remove it from the heap and return it.  Must be
+        called with the lock held.
+        """
+        while True:
+            if not self._heap:
+                self._wakeup.wait()
+                continue
+            deadline, _, timer = self._heap[0]
+            if timer._state == Timer.CANCELLED:
+                heapq.heappop(self._heap)
+                self._cancelled_count -= 1
+                continue
+            remaining = deadline - _clock()
+            if remaining > 0:
+                self._wakeup.wait(remaining)
+                continue
+            heapq.heappop(self._heap)
+            timer._state = Timer.FINISHED
+            return timer
+
+    def _thread_proc(self):
+        while True:
+            with self._lock:
+                timer = self._get_next_due_timer()
+            try:
+                timer.function(*timer.args, **timer.kwargs)
+            except Exception as e:
+                handle_exceptions.handle_background_exception(e)
+            # Don't keep the timer alive while waiting for the next one
+            timer = None
+
+
+_default_scheduler = TimerScheduler()
+
+
+class Timer(object):
+    """
+    A timer which calls a function after a number of seconds have passed.  This has the same
+    interface as threading.Timer, but is run by a shared TimerScheduler instead of its own thread.
+    """
+
+    SCHEDULED = "scheduled"
+    CANCELLED = "cancelled"
+    FINISHED = "finished"
+
+    def __init__(self, interval, function, args=None, kwargs=None, scheduler=None):
+        """
+        Initializer for Timer
+
+        :param float interval: Number of seconds after which the function is called.
+        :param function: The function to call.
+        :param list args: (optional) Positional arguments for the function.
+        :param dict kwargs: (optional) Keyword arguments for the function.
+        :param scheduler: (optional) The TimerScheduler to run the timer on. Defaults to the
+         scheduler shared by the whole process.
+        """
+        self.interval = interval
+        self.function = function
+        self.args = args if args is not None else []
+        self.kwargs = kwargs if kwargs is not None else {}
+        self._scheduler = scheduler if scheduler is not None else _default_scheduler
+        self._state = None
+
+    def start(self):
+        """
+        Start the timer.
+
+        :raises: RuntimeError if the timer has already been started.
+        """
+        if self._state is not None:
+            raise RuntimeError("timers can only be started once")
+        self._state = Timer.SCHEDULED
+        self._scheduler.schedule(self)
+
+    def cancel(self):
+        """Stop the timer, if it has not run yet"""
+        self._scheduler.cancel(self)
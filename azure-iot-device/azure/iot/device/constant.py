@@ -13,3 +13,5 @@ IOTHUB_API_VERSION = "2018-06-30"
 PROVISIONING_API_VERSION = "2019-03-31"
 SECURITY_MESSAGE_INTERFACE_ID = "urn:azureiot:Security:SecurityAgent:1"
 TELEMETRY_MESSAGE_SIZE_LIMIT = 262144
+# Default number of telemetry messages a batch send keeps awaiting acknowledgement at once
+DEFAULT_MAX_IN_FLIGHT_MESSAGES = 20
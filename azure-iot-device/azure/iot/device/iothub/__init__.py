@@ -5,6 +5,13 @@ as a Device or Module.
 """
 
 from .sync_clients import IoTHubDeviceClient, IoTHubModuleClient
-from .models import Message, MethodRequest, MethodResponse
+from .models import Message, MethodRequest, MethodResponse, InboxOptions
 
-__all__ = ["IoTHubDeviceClient", "IoTHubModuleClient", "Message", "MethodRequest", "MethodResponse"]
+__all__ = [
+    "IoTHubDeviceClient",
+    "IoTHubModuleClient",
+    "Message",
+    "MethodRequest",
+    "MethodResponse",
+    "InboxOptions",
+]
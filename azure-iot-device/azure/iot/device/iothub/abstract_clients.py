@@ -27,19 +27,28 @@ logger = logging.getLogger(__name__)
 # SymmetricKeyAuthenticationProvider was intended to be part of an Edge scenario or not.
 
 
-def _validate_kwargs(**kwargs):
+def _validate_kwargs(exclude=[], **kwargs):
     """Helper function to validate user provided kwargs.
-    Raises TypeError if an invalid option has been provided"""
+    Raises TypeError if an invalid option, or one of the excluded options, has been provided"""
     valid_kwargs = [
         "product_info",
         "websockets",
         "cipher",
         "server_verification_cert",
         "proxy_options",
+        "offline_store_options",
+        "executor_group",
+        "pipeline_engine",
+        "http_max_concurrent_requests",
+        "http_max_queued_requests",
+        "retry_policy",
+        "nonblocking_reauthorization",
+        "inbox_options",
+        "handler_max_workers",
     ]
 
     for kwarg in kwargs:
-        if kwarg not in valid_kwargs:
+        if kwarg not in valid_kwargs or kwarg in exclude:
             raise TypeError("Got an unexpected keyword argument '{}'".format(kwarg))
 
 
@@ -54,6 +63,30 @@ def _get_pipeline_config_kwargs(**kwargs):
         new_kwargs["cipher"] = kwargs["cipher"]
     if "proxy_options" in kwargs:
         new_kwargs["proxy_options"] = kwargs["proxy_options"]
+    if "offline_store_options" in kwargs:
+        new_kwargs["offline_store_options"] = kwargs["offline_store_options"]
+    if "executor_group" in kwargs:
+        new_kwargs["executor_group"] = kwargs["executor_group"]
+    if "pipeline_engine" in kwargs:
+        new_kwargs["pipeline_engine"] = kwargs["pipeline_engine"]
+    if "http_max_concurrent_requests" in kwargs:
+        new_kwargs["http_max_concurrent_requests"] = kwargs["http_max_concurrent_requests"]
+    if "http_max_queued_requests" in kwargs:
+        new_kwargs["http_max_queued_requests"] = kwargs["http_max_queued_requests"]
+    if "retry_policy" in kwargs:
+        new_kwargs["retry_policy"] = kwargs["retry_policy"]
+    if "nonblocking_reauthorization" in kwargs:
+        new_kwargs["nonblocking_reauthorization"] = kwargs["nonblocking_reauthorization"]
+    return new_kwargs
+
+
+def _get_client_kwargs(**kwargs):
+    """Helper function to get a subset of user provided kwargs relevant to the client itself"""
+    new_kwargs = {}
+    if "inbox_options" in kwargs:
+        new_kwargs["inbox_options"] = kwargs["inbox_options"]
+    if "handler_max_workers" in kwargs:
+        new_kwargs["handler_max_workers"] = kwargs["handler_max_workers"]
     return new_kwargs
 
 
@@ -63,14 +96,23 @@ class AbstractIoTHubClient(object):
     This class needs to be extended for specific clients.
     """
 
-    def __init__(self, mqtt_pipeline, http_pipeline):
+    # Configuration options accepted by other clients which this client does not support
+    _unsupported_kwargs = []
+
+    def __init__(self, mqtt_pipeline, http_pipeline, inbox_options=None, handler_max_workers=None):
         """Initializer for a generic client.
 
         :param mqtt_pipeline: The pipeline used to connect to the IoTHub endpoint.
         :type mqtt_pipeline: :class:`azure.iot.device.iothub.pipeline.MQTTPipeline`
+        :param inbox_options: Options limiting the number of received messages held by the client.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time.
         """
         self._mqtt_pipeline = mqtt_pipeline
         self._http_pipeline = http_pipeline
+        self._inbox_options = inbox_options
+        self._handler_max_workers = handler_max_workers
 
     @classmethod
     def create_from_connection_string(cls, connection_string, **kwargs):
@@ -91,6 +133,39 @@ class AbstractIoTHubClient(object):
             arbitrary product info which is appended to the user agent string.
         :param proxy_options: Options for sending traffic through proxy servers.
         :type proxy_options: :class:`azure.iot.device.ProxyOptions`
+        :param offline_store_options: Options for storing telemetry on disk while the client is
+            disconnected, to be sent once it connects again, even after a restart.
+        :type offline_store_options: :class:`azure.iot.device.OfflineStoreOptions`
+        :param executor_group: Configuration Option. Default is None. Name of the executor group
+            the client runs in. Clients in the same group share a dedicated pipeline thread and
+            handler thread, so giving each client (or each shard of clients) its own group lets
+            many clients in one process make progress in parallel. If None, the client shares
+            the process-wide threads with every other client.
+        :type executor_group: hashable
+        :param str pipeline_engine: Configuration Option. Default is "thread". Set to "asyncio" to
+            run the client's pipeline thread as an asyncio event loop which also services the
+            network connection, rather than using a separate network thread per client.
+        :param int http_max_concurrent_requests: Configuration Option. Default is 8. Maximum
+            number of HTTP requests (e.g. method invocations and blob storage calls) the client sends
+            at the same time.
+        :param int http_max_queued_requests: Configuration Option. Default is 1000. Maximum number
+            of HTTP requests waiting to be sent. Requests made while every HTTP worker is busy
+            and the queue is full fail.
+        :param retry_policy: Policy for how long the client waits before retrying failed
+            operations and before reconnecting, with exponential backoff and jitter. If not
+            provided, the client waits a fixed time.
+        :type retry_policy: :class:`azure.iot.device.RetryPolicy`
+        :param bool nonblocking_reauthorization: Configuration Option. Default is False. If True,
+            the client keeps sending while it reauthorizes its connection with a renewed SAS
+            token, rather than holding outgoing messages until the reauthorization completes.
+        :param inbox_options: Options limiting the number of received C2D or input messages held
+            by the client until the application receives them, and what to do when that limit is
+            reached. If not provided, the number of held messages is not limited.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time. Handlers for different inputs, methods or features run concurrently,
+            while data for the same one is handled in order. Default 4. Only supported by the
+            synchronous clients.
 
         :raises: ValueError if given an invalid connection_string.
         :raises: TypeError if given an unrecognized parameter.
@@ -101,7 +176,7 @@ class AbstractIoTHubClient(object):
         # This will require refactoring of the auth package to use common objects (e.g. ConnectionString)
         # in order to differentiate types of connection strings.
 
-        _validate_kwargs(**kwargs)
+        _validate_kwargs(exclude=cls._unsupported_kwargs, **kwargs)
 
         # Pipeline Config setup
         pipeline_config_kwargs = _get_pipeline_config_kwargs(**kwargs)
@@ -117,7 +192,7 @@ class AbstractIoTHubClient(object):
         http_pipeline = pipeline.HTTPPipeline(authentication_provider, pipeline_configuration)
         mqtt_pipeline = pipeline.MQTTPipeline(authentication_provider, pipeline_configuration)
 
-        return cls(mqtt_pipeline, http_pipeline)
+        return cls(mqtt_pipeline, http_pipeline, **_get_client_kwargs(**kwargs))
 
     @abc.abstractmethod
     def connect(self):
@@ -131,6 +206,10 @@ class AbstractIoTHubClient(object):
     def send_message(self, message):
         pass
 
+    @abc.abstractmethod
+    def send_message_batch(self, messages, max_in_flight):
+        pass
+
     @abc.abstractmethod
     def receive_method_request(self, method_name=None):
         pass
@@ -187,12 +266,45 @@ class AbstractIoTHubDeviceClient(AbstractIoTHubClient):
             arbitrary product info which is appended to the user agent string.
         :param proxy_options: Options for sending traffic through proxy servers.
         :type proxy_options: :class:`azure.iot.device.ProxyOptions`
+        :param offline_store_options: Options for storing telemetry on disk while the client is
+            disconnected, to be sent once it connects again, even after a restart.
+        :type offline_store_options: :class:`azure.iot.device.OfflineStoreOptions`
+        :param executor_group: Configuration Option. Default is None. Name of the executor group
+            the client runs in. Clients in the same group share a dedicated pipeline thread and
+            handler thread, so giving each client (or each shard of clients) its own group lets
+            many clients in one process make progress in parallel. If None, the client shares
+            the process-wide threads with every other client.
+        :type executor_group: hashable
+        :param str pipeline_engine: Configuration Option. Default is "thread". Set to "asyncio" to
+            run the client's pipeline thread as an asyncio event loop which also services the
+            network connection, rather than using a separate network thread per client.
+        :param int http_max_concurrent_requests: Configuration Option. Default is 8. Maximum
+            number of HTTP requests (e.g. method invocations and blob storage calls) the client sends
+            at the same time.
+        :param int http_max_queued_requests: Configuration Option. Default is 1000. Maximum number
+            of HTTP requests waiting to be sent. Requests made while every HTTP worker is busy
+            and the queue is full fail.
+        :param retry_policy: Policy for how long the client waits before retrying failed
+            operations and before reconnecting, with exponential backoff and jitter. If not
+            provided, the client waits a fixed time.
+        :type retry_policy: :class:`azure.iot.device.RetryPolicy`
+        :param bool nonblocking_reauthorization: Configuration Option. Default is False. If True,
+            the client keeps sending while it reauthorizes its connection with a renewed SAS
+            token, rather than holding outgoing messages until the reauthorization completes.
+        :param inbox_options: Options limiting the number of received C2D or input messages held
+            by the client until the application receives them, and what to do when that limit is
+            reached. If not provided, the number of held messages is not limited.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time. Handlers for different inputs, methods or features run concurrently,
+            while data for the same one is handled in order. Default 4. Only supported by the
+            synchronous clients.
 
         :raises: TypeError if given an unrecognized parameter.
 
         :returns: An instance of an IoTHub client that uses an X509 certificate for authentication.
         """
-        _validate_kwargs(**kwargs)
+        _validate_kwargs(exclude=cls._unsupported_kwargs, **kwargs)
 
         # Pipeline Config setup
         pipeline_config_kwargs = _get_pipeline_config_kwargs(**kwargs)
@@ -209,7 +321,7 @@ class AbstractIoTHubDeviceClient(AbstractIoTHubClient):
         http_pipeline = pipeline.HTTPPipeline(authentication_provider, pipeline_configuration)
         mqtt_pipeline = pipeline.MQTTPipeline(authentication_provider, pipeline_configuration)
 
-        return cls(mqtt_pipeline, http_pipeline)
+        return cls(mqtt_pipeline, http_pipeline, **_get_client_kwargs(**kwargs))
 
     @classmethod
     def create_from_symmetric_key(cls, symmetric_key, hostname, device_id, **kwargs):
@@ -233,12 +345,45 @@ class AbstractIoTHubDeviceClient(AbstractIoTHubClient):
             arbitrary product info which is appended to the user agent string.
         :param proxy_options: Options for sending traffic through proxy servers.
         :type proxy_options: :class:`azure.iot.device.ProxyOptions`
+        :param offline_store_options: Options for storing telemetry on disk while the client is
+            disconnected, to be sent once it connects again, even after a restart.
+        :type offline_store_options: :class:`azure.iot.device.OfflineStoreOptions`
+        :param executor_group: Configuration Option. Default is None. Name of the executor group
+            the client runs in. Clients in the same group share a dedicated pipeline thread and
+            handler thread, so giving each client (or each shard of clients) its own group lets
+            many clients in one process make progress in parallel. If None, the client shares
+            the process-wide threads with every other client.
+        :type executor_group: hashable
+        :param str pipeline_engine: Configuration Option. Default is "thread". Set to "asyncio" to
+            run the client's pipeline thread as an asyncio event loop which also services the
+            network connection, rather than using a separate network thread per client.
+        :param int http_max_concurrent_requests: Configuration Option. Default is 8. Maximum
+            number of HTTP requests (e.g. method invocations and blob storage calls) the client sends
+            at the same time.
+        :param int http_max_queued_requests: Configuration Option. Default is 1000. Maximum number
+            of HTTP requests waiting to be sent. Requests made while every HTTP worker is busy
+            and the queue is full fail.
+        :param retry_policy: Policy for how long the client waits before retrying failed
+            operations and before reconnecting, with exponential backoff and jitter. If not
+            provided, the client waits a fixed time.
+        :type retry_policy: :class:`azure.iot.device.RetryPolicy`
+        :param bool nonblocking_reauthorization: Configuration Option. Default is False. If True,
+            the client keeps sending while it reauthorizes its connection with a renewed SAS
+            token, rather than holding outgoing messages until the reauthorization completes.
+        :param inbox_options: Options limiting the number of received C2D or input messages held
+            by the client until the application receives them, and what to do when that limit is
+            reached. If not provided, the number of held messages is not limited.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time. Handlers for different inputs, methods or features run concurrently,
+            while data for the same one is handled in order. Default 4. Only supported by the
+            synchronous clients.
 
         :raises: TypeError if given an unrecognized parameter.
 
         :return: An instance of an IoTHub client that uses a symmetric key for authentication.
         """
-        _validate_kwargs(**kwargs)
+        _validate_kwargs(exclude=cls._unsupported_kwargs, **kwargs)
 
         # Pipeline Config setup
         pipeline_config_kwargs = _get_pipeline_config_kwargs(**kwargs)
@@ -255,22 +400,36 @@ class AbstractIoTHubDeviceClient(AbstractIoTHubClient):
         http_pipeline = pipeline.HTTPPipeline(authentication_provider, pipeline_configuration)
         mqtt_pipeline = pipeline.MQTTPipeline(authentication_provider, pipeline_configuration)
 
-        return cls(mqtt_pipeline, http_pipeline)
+        return cls(mqtt_pipeline, http_pipeline, **_get_client_kwargs(**kwargs))
 
     @abc.abstractmethod
     def receive_message(self):
         pass
 
+    @abc.abstractmethod
+    def receive_messages(self, max_count):
+        pass
+
 
 @six.add_metaclass(abc.ABCMeta)
 class AbstractIoTHubModuleClient(AbstractIoTHubClient):
-    def __init__(self, mqtt_pipeline, http_pipeline):
+    def __init__(self, mqtt_pipeline, http_pipeline, inbox_options=None, handler_max_workers=None):
         """Initializer for a module client.
 
         :param mqtt_pipeline: The pipeline used to connect to the IoTHub endpoint.
         :type mqtt_pipeline: :class:`azure.iot.device.iothub.pipeline.MQTTPipeline`
+        :param inbox_options: Options limiting the number of received messages held by the client.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time.
         """
-        super(AbstractIoTHubModuleClient, self).__init__(mqtt_pipeline, http_pipeline)
+        super(AbstractIoTHubModuleClient, self).__init__(
+            mqtt_pipeline,
+            http_pipeline,
+            inbox_options=inbox_options,
+            handler_max_workers=handler_max_workers,
+        )
 
     @classmethod
     def create_from_edge_environment(cls, **kwargs):
@@ -289,6 +448,39 @@ class AbstractIoTHubModuleClient(AbstractIoTHubClient):
             arbitrary product info which is appended to the user agent string.
         :param proxy_options: Options for sending traffic through proxy servers.
         :type proxy_options: :class:`azure.iot.device.ProxyOptions`
+        :param offline_store_options: Options for storing telemetry on disk while the client is
+            disconnected, to be sent once it connects again, even after a restart.
+        :type offline_store_options: :class:`azure.iot.device.OfflineStoreOptions`
+        :param executor_group: Configuration Option. Default is None. Name of the executor group
+            the client runs in. Clients in the same group share a dedicated pipeline thread and
+            handler thread, so giving each client (or each shard of clients) its own group lets
+            many clients in one process make progress in parallel. If None, the client shares
+            the process-wide threads with every other client.
+        :type executor_group: hashable
+        :param str pipeline_engine: Configuration Option. Default is "thread". Set to "asyncio" to
+            run the client's pipeline thread as an asyncio event loop which also services the
+            network connection, rather than using a separate network thread per client.
+        :param int http_max_concurrent_requests: Configuration Option. Default is 8. Maximum
+            number of HTTP requests (e.g. method invocations and blob storage calls) the client sends
+            at the same time.
+        :param int http_max_queued_requests: Configuration Option. Default is 1000. Maximum number
+            of HTTP requests waiting to be sent. Requests made while every HTTP worker is busy
+            and the queue is full fail.
+        :param retry_policy: Policy for how long the client waits before retrying failed
+            operations and before reconnecting, with exponential backoff and jitter. If not
+            provided, the client waits a fixed time.
+        :type retry_policy: :class:`azure.iot.device.RetryPolicy`
+        :param bool nonblocking_reauthorization: Configuration Option. Default is False. If True,
+            the client keeps sending while it reauthorizes its connection with a renewed SAS
+            token, rather than holding outgoing messages until the reauthorization completes.
+        :param inbox_options: Options limiting the number of received C2D or input messages held
+            by the client until the application receives them, and what to do when that limit is
+            reached. If not provided, the number of held messages is not limited.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time. Handlers for different inputs, methods or features run concurrently,
+            while data for the same one is handled in order. Default 4. Only supported by the
+            synchronous clients.
 
         :raises: OSError if the IoT Edge container is not configured correctly.
         :raises: ValueError if debug variables are invalid.
@@ -296,7 +488,7 @@ class AbstractIoTHubModuleClient(AbstractIoTHubClient):
         :returns: An instance of an IoTHub client that uses the IoT Edge environment for
             authentication.
         """
-        _validate_kwargs(**kwargs)
+        _validate_kwargs(exclude=cls._unsupported_kwargs, **kwargs)
         if kwargs.get("server_verification_cert"):
             raise TypeError(
                 "'server_verification_cert' is not supported by clients using an IoT Edge environment"
@@ -374,7 +566,7 @@ class AbstractIoTHubModuleClient(AbstractIoTHubClient):
         http_pipeline = pipeline.HTTPPipeline(authentication_provider, pipeline_configuration)
         mqtt_pipeline = pipeline.MQTTPipeline(authentication_provider, pipeline_configuration)
 
-        return cls(mqtt_pipeline, http_pipeline)
+        return cls(mqtt_pipeline, http_pipeline, **_get_client_kwargs(**kwargs))
 
     @classmethod
     def create_from_x509_certificate(cls, x509, hostname, device_id, module_id, **kwargs):
@@ -403,12 +595,45 @@ class AbstractIoTHubModuleClient(AbstractIoTHubClient):
             arbitrary product info which is appended to the user agent string.
         :param proxy_options: Options for sending traffic through proxy servers.
         :type proxy_options: :class:`azure.iot.device.ProxyOptions`
+        :param offline_store_options: Options for storing telemetry on disk while the client is
+            disconnected, to be sent once it connects again, even after a restart.
+        :type offline_store_options: :class:`azure.iot.device.OfflineStoreOptions`
+        :param executor_group: Configuration Option. Default is None. Name of the executor group
+            the client runs in. Clients in the same group share a dedicated pipeline thread and
+            handler thread, so giving each client (or each shard of clients) its own group lets
+            many clients in one process make progress in parallel. If None, the client shares
+            the process-wide threads with every other client.
+        :type executor_group: hashable
+        :param str pipeline_engine: Configuration Option. Default is "thread". Set to "asyncio" to
+            run the client's pipeline thread as an asyncio event loop which also services the
+            network connection, rather than using a separate network thread per client.
+        :param int http_max_concurrent_requests: Configuration Option. Default is 8. Maximum
+            number of HTTP requests (e.g. method invocations and blob storage calls) the client sends
+            at the same time.
+        :param int http_max_queued_requests: Configuration Option. Default is 1000. Maximum number
+            of HTTP requests waiting to be sent. Requests made while every HTTP worker is busy
+            and the queue is full fail.
+        :param retry_policy: Policy for how long the client waits before retrying failed
+            operations and before reconnecting, with exponential backoff and jitter. If not
+            provided, the client waits a fixed time.
+        :type retry_policy: :class:`azure.iot.device.RetryPolicy`
+        :param bool nonblocking_reauthorization: Configuration Option. Default is False. If True,
+            the client keeps sending while it reauthorizes its connection with a renewed SAS
+            token, rather than holding outgoing messages until the reauthorization completes.
+        :param inbox_options: Options limiting the number of received C2D or input messages held
+            by the client until the application receives them, and what to do when that limit is
+            reached. If not provided, the number of held messages is not limited.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time. Handlers for different inputs, methods or features run concurrently,
+            while data for the same one is handled in order. Default 4. Only supported by the
+            synchronous clients.
 
         :raises: TypeError if given an unrecognized parameter.
 
         :returns: An instance of an IoTHub client that uses an X509 certificate for authentication.
         """
-        _validate_kwargs(**kwargs)
+        _validate_kwargs(exclude=cls._unsupported_kwargs, **kwargs)
 
         # Pipeline Config setup
         pipeline_config_kwargs = _get_pipeline_config_kwargs(**kwargs)
@@ -423,7 +648,7 @@ class AbstractIoTHubModuleClient(AbstractIoTHubClient):
         # Pipeline setup
         http_pipeline = pipeline.HTTPPipeline(authentication_provider, pipeline_configuration)
         mqtt_pipeline = pipeline.MQTTPipeline(authentication_provider, pipeline_configuration)
-        return cls(mqtt_pipeline, http_pipeline)
+        return cls(mqtt_pipeline, http_pipeline, **_get_client_kwargs(**kwargs))
 
     @abc.abstractmethod
     def send_message_to_output(self, message, output_name):
@@ -432,3 +657,7 @@ class AbstractIoTHubModuleClient(AbstractIoTHubClient):
     @abc.abstractmethod
     def receive_message_on_input(self, input_name):
         pass
+
+    @abc.abstractmethod
+    def receive_messages_on_input(self, input_name, max_count):
+        pass
@@ -8,6 +8,7 @@ Azure IoTHub Device SDK for Python.
 """
 
 import logging
+import asyncio
 from azure.iot.device.common import async_adapter
 from azure.iot.device.iothub.abstract_clients import (
     AbstractIoTHubClient,
@@ -53,6 +54,9 @@ class GenericIoTHubClient(AbstractIoTHubClient):
     This class needs to be extended for specific clients.
     """
 
+    # Received data is only dispatched to handlers by the synchronous clients
+    _unsupported_kwargs = ["handler_max_workers"]
+
     def __init__(self, **kwargs):
         """Initializer for a generic asynchronous client.
 
@@ -69,7 +73,10 @@ class GenericIoTHubClient(AbstractIoTHubClient):
         # in the class hierarchies of different clients. Thus, args here must be passed along as
         # **kwargs.
         super().__init__(**kwargs)
-        self._inbox_manager = InboxManager(inbox_type=AsyncClientInbox)
+        self._inbox_manager = InboxManager(
+            inbox_type=AsyncClientInbox, message_inbox_options=self._inbox_options
+        )
+        self._inbox_manager.on_feature_pause_changed = self._on_feature_pause_changed
         self._mqtt_pipeline.on_connected = self._on_connected
         self._mqtt_pipeline.on_disconnected = self._on_disconnected
         self._mqtt_pipeline.on_method_request_received = self._inbox_manager.route_method_request
@@ -85,6 +92,21 @@ class GenericIoTHubClient(AbstractIoTHubClient):
         self._inbox_manager.clear_all_method_requests()
         logger.info("Cleared all pending method requests due to disconnect")
 
+    def _on_feature_pause_changed(self, feature_name):
+        """Helper handler that is called when receiving data for a feature may have to be paused
+        or resumed, because one of its inboxes has become full or has space again"""
+        inbox_manager = self._inbox_manager
+
+        def on_complete(error=None):
+            if error:
+                logger.error("Pausing or resuming {} failed: {}".format(feature_name, error))
+
+        self._mqtt_pipeline.update_feature_pause(
+            feature_name,
+            is_pause_wanted=lambda: inbox_manager.is_feature_pause_wanted(feature_name),
+            callback=on_complete,
+        )
+
     async def connect(self):
         """Connects the client to an Azure IoT Hub or Azure IoT Edge Hub instance.
 
@@ -159,6 +181,73 @@ class GenericIoTHubClient(AbstractIoTHubClient):
 
         logger.info("Successfully sent message to Hub")
 
+    async def send_message_batch(
+        self, messages, max_in_flight=device_constant.DEFAULT_MAX_IN_FLIGHT_MESSAGES
+    ):
+        """Sends multiple messages to the default events endpoint on the Azure IoT Hub or Azure IoT Edge Hub instance.
+
+        Unlike send_message, this coroutine does not wait for each message to be acknowledged by
+        the service before sending the next one. Up to max_in_flight messages are sent without
+        acknowledgement, and this coroutine returns once every message has either been
+        acknowledged or has failed.
+
+        If the connection to the service has not previously been opened by a call to connect, this
+        function will open the connection before sending the events.
+
+        :param messages: The messages to send. Any item that is not an instance of the Message
+            class will be converted to Message object.
+        :type messages: iterable of :class:`azure.iot.device.Message` or str
+        :param int max_in_flight: The maximum number of messages that can be awaiting
+            acknowledgement from the service at any one time. Default is 20.
+
+        :returns: A list with one entry per message, in the order the messages were given. The
+            entry is None if the message was sent successfully, or the
+            :class:`azure.iot.device.exceptions.ClientError` that caused it to fail.
+        :rtype: list
+
+        :raises: ValueError if any message fails size validation. No messages are sent if this
+            is raised.
+        :raises: ValueError if max_in_flight is less than 1.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        validated_messages = []
+        for message in messages:
+            if not isinstance(message, Message):
+                message = Message(message)
+            if message.get_size() > device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
+                raise ValueError("Size of telemetry message can not exceed 256 KB.")
+            validated_messages.append(message)
+
+        logger.info("Sending batch of {} messages to Hub...".format(len(validated_messages)))
+        send_message_async = async_adapter.emulate_async(self._mqtt_pipeline.send_message)
+
+        in_flight = asyncio.Semaphore(max_in_flight)
+        callbacks = []
+        for message in validated_messages:
+            await in_flight.acquire()
+            callback = async_adapter.AwaitableCallback()
+            callback.future.add_done_callback(lambda future: in_flight.release())
+            callbacks.append(callback)
+            await send_message_async(message, callback=callback)
+
+        results = []
+        for callback in callbacks:
+            try:
+                await handle_result(callback)
+            except exceptions.ClientError as e:
+                results.append(e)
+            else:
+                results.append(None)
+
+        logger.info(
+            "Finished sending batch to Hub: {} of {} messages succeeded".format(
+                results.count(None), len(results)
+            )
+        )
+        return results
+
     async def receive_method_request(self, method_name=None):
         """Receive a method request via the Azure IoT Hub or Azure IoT Edge Hub.
 
@@ -357,7 +446,7 @@ class IoTHubDeviceClient(GenericIoTHubClient, AbstractIoTHubDeviceClient):
     Intended for usage with Python 3.5.3+
     """
 
-    def __init__(self, mqtt_pipeline, http_pipeline):
+    def __init__(self, mqtt_pipeline, http_pipeline, inbox_options=None):
         """Initializer for a IoTHubDeviceClient.
 
         This initializer should not be called directly.
@@ -365,8 +454,12 @@ class IoTHubDeviceClient(GenericIoTHubClient, AbstractIoTHubDeviceClient):
 
         :param mqtt_pipeline: The pipeline used to connect to the IoTHub endpoint.
         :type mqtt_pipeline: :class:`azure.iot.device.iothub.pipeline.MQTTPipeline`
+        :param inbox_options: Options limiting the number of received messages held by the client.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
         """
-        super().__init__(mqtt_pipeline=mqtt_pipeline, http_pipeline=http_pipeline)
+        super().__init__(
+            mqtt_pipeline=mqtt_pipeline, http_pipeline=http_pipeline, inbox_options=inbox_options
+        )
         self._mqtt_pipeline.on_c2d_message_received = self._inbox_manager.route_c2d_message
 
     async def receive_message(self):
@@ -386,6 +479,36 @@ class IoTHubDeviceClient(GenericIoTHubClient, AbstractIoTHubDeviceClient):
         logger.info("Message received")
         return message
 
+    async def receive_messages(self, max_count, timeout=None):
+        """Receive up to max_count messages that have been sent from the Azure IoT Hub.
+
+        Waits for a message to be available, then returns it along with the messages received
+        after it, up to max_count messages in total. This lets messages that arrive in bursts be
+        processed in batches.
+
+        :param int max_count: The maximum number of messages to return.
+        :param int timeout: Optionally provide a number of seconds until waiting times out.
+
+        :raises: ValueError if max_count is less than 1.
+
+        :returns: List of messages that were sent from the Azure IoT Hub, which is empty if
+            no message has been received before the timeout.
+        :rtype: list(:class:`azure.iot.device.Message`)
+        """
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1")
+        if not self._mqtt_pipeline.feature_enabled[constant.C2D_MSG]:
+            await self._enable_feature(constant.C2D_MSG)
+        c2d_inbox = self._inbox_manager.get_c2d_message_inbox()
+
+        logger.info("Waiting for messages from Hub...")
+        try:
+            messages = await c2d_inbox.get_batch(max_count, timeout=timeout)
+        except asyncio.TimeoutError:
+            messages = []
+        logger.info("{} messages received".format(len(messages)))
+        return messages
+
 
 class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
     """An asynchronous module client that connects to an Azure IoT Hub or Azure IoT Edge instance.
@@ -393,7 +516,7 @@ class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
     Intended for usage with Python 3.5.3+
     """
 
-    def __init__(self, mqtt_pipeline, http_pipeline):
+    def __init__(self, mqtt_pipeline, http_pipeline, inbox_options=None):
         """Intializer for a IoTHubModuleClient.
 
         This initializer should not be called directly.
@@ -401,8 +524,12 @@ class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
 
         :param mqtt_pipeline: The pipeline used to connect to the IoTHub endpoint.
         :type mqtt_pipeline: :class:`azure.iot.device.iothub.pipeline.MQTTPipeline`
+        :param inbox_options: Options limiting the number of received messages held by the client.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
         """
-        super().__init__(mqtt_pipeline=mqtt_pipeline, http_pipeline=http_pipeline)
+        super().__init__(
+            mqtt_pipeline=mqtt_pipeline, http_pipeline=http_pipeline, inbox_options=inbox_options
+        )
         self._mqtt_pipeline.on_input_message_received = self._inbox_manager.route_input_message
 
     async def send_message_to_output(self, message, output_name):
@@ -464,6 +591,38 @@ class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
         logger.info("Input message received on: " + input_name)
         return message
 
+    async def receive_messages_on_input(self, input_name, max_count, timeout=None):
+        """Receive up to max_count input messages that have been sent from other Modules to a
+        specific input.
+
+        Waits for a message to be available, then returns it along with the messages received
+        after it, up to max_count messages in total. This lets messages that arrive in bursts be
+        processed in batches.
+
+        :param str input_name: The input name to receive messages on.
+        :param int max_count: The maximum number of messages to return.
+        :param int timeout: Optionally provide a number of seconds until waiting times out.
+
+        :raises: ValueError if max_count is less than 1.
+
+        :returns: List of messages that were sent to the specified input, which is empty if
+            no message has been received before the timeout.
+        :rtype: list(:class:`azure.iot.device.Message`)
+        """
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1")
+        if not self._mqtt_pipeline.feature_enabled[constant.INPUT_MSG]:
+            await self._enable_feature(constant.INPUT_MSG)
+        inbox = self._inbox_manager.get_input_message_inbox(input_name)
+
+        logger.info("Waiting for input messages on: " + input_name + "...")
+        try:
+            messages = await inbox.get_batch(max_count, timeout=timeout)
+        except asyncio.TimeoutError:
+            messages = []
+        logger.info("{} input messages received on: {}".format(len(messages), input_name))
+        return messages
+
     async def invoke_method(self, method_params, device_id, module_id=None):
         """Invoke a method from your client onto a device or module client, and receive the response to the method call.
 
@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------
 """This module contains an Inbox class for use with an asynchronous client"""
 
+import asyncio
 import janus
 from azure.iot.device.iothub.sync_inbox import AbstractInbox
 
@@ -15,9 +16,13 @@ class AsyncClientInbox(AbstractInbox):
     All methods implemented in this class are threadsafe.
     """
 
-    def __init__(self):
-        """Initializer for AsyncClientInbox."""
-        self._queue = janus.Queue()
+    def __init__(self, **kwargs):
+        """Initializer for AsyncClientInbox.
+
+        Accepts the same keyword arguments as AbstractInbox.
+        """
+        super().__init__(**kwargs)
+        self._queue = janus.Queue(maxsize=self._get_queue_maxsize())
 
     def __contains__(self, item):
         """Return True if item is in Inbox, False otherwise"""
@@ -27,15 +32,25 @@ class AsyncClientInbox(AbstractInbox):
         with self._queue._sync_mutex:
             return item in self._queue._queue
 
-    def _put(self, item):
-        """Put an item into the Inbox.
+    def _put_item(self, item):
+        self._queue.sync_q.put(item)
 
-        Block if necessary until a free slot is available.
-        Only to be used by the InboxManager.
+    def _put_item_nowait(self, item):
+        try:
+            self._queue.sync_q.put_nowait(item)
+        except janus.SyncQueueFull:
+            return False
+        return True
 
-        :param item: The item to be put in the Inbox.
-        """
-        self._queue.sync_q.put(item)
+    def _remove_item_nowait(self):
+        try:
+            self._queue.sync_q.get_nowait()
+        except janus.SyncQueueEmpty:
+            return False
+        return True
+
+    def _qsize(self):
+        return self._queue.sync_q.qsize()
 
     async def get(self):
         """Remove and return an item from the Inbox.
@@ -44,7 +59,37 @@ class AsyncClientInbox(AbstractInbox):
 
         :returns: An item from the Inbox.
         """
-        return await self._queue.async_q.get()
+        item = await self._queue.async_q.get()
+        self._on_item_removed()
+        return item
+
+    async def get_batch(self, max_count, timeout=None):
+        """Remove and return up to max_count items from the Inbox, in the order they were added.
+
+        If Inbox is empty, wait until an item is available.  Once an item is available, the
+        other items returned are the ones already in the Inbox, so this doesn't wait for more.
+
+        :param int max_count: The maximum number of items to return.
+        :param int timeout: Optionally provide a number of seconds until waiting times out.
+
+        :raises: ValueError if max_count is less than 1
+        :raises: asyncio.TimeoutError if the timeout passes while the Inbox is empty
+
+        :returns: A list of between 1 and max_count items from the Inbox.
+        """
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1")
+        if timeout is None:
+            items = [await self._queue.async_q.get()]
+        else:
+            items = [await asyncio.wait_for(self._queue.async_q.get(), timeout)]
+        while len(items) < max_count:
+            try:
+                items.append(self._queue.async_q.get_nowait())
+            except janus.AsyncQueueEmpty:
+                break
+        self._on_item_removed()
+        return items
 
     def empty(self):
         """Returns True if the inbox is empty, False otherwise
@@ -61,3 +106,4 @@ class AsyncClientInbox(AbstractInbox):
                 self._queue.sync_q.get_nowait()
             except janus.SyncQueueEmpty:
                 break
+        self._on_item_removed()
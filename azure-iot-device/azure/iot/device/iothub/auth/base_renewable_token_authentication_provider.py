@@ -10,8 +10,10 @@ import abc
 import logging
 import math
 import six
+import threading
 import weakref
-from threading import Timer
+from azure.iot.device.common import handle_exceptions
+from azure.iot.device.common.timer_scheduler import Timer
 import six.moves.urllib as urllib
 from .authentication_provider import AuthenticationProvider
 
@@ -26,6 +28,9 @@ DEFAULT_TOKEN_VALIDITY_PERIOD = 3600
 # Length of time, in seconds, before a token expires that we want to begin renewing it.
 DEFAULT_TOKEN_RENEWAL_MARGIN = 120
 
+# Length of time, in seconds, to wait before trying again when renewing a token fails.
+DEFAULT_TOKEN_RENEWAL_RETRY_INTERVAL = 10
+
 
 @six.add_metaclass(abc.ABCMeta)
 class BaseRenewableTokenAuthenticationProvider(AuthenticationProvider):
@@ -38,6 +43,10 @@ class BaseRenewableTokenAuthenticationProvider(AuthenticationProvider):
     which is expected to be provided by derived objects.  This base also
     implements the functionality necessary for timing and executing the
     token renewal operation.
+
+    Timed renewals sign the new token on a background thread, so that a slow signing function
+    (e.g. a request to the IoT Edge workload API) doesn't hold up the shared timer thread.  The
+    current token stays in use until the new one is ready.
     """
 
     def __init__(self, hostname, device_id, module_id=None):
@@ -58,7 +67,10 @@ class BaseRenewableTokenAuthenticationProvider(AuthenticationProvider):
         )
         self.token_validity_period = DEFAULT_TOKEN_VALIDITY_PERIOD
         self.token_renewal_margin = DEFAULT_TOKEN_RENEWAL_MARGIN
+        self.token_renewal_retry_interval = DEFAULT_TOKEN_RENEWAL_RETRY_INTERVAL
         self._token_update_timer = None
+        self._token_renewal_thread = None
+        self._token_lock = threading.Lock()
         self.shared_access_key_name = None
         self.sas_token_str = None
         self.on_sas_token_updated_handler_list = []
@@ -112,6 +124,13 @@ class BaseRenewableTokenAuthenticationProvider(AuthenticationProvider):
 
         :return: None
         """
+        with self._token_lock:
+            self._create_sas_token()
+        self._notify_token_updated()
+
+    def _create_sas_token(self):
+        """Sign a new SAS token, make it the current token, and schedule its renewal.
+        """
         logger.info(
             "Generating new SAS token for (%s,%s) that expires %d seconds in the future",
             self.device_id,
@@ -135,7 +154,6 @@ class BaseRenewableTokenAuthenticationProvider(AuthenticationProvider):
 
         self.sas_token_str = str(token)
         self._schedule_token_update(self.token_validity_period - self.token_renewal_margin)
-        self._notify_token_updated()
 
     def _cancel_token_update_timer(self):
         """Cancel any future token update operations.  This is typically done as part of a
@@ -186,13 +204,54 @@ class BaseRenewableTokenAuthenticationProvider(AuthenticationProvider):
 
         def timerfunc():
             this = self_weakref()
-            logger.debug("Timed SAS update for (%s,%s)", this.device_id, this.module_id)
-            this.generate_new_sas_token()
+            if this:
+                logger.debug("Timed SAS update for (%s,%s)", this.device_id, this.module_id)
+                this._start_token_renewal()
 
         self._token_update_timer = Timer(seconds_until_update, timerfunc)
-        self._token_update_timer.daemon = True
         self._token_update_timer.start()
 
+    def _start_token_renewal(self):
+        """Renew the SAS token on a new background thread.  Timer functions run on the timer
+        thread shared by every client, and signing may take a while (or block on I/O), so it
+        mustn't be done there.
+        """
+        self._token_renewal_thread = threading.Thread(
+            target=self._renew_sas_token, name="azure_iot_sas_renewal"
+        )
+        self._token_renewal_thread.daemon = True
+        self._token_renewal_thread.start()
+
+    def _renew_sas_token(self):
+        """Generate a new SAS token.  If signing fails, the current token (which is still valid for
+        up to self.token_renewal_margin seconds) is kept, and the renewal is tried again after
+        self.token_renewal_retry_interval seconds.  If a token update handler fails, the new token
+        has already been made current and its renewal scheduled, so the error is only reported.
+        """
+        try:
+            with self._token_lock:
+                self._create_sas_token()
+        except Exception as e:
+            logger.warning(
+                "Renewing SAS token for (%s,%s) failed.  Trying again in %d seconds",
+                self.device_id,
+                self.module_id,
+                self.token_renewal_retry_interval,
+            )
+            handle_exceptions.handle_background_exception(e)
+            self._schedule_token_update(self.token_renewal_retry_interval)
+            return
+
+        try:
+            self._notify_token_updated()
+        except Exception as e:
+            logger.error(
+                "Unexpected error notifying the token update for (%s,%s)",
+                self.device_id,
+                self.module_id,
+            )
+            handle_exceptions.handle_background_exception(e)
+
     def _notify_token_updated(self):
         """Notify clients that the SAS token has been updated by calling self.on_sas_token_updated.
         In response to this event, clients should re-initiate their connection in order to use
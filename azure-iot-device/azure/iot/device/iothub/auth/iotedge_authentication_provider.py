@@ -8,17 +8,54 @@ import os
 import base64
 import json
 import six.moves.urllib as urllib
-import requests
-import requests_unixsocket
 import logging
+import threading
+import time
 from .base_renewable_token_authentication_provider import BaseRenewableTokenAuthenticationProvider
 from azure.iot.device.common.chainable_exception import ChainableException
 from azure.iot.device.product_info import ProductInfo
 
-requests_unixsocket.monkeypatch()
-
 logger = logging.getLogger(__name__)
 
+# Length of time, in seconds, that a trust bundle received from IoT Edge is used for.
+DEFAULT_TRUST_BUNDLE_TTL = 3600
+
+_requests = None
+_requests_unixsocket = None
+_requests_import_lock = threading.Lock()
+
+# Trust bundle certificates received from IoT Edge, by (workload URI, API version), as
+# (certificate, time received).  Shared by every IoTEdgeHsm in the process, so that clients
+# created for the same module (or for several modules in one process) don't each ask for it.
+_trust_bundle_cache = {}
+_trust_bundle_cache_lock = threading.Lock()
+
+# Python 2.7 has no monotonic clock
+_clock = getattr(time, "monotonic", time.time)
+
+
+def _import_requests():
+    """Import requests, and requests_unixsocket to support the unix sockets used by IoT Edge.
+
+    requests takes a long time to import and is only used to talk to IoT Edge, so it is imported
+    on first use rather than with the client.
+    """
+    global _requests, _requests_unixsocket
+    with _requests_import_lock:
+        if _requests is None:
+            import requests
+            import requests_unixsocket
+
+            _requests_unixsocket = requests_unixsocket
+            _requests = requests
+    return _requests
+
+
+def _create_session():
+    """Create a requests Session which can talk to IoT Edge over unix sockets"""
+    _import_requests()
+    return _requests_unixsocket.Session()
+
 
 class IoTEdgeError(ChainableException):
     pass
@@ -87,7 +124,14 @@ class IoTEdgeHsm(object):
        SharedAccessSignature string which can be used to authenticate with Iot Edge
     """
 
-    def __init__(self, module_id, module_generation_id, workload_uri, api_version):
+    def __init__(
+        self,
+        module_id,
+        module_generation_id,
+        workload_uri,
+        api_version,
+        trust_bundle_ttl=DEFAULT_TRUST_BUNDLE_TTL,
+    ):
         """
         Constructor for instantiating a Azure IoT Edge HSM object
 
@@ -95,11 +139,38 @@ class IoTEdgeHsm(object):
         :param str api_version: The API version
         :param str module_generation_id: The module generation id
         :param str workload_uri: The workload uri
+        :param int trust_bundle_ttl: Length of time, in seconds, that a trust bundle received
+            from IoT Edge is used for before asking for it again.
         """
         self.module_id = urllib.parse.quote(module_id)
         self.api_version = api_version
         self.module_generation_id = module_generation_id
         self.workload_uri = _format_socket_uri(workload_uri)
+        self.trust_bundle_ttl = trust_bundle_ttl
+
+        # The session, and its connection to IoT Edge, is kept for all requests made by this
+        # object, so that every signing request doesn't have to open a new connection.
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._params = {"api-version": self.api_version}
+        self._headers = {"User-Agent": urllib.parse.quote_plus(ProductInfo.get_iothub_user_agent())}
+        self._sign_uri = (
+            self.workload_uri
+            + "modules/"
+            + self.module_id
+            + "/genid/"
+            + self.module_generation_id
+            + "/sign"
+        )
+
+    def _request(self, method, url, **kwargs):
+        """Make a request to IoT Edge using the session of this object"""
+        with self._session_lock:
+            if self._session is None:
+                self._session = _create_session()
+            return getattr(self._session, method)(
+                url, params=self._params, headers=self._headers, **kwargs
+            )
 
     # TODO: Is this really the right name? It returns a certificate FROM the trust bundle,
     # not the trust bundle itself
@@ -108,16 +179,23 @@ class IoTEdgeHsm(object):
         Return the trust bundle that can be used to validate the server-side SSL
         TLS connection that we use to talk to edgeHub.
 
+        The certificate received is used by every IoTEdgeHsm in the process using the same
+        workload URI and API version, for self.trust_bundle_ttl seconds.
+
         :return: The server verification certificate to use for connections to the Azure IoT Edge
         instance, as a PEM certificate in string form.
 
         :raises: IoTEdgeError if unable to retrieve the certificate.
         """
-        r = requests.get(
-            self.workload_uri + "trust-bundle",
-            params={"api-version": self.api_version},
-            headers={"User-Agent": urllib.parse.quote_plus(ProductInfo.get_iothub_user_agent())},
-        )
+        cache_key = (self.workload_uri, self.api_version)
+        with _trust_bundle_cache_lock:
+            cached = _trust_bundle_cache.get(cache_key)
+        if cached and _clock() - cached[1] < self.trust_bundle_ttl:
+            logger.debug("Using cached trust bundle")
+            return cached[0]
+
+        requests = _import_requests()
+        r = self._request("get", self.workload_uri + "trust-bundle")
         # Validate that the request was successful
         try:
             r.raise_for_status()
@@ -133,6 +211,9 @@ class IoTEdgeHsm(object):
             cert = bundle["certificate"]
         except KeyError as e:
             raise IoTEdgeError(message="No certificate in trust bundle", cause=e)
+
+        with _trust_bundle_cache_lock:
+            _trust_bundle_cache[cache_key] = (cert, _clock())
         return cert
 
     def sign(self, data_str):
@@ -148,23 +229,11 @@ class IoTEdgeHsm(object):
         :raises: IoTEdgeError if unable to sign the data.
         """
         encoded_data_str = base64.b64encode(data_str.encode("utf-8")).decode()
-
-        path = (
-            self.workload_uri
-            + "modules/"
-            + self.module_id
-            + "/genid/"
-            + self.module_generation_id
-            + "/sign"
-        )
         sign_request = {"keyId": "primary", "algo": "HMACSHA256", "data": encoded_data_str}
 
-        r = requests.post(  # TODO: can we use json field instead of data?
-            url=path,
-            params={"api-version": self.api_version},
-            headers={"User-Agent": urllib.parse.quote_plus(ProductInfo.get_iothub_user_agent())},
-            data=json.dumps(sign_request),
-        )
+        requests = _import_requests()
+        # TODO: can we use json field instead of data?
+        r = self._request("post", self._sign_uri, data=json.dumps(sign_request))
         try:
             r.raise_for_status()
         except requests.exceptions.HTTPError as e:
@@ -65,6 +65,9 @@ class SymmetricKeyAuthenticationProvider(BaseRenewableTokenAuthenticationProvide
         self.shared_access_key_name = shared_access_key_name
         self.gateway_hostname = gateway_hostname
         self.server_verification_cert = None
+        # HMAC already keyed with the decoded shared_access_key, which signatures are made on copies of
+        self._signing_hmac = None
+        self._signing_hmac_key = None
 
     @staticmethod
     def parse(connection_string):
@@ -111,8 +114,12 @@ class SymmetricKeyAuthenticationProvider(BaseRenewableTokenAuthenticationProvide
         """
         try:
             message = (quoted_resource_uri + "\n" + str(expiry)).encode("utf-8")
-            signing_key = base64.b64decode(self.shared_access_key.encode("utf-8"))
-            signed_hmac = hmac.HMAC(signing_key, message, hashlib.sha256)
+            if self._signing_hmac_key != self.shared_access_key:
+                signing_key = base64.b64decode(self.shared_access_key.encode("utf-8"))
+                self._signing_hmac = hmac.HMAC(signing_key, digestmod=hashlib.sha256)
+                self._signing_hmac_key = self.shared_access_key
+            signed_hmac = self._signing_hmac.copy()
+            signed_hmac.update(message)
             signature = urllib.parse.quote(base64.b64encode(signed_hmac.digest()))
         except (TypeError, base64.binascii.Error):
             raise ValueError("Unable to build shared access signature from given values")
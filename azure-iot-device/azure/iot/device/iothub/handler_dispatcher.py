@@ -0,0 +1,91 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains a dispatcher which calls user handlers for received data on a pool of
+worker threads."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from azure.iot.device.common import handle_exceptions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class HandlerDispatcher(object):
+    """Calls handlers on a bounded pool of worker threads.
+
+    Each call is dispatched with a key (e.g. the name of an input). Calls with the same key are
+    made one at a time, in the order they were dispatched, while calls with different keys run
+    concurrently. A slow handler therefore only delays the data for its own key.
+
+    The calls waiting for a worker are held in an Inbox per key, so the maximum size and overflow
+    policy of that Inbox limit how many calls can pile up behind a slow handler.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        """Initializer for the HandlerDispatcher.
+
+        :param int max_workers: The maximum number of handlers running at the same time.
+
+        :raises: ValueError if max_workers is less than 1.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._max_workers = max_workers
+        self._pool = None
+        # key -> Inbox of the calls waiting for the calls before them with the same key.  A key is
+        # only present while a worker is assigned to it.
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    def dispatch(self, key, inbox, handler, *args):
+        """Call a handler on a worker thread, after the calls already dispatched with the same key.
+
+        This does not block.  Exceptions raised by the handler are logged.
+
+        :param key: The ordering key of the call.
+        :param inbox: The Inbox holding the calls with this key while they wait for a worker. The
+         same Inbox must be used for every call with the key.
+        :type inbox: :class:`azure.iot.device.iothub.sync_inbox.SyncClientInbox`
+        :param handler: The handler to call.
+        :param args: The arguments to call the handler with.
+
+        :returns: Boolean indicating if the call was dispatched (True), or dropped because the
+         Inbox is full (False).
+        """
+        with self._lock:
+            # Put the call in the inbox while holding the lock, so that a worker can't be done
+            # with the key in between
+            if not inbox._put((handler, args)):
+                return False
+            if key in self._queues:
+                # A worker is already running calls for this key, and will pick this one up
+                return True
+            self._queues[key] = inbox
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._max_workers)
+            pool = self._pool
+        pool.submit(self._run_next, key)
+        return True
+
+    def _run_next(self, key):
+        with self._lock:
+            handler, args = self._queues[key].get(block=False)
+        try:
+            handler(*args)
+        except Exception as e:
+            logger.error("Unexpected error in handler for {}".format(key))
+            handle_exceptions.handle_background_exception(e)
+        with self._lock:
+            if self._queues[key].empty():
+                del self._queues[key]
+                return
+            pool = self._pool
+        # Go to the back of the pool's queue rather than running the next call for this key
+        # right away, so that a busy key doesn't keep a worker from the other keys
+        pool.submit(self._run_next, key)
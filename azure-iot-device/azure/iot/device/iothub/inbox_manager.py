@@ -3,33 +3,112 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # --------------------------------------------------------------------------
-"""This module contains a manager for inboxes."""
+"""This module contains a manager for inboxes and handlers."""
 
 import logging
+from .pipeline import constant as pipeline_constant
 
 logger = logging.getLogger(__name__)
 
 
 class InboxManager(object):
-    """Manages the various Inboxes for a client.
+    """Manages the various Inboxes and handlers for a client.
+
+    Received data for which a handler is set is dispatched to the handler instead of being put in
+    an Inbox.  While it waits for the handler, the data is held in an Inbox of its own, which has
+    the same limits as the Inbox it would otherwise have been put in.
 
     :ivar c2d_message_inbox: The C2D message Inbox.
     :ivar input_message_inboxes: A dictionary mapping input names to input message Inboxes.
     :ivar generic_method_request_inbox: The generic method request Inbox.
     :ivar named_method_request_inboxes: A dictionary mapping method names to method request Inboxes.
+    :ivar on_feature_pause_changed: Handler called with the name of a feature when one of its
+     inboxes becomes full or has space again, and so receiving data for the feature may have to be
+     paused or resumed.  Use is_feature_pause_wanted for whether it should be paused.
+    :ivar c2d_message_handler: The handler for C2D messages.
+    :ivar input_message_handlers: A dictionary mapping input names to input message handlers.
+    :ivar generic_method_request_handler: The handler for method requests without a handler or
+     Inbox for their method name.
+    :ivar named_method_request_handlers: A dictionary mapping method names to method request
+     handlers.
+    :ivar twin_patch_handler: The handler for twin patches.
     """
 
-    def __init__(self, inbox_type):
+    def __init__(self, inbox_type, message_inbox_options=None, handler_dispatcher=None):
         """Initializer for the InboxManager.
 
         :param inbox_type: An Inbox class that the manager will use to create Inboxes.
+        :param message_inbox_options: Options limiting the size of the C2D message Inbox and of
+         each input message Inbox, and of the Inboxes holding C2D and input messages waiting for
+         their handler. If not provided, these Inboxes are unbounded.
+        :type message_inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param handler_dispatcher: The dispatcher used to call handlers. Required to set handlers.
+        :type handler_dispatcher: :class:`azure.iot.device.iothub.handler_dispatcher.HandlerDispatcher`
         """
         self._create_inbox = inbox_type
-        self.c2d_message_inbox = self._create_inbox()
+        self._handler_dispatcher = handler_dispatcher
+        self._message_inbox_options = message_inbox_options
+        self.on_feature_pause_changed = None
+        self.c2d_message_inbox = self._create_message_inbox(pipeline_constant.C2D_MSG)
         self.input_message_inboxes = {}
         self.generic_method_request_inbox = self._create_inbox()
         self.named_method_request_inboxes = {}
         self.twin_patch_inbox = self._create_inbox()
+        self.c2d_message_handler = None
+        self.input_message_handlers = {}
+        self.generic_method_request_handler = None
+        self.named_method_request_handlers = {}
+        self.twin_patch_handler = None
+        # dispatch key -> Inbox of the data waiting for the handler of that key
+        self._handler_inboxes = {}
+
+    def _create_message_inbox(self, feature_name):
+        """Create an Inbox for C2D or input messages, limited by the message inbox options"""
+        options = self._message_inbox_options
+        if not options:
+            return self._create_inbox()
+
+        inbox = self._create_inbox(
+            max_size=options.max_size,
+            overflow_policy=options.overflow_policy,
+            resume_size=options.resume_size,
+        )
+        inbox.on_full = lambda: self._on_inbox_full_changed(feature_name)
+        inbox.on_space_available = lambda: self._on_inbox_full_changed(feature_name)
+        return inbox
+
+    def _on_inbox_full_changed(self, feature_name):
+        if self.on_feature_pause_changed:
+            self.on_feature_pause_changed(feature_name)
+
+    def _dispatch(self, feature_name, key, handler, incoming_data):
+        """Dispatch received data to a handler, holding it in the Inbox for the key until then"""
+        inbox = self._handler_inboxes.get(key)
+        if inbox is None:
+            if feature_name in (pipeline_constant.C2D_MSG, pipeline_constant.INPUT_MSG):
+                inbox = self._create_message_inbox(feature_name)
+            else:
+                inbox = self._create_inbox()
+            self._handler_inboxes[key] = inbox
+        return self._handler_dispatcher.dispatch(key, inbox, handler, incoming_data)
+
+    def is_feature_pause_wanted(self, feature_name):
+        """Check if receiving data for a feature should be paused, because one of its inboxes is
+        full.
+
+        :param str feature_name: The name of the feature.
+        :returns: Boolean indicating if the feature should be paused.
+        """
+        if feature_name == pipeline_constant.C2D_MSG:
+            inboxes = [self.c2d_message_inbox]
+        elif feature_name == pipeline_constant.INPUT_MSG:
+            inboxes = list(self.input_message_inboxes.values())
+        else:
+            return False
+        for key, inbox in list(self._handler_inboxes.items()):
+            if key == feature_name or (isinstance(key, tuple) and key[0] == feature_name):
+                inboxes.append(inbox)
+        return any(inbox.full for inbox in inboxes)
 
     def get_input_message_inbox(self, input_name):
         """Retrieve the input message Inbox for a given input.
@@ -43,7 +122,7 @@ class InboxManager(object):
             inbox = self.input_message_inboxes[input_name]
         except KeyError:
             # Create new Inbox for input if it does not yet exist
-            inbox = self._create_inbox()
+            inbox = self._create_message_inbox(pipeline_constant.INPUT_MSG)
             self.input_message_inboxes[input_name] = inbox
 
         return inbox
@@ -101,13 +180,25 @@ class InboxManager(object):
 
         :returns: Boolean indicating if message was successfuly routed or not.
         """
+        handler = self.input_message_handlers.get(input_name)
+        if handler:
+            if not self._dispatch(
+                pipeline_constant.INPUT_MSG,
+                (pipeline_constant.INPUT_MSG, input_name),
+                handler,
+                incoming_message,
+            ):
+                return False
+            logger.debug("Input message dispatched to {} handler".format(input_name))
+            return True
         try:
             inbox = self.input_message_inboxes[input_name]
         except KeyError:
             logger.warning("No input message inbox for {} - dropping message".format(input_name))
             return False
         else:
-            inbox._put(incoming_message)
+            if not inbox._put(incoming_message):
+                return False
             logger.debug("Input message sent to {} inbox".format(input_name))
             return True
 
@@ -118,25 +209,45 @@ class InboxManager(object):
 
         :returns: Boolean indicating if message was successfully routed or not.
         """
-        self.c2d_message_inbox._put(incoming_message)
+        handler = self.c2d_message_handler
+        if handler:
+            if not self._dispatch(
+                pipeline_constant.C2D_MSG, pipeline_constant.C2D_MSG, handler, incoming_message
+            ):
+                return False
+            logger.debug("C2D message dispatched to handler")
+            return True
+        if not self.c2d_message_inbox._put(incoming_message):
+            return False
         logger.debug("C2D message sent to inbox")
         return True
 
     def route_method_request(self, incoming_method_request):
         """Route an incoming method request to the correct method request Inbox.
 
-        If the method name is recognized, it will be routed to a method-specific Inbox.
-        Otherwise, it will be routed to the generic method request Inbox.
+        If the method name is recognized, it will be routed to a method-specific handler or Inbox.
+        Otherwise, it will be routed to the generic method request handler if there is one, or to
+        the generic method request Inbox.
 
         :param incoming_method_request: The method request to be routed.
 
         :returns: Boolean indicating if the method request was successfully routed or not.
         """
-        try:
-            inbox = self.named_method_request_inboxes[incoming_method_request.name]
-        except KeyError:
+        method_name = incoming_method_request.name
+        handler = self.named_method_request_handlers.get(method_name)
+        inbox = self.named_method_request_inboxes.get(method_name)
+        if not handler and not inbox:
+            handler = self.generic_method_request_handler
             inbox = self.generic_method_request_inbox
-        inbox._put(incoming_method_request)
+        if handler:
+            self._dispatch(
+                pipeline_constant.METHODS,
+                (pipeline_constant.METHODS, method_name),
+                handler,
+                incoming_method_request,
+            )
+        else:
+            inbox._put(incoming_method_request)
         return True
 
     def route_twin_patch(self, incoming_patch):
@@ -146,6 +257,16 @@ class InboxManager(object):
 
         :returns: Boolean indicating if patch was successfully routed or not.
         """
+        handler = self.twin_patch_handler
+        if handler:
+            self._dispatch(
+                pipeline_constant.TWIN_PATCHES,
+                pipeline_constant.TWIN_PATCHES,
+                handler,
+                incoming_patch,
+            )
+            logger.debug("twin patch dispatched to handler")
+            return True
         self.twin_patch_inbox._put(incoming_patch)
         logger.debug("twin patch message sent to inbox")
         return True
@@ -5,3 +5,4 @@ This package provides object models for use within the Azure IoT Hub Device SDK.
 
 from .message import Message
 from .methods import MethodRequest, MethodResponse
+from .inbox_options import InboxOptions
@@ -0,0 +1,63 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains a class representing options for the inboxes which hold received messages.
+"""
+
+# Overflow policies
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+PAUSE = "pause"
+
+
+class InboxOptions(object):
+    """
+    A class containing options that limit how many received C2D messages or input messages are
+    held by the client while waiting for the application to receive them.  Each inbox (the C2D
+    message inbox, and the inbox of each input) is limited separately.  Messages waiting for a
+    message handler to be called are limited in the same way, separately for each handler.
+    """
+
+    def __init__(self, max_size, overflow_policy=DROP_OLDEST, resume_size=None):
+        """
+        Initializer for InboxOptions
+
+        :param int max_size: Maximum number of messages held by each inbox.
+        :param str overflow_policy: (optional) What to do with a message received while its inbox
+         is full. One of:
+         "drop_oldest" (default) to discard the oldest message in the inbox to make room for it,
+         "drop_newest" to discard the received message,
+         "pause" to stop receiving messages of that kind from the service (by unsubscribing)
+         until the application has received enough messages from the inbox. The service holds
+         on to the messages sent in the meantime. Messages that were already on their way when
+         the client paused are kept, so the inbox can briefly hold more than max_size messages.
+        :param int resume_size: (optional) For the "pause" policy, the number of messages the
+         inbox has to be down to before receiving messages resumes. Defaults to half of max_size.
+
+        :raises: ValueError if given an invalid max_size, overflow_policy or resume_size.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if overflow_policy not in (DROP_OLDEST, DROP_NEWEST, PAUSE):
+            raise ValueError("Invalid overflow_policy: {}".format(overflow_policy))
+        if resume_size is None:
+            resume_size = max_size // 2
+        elif not 0 <= resume_size < max_size:
+            raise ValueError("resume_size must be at least 0 and less than max_size")
+        self._max_size = max_size
+        self._overflow_policy = overflow_policy
+        self._resume_size = resume_size
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def overflow_policy(self):
+        return self._overflow_policy
+
+    @property
+    def resume_size(self):
+        return self._resume_size
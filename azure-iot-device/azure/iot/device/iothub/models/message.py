@@ -6,13 +6,88 @@
 """This module contains a class representing messages that are sent or received.
 """
 from azure.iot.device import constant
-import sys
+import codecs
+import six
+
+
+class _CustomProperties(dict):
+    """A dictionary which counts the changes made to it, so that a Message knows when the size
+    it has calculated for its custom properties is out of date.
+    """
+
+    __slots__ = ["version"]
+
+    def __init__(self, *args, **kwargs):
+        super(_CustomProperties, self).__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        super(_CustomProperties, self).__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super(_CustomProperties, self).__delitem__(key)
+        self.version += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super(_CustomProperties, self).clear()
+        self.version += 1
+
+    def pop(self, *args):
+        self.version += 1
+        return super(_CustomProperties, self).pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super(_CustomProperties, self).popitem()
+
+    def setdefault(self, key, default=None):
+        self.version += 1
+        return super(_CustomProperties, self).setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super(_CustomProperties, self).update(*args, **kwargs)
+        self.version += 1
+
+
+# Python < 3.7 has no str.isascii
+_is_ascii = getattr(six.text_type, "isascii", None)
+
+
+def _get_data_size(data):
+    """Return the number of bytes the data takes up on the wire"""
+    if data is None:
+        return 0
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if not isinstance(data, six.text_type):
+        data = str(data)
+    if _is_ascii and _is_ascii(data):
+        # Avoid encoding (and so copying) the data just to count the bytes
+        return len(data)
+    return len(data.encode("utf-8"))
+
+
+def _get_properties_size(message):
+    """Return the number of bytes the system and custom properties of the message take up on the
+    wire, when encoded on the topic it is sent to"""
+    # Imported here, as the pipeline package itself depends on this module
+    from azure.iot.device.iothub.pipeline import mqtt_topic_iothub
+
+    return len(mqtt_topic_iothub.encode_message_properties_in_topic(message, ""))
 
 
 class Message(object):
     """Represents a message to or from IoTHub
 
-    :ivar data: The data that constitutes the payload
+    :ivar data: The data that constitutes the payload. For received messages, this is the bytes
+     object read by the transport, which is never copied on its way to the client.
     :ivar custom_properties: Dictionary of custom message properties
     :ivar message id: A user-settable identifier for the message used for request-reply patterns. Format: A case-sensitive string (up to 128 characters long) of ASCII 7-bit alphanumeric characters + {'-', ':', '.', '+', '%', '_', '#', '*', '?', '!', '(', ')', ',', '=', '@', ';', '$', '''}
     :ivar expiry_time_utc: Date and time of message expiration in UTC format
@@ -23,6 +98,23 @@ class Message(object):
     :ivar output_name: Name of the output that the is being sent to.
     """
 
+    __slots__ = [
+        "data",
+        "_custom_properties",
+        "message_id",
+        "expiry_time_utc",
+        "correlation_id",
+        "user_id",
+        "content_encoding",
+        "content_type",
+        "output_name",
+        "_iothub_interface_id",
+        "_decoded_data",
+        "_decoded_data_key",
+        "_size",
+        "_size_key",
+    ]
+
     def __init__(
         self, data, message_id=None, content_encoding=None, content_type=None, output_name=None
     ):
@@ -36,7 +128,7 @@ class Message(object):
         :param str output_name: Name of the output that the is being sent to.
         """
         self.data = data
-        self.custom_properties = {}
+        self._custom_properties = _CustomProperties()
         self.message_id = message_id
         self.expiry_time_utc = None
         self.correlation_id = None
@@ -45,6 +137,53 @@ class Message(object):
         self.content_type = content_type
         self.output_name = output_name
         self._iothub_interface_id = None
+        self._decoded_data = None
+        self._decoded_data_key = None
+        self._size = None
+        self._size_key = None
+
+    @property
+    def custom_properties(self):
+        return self._custom_properties
+
+    @custom_properties.setter
+    def custom_properties(self, value):
+        # A dictionary set by the user is kept as is (rather than copied into a _CustomProperties)
+        # so that changes the user makes to it still apply, at the cost of not caching the size.
+        self._custom_properties = value
+
+    @property
+    def data_view(self):
+        """A memoryview of the data, for reading or slicing binary data without copying it.
+
+        :raises: TypeError if the data is not a bytes-like object.
+        """
+        return memoryview(self.data)
+
+    def decode_data(self):
+        """
+        Return the data decoded to a string according to content_encoding (utf-8 if not set).
+        Bytes data is only decoded the first time this is called.  Mutable data (a bytearray or
+        memoryview) can change in place, so it is decoded on every call.  Data which is already
+        a string is returned as is.
+
+        :raises: UnicodeDecodeError if the data is not valid for the content encoding.
+        :raises: LookupError if the content encoding is not a known encoding.
+
+        :returns: The decoded data.
+        :rtype: str
+        """
+        if isinstance(self.data, (bytearray, memoryview)):
+            return codecs.decode(self.data, self.content_encoding or "utf-8")
+        key = (self.data, self.content_encoding)
+        if self._decoded_data_key is None or key != self._decoded_data_key:
+            if isinstance(self.data, bytes):
+                encoding = self.content_encoding or "utf-8"
+                self._decoded_data = codecs.decode(self.data, encoding)
+            else:
+                self._decoded_data = self.data
+            self._decoded_data_key = key
+        return self._decoded_data
 
     @property
     def iothub_interface_id(self):
@@ -62,14 +201,41 @@ class Message(object):
         return str(self.data)
 
     def get_size(self):
-        total = 0
-        total = total + sum(
-            sys.getsizeof(v)
-            for v in self.__dict__.values()
-            if v is not None and v is not self.custom_properties
+        """
+        Return the size of the message on the wire: the size of its data (encoded as utf-8 if it
+        is a string) plus the size of its system and custom properties, as encoded on the topic
+        the message is sent to. The size is calculated once, and then only again after the
+        message has been changed.
+
+        :raises: ValueError if the custom properties contain duplicate keys once converted to
+         strings.
+
+        :returns: The size of the message, in bytes.
+        :rtype: int
+        """
+        # Rather than having every field setter invalidate the cached size, the fields the size
+        # was calculated from are kept and compared.  This is cheap, since unchanged fields are
+        # the very same objects.  Mutable data (a bytearray or memoryview) can be changed in
+        # place, so its current size is compared instead of the object.
+        custom_properties = self._custom_properties
+        version = getattr(custom_properties, "version", None)
+        data = self.data
+        if isinstance(data, (bytearray, memoryview)):
+            data = (type(data), _get_data_size(data))
+        key = (
+            data,
+            self.message_id,
+            self.expiry_time_utc,
+            self.correlation_id,
+            self.user_id,
+            self.content_encoding,
+            self.content_type,
+            self.output_name,
+            self._iothub_interface_id,
+            custom_properties,
+            version,
         )
-        if self.custom_properties:
-            total = total + sum(
-                sys.getsizeof(v) for v in self.custom_properties.values() if v is not None
-            )
-        return total
+        if version is None or key != self._size_key:
+            self._size = _get_data_size(self.data) + _get_properties_size(self)
+            self._size_key = key
+        return self._size
@@ -11,6 +11,7 @@ from azure.iot.device.common.pipeline import (
     pipeline_stages_base,
     pipeline_ops_base,
     pipeline_stages_mqtt,
+    pipeline_thread,
 )
 from . import (
     constant,
@@ -40,6 +41,9 @@ class MQTTPipeline(object):
             constant.TWIN_PATCHES: False,
         }
 
+        # Features which are paused because an inbox is full.  Only used on the pipeline thread.
+        self._feature_paused = {constant.C2D_MSG: False, constant.INPUT_MSG: False}
+
         # Event Handlers - Will be set by Client after instantiation of this object
         self.on_connected = None
         self.on_disconnected = None
@@ -84,6 +88,13 @@ class MQTTPipeline(object):
             #
             .append_stage(pipeline_stages_iothub_mqtt.IoTHubMQTTTranslationStage())
             #
+            # StoreAndForwardStage comes after IoTHubMQTTTranslationStage because it stores the
+            # MQTT publishes which that stage produces for telemetry, and before AutoConnectStage
+            # because publishes which are stored while disconnected should not trigger a connection
+            # for each of them.
+            #
+            .append_stage(pipeline_stages_base.StoreAndForwardStage())
+            #
             # AutoConnectStage comes here because only MQTT ops have the need_connection flag set
             # and this is the first place in the pipeline wherer we can guaranetee that all network
             # ops are MQTT ops.
@@ -387,6 +398,58 @@ class MQTTPipeline(object):
             )
         )
 
+    def update_feature_pause(self, feature_name, is_pause_wanted, callback):
+        """
+        Pause or resume receiving data for the given feature, so that it matches what
+        is_pause_wanted returns.  Pausing unsubscribes from the appropriate topics without marking
+        the feature as disabled.  Resuming subscribes to them again, unless the feature has been
+        disabled since.
+
+        is_pause_wanted is called on the pipeline thread, which is also where the decision to pause
+        or resume is made.  This way, updates requested from different threads can't reach the
+        pipeline out of order and leave the feature paused when it shouldn't be (or vice versa).
+
+        :param feature_name: one of the feature name constants from constant.py which can be
+         paused (C2D_MSG or INPUT_MSG)
+        :param is_pause_wanted: function which returns True if the feature should be paused
+        :param callback: callback which is called when the feature is paused or resumed, or right
+         away if it already is
+
+        :raises: ValueError if feature_name is invalid
+        """
+        logger.debug("update_feature_pause {} called".format(feature_name))
+        if feature_name not in self._feature_paused:
+            raise ValueError("Invalid feature_name")
+
+        def on_complete(op, error):
+            callback(error=error)
+
+        def settle_feature_pause():
+            pause = bool(is_pause_wanted())
+            if pause == self._feature_paused[feature_name]:
+                callback(error=None)
+                return
+            self._feature_paused[feature_name] = pause
+            if pause:
+                logger.info("Pausing {}".format(feature_name))
+                op = pipeline_ops_base.DisableFeatureOperation(
+                    feature_name=feature_name, callback=on_complete
+                )
+            elif self.feature_enabled[feature_name]:
+                logger.info("Resuming {}".format(feature_name))
+                op = pipeline_ops_base.EnableFeatureOperation(
+                    feature_name=feature_name, callback=on_complete
+                )
+            else:
+                logger.debug("{} is not enabled.  Not resuming".format(feature_name))
+                callback(error=None)
+                return
+            self._pipeline.run_op(op)
+
+        pipeline_thread.invoke_on_pipeline_thread_nowait(
+            settle_feature_pause, group=self._pipeline.executor_group
+        )()
+
     @property
     def connected(self):
         """
@@ -7,7 +7,6 @@
 import logging
 from datetime import date
 import six.moves.urllib as urllib
-from azure.iot.device.common import version_compat
 
 logger = logging.getLogger(__name__)
 
@@ -276,36 +275,247 @@ def extract_message_properties_from_topic(topic, message_received):
     else:
         raise ValueError("topic has incorrect format")
 
-    # We do not want to extract values corresponding to these keys
-    ignored_extraction_values = ["iothub-ack", "$.to"]
+    if properties:
+        _set_message_properties(message_received, _decode_message_properties(properties))
+
 
+def _decode_message_properties(properties_str):
+    """Return a dictionary of the url-decoded keys and values of a message properties string in
+    the format {key1}={value1}&{key2}={value2}...&{keyn}={valuen}
+    """
     # NOTE: we cannot use urllib.parse.parse_qs because it always decodes '+' as ' ',
     # and the behavior cannot be overriden. Must parse key/value pairs manually.
+    properties = {}
+    for entry in properties_str.split("&"):
+        pair = entry.split("=")
+        properties[urllib.parse.unquote(pair[0])] = urllib.parse.unquote(pair[1])
+    return properties
+
+
+# We do not want to extract values corresponding to these keys
+_IGNORED_MESSAGE_PROPERTIES = ("iothub-ack", "$.to")
+
+
+def _set_message_properties(message_received, properties):
+    for key, value in properties.items():
+        if key in _IGNORED_MESSAGE_PROPERTIES:
+            continue
+        elif key == "$.mid":
+            message_received.message_id = value
+        elif key == "$.cid":
+            message_received.correlation_id = value
+        elif key == "$.uid":
+            message_received.user_id = value
+        elif key == "$.ct":
+            message_received.content_type = value
+        elif key == "$.ce":
+            message_received.content_encoding = value
+        elif key == "$.exp":
+            message_received.expiry_time_utc = value
+        else:
+            message_received.custom_properties[key] = value
 
-    if properties:
-        key_value_pairs = properties.split("&")
-
-        for entry in key_value_pairs:
-            pair = entry.split("=")
-            key = urllib.parse.unquote(pair[0])
-            value = urllib.parse.unquote(pair[1])
-
-            if key in ignored_extraction_values:
-                continue
-            elif key == "$.mid":
-                message_received.message_id = value
-            elif key == "$.cid":
-                message_received.correlation_id = value
-            elif key == "$.uid":
-                message_received.user_id = value
-            elif key == "$.ct":
-                message_received.content_type = value
-            elif key == "$.ce":
-                message_received.content_encoding = value
-            elif key == "$.exp":
-                message_received.expiry_time_utc = value
+
+# Kinds of topics that messages are received on
+C2D_TOPIC = "c2d"
+INPUT_TOPIC = "input"
+METHOD_TOPIC = "method"
+TWIN_RESPONSE_TOPIC = "twin_response"
+TWIN_PATCH_TOPIC = "twin_patch"
+UNKNOWN_TOPIC = "unknown"
+
+_IOTHUB_TOPIC_PREFIX = "$iothub/"
+_METHOD_TOPIC_PREFIX = "$iothub/methods/POST/"
+_TWIN_RESPONSE_TOPIC_PREFIX = "$iothub/twin/res/"
+_TWIN_PATCH_TOPIC_PREFIX = "$iothub/twin/PATCH/properties/desired"
+
+
+class IncomingTopic(object):
+    """
+    The result of parsing the topic of a received message.  Only the attributes which apply to
+    the kind of topic are set, the others are None.
+
+    :ivar str kind: The kind of topic, e.g. C2D_TOPIC or UNKNOWN_TOPIC.
+    :ivar str input_name: The input name of an input message topic.
+    :ivar str method_name: The method name of a method request topic.
+    :ivar str request_id: The request id of a method request or twin response topic.
+    :ivar int status_code: The status code of a twin response topic.
+    """
+
+    def __init__(
+        self,
+        kind,
+        properties_str=None,
+        input_name=None,
+        method_name=None,
+        request_id=None,
+        status_code=None,
+    ):
+        self.kind = kind
+        self.input_name = input_name
+        self.method_name = method_name
+        self.request_id = request_id
+        self.status_code = status_code
+        self._properties_str = properties_str
+        self._properties = None
+
+    @property
+    def properties(self):
+        """
+        A dictionary of the url-decoded message properties of a C2D or input message topic.  The
+        properties are only decoded when first accessed.
+        """
+        if self._properties is None:
+            if self._properties_str:
+                self._properties = _decode_message_properties(self._properties_str)
             else:
-                message_received.custom_properties[key] = value
+                self._properties = {}
+        return self._properties
+
+    def set_message_properties(self, message_received):
+        """
+        Set the message properties of a C2D or input message topic on the received message.
+        :param message_received: The message received with the payload in bytes
+        """
+        if self._properties_str:
+            _set_message_properties(message_received, self.properties)
+
+
+class IncomingTopicParser(object):
+    """
+    Classifies and parses the topics of messages received by a device or module in a single pass
+    over the topic string.  The device and module specific topic prefixes are encoded once, when
+    the parser is created.
+    """
+
+    def __init__(self, device_id=None, module_id=None):
+        """
+        :param str device_id: The device id of the client. If not provided, C2D and input message
+         topics are not recognized.
+        :param str module_id: The module id of the client. If not provided, input message topics
+         are not recognized.
+        """
+        if device_id:
+            self._c2d_prefix = _get_topic_base(device_id) + "/messages/devicebound"
+        else:
+            self._c2d_prefix = None
+        if device_id and module_id:
+            self._input_prefix = _get_topic_base(device_id, module_id) + "/inputs/"
+        else:
+            self._input_prefix = None
+
+    def parse(self, topic):
+        """
+        Classify the topic of a received message and extract the information it carries.
+
+        :param str topic: The topic string
+        :returns: An IncomingTopic. Topics which are not meant for this client are UNKNOWN_TOPIC.
+        :raises: ValueError or IndexError if a method request or twin response topic has an
+         incorrect format
+        """
+        if topic.startswith(_IOTHUB_TOPIC_PREFIX):
+            if topic.startswith(_METHOD_TOPIC_PREFIX):
+                method_name, request_id = _parse_request_topic(topic, _METHOD_TOPIC_PREFIX)
+                return IncomingTopic(METHOD_TOPIC, method_name=method_name, request_id=request_id)
+            elif topic.startswith(_TWIN_RESPONSE_TOPIC_PREFIX):
+                status_code, request_id = _parse_request_topic(topic, _TWIN_RESPONSE_TOPIC_PREFIX)
+                return IncomingTopic(
+                    TWIN_RESPONSE_TOPIC, request_id=request_id, status_code=int(status_code)
+                )
+            elif topic.startswith(_TWIN_PATCH_TOPIC_PREFIX):
+                return IncomingTopic(TWIN_PATCH_TOPIC)
+
+        elif self._c2d_prefix and topic.startswith(self._c2d_prefix):
+            # devices/<deviceId>/messages/devicebound/<properties>
+            remainder = topic[len(self._c2d_prefix) :]
+            if not remainder:
+                return IncomingTopic(C2D_TOPIC)
+            elif remainder[0] == "/":
+                return IncomingTopic(C2D_TOPIC, properties_str=remainder[1:].split("/", 1)[0])
+
+        elif self._input_prefix and topic.startswith(self._input_prefix):
+            # devices/<deviceId>/modules/<moduleId>/inputs/<inputName>/<properties>
+            segments = topic[len(self._input_prefix) :].split("/", 2)
+            return IncomingTopic(
+                INPUT_TOPIC,
+                properties_str=segments[1] if len(segments) > 1 else None,
+                input_name=urllib.parse.unquote(segments[0]),
+            )
+
+        return IncomingTopic(UNKNOWN_TOPIC)
+
+
+def _parse_request_topic(topic, prefix):
+    """Return the url-decoded path segment following the prefix, and the request id, of a topic
+    in the format <prefix><segment>/?$rid=<requestId>
+    """
+    segment = topic[len(prefix) :].split("/", 1)[0]
+    properties = _extract_properties(topic.split("?")[1])
+    return urllib.parse.unquote(segment), properties["rid"]
+
+
+# Maximum number of entries kept by each of the caches used when encoding message properties
+ENCODING_CACHE_SIZE = 1024
+
+
+class _EncodingCache(object):
+    """
+    A bounded memo of string -> encoded string.  Telemetry tends to repeat the same property
+    values message after message, so the work of encoding them only needs to be done once.
+    The cache is simply emptied when it reaches its maximum size, which keeps it bounded
+    without the bookkeeping an LRU would need on every lookup.
+    """
+
+    def __init__(self, encode, max_size=ENCODING_CACHE_SIZE):
+        self._encode = encode
+        self._max_size = max_size
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, value):
+        encoded = self._cache.get(value)
+        if encoded is None:
+            encoded = self._encode(value)
+            if len(self._cache) >= self._max_size:
+                self._cache.clear()
+            self._cache[value] = encoded
+        return encoded
+
+
+def _quote(value):
+    return urllib.parse.quote(value, safe="")
+
+
+def _get_custom_property_layout(keys):
+    """
+    Return the order in which the custom properties with the given (string converted) keys are
+    encoded, as a list of (index of the key, encoded "<key>=" prefix) sorted by key.
+    """
+    if len(keys) != len(set(keys)):
+        raise ValueError("Duplicate keys in custom properties!")
+    return [(i, _quote(keys[i]) + "=") for i in sorted(range(len(keys)), key=keys.__getitem__)]
+
+
+# Each system property is encoded as a fixed, pre-encoded "<key>=" prefix followed by its value.
+# Properties which are usually the same for every message sent by a client have their entire
+# "<key>=<value>" pair cached, while properties which are unique per message (e.g. the message
+# id) are encoded every time so they don't flush the cache.
+_OUTPUT_NAME_PREFIX = _quote("$.on") + "="
+_MESSAGE_ID_PREFIX = _quote("$.mid") + "="
+_CORRELATION_ID_PREFIX = _quote("$.cid") + "="
+_USER_ID_PREFIX = _quote("$.uid") + "="
+_CONTENT_TYPE_PREFIX = _quote("$.ct") + "="
+_CONTENT_ENCODING_PREFIX = _quote("$.ce") + "="
+_INTERFACE_ID_PREFIX = _quote("$.ifid") + "="
+_EXPIRY_PREFIX = _quote("$.exp") + "="
+
+_system_property_cache = _EncodingCache(
+    lambda prefix_and_value: prefix_and_value[0] + _quote(prefix_and_value[1])
+)
+_custom_property_layout_cache = _EncodingCache(_get_custom_property_layout)
+_custom_property_value_cache = _EncodingCache(_quote)
 
 
 def encode_message_properties_in_topic(message_to_send, topic):
@@ -320,65 +530,62 @@ def encode_message_properties_in_topic(message_to_send, topic):
     "devices/<deviceId>/modules/<moduleId>/messages/events/
     :return: The topic which has been uri-encoded
     """
-    system_properties = []
+    encoded_properties = []
     if message_to_send.output_name:
-        system_properties.append(("$.on", str(message_to_send.output_name)))
+        encoded_properties.append(
+            _system_property_cache.get((_OUTPUT_NAME_PREFIX, str(message_to_send.output_name)))
+        )
+
     if message_to_send.message_id:
-        system_properties.append(("$.mid", str(message_to_send.message_id)))
+        encoded_properties.append(_MESSAGE_ID_PREFIX + _quote(str(message_to_send.message_id)))
 
     if message_to_send.correlation_id:
-        system_properties.append(("$.cid", str(message_to_send.correlation_id)))
+        encoded_properties.append(
+            _CORRELATION_ID_PREFIX + _quote(str(message_to_send.correlation_id))
+        )
 
     if message_to_send.user_id:
-        system_properties.append(("$.uid", str(message_to_send.user_id)))
+        encoded_properties.append(
+            _system_property_cache.get((_USER_ID_PREFIX, str(message_to_send.user_id)))
+        )
 
     if message_to_send.content_type:
-        system_properties.append(("$.ct", str(message_to_send.content_type)))
+        encoded_properties.append(
+            _system_property_cache.get((_CONTENT_TYPE_PREFIX, str(message_to_send.content_type)))
+        )
 
     if message_to_send.content_encoding:
-        system_properties.append(("$.ce", str(message_to_send.content_encoding)))
-
-    if message_to_send.iothub_interface_id:
-        system_properties.append(("$.ifid", str(message_to_send.iothub_interface_id)))
-
-    if message_to_send.expiry_time_utc:
-        system_properties.append(
-            (
-                "$.exp",
-                message_to_send.expiry_time_utc.isoformat()  # returns string
-                if isinstance(message_to_send.expiry_time_utc, date)
-                else message_to_send.expiry_time_utc,
+        encoded_properties.append(
+            _system_property_cache.get(
+                (_CONTENT_ENCODING_PREFIX, str(message_to_send.content_encoding))
             )
         )
 
-    system_properties_encoded = version_compat.urlencode(
-        system_properties, quote_via=urllib.parse.quote
-    )
-    topic += system_properties_encoded
-
-    if message_to_send.custom_properties and len(message_to_send.custom_properties) > 0:
-        if system_properties and len(system_properties) > 0:
-            topic += "&"
-
-        # Convert the custom properties to a sorted list in order to ensure the
-        # resulting ordering in the topic string is consistent across versions of Python.
-        # Convert to the properties to strings for safety.
-        custom_prop_seq = [
-            (str(i[0]), str(i[1])) for i in list(message_to_send.custom_properties.items())
-        ]
-        custom_prop_seq.sort()
-
-        # Validate that string conversion has not created duplicate keys
-        keys = [i[0] for i in custom_prop_seq]
-        if len(keys) != len(set(keys)):
-            raise ValueError("Duplicate keys in custom properties!")
-
-        user_properties_encoded = version_compat.urlencode(
-            custom_prop_seq, quote_via=urllib.parse.quote
+    if message_to_send.iothub_interface_id:
+        encoded_properties.append(
+            _system_property_cache.get(
+                (_INTERFACE_ID_PREFIX, str(message_to_send.iothub_interface_id))
+            )
         )
-        topic += user_properties_encoded
 
-    return topic
+    if message_to_send.expiry_time_utc:
+        expiry_time_utc = message_to_send.expiry_time_utc
+        if isinstance(expiry_time_utc, date):
+            expiry_time_utc = expiry_time_utc.isoformat()
+        encoded_properties.append(_EXPIRY_PREFIX + _quote(expiry_time_utc))
+
+    if message_to_send.custom_properties:
+        # Convert the properties to strings for safety.  The keys are then encoded in sorted order
+        # to ensure the resulting ordering in the topic string is consistent across versions of
+        # Python.  Clients normally send the same set of keys with every message, so the sorted,
+        # encoded keys are cached by the set of keys and only the values have to be looked up.
+        custom_properties = message_to_send.custom_properties
+        keys = tuple(str(key) for key in custom_properties)
+        values = [str(value) for value in custom_properties.values()]
+        for index, encoded_key in _custom_property_layout_cache.get(keys):
+            encoded_properties.append(encoded_key + _custom_property_value_cache.get(values[index]))
+
+    return topic + "&".join(encoded_properties)
 
 
 def _extract_properties(properties_str):
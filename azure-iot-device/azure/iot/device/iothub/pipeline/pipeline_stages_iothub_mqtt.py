@@ -37,6 +37,7 @@ class IoTHubMQTTTranslationStage(PipelineStage):
         self.feature_to_topic = {}
         self.device_id = None
         self.module_id = None
+        self.topic_parser = mqtt_topic_iothub.IncomingTopicParser()
 
     @pipeline_thread.runs_on_pipeline_thread
     def _run_op(self, op):
@@ -139,6 +140,7 @@ class IoTHubMQTTTranslationStage(PipelineStage):
                 worker_op_type=pipeline_ops_mqtt.MQTTPublishOperation,
                 topic=topic,
                 payload=op.message.data,
+                durable=True,
             )
             self.send_op_down(worker_op)
 
@@ -199,6 +201,7 @@ class IoTHubMQTTTranslationStage(PipelineStage):
         self.telemetry_topic = mqtt_topic_iothub.get_telemetry_topic_for_publish(
             device_id, module_id
         )
+        self.topic_parser = mqtt_topic_iothub.IncomingTopicParser(device_id, module_id)
         self.feature_to_topic = {
             pipeline_constant.C2D_MSG: (mqtt_topic_iothub.get_c2d_topic_for_subscribe(device_id)),
             pipeline_constant.INPUT_MSG: (
@@ -219,38 +222,38 @@ class IoTHubMQTTTranslationStage(PipelineStage):
         """
         if isinstance(event, pipeline_events_mqtt.IncomingMQTTMessageEvent):
             topic = event.topic
+            parsed_topic = self.topic_parser.parse(topic)
 
-            if mqtt_topic_iothub.is_c2d_topic(topic, self.device_id):
+            if parsed_topic.kind == mqtt_topic_iothub.C2D_TOPIC:
                 message = Message(event.payload)
-                mqtt_topic_iothub.extract_message_properties_from_topic(topic, message)
+                parsed_topic.set_message_properties(message)
                 self.send_event_up(pipeline_events_iothub.C2DMessageEvent(message))
 
-            elif mqtt_topic_iothub.is_input_topic(topic, self.device_id, self.module_id):
+            elif parsed_topic.kind == mqtt_topic_iothub.INPUT_TOPIC:
                 message = Message(event.payload)
-                mqtt_topic_iothub.extract_message_properties_from_topic(topic, message)
-                input_name = mqtt_topic_iothub.get_input_name_from_topic(topic)
-                self.send_event_up(pipeline_events_iothub.InputMessageEvent(input_name, message))
+                parsed_topic.set_message_properties(message)
+                self.send_event_up(
+                    pipeline_events_iothub.InputMessageEvent(parsed_topic.input_name, message)
+                )
 
-            elif mqtt_topic_iothub.is_method_topic(topic):
-                request_id = mqtt_topic_iothub.get_method_request_id_from_topic(topic)
-                method_name = mqtt_topic_iothub.get_method_name_from_topic(topic)
+            elif parsed_topic.kind == mqtt_topic_iothub.METHOD_TOPIC:
                 method_received = MethodRequest(
-                    request_id=request_id,
-                    name=method_name,
+                    request_id=parsed_topic.request_id,
+                    name=parsed_topic.method_name,
                     payload=json.loads(event.payload.decode("utf-8")),
                 )
                 self.send_event_up(pipeline_events_iothub.MethodRequestEvent(method_received))
 
-            elif mqtt_topic_iothub.is_twin_response_topic(topic):
-                request_id = mqtt_topic_iothub.get_twin_request_id_from_topic(topic)
-                status_code = int(mqtt_topic_iothub.get_twin_status_code_from_topic(topic))
+            elif parsed_topic.kind == mqtt_topic_iothub.TWIN_RESPONSE_TOPIC:
                 self.send_event_up(
                     pipeline_events_base.ResponseEvent(
-                        request_id=request_id, status_code=status_code, response_body=event.payload
+                        request_id=parsed_topic.request_id,
+                        status_code=parsed_topic.status_code,
+                        response_body=event.payload,
                     )
                 )
 
-            elif mqtt_topic_iothub.is_twin_desired_property_patch_topic(topic):
+            elif parsed_topic.kind == mqtt_topic_iothub.TWIN_PATCH_TOPIC:
                 self.send_event_up(
                     pipeline_events_iothub.TwinDesiredPropertiesPatchEvent(
                         patch=json.loads(event.payload.decode("utf-8"))
@@ -8,6 +8,8 @@ Azure IoTHub Device SDK for Python.
 """
 
 import logging
+import threading
+from concurrent.futures import Future
 from .abstract_clients import (
     AbstractIoTHubClient,
     AbstractIoTHubDeviceClient,
@@ -15,6 +17,7 @@ from .abstract_clients import (
 )
 from .models import Message
 from .inbox_manager import InboxManager
+from .handler_dispatcher import HandlerDispatcher, DEFAULT_MAX_WORKERS
 from .sync_inbox import SyncClientInbox, InboxEmpty
 from .pipeline import constant as pipeline_constant
 from .pipeline import exceptions as pipeline_exceptions
@@ -50,6 +53,31 @@ def handle_result(callback):
         raise exceptions.ClientError(message="Unexpected failure", cause=e)
 
 
+def create_future_callback(return_arg_name=None):
+    """Create a Future along with a pipeline callback that completes it.
+
+    The Future is resolved with the callback's result, or with the same client error that
+    handle_result would raise. It is already marked as running, so it cannot be cancelled.
+
+    :returns: A tuple of (future, callback)
+    """
+    future = Future()
+    future.set_running_or_notify_cancel()
+    evented_callback = EventedCallback(return_arg_name=return_arg_name)
+
+    def on_complete(*args, **kwargs):
+        evented_callback(*args, **kwargs)
+        try:
+            # The completion event has already been set, so this does not block
+            result = handle_result(evented_callback)
+        except exceptions.ClientError as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+    return future, on_complete
+
+
 class GenericIoTHubClient(AbstractIoTHubClient):
     """A superclass representing a generic synchronous client.
     This class needs to be extended for specific clients.
@@ -71,7 +99,18 @@ class GenericIoTHubClient(AbstractIoTHubClient):
         # in the class hierarchies of different clients. Thus, args here must be passed along as
         # **kwargs.
         super(GenericIoTHubClient, self).__init__(**kwargs)
-        self._inbox_manager = InboxManager(inbox_type=SyncClientInbox)
+        handler_max_workers = self._handler_max_workers
+        if handler_max_workers is None:
+            handler_max_workers = DEFAULT_MAX_WORKERS
+        self._handler_dispatcher = HandlerDispatcher(max_workers=handler_max_workers)
+        self._inbox_manager = InboxManager(
+            inbox_type=SyncClientInbox,
+            message_inbox_options=self._inbox_options,
+            handler_dispatcher=self._handler_dispatcher,
+        )
+        self._inbox_manager.on_feature_pause_changed = CallableWeakMethod(
+            self, "_on_feature_pause_changed"
+        )
         self._mqtt_pipeline.on_connected = CallableWeakMethod(self, "_on_connected")
         self._mqtt_pipeline.on_disconnected = CallableWeakMethod(self, "_on_disconnected")
         self._mqtt_pipeline.on_method_request_received = CallableWeakMethod(
@@ -91,6 +130,21 @@ class GenericIoTHubClient(AbstractIoTHubClient):
         self._inbox_manager.clear_all_method_requests()
         logger.info("Cleared all pending method requests due to disconnect")
 
+    def _on_feature_pause_changed(self, feature_name):
+        """Helper handler that is called when receiving data for a feature may have to be paused
+        or resumed, because one of its inboxes has become full or has space again"""
+        inbox_manager = self._inbox_manager
+
+        def on_complete(error=None):
+            if error:
+                logger.error("Pausing or resuming {} failed: {}".format(feature_name, error))
+
+        self._mqtt_pipeline.update_feature_pause(
+            feature_name,
+            is_pause_wanted=lambda: inbox_manager.is_feature_pause_wanted(feature_name),
+            callback=on_complete,
+        )
+
     def connect(self):
         """Connects the client to an Azure IoT Hub or Azure IoT Edge Hub instance.
 
@@ -171,6 +225,109 @@ class GenericIoTHubClient(AbstractIoTHubClient):
 
         logger.info("Successfully sent message to Hub")
 
+    def begin_send_message(self, message):
+        """Starts sending a message to the default events endpoint on the Azure IoT Hub or Azure IoT Edge Hub instance.
+
+        This function returns as soon as the message has been handed to the pipeline, without
+        waiting for the service to acknowledge it. The returned Future is completed once the
+        acknowledgement is received or the send fails.
+
+        If the connection to the service has not previously been opened by a call to connect, this
+        function will open the connection before sending the event.
+
+        :param message: The actual message to send. Anything passed that is not an instance of the
+            Message class will be converted to Message object.
+        :type message: :class:`azure.iot.device.Message` or str
+
+        :returns: A Future whose result is None once the message is sent. On failure, the Future
+            holds the same :class:`azure.iot.device.exceptions.ClientError` that send_message
+            would raise. Callbacks added to the Future run on a client thread and should not block.
+        :rtype: :class:`concurrent.futures.Future`
+
+        :raises: ValueError if the message fails size validation.
+        """
+        if not isinstance(message, Message):
+            message = Message(message)
+
+        if message.get_size() > device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
+            raise ValueError("Size of telemetry message can not exceed 256 KB.")
+
+        logger.info("Starting to send message to Hub...")
+
+        future, callback = create_future_callback()
+        self._mqtt_pipeline.send_message(message, callback=callback)
+        return future
+
+    def send_message_batch(
+        self, messages, max_in_flight=device_constant.DEFAULT_MAX_IN_FLIGHT_MESSAGES
+    ):
+        """Sends multiple messages to the default events endpoint on the Azure IoT Hub or Azure IoT Edge Hub instance.
+
+        Unlike send_message, this function does not wait for each message to be acknowledged by
+        the service before sending the next one. Up to max_in_flight messages are sent without
+        acknowledgement, and this function returns once every message has either been
+        acknowledged or has failed.
+
+        If the connection to the service has not previously been opened by a call to connect, this
+        function will open the connection before sending the events.
+
+        :param messages: The messages to send. Any item that is not an instance of the Message
+            class will be converted to Message object.
+        :type messages: iterable of :class:`azure.iot.device.Message` or str
+        :param int max_in_flight: The maximum number of messages that can be awaiting
+            acknowledgement from the service at any one time. Default is 20.
+
+        :returns: A list with one entry per message, in the order the messages were given. The
+            entry is None if the message was sent successfully, or the
+            :class:`azure.iot.device.exceptions.ClientError` that caused it to fail.
+        :rtype: list
+
+        :raises: ValueError if any message fails size validation. No messages are sent if this
+            is raised.
+        :raises: ValueError if max_in_flight is less than 1.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        validated_messages = []
+        for message in messages:
+            if not isinstance(message, Message):
+                message = Message(message)
+            if message.get_size() > device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
+                raise ValueError("Size of telemetry message can not exceed 256 KB.")
+            validated_messages.append(message)
+
+        logger.info("Sending batch of {} messages to Hub...".format(len(validated_messages)))
+
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+        callbacks = []
+        for message in validated_messages:
+            in_flight.acquire()
+            callback = EventedCallback()
+            callbacks.append(callback)
+
+            def on_complete(error=None, callback=callback):
+                callback(error=error)
+                in_flight.release()
+
+            self._mqtt_pipeline.send_message(message, callback=on_complete)
+
+        results = []
+        for callback in callbacks:
+            try:
+                handle_result(callback)
+            except exceptions.ClientError as e:
+                results.append(e)
+            else:
+                results.append(None)
+
+        logger.info(
+            "Finished sending batch to Hub: {} of {} messages succeeded".format(
+                results.count(None), len(results)
+            )
+        )
+        return results
+
     def receive_method_request(self, method_name=None, block=True, timeout=None):
         """Receive a method request via the Azure IoT Hub or Azure IoT Edge Hub.
 
@@ -196,6 +353,28 @@ class GenericIoTHubClient(AbstractIoTHubClient):
         logger.info("Received method request")
         return method_request
 
+    def set_method_request_handler(self, handler, method_name=None):
+        """Set a handler called with each method request received via the Azure IoT Hub or Azure
+        IoT Edge Hub, instead of receiving them with receive_method_request.
+
+        The handler is called on a worker thread of the client, one request at a time for each
+        method name. It should respond to the request with send_method_response.
+
+        :param handler: Function called with the MethodRequest, or None to remove the handler.
+        :param str method_name: Optionally provide the name of the method to handle requests for.
+            If this parameter is not given, the handler is called for all methods without a
+            specific handler or pending call to receive_method_request.
+        """
+        if method_name:
+            if handler:
+                self._inbox_manager.named_method_request_handlers[method_name] = handler
+            else:
+                self._inbox_manager.named_method_request_handlers.pop(method_name, None)
+        else:
+            self._inbox_manager.generic_method_request_handler = handler
+        if handler and not self._mqtt_pipeline.feature_enabled[pipeline_constant.METHODS]:
+            self._enable_feature(pipeline_constant.METHODS)
+
     def send_method_response(self, method_response):
         """Send a response to a method request via the Azure IoT Hub or Azure IoT Edge Hub.
 
@@ -225,6 +404,31 @@ class GenericIoTHubClient(AbstractIoTHubClient):
 
         logger.info("Successfully sent method response to Hub")
 
+    def begin_send_method_response(self, method_response):
+        """Starts sending a response to a method request via the Azure IoT Hub or Azure IoT Edge Hub.
+
+        This function returns as soon as the response has been handed to the pipeline, without
+        waiting for the service to acknowledge it. The returned Future is completed once the
+        acknowledgement is received or the send fails.
+
+        If the connection to the service has not previously been opened by a call to connect, this
+        function will open the connection before sending the event.
+
+        :param method_response: The MethodResponse to send.
+        :type method_response: :class:`azure.iot.device.MethodResponse`
+
+        :returns: A Future whose result is None once the response is sent. On failure, the Future
+            holds the same :class:`azure.iot.device.exceptions.ClientError` that
+            send_method_response would raise. Callbacks added to the Future run on a client thread
+            and should not block.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        logger.info("Starting to send method response to Hub...")
+
+        future, callback = create_future_callback()
+        self._mqtt_pipeline.send_method_response(method_response, callback=callback)
+        return future
+
     def _enable_feature(self, feature_name):
         """Enable an Azure IoT Hub feature.
 
@@ -304,6 +508,45 @@ class GenericIoTHubClient(AbstractIoTHubClient):
 
         logger.info("Successfully patched twin")
 
+    def begin_patch_twin_reported_properties(self, reported_properties_patch):
+        """
+        Starts updating reported properties with the Azure IoT Hub or Azure IoT Edge Hub service.
+
+        This function returns as soon as the patch has been handed to the pipeline, without
+        waiting for the service to acknowledge it. The returned Future is completed once the
+        service responds or the patch fails. If the twin feature has not been enabled yet, this
+        function waits for it to be enabled before returning.
+
+        :param reported_properties_patch: Twin Reported Properties patch as a JSON dict
+        :type reported_properties_patch: dict
+
+        :returns: A Future whose result is None once the patch is acknowledged. On failure, the
+            Future holds the same :class:`azure.iot.device.exceptions.ClientError` that
+            patch_twin_reported_properties would raise. Callbacks added to the Future run on a
+            client thread and should not block.
+        :rtype: :class:`concurrent.futures.Future`
+        """
+        if not self._mqtt_pipeline.feature_enabled[pipeline_constant.TWIN]:
+            self._enable_feature(pipeline_constant.TWIN)
+
+        future, callback = create_future_callback()
+        self._mqtt_pipeline.patch_twin_reported_properties(
+            patch=reported_properties_patch, callback=callback
+        )
+        return future
+
+    def set_twin_desired_properties_patch_handler(self, handler):
+        """Set a handler called with each desired property patch sent from the Azure IoT Hub or
+        Azure IoT Edge Hub, instead of receiving them with receive_twin_desired_properties_patch.
+
+        The handler is called on a worker thread of the client, one patch at a time.
+
+        :param handler: Function called with the patch (a dict), or None to remove the handler.
+        """
+        self._inbox_manager.twin_patch_handler = handler
+        if handler and not self._mqtt_pipeline.feature_enabled[pipeline_constant.TWIN_PATCHES]:
+            self._enable_feature(pipeline_constant.TWIN_PATCHES)
+
     def receive_twin_desired_properties_patch(self, block=True, timeout=None):
         """
         Receive a desired property patch via the Azure IoT Hub or Azure IoT Edge Hub.
@@ -344,7 +587,7 @@ class IoTHubDeviceClient(GenericIoTHubClient, AbstractIoTHubDeviceClient):
     Intended for usage with Python 2.7 or compatibility scenarios for Python 3.5.3+.
     """
 
-    def __init__(self, mqtt_pipeline, http_pipeline):
+    def __init__(self, mqtt_pipeline, http_pipeline, inbox_options=None, handler_max_workers=None):
         """Initializer for a IoTHubDeviceClient.
 
         This initializer should not be called directly.
@@ -352,14 +595,33 @@ class IoTHubDeviceClient(GenericIoTHubClient, AbstractIoTHubDeviceClient):
 
         :param mqtt_pipeline: The pipeline used to connect to the IoTHub endpoint.
         :type mqtt_pipeline: :class:`azure.iot.device.iothub.pipeline.MQTTPipeline`
+        :param inbox_options: Options limiting the number of received messages held by the client.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time.
         """
         super(IoTHubDeviceClient, self).__init__(
-            mqtt_pipeline=mqtt_pipeline, http_pipeline=http_pipeline
+            mqtt_pipeline=mqtt_pipeline,
+            http_pipeline=http_pipeline,
+            inbox_options=inbox_options,
+            handler_max_workers=handler_max_workers,
         )
         self._mqtt_pipeline.on_c2d_message_received = CallableWeakMethod(
             self._inbox_manager, "route_c2d_message"
         )
 
+    def set_message_handler(self, handler):
+        """Set a handler called with each message sent from the Azure IoT Hub, instead of
+        receiving them with receive_message.
+
+        The handler is called on a worker thread of the client, one message at a time.
+
+        :param handler: Function called with the Message, or None to remove the handler.
+        """
+        self._inbox_manager.c2d_message_handler = handler
+        if handler and not self._mqtt_pipeline.feature_enabled[pipeline_constant.C2D_MSG]:
+            self._enable_feature(pipeline_constant.C2D_MSG)
+
     def receive_message(self, block=True, timeout=None):
         """Receive a message that has been sent from the Azure IoT Hub.
 
@@ -382,6 +644,37 @@ class IoTHubDeviceClient(GenericIoTHubClient, AbstractIoTHubDeviceClient):
         logger.info("Message received")
         return message
 
+    def receive_messages(self, max_count, block=True, timeout=None):
+        """Receive up to max_count messages that have been sent from the Azure IoT Hub.
+
+        Waits for a message to be available, then returns it along with the messages received
+        after it, up to max_count messages in total. This lets messages that arrive in bursts be
+        processed in batches.
+
+        :param int max_count: The maximum number of messages to return.
+        :param bool block: Indicates if the operation should block until a message is received.
+        :param int timeout: Optionally provide a number of seconds until blocking times out.
+
+        :raises: ValueError if max_count is less than 1.
+
+        :returns: List of messages that were sent from the Azure IoT Hub, which is empty if
+            no message has been received by the end of the blocking period.
+        :rtype: list(:class:`azure.iot.device.Message`)
+        """
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1")
+        if not self._mqtt_pipeline.feature_enabled[pipeline_constant.C2D_MSG]:
+            self._enable_feature(pipeline_constant.C2D_MSG)
+        c2d_inbox = self._inbox_manager.get_c2d_message_inbox()
+
+        logger.info("Waiting for messages from Hub...")
+        try:
+            messages = c2d_inbox.get_batch(max_count, block=block, timeout=timeout)
+        except InboxEmpty:
+            messages = []
+        logger.info("{} messages received".format(len(messages)))
+        return messages
+
     def get_storage_info_for_blob(self, blob_name):
         """Sends a POST request over HTTP to an IoTHub endpoint that will return information for uploading via the Azure Storage Account linked to the IoTHub your device is connected to.
 
@@ -423,7 +716,7 @@ class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
     Intended for usage with Python 2.7 or compatibility scenarios for Python 3.5.3+.
     """
 
-    def __init__(self, mqtt_pipeline, http_pipeline):
+    def __init__(self, mqtt_pipeline, http_pipeline, inbox_options=None, handler_max_workers=None):
         """Intializer for a IoTHubModuleClient.
 
         This initializer should not be called directly.
@@ -433,9 +726,16 @@ class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
         :type mqtt_pipeline: :class:`azure.iot.device.iothub.pipeline.MQTTPipeline`
         :param http_pipeline: The pipeline used to connect to the IoTHub endpoint via HTTP.
         :type http_pipeline: :class:`azure.iot.device.iothub.pipeline.HTTPPipeline`
+        :param inbox_options: Options limiting the number of received messages held by the client.
+        :type inbox_options: :class:`azure.iot.device.InboxOptions`
+        :param int handler_max_workers: Maximum number of handlers for received data running at
+            the same time.
         """
         super(IoTHubModuleClient, self).__init__(
-            mqtt_pipeline=mqtt_pipeline, http_pipeline=http_pipeline
+            mqtt_pipeline=mqtt_pipeline,
+            http_pipeline=http_pipeline,
+            inbox_options=inbox_options,
+            handler_max_workers=handler_max_workers,
         )
         self._mqtt_pipeline.on_input_message_received = CallableWeakMethod(
             self._inbox_manager, "route_input_message"
@@ -483,6 +783,60 @@ class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
 
         logger.info("Successfully sent message to output: " + output_name)
 
+    def begin_send_message_to_output(self, message, output_name):
+        """Starts sending an event/message to the given module output.
+
+        This function returns as soon as the message has been handed to the pipeline, without
+        waiting for the service to acknowledge it. The returned Future is completed once the
+        acknowledgement is received or the send fails.
+
+        If the connection to the service has not previously been opened by a call to connect, this
+        function will open the connection before sending the event.
+
+        :param message: Message to send to the given output. Anything passed that is not an instance of the
+            Message class will be converted to Message object.
+        :type message: :class:`azure.iot.device.Message` or str
+        :param str output_name: Name of the output to send the event to.
+
+        :returns: A Future whose result is None once the message is sent. On failure, the Future
+            holds the same :class:`azure.iot.device.exceptions.ClientError` that
+            send_message_to_output would raise. Callbacks added to the Future run on a client
+            thread and should not block.
+        :rtype: :class:`concurrent.futures.Future`
+
+        :raises: ValueError if the message fails size validation.
+        """
+        if not isinstance(message, Message):
+            message = Message(message)
+
+        if message.get_size() > device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
+            raise ValueError("Size of message can not exceed 256 KB.")
+
+        message.output_name = output_name
+
+        logger.info("Starting to send message to output:" + output_name + "...")
+
+        future, callback = create_future_callback()
+        self._mqtt_pipeline.send_output_event(message, callback=callback)
+        return future
+
+    def set_input_message_handler(self, input_name, handler):
+        """Set a handler called with each message sent to the given module input, instead of
+        receiving them with receive_message_on_input.
+
+        The handler is called on a worker thread of the client, one message at a time for each
+        input. Handlers of different inputs run concurrently.
+
+        :param str input_name: The input name to handle messages for.
+        :param handler: Function called with the Message, or None to remove the handler.
+        """
+        if handler:
+            self._inbox_manager.input_message_handlers[input_name] = handler
+        else:
+            self._inbox_manager.input_message_handlers.pop(input_name, None)
+        if handler and not self._mqtt_pipeline.feature_enabled[pipeline_constant.INPUT_MSG]:
+            self._enable_feature(pipeline_constant.INPUT_MSG)
+
     def receive_message_on_input(self, input_name, block=True, timeout=None):
         """Receive an input message that has been sent from another Module to a specific input.
 
@@ -505,6 +859,39 @@ class IoTHubModuleClient(GenericIoTHubClient, AbstractIoTHubModuleClient):
         logger.info("Input message received on: " + input_name)
         return message
 
+    def receive_messages_on_input(self, input_name, max_count, block=True, timeout=None):
+        """Receive up to max_count input messages that have been sent from other Modules to a
+        specific input.
+
+        Waits for a message to be available, then returns it along with the messages received
+        after it, up to max_count messages in total. This lets messages that arrive in bursts be
+        processed in batches.
+
+        :param str input_name: The input name to receive messages on.
+        :param int max_count: The maximum number of messages to return.
+        :param bool block: Indicates if the operation should block until a message is received.
+        :param int timeout: Optionally provide a number of seconds until blocking times out.
+
+        :raises: ValueError if max_count is less than 1.
+
+        :returns: List of messages that were sent to the specified input, which is empty if
+            no message has been received by the end of the blocking period.
+        :rtype: list(:class:`azure.iot.device.Message`)
+        """
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1")
+        if not self._mqtt_pipeline.feature_enabled[pipeline_constant.INPUT_MSG]:
+            self._enable_feature(pipeline_constant.INPUT_MSG)
+        input_inbox = self._inbox_manager.get_input_message_inbox(input_name)
+
+        logger.info("Waiting for input messages on: " + input_name + "...")
+        try:
+            messages = input_inbox.get_batch(max_count, block=block, timeout=timeout)
+        except InboxEmpty:
+            messages = []
+        logger.info("{} input messages received on: {}".format(len(messages), input_name))
+        return messages
+
     def invoke_method(self, method_params, device_id, module_id=None):
         """Invoke a method from your client onto a device or module client, and receive the response to the method call.
 
@@ -1,13 +1,13 @@
-# -------------------------------------------------------------------------
-# Copyright (c) Microsoft Corporation. All rights reserved.
-# Licensed under the MIT License. See License.txt in the project root for
-# license information.
-# --------------------------------------------------------------------------
 """This module contains an Inbox class for use with a synchronous client."""
 
+import logging
+import threading
 from six.moves import queue
 import six
 from abc import ABCMeta, abstractmethod
+from .models import inbox_options
+
+logger = logging.getLogger(__name__)
 
 
 class InboxEmpty(Exception):
@@ -18,23 +18,143 @@ class InboxEmpty(Exception):
 class AbstractInbox:
     """Abstract Base Class for Inbox.
 
-    Holds generic incoming data for a client.
+    Holds generic incoming data for a client.  An inbox can be limited to a maximum number of
+    items, in which case an overflow policy decides what happens to items put in it while it is
+    full.  Implementations provide the queue primitives, while this class applies the policy.
 
     All methods, when implemented, should be threadsafe.
+
+    :ivar int dropped_count: The number of items dropped because the inbox was full.
+    :ivar int high_water_mark: The largest number of items the inbox has held.
+    :ivar on_full: Handler called with no arguments when an inbox using the "pause" overflow
+     policy becomes full.
+    :ivar on_space_available: Handler called with no arguments when an inbox using the "pause"
+     overflow policy that was full is back down to its resume size.  The two handlers are called
+     on whichever threads put and remove items, so they can run in either order.  Handlers should
+     use the full property for the current state.
     """
 
-    @abstractmethod
+    def __init__(self, max_size=0, overflow_policy=inbox_options.DROP_OLDEST, resume_size=0):
+        """Initializer for an Inbox.
+
+        :param int max_size: Maximum number of items in the inbox, or 0 for no maximum.
+        :param str overflow_policy: One of the overflow policies in
+         azure.iot.device.iothub.models.inbox_options
+        :param int resume_size: The number of items a full inbox using the "pause" overflow
+         policy has to be down to before on_space_available is called.
+        """
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.resume_size = resume_size
+        self.dropped_count = 0
+        self.high_water_mark = 0
+        self.on_full = None
+        self.on_space_available = None
+        self._full = False
+        self._state_lock = threading.Lock()
+
+    @property
+    def full(self):
+        """True if the inbox uses the "pause" overflow policy, has become full, and is not back
+        down to its resume size yet"""
+        return self._full
+
+    def _get_queue_maxsize(self):
+        """Return the maxsize for the underlying queue of the inbox"""
+        if self.overflow_policy == inbox_options.PAUSE:
+            # The queue itself must accept the items which arrive before the pause takes effect
+            return 0
+        return self.max_size
+
     def _put(self, item):
-        """Put an item into the Inbox.
+        """Put an item into the Inbox, applying the overflow policy if the inbox is full.
 
-        Implementation should block until a free slot is available.
         Implementation MUST be a synchronous function.
         Only to be used by the InboxManager.
 
         :param item: The item to put in the Inbox.
+
+        :returns: Boolean indicating if the item was put in the inbox (True) or dropped (False).
+        """
+        if not self.max_size or self.overflow_policy == inbox_options.PAUSE:
+            self._put_item(item)
+        elif self.overflow_policy == inbox_options.DROP_NEWEST:
+            if not self._put_item_nowait(item):
+                self._record_dropped_item()
+                return False
+        else:
+            while not self._put_item_nowait(item):
+                if self._remove_item_nowait():
+                    self._record_dropped_item()
+
+        with self._state_lock:
+            # The size is read and the inbox marked as full under the same lock that
+            # _on_item_removed checks them with.  Any item removed from now on is followed by that
+            # check, so the inbox can't be left marked as full once it has been emptied.
+            size = self._qsize()
+            self.high_water_mark = max(self.high_water_mark, size)
+            notify_full = (
+                self.overflow_policy == inbox_options.PAUSE
+                and self.max_size
+                and size >= self.max_size
+                and not self._full
+            )
+            if notify_full:
+                self._full = True
+        if notify_full:
+            logger.warning("Inbox is full ({} items)".format(size))
+            if self.on_full:
+                self.on_full()
+        return True
+
+    def _record_dropped_item(self):
+        with self._state_lock:
+            self.dropped_count += 1
+            dropped_count = self.dropped_count
+        if dropped_count == 1:
+            logger.warning("Inbox is full - dropping an item")
+        else:
+            logger.debug("Inbox is full - dropping an item ({} dropped)".format(dropped_count))
+
+    def _on_item_removed(self):
+        """Call on_space_available if a full inbox is now down to its resume size"""
+        if self.overflow_policy != inbox_options.PAUSE:
+            return
+        with self._state_lock:
+            notify_space_available = self._full and self._qsize() <= self.resume_size
+            if notify_space_available:
+                self._full = False
+        if notify_space_available:
+            logger.info("Inbox is no longer full")
+            if self.on_space_available:
+                self.on_space_available()
+
+    @abstractmethod
+    def _put_item(self, item):
+        """Put an item into the underlying queue, blocking until a free slot is available."""
+        pass
+
+    @abstractmethod
+    def _put_item_nowait(self, item):
+        """Put an item into the underlying queue if a free slot is available.
+
+        :returns: Boolean indicating if the item was put in the queue.
         """
         pass
 
+    @abstractmethod
+    def _remove_item_nowait(self):
+        """Remove the oldest item from the underlying queue, if there is one.
+
+        :returns: Boolean indicating if an item was removed.
+        """
+        pass
+
+    @abstractmethod
+    def _qsize(self):
+        """Return the number of items in the underlying queue."""
+        pass
+
     @abstractmethod
     def get(self):
         """Remove and return an item from the inbox.
@@ -46,6 +166,19 @@ class AbstractInbox:
         """
         pass
 
+    @abstractmethod
+    def get_batch(self, max_count):
+        """Remove and return up to max_count items from the inbox, in the order they were added.
+
+        Implementation should have the capability to block until at least one item is available.
+        Implementation can be a synchronous function or an asynchronous coroutine.
+
+        :param int max_count: The maximum number of items to return.
+
+        :returns: A list of items from the Inbox.
+        """
+        pass
+
     @abstractmethod
     def empty(self):
         """Returns True if the inbox is empty, False otherwise
@@ -67,24 +200,38 @@ class SyncClientInbox(AbstractInbox):
     All methods implemented in this class are threadsafe.
     """
 
-    def __init__(self):
-        """Initializer for SyncClientInbox"""
-        self._queue = queue.Queue()
+    def __init__(self, **kwargs):
+        """Initializer for SyncClientInbox
+
+        Accepts the same keyword arguments as AbstractInbox.
+        """
+        super(SyncClientInbox, self).__init__(**kwargs)
+        self._queue = queue.Queue(maxsize=self._get_queue_maxsize())
 
     def __contains__(self, item):
         """Return True if item is in Inbox, False otherwise"""
         with self._queue.mutex:
             return item in self._queue.queue
 
-    def _put(self, item):
-        """Put an item into the inbox.
+    def _put_item(self, item):
+        self._queue.put(item)
 
-        Block if necessary until a free slot is available.
-        Only to be used by the InboxManager.
+    def _put_item_nowait(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
 
-        :param item: The item to put in the inbox.
-        """
-        self._queue.put(item)
+    def _remove_item_nowait(self):
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            return False
+        return True
+
+    def _qsize(self):
+        return self._queue.qsize()
 
     def get(self, block=True, timeout=None):
         """Remove and return an item from the inbox.
@@ -99,9 +246,42 @@ class SyncClientInbox(AbstractInbox):
         :returns: An item from the Inbox
         """
         try:
-            return self._queue.get(block=block, timeout=timeout)
+            item = self._queue.get(block=block, timeout=timeout)
+        except queue.Empty:
+            raise InboxEmpty("Inbox is empty")
+        self._on_item_removed()
+        return item
+
+    def get_batch(self, max_count, block=True, timeout=None):
+        """Remove and return up to max_count items from the inbox, in the order they were added.
+
+        Once an item is available, the other items returned are the ones already in the inbox,
+        so this doesn't wait for more.
+
+        :param int max_count: The maximum number of items to return.
+        :param bool block: Indicates if the operation should block until an item is available.
+        Default True.
+        :param int timeout: Optionally provide a number of seconds until blocking times out.
+
+        :raises: ValueError if max_count is less than 1
+        :raises: InboxEmpty if timeout occurs because the inbox is empty
+        :raises: InboxEmpty if inbox is empty in non-blocking mode
+
+        :returns: A list of between 1 and max_count items from the Inbox
+        """
+        if max_count < 1:
+            raise ValueError("max_count must be at least 1")
+        try:
+            items = [self._queue.get(block=block, timeout=timeout)]
         except queue.Empty:
             raise InboxEmpty("Inbox is empty")
+        while len(items) < max_count:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._on_item_removed()
+        return items
 
     def empty(self):
         """Returns True if the inbox is empty, False otherwise
@@ -115,3 +295,6 @@ class SyncClientInbox(AbstractInbox):
         """
         with self._queue.mutex:
             self._queue.queue.clear()
+            # Wake up any thread blocked putting an item into the full inbox
+            self._queue.not_full.notify_all()
+        self._on_item_removed()
@@ -7,9 +7,35 @@
 Currently we have to do like this so that we don't use exec anywhere"""
 
 
-def execute_patch_for_sync():
+def execute_patch_for_sync_iothub():
     from azure.iot.device.iothub.sync_clients import IoTHubDeviceClient as IoTHubDeviceClient
 
+    def begin_patch_twin_reported_properties(self, reported_properties_patch):
+        return super(IoTHubDeviceClient, self).begin_patch_twin_reported_properties(
+            reported_properties_patch
+        )
+
+    begin_patch_twin_reported_properties.__doc__ = (
+        IoTHubDeviceClient.begin_patch_twin_reported_properties.__doc__
+    )
+    setattr(
+        IoTHubDeviceClient,
+        "begin_patch_twin_reported_properties",
+        begin_patch_twin_reported_properties,
+    )
+
+    def begin_send_message(self, message):
+        return super(IoTHubDeviceClient, self).begin_send_message(message)
+
+    begin_send_message.__doc__ = IoTHubDeviceClient.begin_send_message.__doc__
+    setattr(IoTHubDeviceClient, "begin_send_message", begin_send_message)
+
+    def begin_send_method_response(self, method_response):
+        return super(IoTHubDeviceClient, self).begin_send_method_response(method_response)
+
+    begin_send_method_response.__doc__ = IoTHubDeviceClient.begin_send_method_response.__doc__
+    setattr(IoTHubDeviceClient, "begin_send_method_response", begin_send_method_response)
+
     def connect(self):
         return super(IoTHubDeviceClient, self).connect()
 
@@ -62,6 +88,12 @@ def execute_patch_for_sync():
     send_message.__doc__ = IoTHubDeviceClient.send_message.__doc__
     setattr(IoTHubDeviceClient, "send_message", send_message)
 
+    def send_message_batch(self, messages, max_in_flight=20):
+        return super(IoTHubDeviceClient, self).send_message_batch(messages, max_in_flight)
+
+    send_message_batch.__doc__ = IoTHubDeviceClient.send_message_batch.__doc__
+    setattr(IoTHubDeviceClient, "send_message_batch", send_message_batch)
+
     def send_method_response(self, method_response):
         return super(IoTHubDeviceClient, self).send_method_response(method_response)
 
@@ -101,6 +133,32 @@ def execute_patch_for_sync():
     )
     from azure.iot.device.iothub.sync_clients import IoTHubModuleClient as IoTHubModuleClient
 
+    def begin_patch_twin_reported_properties(self, reported_properties_patch):
+        return super(IoTHubModuleClient, self).begin_patch_twin_reported_properties(
+            reported_properties_patch
+        )
+
+    begin_patch_twin_reported_properties.__doc__ = (
+        IoTHubModuleClient.begin_patch_twin_reported_properties.__doc__
+    )
+    setattr(
+        IoTHubModuleClient,
+        "begin_patch_twin_reported_properties",
+        begin_patch_twin_reported_properties,
+    )
+
+    def begin_send_message(self, message):
+        return super(IoTHubModuleClient, self).begin_send_message(message)
+
+    begin_send_message.__doc__ = IoTHubModuleClient.begin_send_message.__doc__
+    setattr(IoTHubModuleClient, "begin_send_message", begin_send_message)
+
+    def begin_send_method_response(self, method_response):
+        return super(IoTHubModuleClient, self).begin_send_method_response(method_response)
+
+    begin_send_method_response.__doc__ = IoTHubModuleClient.begin_send_method_response.__doc__
+    setattr(IoTHubModuleClient, "begin_send_method_response", begin_send_method_response)
+
     def connect(self):
         return super(IoTHubModuleClient, self).connect()
 
@@ -153,6 +211,12 @@ def execute_patch_for_sync():
     send_message.__doc__ = IoTHubModuleClient.send_message.__doc__
     setattr(IoTHubModuleClient, "send_message", send_message)
 
+    def send_message_batch(self, messages, max_in_flight=20):
+        return super(IoTHubModuleClient, self).send_message_batch(messages, max_in_flight)
+
+    send_message_batch.__doc__ = IoTHubModuleClient.send_message_batch.__doc__
+    setattr(IoTHubModuleClient, "send_message_batch", send_message_batch)
+
     def send_method_response(self, method_response):
         return super(IoTHubModuleClient, self).send_method_response(method_response)
 
@@ -192,6 +256,9 @@ def execute_patch_for_sync():
         "create_from_x509_certificate",
         classmethod(create_from_x509_certificate),
     )
+
+
+def execute_patch_for_sync_provisioning():
     from azure.iot.device.provisioning.provisioning_device_client import (
         ProvisioningDeviceClient as ProvisioningDeviceClient,
     )
@@ -225,3 +292,8 @@ def execute_patch_for_sync():
         "create_from_x509_certificate",
         classmethod(create_from_x509_certificate),
     )
+
+
+def execute_patch_for_sync():
+    execute_patch_for_sync_iothub()
+    execute_patch_for_sync_provisioning()
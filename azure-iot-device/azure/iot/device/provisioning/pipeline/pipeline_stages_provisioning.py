@@ -16,7 +16,7 @@ from azure.iot.device.provisioning.models.registration_result import (
 import logging
 import weakref
 import json
-from threading import Timer
+from azure.iot.device.common.timer_scheduler import Timer
 import time
 
 logger = logging.getLogger(__name__)
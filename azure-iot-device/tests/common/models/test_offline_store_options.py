@@ -0,0 +1,64 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import pytest
+import logging
+from azure.iot.device.common.models import OfflineStoreOptions
+
+logging.basicConfig(level=logging.DEBUG)
+
+fake_path = "/some/path"
+
+
+@pytest.mark.describe("OfflineStoreOptions")
+class TestOfflineStoreOptions(object):
+    @pytest.mark.it("Instantiates with the properties set to the values of the parameters")
+    def test_properties(self):
+        options = OfflineStoreOptions(
+            path=fake_path,
+            max_size=1000,
+            max_age=3600,
+            overflow_policy="reject_new",
+            segment_size=100,
+            max_in_flight=5,
+        )
+        assert options.path == fake_path
+        assert options.max_size == 1000
+        assert options.max_age == 3600
+        assert options.overflow_policy == "reject_new"
+        assert options.segment_size == 100
+        assert options.max_in_flight == 5
+
+    @pytest.mark.it("Instantiates with default values for the optional properties")
+    def test_defaults(self):
+        options = OfflineStoreOptions(path=fake_path)
+        assert options.max_size == 64 * 1024 * 1024
+        assert options.max_age is None
+        assert options.overflow_policy == "drop_oldest"
+        assert options.segment_size == 4 * 1024 * 1024
+        assert options.max_in_flight == 32
+
+    @pytest.mark.it("Maintains all properties as read-only")
+    @pytest.mark.parametrize(
+        "name", ["path", "max_size", "max_age", "overflow_policy", "segment_size", "max_in_flight"]
+    )
+    def test_read_only(self, name):
+        options = OfflineStoreOptions(path=fake_path)
+        with pytest.raises(AttributeError):
+            setattr(options, name, "new value")
+
+    @pytest.mark.it("Raises a ValueError if given invalid options")
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            pytest.param({"overflow_policy": "drop_newest"}, id="Invalid overflow_policy"),
+            pytest.param({"max_size": 100, "segment_size": 60}, id="max_size too small"),
+            pytest.param({"max_in_flight": 0}, id="Invalid max_in_flight"),
+        ],
+    )
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            OfflineStoreOptions(path=fake_path, **kwargs)
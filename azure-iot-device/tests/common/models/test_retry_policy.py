@@ -0,0 +1,153 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import pytest
+import logging
+from azure.iot.device.common.models import RetryPolicy
+from azure.iot.device.common.models import retry_policy
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+@pytest.mark.describe("RetryPolicy")
+class TestRetryPolicy(object):
+    @pytest.mark.it("Instantiates with the properties set to the values of the parameters")
+    def test_properties(self):
+        policy = RetryPolicy(
+            initial_interval=2,
+            max_interval=30,
+            jitter=False,
+            max_retries=5,
+            max_retries_per_op={"publish": 10},
+            retry_budget=20,
+            retry_budget_refill_rate=0.5,
+        )
+        assert policy.initial_interval == 2
+        assert policy.max_interval == 30
+        assert policy.jitter is False
+        assert policy.max_retries == 5
+        assert policy.max_retries_per_op == {"publish": 10}
+        assert policy.retry_budget == 20
+        assert policy.retry_budget_refill_rate == 0.5
+
+    @pytest.mark.it("Instantiates with default values for the optional properties")
+    def test_defaults(self):
+        policy = RetryPolicy()
+        assert policy.initial_interval == 1.0
+        assert policy.max_interval == 60.0
+        assert policy.jitter is True
+        assert policy.max_retries is None
+        assert policy.max_retries_per_op == {}
+        assert policy.retry_budget is None
+        assert policy.retry_budget_refill_rate == 1.0
+
+    @pytest.mark.it("Maintains all properties as read-only")
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "initial_interval",
+            "max_interval",
+            "jitter",
+            "max_retries",
+            "max_retries_per_op",
+            "retry_budget",
+            "retry_budget_refill_rate",
+        ],
+    )
+    def test_read_only(self, name):
+        policy = RetryPolicy()
+        with pytest.raises(AttributeError):
+            setattr(policy, name, "new value")
+
+    @pytest.mark.it("Raises a ValueError if given invalid options")
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            pytest.param({"initial_interval": 0}, id="Invalid initial_interval"),
+            pytest.param({"initial_interval": 10, "max_interval": 5}, id="max_interval too small"),
+            pytest.param({"max_retries": -1}, id="Invalid max_retries"),
+            pytest.param({"max_retries_per_op": {"connect": 1}}, id="Invalid operation kind"),
+            pytest.param({"max_retries_per_op": {"publish": -1}}, id="Invalid max_retries_per_op"),
+            pytest.param({"retry_budget": 0}, id="Invalid retry_budget"),
+            pytest.param({"retry_budget_refill_rate": 0}, id="Invalid retry_budget_refill_rate"),
+        ],
+    )
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            RetryPolicy(**kwargs)
+
+
+@pytest.mark.describe("RetryPolicy - .get_retry_interval()")
+class TestRetryPolicyGetRetryInterval(object):
+    @pytest.mark.it("Doubles the interval after each retry, up to max_interval, without jitter")
+    def test_exponential(self):
+        policy = RetryPolicy(initial_interval=1, max_interval=10, jitter=False)
+        intervals = [policy.get_retry_interval("publish", count) for count in range(6)]
+        assert intervals == [1, 2, 4, 8, 10, 10]
+
+    @pytest.mark.it(
+        "Picks a random interval between initial_interval and three times the previous interval, up to max_interval, with jitter"
+    )
+    def test_decorrelated_jitter(self):
+        policy = RetryPolicy(initial_interval=1, max_interval=50)
+        previous = None
+        for count in range(20):
+            interval = policy.get_retry_interval("publish", count, previous)
+            assert 1 <= interval <= min(50, 3 * (previous or 1))
+            previous = interval
+
+    @pytest.mark.it("Spreads the intervals of many clients retrying at the same time")
+    def test_jitter_spreads(self):
+        policy = RetryPolicy(initial_interval=1, max_interval=50)
+        intervals = set(policy.get_retry_interval("publish", 0) for _ in range(100))
+        assert len(intervals) > 50
+
+    @pytest.mark.it("Returns None once an operation has been retried max_retries times")
+    def test_max_retries(self):
+        policy = RetryPolicy(max_retries=2)
+        assert policy.get_retry_interval("subscribe", 1) is not None
+        assert policy.get_retry_interval("subscribe", 2) is None
+
+    @pytest.mark.it("Uses the maximum number of retries given for the kind of operation, if any")
+    def test_max_retries_per_op(self):
+        policy = RetryPolicy(max_retries=2, max_retries_per_op={"publish": 5})
+        assert policy.get_retry_interval("publish", 4) is not None
+        assert policy.get_retry_interval("publish", 5) is None
+        assert policy.get_retry_interval("unsubscribe", 2) is None
+
+    @pytest.mark.it("Never limits the number of reconnect attempts")
+    def test_connect_unlimited(self):
+        policy = RetryPolicy(max_retries=0)
+        assert policy.get_retry_interval(retry_policy.CONNECT, 100) is not None
+
+
+@pytest.mark.describe("RetryBudget")
+class TestRetryBudget(object):
+    @pytest.mark.it("Allows as many retries in a burst as its capacity")
+    def test_capacity(self):
+        budget = RetryPolicy(retry_budget=3, retry_budget_refill_rate=0.001).create_retry_budget()
+        assert [budget.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    @pytest.mark.it("Allows more retries as time passes")
+    def test_refill(self, mocker):
+        clock = mocker.patch.object(retry_policy, "_clock", return_value=100.0)
+        budget = RetryPolicy(retry_budget=2, retry_budget_refill_rate=0.5).create_retry_budget()
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        clock.return_value = 102.0
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+    @pytest.mark.it("Allows any number of retries if the policy has no retry budget")
+    def test_unlimited(self):
+        budget = RetryPolicy().create_retry_budget()
+        assert all(budget.try_acquire() for _ in range(1000))
+
+    @pytest.mark.it("Is created separately for each client")
+    def test_separate(self):
+        policy = RetryPolicy(retry_budget=1)
+        assert policy.create_retry_budget() is not policy.create_retry_budget()
@@ -4,7 +4,8 @@
 # license information.
 # --------------------------------------------------------------------------
 import pytest
-from azure.iot.device import ProxyOptions
+from azure.iot.device import ProxyOptions, OfflineStoreOptions, RetryPolicy
+from azure.iot.device.common import http_transport
 
 
 class PipelineConfigInstantiationTestBase(object):
@@ -122,3 +123,118 @@ class PipelineConfigInstantiationTestBase(object):
     def test_proxy_options_default(self, config_cls):
         config = config_cls()
         assert config.proxy_options is None
+
+    @pytest.mark.it(
+        "Instantiates with the 'offline_store_options' attribute set to the OfflineStoreOptions object provided in the 'offline_store_options' parameter"
+    )
+    def test_offline_store_options(self, config_cls):
+        offline_store_options = OfflineStoreOptions(path="/some/path")
+        config = config_cls(offline_store_options=offline_store_options)
+        assert config.offline_store_options is offline_store_options
+
+    @pytest.mark.it(
+        "Instantiates with the 'offline_store_options' attribute to 'None' if no 'offline_store_options' parameter is provided"
+    )
+    def test_offline_store_options_default(self, config_cls):
+        config = config_cls()
+        assert config.offline_store_options is None
+
+    @pytest.mark.it(
+        "Instantiates with the 'retry_policy' attribute set to the RetryPolicy object provided in the 'retry_policy' parameter"
+    )
+    def test_retry_policy(self, config_cls):
+        retry_policy = RetryPolicy()
+        config = config_cls(retry_policy=retry_policy)
+        assert config.retry_policy is retry_policy
+
+    @pytest.mark.it(
+        "Instantiates with the 'retry_policy' attribute to 'None' if no 'retry_policy' parameter is provided"
+    )
+    def test_retry_policy_default(self, config_cls):
+        config = config_cls()
+        assert config.retry_policy is None
+
+    @pytest.mark.it(
+        "Instantiates with the 'nonblocking_reauthorization' attribute set to the provided 'nonblocking_reauthorization' parameter"
+    )
+    def test_nonblocking_reauthorization(self, config_cls):
+        config = config_cls(nonblocking_reauthorization=True)
+        assert config.nonblocking_reauthorization is True
+
+    @pytest.mark.it(
+        "Instantiates with the 'nonblocking_reauthorization' attribute set to 'False' if no 'nonblocking_reauthorization' parameter is provided"
+    )
+    def test_nonblocking_reauthorization_default(self, config_cls):
+        config = config_cls()
+        assert config.nonblocking_reauthorization is False
+
+    @pytest.mark.it(
+        "Instantiates with the 'executor_group' attribute set to the provided 'executor_group' parameter"
+    )
+    def test_executor_group(self, config_cls):
+        config = config_cls(executor_group="shard-1")
+        assert config.executor_group == "shard-1"
+
+    @pytest.mark.it(
+        "Instantiates with the 'executor_group' attribute to 'None' if no 'executor_group' parameter is provided"
+    )
+    def test_executor_group_default(self, config_cls):
+        config = config_cls()
+        assert config.executor_group is None
+
+    @pytest.mark.it(
+        "Instantiates with the 'pipeline_engine' attribute set to the provided 'pipeline_engine' parameter"
+    )
+    @pytest.mark.parametrize("pipeline_engine", ["thread", "asyncio"])
+    def test_pipeline_engine(self, config_cls, pipeline_engine):
+        config = config_cls(pipeline_engine=pipeline_engine)
+        assert config.pipeline_engine == pipeline_engine
+
+    @pytest.mark.it(
+        "Instantiates with the 'pipeline_engine' attribute to 'thread' if no 'pipeline_engine' parameter is provided"
+    )
+    def test_pipeline_engine_default(self, config_cls):
+        config = config_cls()
+        assert config.pipeline_engine == "thread"
+
+    @pytest.mark.it(
+        "Raises ValueError if the provided 'pipeline_engine' parameter is not supported"
+    )
+    def test_invalid_pipeline_engine(self, config_cls):
+        with pytest.raises(ValueError):
+            config_cls(pipeline_engine="fibers")
+
+    @pytest.mark.it(
+        "Instantiates with the 'executor_group' attribute set to a shared asyncio group if using the 'asyncio' pipeline engine without an 'executor_group' parameter"
+    )
+    def test_executor_group_default_asyncio(self, config_cls):
+        config = config_cls(pipeline_engine="asyncio")
+        assert config.executor_group == "asyncio"
+
+    @pytest.mark.it(
+        "Instantiates with the 'http_max_concurrent_requests' and 'http_max_queued_requests' attributes set to the provided parameters"
+    )
+    def test_http_request_limits(self, config_cls):
+        config = config_cls(http_max_concurrent_requests=50, http_max_queued_requests=200)
+        assert config.http_max_concurrent_requests == 50
+        assert config.http_max_queued_requests == 200
+
+    @pytest.mark.it(
+        "Instantiates with the 'http_max_concurrent_requests' and 'http_max_queued_requests' attributes set to the HTTP transport defaults if not provided"
+    )
+    def test_http_request_limits_default(self, config_cls):
+        config = config_cls()
+        assert config.http_max_concurrent_requests == http_transport.DEFAULT_MAX_CONCURRENT_REQUESTS
+        assert config.http_max_queued_requests == http_transport.DEFAULT_MAX_QUEUED_REQUESTS
+
+    @pytest.mark.it("Raises ValueError if the provided HTTP request limits are out of range")
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            pytest.param({"http_max_concurrent_requests": 0}, id="No concurrent requests"),
+            pytest.param({"http_max_queued_requests": -1}, id="Negative queue size"),
+        ],
+    )
+    def test_invalid_http_request_limits(self, config_cls, kwargs):
+        with pytest.raises(ValueError):
+            config_cls(**kwargs)
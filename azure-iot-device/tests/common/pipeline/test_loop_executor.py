@@ -0,0 +1,71 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import pytest
+import threading
+import logging
+from azure.iot.device.common.pipeline import loop_executor
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+@pytest.fixture
+def executor():
+    return loop_executor.EventLoopExecutor(thread_name="pipeline")
+
+
+@pytest.mark.describe("EventLoopExecutor - .submit()")
+class TestEventLoopExecutorSubmit(object):
+    @pytest.mark.it("Runs the function on the event loop thread")
+    def test_runs_on_loop_thread(self, executor):
+        def get_thread():
+            return threading.current_thread()
+
+        thread = executor.submit(get_thread).result()
+        assert thread is not threading.current_thread()
+        assert thread.name == "pipeline"
+
+    @pytest.mark.it("Runs the function while the executor's event loop is running")
+    def test_runs_in_loop(self, executor):
+        assert executor.submit(executor.event_loop.is_running).result() is True
+
+    @pytest.mark.it("Passes the arguments to the function and returns its result via the Future")
+    def test_result(self, executor):
+        def add(a, b):
+            return a + b
+
+        assert executor.submit(add, 1, b=2).result() == 3
+
+    @pytest.mark.it("Returns exceptions raised by the function via the Future")
+    def test_exception(self, executor, arbitrary_exception):
+        def raise_exception():
+            raise arbitrary_exception
+
+        future = executor.submit(raise_exception)
+        with pytest.raises(type(arbitrary_exception)) as e_info:
+            future.result()
+        assert e_info.value is arbitrary_exception
+
+    @pytest.mark.it("Runs submitted functions in the order they were submitted")
+    def test_order(self, executor):
+        results = []
+        futures = [executor.submit(results.append, i) for i in range(100)]
+        for future in futures:
+            future.result()
+        assert results == list(range(100))
+
+
+@pytest.mark.describe("EventLoopExecutor - Instantiation")
+class TestEventLoopExecutorInstantiation(object):
+    @pytest.mark.it("Calls the initializer with the event loop, on the event loop thread")
+    def test_initializer(self, mocker):
+        calls = []
+
+        def initializer(event_loop):
+            calls.append((event_loop, threading.current_thread()))
+
+        executor = loop_executor.EventLoopExecutor(thread_name="pipeline", initializer=initializer)
+        thread = executor.submit(threading.current_thread).result()
+        assert calls == [(executor.event_loop, thread)]
@@ -126,6 +126,18 @@ class MQTTPublishOperationInstantiationTests(MQTTPublishOperationTestConfig):
         op = cls_type(**init_kwargs)
         assert op.needs_connection is True
 
+    @pytest.mark.it("Initializes 'durable' attribute with the provided 'durable' parameter")
+    def test_durable(self, cls_type, init_kwargs):
+        op = cls_type(durable=True, **init_kwargs)
+        assert op.durable is True
+
+    @pytest.mark.it(
+        "Initializes 'durable' attribute as False if no 'durable' parameter is provided"
+    )
+    def test_durable_default(self, cls_type, init_kwargs):
+        op = cls_type(**init_kwargs)
+        assert op.durable is False
+
 
 pipeline_ops_test.add_operation_tests(
     test_module=this_module,
@@ -167,6 +179,16 @@ class MQTTSubscribeOperationInstantiationTests(MQTTSubscribeOperationTestConfig)
         op = cls_type(**init_kwargs)
         assert op.retry_timer is None
 
+    @pytest.mark.it("Initializes 'retry_count' attribute as 0")
+    def test_retry_count(self, cls_type, init_kwargs):
+        op = cls_type(**init_kwargs)
+        assert op.retry_count == 0
+
+    @pytest.mark.it("Initializes 'retry_interval' attribute as None")
+    def test_retry_interval(self, cls_type, init_kwargs):
+        op = cls_type(**init_kwargs)
+        assert op.retry_interval is None
+
 
 pipeline_ops_test.add_operation_tests(
     test_module=this_module,
@@ -208,6 +230,16 @@ class MQTTUnsubscribeOperationInstantiationTests(MQTTUnsubscribeOperationTestCon
         op = cls_type(**init_kwargs)
         assert op.retry_timer is None
 
+    @pytest.mark.it("Initializes 'retry_count' attribute as 0")
+    def test_retry_count(self, cls_type, init_kwargs):
+        op = cls_type(**init_kwargs)
+        assert op.retry_count == 0
+
+    @pytest.mark.it("Initializes 'retry_interval' attribute as None")
+    def test_retry_interval(self, cls_type, init_kwargs):
+        op = cls_type(**init_kwargs)
+        assert op.retry_interval is None
+
 
 pipeline_ops_test.add_operation_tests(
     test_module=this_module,
@@ -9,11 +9,11 @@ import time
 import pytest
 import sys
 import six
-import threading
 import random
 import uuid
 from six.moves import queue
-from azure.iot.device.common import transport_exceptions, handle_exceptions
+from azure.iot.device.common import transport_exceptions, handle_exceptions, timer_scheduler
+from azure.iot.device.common.models import OfflineStoreOptions, RetryPolicy
 from azure.iot.device.common.pipeline import (
     pipeline_stages_base,
     pipeline_ops_base,
@@ -35,7 +35,7 @@ pytestmark = pytest.mark.usefixtures("fake_pipeline_thread")
 ###################
 @pytest.fixture
 def mock_timer(mocker):
-    return mocker.patch.object(threading, "Timer")
+    return mocker.patch.object(timer_scheduler, "Timer")
 
 
 # Not a fixture, but useful for sharing
@@ -93,6 +93,13 @@ class PipelineRootStageInstantiationTests(PipelineRootStageTestConfig):
         stage = pipeline_stages_base.PipelineRootStage(**init_kwargs)
         assert stage.pipeline_configuration is init_kwargs["pipeline_configuration"]
 
+    @pytest.mark.it(
+        "Initializes 'executor_group' with the 'executor_group' of the provided 'pipeline_configuration'"
+    )
+    def test_executor_group(self, init_kwargs):
+        stage = pipeline_stages_base.PipelineRootStage(**init_kwargs)
+        assert stage.executor_group is init_kwargs["pipeline_configuration"].executor_group
+
 
 pipeline_stage_test.add_base_pipeline_stage_tests(
     test_module=this_module,
@@ -657,6 +664,319 @@ class TestAutoConnectStageRunOpWithOpThatDoesNotRequireConnection(
         assert stage.send_op_down.call_args == mocker.call(op)
 
 
+###########################
+# STORE AND FORWARD STAGE #
+###########################
+
+
+class StoreAndForwardStageTestConfig(object):
+    @pytest.fixture
+    def cls_type(self):
+        return pipeline_stages_base.StoreAndForwardStage
+
+    @pytest.fixture
+    def init_kwargs(self, mocker):
+        return {}
+
+    @pytest.fixture
+    def offline_store_options(self, tmpdir):
+        return OfflineStoreOptions(
+            path=str(tmpdir.join("offline_store")),
+            max_size=4096,
+            segment_size=1024,
+            max_in_flight=2,
+        )
+
+    @pytest.fixture
+    def stage(self, mocker, cls_type, init_kwargs, offline_store_options):
+        stage = cls_type(**init_kwargs)
+        stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
+            pipeline_configuration=mocker.MagicMock()
+        )
+        stage.pipeline_root.pipeline_configuration.offline_store_options = offline_store_options
+        # Mock flow methods
+        stage.send_op_down = mocker.MagicMock()
+        stage.send_event_up = mocker.MagicMock()
+        return stage
+
+    def make_publish(self, mocker, index, durable=True):
+        return pipeline_ops_mqtt.MQTTPublishOperation(
+            topic="__fake_topic__",
+            payload="payload-{}".format(index),
+            callback=mocker.MagicMock(),
+            durable=durable,
+        )
+
+    def get_ops_sent_down(self, stage, op_class):
+        return [
+            call[0][0] for call in stage.send_op_down.call_args_list if type(call[0][0]) is op_class
+        ]
+
+
+pipeline_stage_test.add_base_pipeline_stage_tests(
+    test_module=this_module,
+    stage_class_under_test=pipeline_stages_base.StoreAndForwardStage,
+    stage_test_config_class=StoreAndForwardStageTestConfig,
+)
+
+
+@pytest.mark.describe("StoreAndForwardStage - .run_op() -- Called while connected")
+class TestStoreAndForwardStageRunOpConnected(StoreAndForwardStageTestConfig, StageRunOpTestBase):
+    @pytest.fixture
+    def op(self, mocker):
+        return self.make_publish(mocker, 0)
+
+    @pytest.fixture(autouse=True)
+    def connected(self, stage):
+        stage.pipeline_root.connected = True
+
+    @pytest.mark.it("Sends a durable MQTTPublishOperation down if there are no stored publishes")
+    def test_sends_down(self, mocker, stage, op):
+        stage.run_op(op)
+        assert stage.send_op_down.call_count == 1
+        assert stage.send_op_down.call_args == mocker.call(op)
+        op.complete()
+        assert op.completed
+        assert op.error is None
+
+    @pytest.mark.it(
+        "Stores the op and completes it successfully if it fails and the pipeline is no longer connected"
+    )
+    def test_stores_on_connection_failure(self, mocker, stage, op, arbitrary_exception):
+        callback = op.callback_stack[0]
+        stage.run_op(op)
+        stage.pipeline_root.connected = False
+        op.complete(error=arbitrary_exception)
+
+        assert op.completed
+        assert callback.call_args == mocker.call(op=op, error=None)
+        assert len(stage.store) == 1
+
+    @pytest.mark.it("Completes the op with the error if it fails while the pipeline is connected")
+    def test_fails_while_connected(self, mocker, stage, op, arbitrary_exception):
+        stage.run_op(op)
+        op.complete(error=arbitrary_exception)
+
+        assert op.completed
+        assert op.error is arbitrary_exception
+        assert len(stage.store) == 0
+
+    @pytest.mark.it(
+        "Stores a durable MQTTPublishOperation behind the stored publishes which are still being sent"
+    )
+    def test_stores_behind_backlog(self, mocker, stage, op):
+        stage.pipeline_root.connected = False
+        for i in range(3):
+            stage.run_op(self.make_publish(mocker, i + 1))
+        stage.pipeline_root.connected = True
+        stage.send_op_down.reset_mock()
+
+        stage.run_op(op)
+        assert op.completed
+        assert len(stage.store) == 4
+        assert op not in self.get_ops_sent_down(stage, pipeline_ops_mqtt.MQTTPublishOperation)
+
+    @pytest.mark.it("Sends non-durable MQTTPublishOperations and other ops down")
+    @pytest.mark.parametrize(
+        "make_op",
+        [
+            pytest.param(
+                lambda mocker: pipeline_ops_mqtt.MQTTPublishOperation(
+                    topic="__fake_topic__", payload="", callback=mocker.MagicMock()
+                ),
+                id="Non-durable MQTTPublishOperation",
+            ),
+            pytest.param(
+                lambda mocker: ArbitraryOperation(callback=mocker.MagicMock()), id="Other"
+            ),
+        ],
+    )
+    def test_passes_down(self, mocker, stage, make_op):
+        op = make_op(mocker)
+        stage.pipeline_root.connected = False
+        stage.run_op(op)
+        assert stage.send_op_down.call_args == mocker.call(op)
+        assert stage.store is None or len(stage.store) == 0
+
+
+@pytest.mark.describe("StoreAndForwardStage - .run_op() -- Called while disconnected")
+class TestStoreAndForwardStageRunOpDisconnected(StoreAndForwardStageTestConfig, StageRunOpTestBase):
+    @pytest.fixture
+    def op(self, mocker):
+        return self.make_publish(mocker, 0)
+
+    @pytest.mark.it("Stores a durable MQTTPublishOperation and completes it successfully")
+    def test_stores(self, mocker, stage, op):
+        callback = op.callback_stack[0]
+        stage.run_op(op)
+        assert callback.call_args == mocker.call(op=op, error=None)
+        assert len(stage.store) == 1
+        assert not self.get_ops_sent_down(stage, pipeline_ops_mqtt.MQTTPublishOperation)
+
+    @pytest.mark.it("Sends a single ConnectOperation down while the connection is pending")
+    def test_connects(self, mocker, stage, op):
+        stage.run_op(op)
+        stage.run_op(self.make_publish(mocker, 1))
+        connect_ops = self.get_ops_sent_down(stage, pipeline_ops_base.ConnectOperation)
+        assert len(connect_ops) == 1
+
+        # Once the connection attempt is over, another stored op triggers a new one
+        connect_ops[0].complete(error=transport_exceptions.ConnectionFailedError())
+        stage.run_op(self.make_publish(mocker, 2))
+        assert len(self.get_ops_sent_down(stage, pipeline_ops_base.ConnectOperation)) == 2
+
+    @pytest.mark.it(
+        "Completes the op with an OperationError if the offline store is full and its overflow policy is 'reject_new'"
+    )
+    def test_store_full(self, mocker, stage, tmpdir):
+        stage.pipeline_root.pipeline_configuration.offline_store_options = OfflineStoreOptions(
+            path=str(tmpdir.join("full_store")),
+            max_size=256,
+            segment_size=128,
+            overflow_policy="reject_new",
+        )
+        ops = [self.make_publish(mocker, i) for i in range(10)]
+        for op in ops:
+            stage.run_op(op)
+        assert ops[0].error is None
+        assert isinstance(ops[-1].error, pipeline_exceptions.OperationError)
+
+    @pytest.mark.it(
+        "Stores a durable MQTTPublishOperation with an int or None payload as paho would send it"
+    )
+    @pytest.mark.parametrize(
+        "payload, expected_payload",
+        [pytest.param(5, b"5", id="int"), pytest.param(None, b"", id="None")],
+    )
+    def test_stores_converted_payload(self, mocker, stage, payload, expected_payload):
+        op = pipeline_ops_mqtt.MQTTPublishOperation(
+            topic="__fake_topic__", payload=payload, callback=mocker.MagicMock(), durable=True
+        )
+        stage.run_op(op)
+        assert op.completed
+        assert op.error is None
+        assert stage.store.read(1)[0].payload == expected_payload
+
+    @pytest.mark.it(
+        "Completes a durable MQTTPublishOperation with a TypeError, without storing it, if its payload is of an unsupported type"
+    )
+    def test_unsupported_payload(self, mocker, stage):
+        op = pipeline_ops_mqtt.MQTTPublishOperation(
+            topic="__fake_topic__", payload=object(), callback=mocker.MagicMock(), durable=True
+        )
+        stage.run_op(op)
+        assert op.completed
+        assert isinstance(op.error, TypeError)
+        assert len(stage.store) == 0
+        assert not self.get_ops_sent_down(stage, pipeline_ops_base.ConnectOperation)
+
+    @pytest.mark.it("Sends a durable MQTTPublishOperation down if there is no offline store")
+    def test_no_store(self, mocker, stage, op):
+        stage.pipeline_root.pipeline_configuration.offline_store_options = None
+        stage.run_op(op)
+        assert stage.send_op_down.call_args == mocker.call(op)
+
+
+@pytest.mark.describe(
+    "StoreAndForwardStage - .handle_pipeline_event() -- Called with ConnectedEvent"
+)
+class TestStoreAndForwardStageHandleConnectedEvent(
+    StoreAndForwardStageTestConfig, StageHandlePipelineEventTestBase
+):
+    @pytest.fixture
+    def event(self):
+        return pipeline_events_base.ConnectedEvent()
+
+    @pytest.fixture
+    def stage(self, mocker, cls_type, init_kwargs, offline_store_options):
+        stage = cls_type(**init_kwargs)
+        stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
+            pipeline_configuration=mocker.MagicMock()
+        )
+        stage.pipeline_root.pipeline_configuration.offline_store_options = offline_store_options
+        stage.send_op_down = mocker.MagicMock()
+
+        # The root marks the pipeline as connected when the event reaches it
+        def send_event_up(event):
+            if isinstance(event, pipeline_events_base.ConnectedEvent):
+                stage.pipeline_root.connected = True
+
+        stage.send_event_up = mocker.MagicMock(side_effect=send_event_up)
+        return stage
+
+    def store_publishes(self, mocker, stage, count):
+        for i in range(count):
+            stage.run_op(self.make_publish(mocker, i))
+        stage.send_op_down.reset_mock()
+
+    def get_payloads_sent_down(self, stage):
+        return [
+            op.payload
+            for op in self.get_ops_sent_down(stage, pipeline_ops_mqtt.MQTTPublishOperation)
+        ]
+
+    @pytest.mark.it("Sends the event up")
+    def test_sends_event_up(self, mocker, stage, event):
+        stage.handle_pipeline_event(event)
+        assert stage.send_event_up.call_args == mocker.call(event)
+
+    @pytest.mark.it("Sends stored publishes down in order, up to max_in_flight at a time")
+    def test_sends_stored_publishes(self, mocker, stage, event):
+        self.store_publishes(mocker, stage, 5)
+        stage.handle_pipeline_event(event)
+        assert self.get_payloads_sent_down(stage) == [b"payload-0", b"payload-1"]
+
+        sent = self.get_ops_sent_down(stage, pipeline_ops_mqtt.MQTTPublishOperation)
+        sent[0].complete()
+        assert self.get_payloads_sent_down(stage)[2:] == [b"payload-2"]
+        while True:
+            in_flight = [
+                op
+                for op in self.get_ops_sent_down(stage, pipeline_ops_mqtt.MQTTPublishOperation)
+                if not op.completed
+            ]
+            if not in_flight:
+                break
+            for op in in_flight:
+                op.complete()
+        assert self.get_payloads_sent_down(stage) == [
+            "payload-{}".format(i).encode("utf-8") for i in range(5)
+        ]
+        assert len(stage.store) == 0
+
+    @pytest.mark.it(
+        "Sends unacknowledged stored publishes again after the next ConnectedEvent if they fail while disconnected"
+    )
+    def test_resends_after_failure(self, mocker, stage, event, arbitrary_exception):
+        self.store_publishes(mocker, stage, 3)
+        stage.handle_pipeline_event(event)
+        first, second = self.get_ops_sent_down(stage, pipeline_ops_mqtt.MQTTPublishOperation)
+        first.complete()
+        stage.pipeline_root.connected = False
+        second.complete(error=arbitrary_exception)
+        third = self.get_ops_sent_down(stage, pipeline_ops_mqtt.MQTTPublishOperation)[2]
+        third.complete(error=arbitrary_exception)
+        assert len(stage.store) == 2
+
+        stage.send_op_down.reset_mock()
+        stage.handle_pipeline_event(pipeline_events_base.ConnectedEvent())
+        assert self.get_payloads_sent_down(stage) == [b"payload-1", b"payload-2"]
+
+    @pytest.mark.it("Sends publishes stored by a previous pipeline")
+    def test_sends_publishes_from_previous_pipeline(
+        self, mocker, stage, event, cls_type, init_kwargs
+    ):
+        previous_stage = cls_type(**init_kwargs)
+        previous_stage.pipeline_root = stage.pipeline_root
+        previous_stage.send_op_down = mocker.MagicMock()
+        for i in range(2):
+            previous_stage.run_op(self.make_publish(mocker, i))
+        previous_stage.store.close()
+
+        stage.handle_pipeline_event(event)
+        assert self.get_payloads_sent_down(stage) == [b"payload-0", b"payload-1"]
+
+
 #########################
 # CONNECTION LOCK STAGE #
 #########################
@@ -684,6 +1004,7 @@ class ConnectionLockStageTestConfig(object):
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.nonblocking_reauthorization = False
         stage.send_op_down = mocker.MagicMock()
         return stage
 
@@ -700,6 +1021,11 @@ class ConnectionLockStageInstantiationTests(ConnectionLockStageTestConfig):
         stage = pipeline_stages_base.ConnectionLockStage(**init_kwargs)
         assert not stage.blocked
 
+    @pytest.mark.it("Initializes 'blocked_by_reauthorize' as False")
+    def test_blocked_by_reauthorize(self, init_kwargs):
+        stage = pipeline_stages_base.ConnectionLockStage(**init_kwargs)
+        assert not stage.blocked_by_reauthorize
+
 
 pipeline_stage_test.add_base_pipeline_stage_tests(
     test_module=this_module,
@@ -880,6 +1206,7 @@ class TestConnectionLockStageRunOpWhileBlocked(ConnectionLockStageTestConfig, St
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.nonblocking_reauthorization = False
         stage.send_op_down = mocker.MagicMock()
         mocker.spy(stage, "run_op")
         assert not stage.blocked
@@ -971,6 +1298,92 @@ class TestConnectionLockStageRunOpWhileBlocked(ConnectionLockStageTestConfig, St
         assert not op4.completed
 
 
+@pytest.mark.describe(
+    "ConnectionLockStage - .run_op() -- Called while blocked by a ReauthorizeConnectionOperation, with nonblocking reauthorization enabled"
+)
+class TestConnectionLockStageRunOpWhileNonblockingReauthorize(
+    ConnectionLockStageTestConfig, StageRunOpTestBase
+):
+    @pytest.fixture
+    def reauthorize_op(self, mocker):
+        return pipeline_ops_base.ReauthorizeConnectionOperation(callback=mocker.MagicMock())
+
+    @pytest.fixture
+    def stage(self, mocker, init_kwargs, reauthorize_op):
+        stage = pipeline_stages_base.ConnectionLockStage(**init_kwargs)
+        stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
+            pipeline_configuration=mocker.MagicMock()
+        )
+        stage.pipeline_root.pipeline_configuration.nonblocking_reauthorization = True
+        stage.pipeline_root.connected = True
+        stage.send_op_down = mocker.MagicMock()
+
+        # Block the stage by running a reauthorize operation
+        stage.run_op(reauthorize_op)
+        assert stage.blocked
+        assert stage.blocked_by_reauthorize
+
+        stage.send_op_down.reset_mock()
+        return stage
+
+    @pytest.fixture
+    def op(self, arbitrary_op):
+        return arbitrary_op
+
+    @pytest.mark.it("Sends the operation down the pipeline without waiting for the reauthorization")
+    def test_sends_down(self, mocker, stage, op):
+        stage.run_op(op)
+
+        assert stage.queue.empty()
+        assert stage.send_op_down.call_count == 1
+        assert stage.send_op_down.call_args == mocker.call(op)
+
+    @pytest.mark.it("Adds connection operations to the queue, pending the reauthorization")
+    @pytest.mark.parametrize("op_cls", connection_ops)
+    def test_queues_connection_ops(self, mocker, stage, op_cls):
+        op = op_cls(callback=mocker.MagicMock())
+        stage.run_op(op)
+
+        assert stage.queue.qsize() == 1
+        assert stage.send_op_down.call_count == 0
+        assert not op.completed
+
+    @pytest.mark.it(
+        "Adds the operation to the queue if the stage is blocked by a connect or disconnect operation"
+    )
+    @pytest.mark.parametrize(
+        "blocking_op_cls, connected",
+        [
+            pytest.param(pipeline_ops_base.ConnectOperation, False, id="ConnectOperation"),
+            pytest.param(pipeline_ops_base.DisconnectOperation, True, id="DisconnectOperation"),
+        ],
+    )
+    def test_queues_when_blocked_by_other_op(
+        self, mocker, init_kwargs, op, blocking_op_cls, connected
+    ):
+        stage = pipeline_stages_base.ConnectionLockStage(**init_kwargs)
+        stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
+            pipeline_configuration=mocker.MagicMock()
+        )
+        stage.pipeline_root.pipeline_configuration.nonblocking_reauthorization = True
+        stage.pipeline_root.connected = connected
+        stage.send_op_down = mocker.MagicMock()
+        stage.run_op(blocking_op_cls(callback=mocker.MagicMock()))
+        stage.send_op_down.reset_mock()
+
+        stage.run_op(op)
+
+        assert stage.queue.qsize() == 1
+        assert stage.send_op_down.call_count == 0
+
+    @pytest.mark.it("Is no longer blocked by the reauthorization once it is complete")
+    def test_unblocked(self, mocker, stage, reauthorize_op):
+        reauthorize_op.complete()
+
+        assert not stage.blocked
+        assert not stage.blocked_by_reauthorize
+
+
 class ConnectionLockStageBlockingOpCompletedTestConfig(ConnectionLockStageTestConfig):
     @pytest.fixture(params=connection_ops)
     def blocking_op(self, mocker, request):
@@ -991,6 +1404,7 @@ class ConnectionLockStageBlockingOpCompletedTestConfig(ConnectionLockStageTestCo
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.nonblocking_reauthorization = False
         stage.send_op_down = mocker.MagicMock()
         mocker.spy(stage, "run_op")
         assert not stage.blocked
@@ -1905,6 +2319,7 @@ class RetryStageTestConfig(object):
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -1927,6 +2342,11 @@ class RetryStageInstantiationTests(RetryStageTestConfig):
         stage = pipeline_stages_base.RetryStage(**init_kwargs)
         assert stage.ops_waiting_to_retry == []
 
+    @pytest.mark.it("Initializes 'retry_budget' as None")
+    def test_retry_budget(self, init_kwargs):
+        stage = pipeline_stages_base.RetryStage(**init_kwargs)
+        assert stage.retry_budget is None
+
 
 pipeline_stage_test.add_base_pipeline_stage_tests(
     test_module=this_module,
@@ -2193,7 +2613,7 @@ class TestRetryStageRetryableOperationCompletedWithNonRetryableError(RetryStageT
         stage.run_op(op)
 
         # Artificially add a timer. Note that this is already mocked due to the 'mock_timer' fixture
-        op.retry_timer = threading.Timer(20, fake_callback)
+        op.retry_timer = timer_scheduler.Timer(20, fake_callback)
         assert op.retry_timer is mock_timer.return_value
 
         op.complete(error=error)
@@ -2229,7 +2649,7 @@ class TestRetryStageRetryableOperationCompletedSuccessfully(RetryStageTestConfig
         stage.run_op(op)
 
         # Artificially add a timer. Note that this is already mocked due to the 'mock_timer' fixture
-        op.retry_timer = threading.Timer(20, fake_callback)
+        op.retry_timer = timer_scheduler.Timer(20, fake_callback)
         assert op.retry_timer is mock_timer.return_value
 
         op.complete()
@@ -2282,6 +2702,89 @@ class TestRetryStageNonretryableOperationCompleted(RetryStageTestConfig):
         assert mock_timer.call_count == 0
 
 
+@pytest.mark.describe(
+    "RetryStage - OCCURANCE: Retryable operation completes with a retryable error when the pipeline configuration has a retry policy"
+)
+class TestRetryStageRetryableOperationCompletedWithRetryPolicy(RetryStageTestConfig):
+    @pytest.fixture(params=retryable_ops, ids=[x[0].__name__ for x in retryable_ops])
+    def op(self, request, mocker):
+        op_cls = request.param[0]
+        init_kwargs = request.param[1]
+        return op_cls(**init_kwargs)
+
+    @pytest.fixture
+    def error(self):
+        return pipeline_exceptions.PipelineTimeoutError()
+
+    @pytest.fixture
+    def policy(self, stage):
+        policy = RetryPolicy(initial_interval=2, max_interval=100, jitter=False, max_retries=2)
+        stage.pipeline_root.pipeline_configuration.retry_policy = policy
+        return policy
+
+    @pytest.mark.it(
+        "Starts a retry timer with the interval given by the retry policy, and records the retry on the operation"
+    )
+    def test_timer_interval(self, mocker, stage, op, error, policy, mock_timer):
+        stage.run_op(op)
+        op.complete(error=error)
+
+        assert not op.completed
+        assert mock_timer.call_count == 1
+        assert mock_timer.call_args == mocker.call(2, mocker.ANY)
+        assert op.retry_count == 1
+        assert op.retry_interval == 2
+
+    @pytest.mark.it("Backs off exponentially between retries of the same operation")
+    def test_backoff(self, mocker, stage, op, error, policy, mock_timer):
+        stage.run_op(op)
+        op.complete(error=error)
+        timer_callback = mock_timer.call_args[0][1]
+        timer_callback()
+        op.complete(error=error)
+
+        assert mock_timer.call_count == 2
+        assert mock_timer.call_args == mocker.call(4, mocker.ANY)
+        assert op.retry_count == 2
+
+    @pytest.mark.it(
+        "Completes the operation with the error once the retry policy allows no more retries"
+    )
+    def test_max_retries(self, mocker, stage, op, error, policy, mock_timer):
+        stage.run_op(op)
+        for _ in range(policy.max_retries):
+            op.complete(error=error)
+            timer_callback = mock_timer.call_args[0][1]
+            timer_callback()
+        op.complete(error=error)
+
+        assert op.completed
+        assert op.error is error
+        assert op not in stage.ops_waiting_to_retry
+        assert mock_timer.call_count == policy.max_retries
+
+    @pytest.mark.it("Completes the operation with the error once the retry budget is used up")
+    def test_retry_budget(self, mocker, stage, error, mock_timer):
+        stage.pipeline_root.pipeline_configuration.retry_policy = RetryPolicy(
+            retry_budget=1, retry_budget_refill_rate=0.001
+        )
+        op1 = pipeline_ops_mqtt.MQTTPublishOperation(
+            topic="fake_topic", payload="fake_payload", callback=fake_callback
+        )
+        op2 = pipeline_ops_mqtt.MQTTPublishOperation(
+            topic="fake_topic", payload="fake_payload", callback=fake_callback
+        )
+        stage.run_op(op1)
+        stage.run_op(op2)
+        op1.complete(error=error)
+        op2.complete(error=error)
+
+        assert not op1.completed
+        assert op2.completed
+        assert op2.error is error
+        assert mock_timer.call_count == 1
+
+
 ###################
 # RECONNECT STAGE #
 ###################
@@ -2302,6 +2805,7 @@ class ReconnectStageTestConfig(object):
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -2330,6 +2834,11 @@ class ReconnectStageInstantiationTests(ReconnectStageTestConfig):
         stage = cls_type(**init_kwargs)
         assert stage.reconnect_delay == 10
 
+    @pytest.mark.it("Initializes the 'reconnect_count' attribute as 0")
+    def test_reconnect_count(self, cls_type, init_kwargs):
+        stage = cls_type(**init_kwargs)
+        assert stage.reconnect_count == 0
+
 
 pipeline_stage_test.add_base_pipeline_stage_tests(
     test_module=this_module,
@@ -2347,6 +2856,7 @@ class TestReconnectStageRunOpWithConnectOperation(ReconnectStageTestConfig, Stag
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -2484,6 +2994,7 @@ class TestReconnectStageRunOpWithDisconnectOperation(ReconnectStageTestConfig, S
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -2643,6 +3154,7 @@ class TestReconnectStageRunOpWithArbitraryOperation(ReconnectStageTestConfig, St
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -2731,6 +3243,7 @@ class TestReconnectStageHandlePipelineEventWithConnectedEvent(
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -2804,6 +3317,7 @@ class TestReconnectStageHandlePipelineEventWithDisconnectedEvent(
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         stage.state = state
         stage.reconnect_timer = reconnect_timer
         mocker.spy(stage, "run_op")
@@ -2912,6 +3426,7 @@ class TestReconnectStageHandlePipelineEventWithArbitraryEvent(
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -2955,6 +3470,7 @@ class TestReconnectStageReconnectTimerExpires(ReconnectStageTestConfig):
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -3066,6 +3582,7 @@ class TestReconnectStageConnectOperationForReconnectIsCompleted(ReconnectStageTe
         stage.pipeline_root = pipeline_stages_base.PipelineRootStage(
             pipeline_configuration=mocker.MagicMock()
         )
+        stage.pipeline_root.pipeline_configuration.retry_policy = None
         mocker.spy(stage, "run_op")
         stage.send_op_down = mocker.MagicMock()
         stage.send_event_up = mocker.MagicMock()
@@ -3309,3 +3826,65 @@ class TestReconnectStageConnectOperationForReconnectIsCompleted(ReconnectStageTe
         connect_op.complete(error=transient_connect_exception)
         assert mock_timer.call_count == 1
         assert mock_timer.return_value.start.call_count == 1
+
+
+@pytest.mark.describe(
+    "ReconnectStage - OCCURANCE: Reconnect attempts when the pipeline configuration has a retry policy"
+)
+class TestReconnectStageWithRetryPolicy(ReconnectStageTestConfig):
+    @pytest.fixture
+    def policy(self, stage):
+        policy = RetryPolicy(initial_interval=1, max_interval=5, jitter=False)
+        stage.pipeline_root.pipeline_configuration.retry_policy = policy
+        return policy
+
+    @pytest.fixture
+    def disconnect(self, stage, mock_timer):
+        def disconnect():
+            # The stage must be connected in order to set a reconnect timer
+            stage.pipeline_root.connected = True
+            stage.handle_pipeline_event(pipeline_events_base.DisconnectedEvent())
+
+        return disconnect
+
+    def fail_reconnect(self, stage, mock_timer):
+        timer_callback = mock_timer.call_args[0][1]
+        timer_callback()
+        connect_op = stage.send_op_down.call_args[0][0]
+        connect_op.complete(error=transport_exceptions.ConnectionFailedError())
+
+    @pytest.mark.it("Waits the interval given by the retry policy before the first reconnect")
+    def test_first_delay(self, mocker, stage, policy, disconnect, mock_timer):
+        disconnect()
+        assert mock_timer.call_args == mocker.call(1, mocker.ANY)
+
+    @pytest.mark.it(
+        "Backs off exponentially, up to the maximum interval, while reconnect attempts keep failing"
+    )
+    def test_backoff(self, mocker, stage, policy, disconnect, mock_timer):
+        disconnect()
+        delays = [mock_timer.call_args[0][0]]
+        for _ in range(4):
+            self.fail_reconnect(stage, mock_timer)
+            delays.append(mock_timer.call_args[0][0])
+        assert delays == [1, 2, 4, 5, 5]
+
+    @pytest.mark.it("Starts backing off from the initial interval again after reconnecting")
+    def test_reset_on_success(self, mocker, stage, policy, disconnect, mock_timer):
+        disconnect()
+        self.fail_reconnect(stage, mock_timer)
+        timer_callback = mock_timer.call_args[0][1]
+        timer_callback()
+        stage.send_op_down.call_args[0][0].complete()
+        assert stage.reconnect_count == 0
+
+        disconnect()
+        assert mock_timer.call_args == mocker.call(1, mocker.ANY)
+
+    @pytest.mark.it("Keeps reconnecting regardless of the retry policy's maximum number of retries")
+    def test_max_retries_ignored(self, mocker, stage, disconnect, mock_timer):
+        stage.pipeline_root.pipeline_configuration.retry_policy = RetryPolicy(max_retries=0)
+        disconnect()
+        self.fail_reconnect(stage, mock_timer)
+        assert mock_timer.call_count == 2
+        assert stage.state == pipeline_stages_base.ReconnectState.WAITING_TO_RECONNECT
@@ -134,6 +134,8 @@ class TestHTTPTransportStageRunOpCalledWithSetHTTPConnectionArgsOperation(
             server_verification_cert=op.server_verification_cert,
             x509_cert=op.client_cert,
             cipher=cipher,
+            max_concurrent_requests=stage.pipeline_root.pipeline_configuration.http_max_concurrent_requests,
+            max_queued_requests=stage.pipeline_root.pipeline_configuration.http_max_queued_requests,
         )
         assert stage.transport is mock_transport.return_value
 
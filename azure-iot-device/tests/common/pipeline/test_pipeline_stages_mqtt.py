@@ -7,8 +7,7 @@ import logging
 import pytest
 import sys
 import six
-import threading
-from azure.iot.device.common import transport_exceptions, handle_exceptions
+from azure.iot.device.common import transport_exceptions, handle_exceptions, timer_scheduler
 from azure.iot.device.common.pipeline import (
     pipeline_ops_base,
     pipeline_stages_base,
@@ -17,6 +16,7 @@ from azure.iot.device.common.pipeline import (
     pipeline_events_mqtt,
     pipeline_stages_mqtt,
     pipeline_exceptions,
+    pipeline_thread,
     config,
 )
 from tests.common.pipeline.helpers import StageRunOpTestBase
@@ -40,7 +40,7 @@ def mock_transport(mocker):
 
 @pytest.fixture
 def mock_timer(mocker):
-    return mocker.patch.object(threading, "Timer")
+    return mocker.patch.object(timer_scheduler, "Timer")
 
 
 # Not a fixture, but used in parametrization
@@ -174,9 +174,22 @@ class TestMQTTTransportStageRunOpCalledWithSetMQTTConnectionArgsOperation(
             websockets=websockets,
             cipher=cipher,
             proxy_options=proxy_options,
+            event_loop=None,
         )
         assert stage.transport is mock_transport.return_value
 
+    @pytest.mark.it(
+        "Creates the MQTTTransport with the event loop driving the pipeline thread, if using the asyncio pipeline engine"
+    )
+    def test_creates_transport_with_event_loop(self, mocker, stage, op, mock_transport):
+        event_loop = mocker.MagicMock()
+        mocker.patch.object(pipeline_thread, "get_current_event_loop", return_value=event_loop)
+
+        stage.run_op(op)
+
+        assert mock_transport.call_count == 1
+        assert mock_transport.call_args[1]["event_loop"] is event_loop
+
     @pytest.mark.it("Sets event handlers on the newly created MQTTTransport")
     def test_sets_transport_handlers(self, mocker, stage, op, mock_transport):
         stage.run_op(op)
@@ -314,7 +327,6 @@ class TestMQTTTransportStageRunOpCalledWithConnectOperation(
 
         assert mock_timer.call_count == 1
         assert mock_timer.call_args == mocker.call(WATCHDOG_INTERVAL, mocker.ANY)
-        assert mock_timer.return_value.daemon is True
         assert mock_timer.return_value.start.call_count == 1
 
     @pytest.mark.it("Performs an MQTT connect via the MQTTTransport")
@@ -412,7 +424,6 @@ class TestMQTTTransportStageRunOpCalledWithReauthorizeConnectionOperation(
 
         assert mock_timer.call_count == 1
         assert mock_timer.call_args == mocker.call(WATCHDOG_INTERVAL, mocker.ANY)
-        assert mock_timer.return_value.daemon is True
         assert mock_timer.return_value.start.call_count == 1
 
     @pytest.mark.it("Performs an MQTT reconnect via the MQTTTransport")
@@ -0,0 +1,178 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import pytest
+import threading
+import logging
+from azure.iot.device.common.pipeline import pipeline_thread
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+def get_current_thread():
+    return threading.current_thread()
+
+
+class FakeStage(object):
+    def __init__(self, mocker, executor_group):
+        self.pipeline_root = mocker.MagicMock()
+        self.pipeline_root.pipeline_configuration.executor_group = executor_group
+
+    @pipeline_thread.invoke_on_pipeline_thread
+    def get_current_thread(self):
+        return threading.current_thread()
+
+
+@pytest.mark.describe("pipeline_thread - .invoke_on_pipeline_thread()")
+class TestInvokeOnPipelineThread(object):
+    @pytest.mark.it("Runs the decorated function on a thread named 'pipeline'")
+    @pytest.mark.parametrize(
+        "group", [pytest.param(None, id="Default group"), pytest.param("shard-1", id="Named group")]
+    )
+    def test_thread_name(self, group):
+        executors = pipeline_thread.get_group_executors(group)  # noqa: F841
+        thread = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group=group)()
+        assert thread is not threading.current_thread()
+        assert thread.name == "pipeline"
+
+    @pytest.mark.it("Runs the decorated function on the same thread for calls in the same group")
+    def test_same_group(self):
+        executors = pipeline_thread.get_group_executors("shard-1")  # noqa: F841
+        thread1 = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-1")()
+        thread2 = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-1")()
+        assert thread1 is thread2
+
+    @pytest.mark.it(
+        "Runs the decorated function on different threads for calls in different groups"
+    )
+    def test_different_groups(self):
+        executors1 = pipeline_thread.get_group_executors("shard-1")  # noqa: F841
+        executors2 = pipeline_thread.get_group_executors("shard-2")  # noqa: F841
+        thread_default = pipeline_thread.invoke_on_pipeline_thread(get_current_thread)()
+        thread1 = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-1")()
+        thread2 = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-2")()
+        assert len(set([thread_default, thread1, thread2])) == 3
+
+    @pytest.mark.it(
+        "Uses the executor group of the stage's pipeline configuration when decorating a stage method"
+    )
+    def test_group_from_stage(self, mocker):
+        executors = pipeline_thread.get_group_executors("shard-1")  # noqa: F841
+        stage = FakeStage(mocker, "shard-1")
+        thread = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-1")()
+        assert stage.get_current_thread() is thread
+
+    @pytest.mark.it(
+        "Uses the executor group of the current thread when decorating a function on a pipeline thread"
+    )
+    def test_group_from_decorating_thread(self):
+        executors = pipeline_thread.get_group_executors("shard-1")  # noqa: F841
+
+        def decorate():
+            return pipeline_thread.invoke_on_pipeline_thread_nowait(get_current_thread)
+
+        decorated = pipeline_thread.invoke_on_pipeline_thread(decorate, group="shard-1")()
+        thread = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-1")()
+        assert decorated().result() is thread
+
+    @pytest.mark.it("Runs the function inline if already on the pipeline thread of the same group")
+    def test_inline_same_group(self):
+        executors = pipeline_thread.get_group_executors("shard-1")  # noqa: F841
+
+        def nested():
+            outer = threading.current_thread()
+            inner = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-1")()
+            return outer, inner
+
+        outer, inner = pipeline_thread.invoke_on_pipeline_thread(nested, group="shard-1")()
+        assert outer is inner
+
+    @pytest.mark.it("Switches threads if called from the pipeline thread of a different group")
+    def test_switch_between_groups(self):
+        executors1 = pipeline_thread.get_group_executors("shard-1")  # noqa: F841
+        executors2 = pipeline_thread.get_group_executors("shard-2")  # noqa: F841
+
+        def nested():
+            outer = threading.current_thread()
+            inner = pipeline_thread.invoke_on_pipeline_thread(get_current_thread, group="shard-2")()
+            return outer, inner
+
+        outer, inner = pipeline_thread.invoke_on_pipeline_thread(nested, group="shard-1")()
+        assert outer is not inner
+        assert inner.name == "pipeline"
+
+    @pytest.mark.it("Re-raises exceptions raised by the decorated function")
+    def test_raises(self, arbitrary_exception):
+        def raise_exception():
+            raise arbitrary_exception
+
+        with pytest.raises(type(arbitrary_exception)) as e_info:
+            pipeline_thread.invoke_on_pipeline_thread(raise_exception, group="shard-1")()
+        assert e_info.value is arbitrary_exception
+
+
+@pytest.mark.describe("pipeline_thread - .invoke_on_callback_thread_nowait()")
+class TestInvokeOnCallbackThreadNowait(object):
+    @pytest.mark.it("Runs the decorated function on the 'callback' thread of the given group")
+    def test_group(self):
+        executors = pipeline_thread.get_group_executors("shard-1")  # noqa: F841
+        default_thread = pipeline_thread.invoke_on_callback_thread_nowait(get_current_thread)()
+        group_thread = pipeline_thread.invoke_on_callback_thread_nowait(
+            get_current_thread, group="shard-1"
+        )()
+        assert default_thread.result().name == "callback"
+        assert group_thread.result().name == "callback"
+        assert default_thread.result() is not group_thread.result()
+
+
+@pytest.mark.describe("pipeline_thread - .get_group_executors()")
+class TestGetGroupExecutors(object):
+    @pytest.mark.it("Returns the same executors for the same group while they are in use")
+    def test_same_executors(self):
+        executors = pipeline_thread.get_group_executors("shard-1")
+        assert pipeline_thread.get_group_executors("shard-1") == executors
+
+    @pytest.mark.it("Returns different executors for different groups")
+    def test_different_executors(self):
+        executors1 = pipeline_thread.get_group_executors("shard-1")
+        executors2 = pipeline_thread.get_group_executors("shard-2")
+        assert not set(executors1) & set(executors2)
+
+    @pytest.mark.it("Runs the pipeline thread of the group as an event loop for the asyncio engine")
+    def test_asyncio_engine(self):
+        executors = pipeline_thread.get_group_executors(
+            "asyncio-shard", pipeline_thread.ASYNCIO_ENGINE
+        )
+        event_loop = pipeline_thread.invoke_on_pipeline_thread(
+            pipeline_thread.get_current_event_loop, group="asyncio-shard"
+        )()
+        assert event_loop is executors[0].event_loop
+        assert event_loop.is_running()
+        # Callbacks into user code still run on a plain worker thread
+        assert (
+            pipeline_thread.invoke_on_callback_thread_nowait(
+                pipeline_thread.get_current_event_loop, group="asyncio-shard"
+            )().result()
+            is None
+        )
+
+    @pytest.mark.it("Raises ValueError if the group is already in use with a different engine")
+    def test_engine_mismatch(self):
+        executors = pipeline_thread.get_group_executors(  # noqa: F841
+            "asyncio-shard", pipeline_thread.ASYNCIO_ENGINE
+        )
+        with pytest.raises(ValueError):
+            pipeline_thread.get_group_executors("asyncio-shard", pipeline_thread.THREAD_ENGINE)
+
+
+@pytest.mark.describe("pipeline_thread - .get_current_event_loop()")
+class TestGetCurrentEventLoop(object):
+    @pytest.mark.it("Returns None if the current thread is not driven by an event loop")
+    def test_no_event_loop(self):
+        assert pipeline_thread.get_current_event_loop() is None
+        assert (
+            pipeline_thread.invoke_on_pipeline_thread(pipeline_thread.get_current_event_loop)()
+            is None
+        )
@@ -0,0 +1,157 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import pytest
+import threading
+import logging
+from six.moves import queue
+from azure.iot.device.common.fair_executor import FairExecutor
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+class BlockedExecutor(object):
+    """Wraps a single worker FairExecutor whose worker is kept busy until unblock() is called"""
+
+    def __init__(self, max_queue_size=100):
+        self.executor = FairExecutor(
+            max_workers=1, max_queue_size=max_queue_size, thread_name="fair_test"
+        )
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+        def block():
+            self.started.set()
+            self.release.wait()
+
+        self.blocker = self.executor.submit("blocker", block)
+        assert self.started.wait(5)
+
+    def unblock(self):
+        self.release.set()
+        self.blocker.result()
+
+
+@pytest.mark.describe("FairExecutor")
+class TestFairExecutor(object):
+    @pytest.mark.it("Runs the submitted function on a worker thread and returns its result")
+    def test_result(self):
+        executor = FairExecutor(max_workers=2, max_queue_size=10, thread_name="fair_test")
+        future = executor.submit("key", lambda x, y: (x + y, threading.current_thread()), 1, y=2)
+        result, thread = future.result()
+        assert result == 3
+        assert thread is not threading.current_thread()
+        assert thread.name == "fair_test"
+
+    @pytest.mark.it("Sets the exception raised by the submitted function on the returned future")
+    def test_exception(self, arbitrary_exception):
+        executor = FairExecutor(max_workers=1, max_queue_size=10, thread_name="fair_test")
+
+        def raise_exception():
+            raise arbitrary_exception
+
+        future = executor.submit("key", raise_exception)
+        assert future.exception() is arbitrary_exception
+
+    @pytest.mark.it("Runs up to max_workers functions at the same time")
+    def test_max_workers(self):
+        executor = FairExecutor(max_workers=3, max_queue_size=10, thread_name="fair_test")
+        release = threading.Event()
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            release.wait(0.2)
+            with lock:
+                running[0] -= 1
+
+        futures = [executor.submit("key", work) for _ in range(6)]
+        for future in futures:
+            future.result()
+        assert max_running[0] == 3
+        assert len(executor._workers) == 3
+
+    @pytest.mark.it("Takes pending work from each key in turn")
+    def test_round_robin(self):
+        blocked = BlockedExecutor()
+        order = []
+        futures = [blocked.executor.submit("a", order.append, "a{}".format(i)) for i in range(3)]
+        futures += [blocked.executor.submit("b", order.append, "b{}".format(i)) for i in range(2)]
+        blocked.unblock()
+        for future in futures:
+            future.result()
+        assert order == ["a0", "b0", "a1", "b1", "a2"]
+
+    @pytest.mark.it("Raises queue.Full if max_queue_size work items are already pending")
+    def test_queue_full(self):
+        blocked = BlockedExecutor(max_queue_size=2)
+        futures = [blocked.executor.submit("key", lambda: None) for _ in range(2)]
+        with pytest.raises(queue.Full):
+            blocked.executor.submit("other_key", lambda: None)
+        blocked.unblock()
+        for future in futures:
+            future.result()
+        # Space is available again once pending work has run
+        blocked.executor.submit("key", lambda: None).result()
+
+    @pytest.mark.it(
+        "Accepts work items which a free worker can take, whatever max_queue_size is, including 0"
+    )
+    def test_free_workers_not_limited_by_queue_size(self):
+        executor = FairExecutor(max_workers=2, max_queue_size=0, thread_name="fair_test")
+        started = [threading.Event(), threading.Event()]
+        release = threading.Event()
+
+        def block(started_event):
+            started_event.set()
+            release.wait()
+
+        futures = [executor.submit("key", block, started_event) for started_event in started]
+        with pytest.raises(queue.Full):
+            executor.submit("key", lambda: None)
+        for started_event in started:
+            assert started_event.wait(5)
+        with pytest.raises(queue.Full):
+            executor.submit("key", lambda: None)
+        release.set()
+        for future in futures:
+            future.result()
+        # Once a worker is free again, it accepts work
+        executor.submit("key", lambda: None).result()
+
+    @pytest.mark.it("Raises queue.Full only once the pending work items fill max_queue_size")
+    def test_queue_full_with_free_workers(self):
+        executor = FairExecutor(max_workers=2, max_queue_size=1, thread_name="fair_test")
+        release = threading.Event()
+        futures = [executor.submit("key", release.wait) for _ in range(3)]
+        with pytest.raises(queue.Full):
+            executor.submit("key", lambda: None)
+        release.set()
+        for future in futures:
+            future.result()
+
+    @pytest.mark.it("Does not run work items which were cancelled before starting")
+    def test_cancel(self, mocker):
+        blocked = BlockedExecutor()
+        fn = mocker.MagicMock()
+        future = blocked.executor.submit("key", fn)
+        assert future.cancel()
+        blocked.unblock()
+        blocked.executor.submit("key", lambda: None).result()
+        assert fn.call_count == 0
+
+    @pytest.mark.it("Raises ValueError if max_workers is less than 1")
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError):
+            FairExecutor(max_workers=0, max_queue_size=10, thread_name="fair_test")
+
+    @pytest.mark.it("Raises ValueError if max_queue_size is negative")
+    def test_invalid_max_queue_size(self):
+        with pytest.raises(ValueError):
+            FairExecutor(max_workers=1, max_queue_size=-1, thread_name="fair_test")
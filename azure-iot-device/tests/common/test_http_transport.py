@@ -9,10 +9,13 @@ from azure.iot.device.common.http_transport import HTTPTransport
 from azure.iot.device.common.models.x509 import X509
 from six.moves import http_client
 from azure.iot.device.common import transport_exceptions as errors
+from azure.iot.device.common import ssl_context_cache
 import pytest
 import logging
 import ssl
+import socket
 import threading
+import time
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -27,6 +30,14 @@ fake_x509_cert = "__fake_x509_certificate__"
 fake_cipher = "DHE-RSA-AES128-SHA"
 
 
+@pytest.fixture(autouse=True)
+def clear_ssl_context_cache():
+    # Tests which mock SSLContext must not get a context cached by another test
+    ssl_context_cache.clear()
+    yield
+    ssl_context_cache.clear()
+
+
 @pytest.mark.describe("HTTPTransport - Instantiation")
 class TestInstantiation(object):
     @pytest.mark.it("Sets the proper required instance parameters")
@@ -112,15 +123,30 @@ class TestInstantiation(object):
             fake_client_cert.pass_phrase,
         )
 
+    @pytest.mark.it(
+        "Shares the TLS/SSL context with other transports using the same certificates and cipher"
+    )
+    def test_shares_tls_context(self, mocker):
+        mock_ssl_context_constructor = mocker.patch.object(ssl, "SSLContext")
+
+        transport1 = HTTPTransport(hostname=fake_hostname, cipher=fake_cipher)
+        transport2 = HTTPTransport(hostname="other_hostname", cipher=fake_cipher)
+
+        assert mock_ssl_context_constructor.call_count == 1
+        assert transport1._ssl_context is transport2._ssl_context
+
 
 class HTTPTransportTestConfig(object):
     @pytest.fixture
     def mock_http_client_constructor(self, mocker):
         mocker.patch.object(ssl, "SSLContext").return_value
         mocker.patch.object(HTTPTransport, "_create_ssl_context").return_value
-        mock_client_constructor = mocker.patch.object(http_client, "HTTPSConnection", autospec=True)
+        mock_client_constructor = mocker.patch.object(
+            http_transport, "PooledHTTPSConnection", autospec=True
+        )
         mock_client = mock_client_constructor.return_value
         response_value = mock_client.getresponse.return_value
+        response_value.will_close = True
         response_value.status = 1234
         response_value.reason = "__fake_reason__"
         response_value.read.return_value = "__fake_response_read_value__"
@@ -129,15 +155,142 @@ class HTTPTransportTestConfig(object):
 
 @pytest.mark.describe("HTTPTransport - .request()")
 class TestRequest(HTTPTransportTestConfig):
-    @pytest.mark.it("Generates a unique HTTP Client connection for each request")
+    @pytest.mark.it(
+        "Generates a new HTTP Client connection for each request if the server does not keep connections alive"
+    )
     def test_creates_http_connection_object(self, mocker, mock_http_client_constructor):
         transport = HTTPTransport(hostname=fake_hostname)
         # We call .result because we need to block for the Future to complete before moving on.
         transport.request(fake_method, fake_path, mocker.MagicMock()).result()
         assert mock_http_client_constructor.call_count == 1
+        assert mock_http_client_constructor.return_value.close.call_count == 1
+
+        transport.request(fake_method, fake_path, mocker.MagicMock()).result()
+        assert mock_http_client_constructor.call_count == 2
+
+    @pytest.mark.it(
+        "Reuses the HTTP Client connection for subsequent requests if the server keeps it alive"
+    )
+    def test_reuses_http_connection_object(self, mocker, mock_http_client_constructor):
+        mock_client = mock_http_client_constructor.return_value
+        mock_client.getresponse.return_value.will_close = False
+        transport = HTTPTransport(hostname=fake_hostname)
 
         transport.request(fake_method, fake_path, mocker.MagicMock()).result()
+        transport.request(fake_method, fake_path, mocker.MagicMock()).result()
+
+        assert mock_http_client_constructor.call_count == 1
+        assert mock_client.request.call_count == 2
+        assert mock_client.close.call_count == 0
+
+    @pytest.mark.it(
+        "Retries an idempotent request on a new HTTP Client connection if a reused connection fails while waiting for the response"
+    )
+    @pytest.mark.parametrize(
+        "stale_error",
+        [
+            pytest.param(http_client.BadStatusLine(""), id="BadStatusLine"),
+            pytest.param(socket.error("Connection reset"), id="socket.error"),
+        ],
+    )
+    @pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+    def test_reconnects_on_stale_connection(
+        self, mocker, mock_http_client_constructor, stale_error, method
+    ):
+        mock_client = mock_http_client_constructor.return_value
+        mock_client.getresponse.return_value.will_close = False
+        transport = HTTPTransport(hostname=fake_hostname)
+        transport.request(method, fake_path, mocker.MagicMock()).result()
+
+        mock_client.getresponse.side_effect = [stale_error, mock_client.getresponse.return_value]
+        cb = mocker.MagicMock()
+        transport.request(method, fake_path, cb).result()
+
+        assert mock_http_client_constructor.call_count == 2
+        assert mock_client.request.call_count == 3
+        assert mock_client.close.call_count == 1
+        assert cb.call_args[1]["response"]["status_code"] == 1234
+
+    @pytest.mark.it(
+        "Retries any request on a new HTTP Client connection if a reused connection fails while the request is being written"
+    )
+    @pytest.mark.parametrize(
+        "stale_error",
+        [
+            pytest.param(http_client.BadStatusLine(""), id="BadStatusLine"),
+            pytest.param(socket.error("Broken pipe"), id="socket.error"),
+        ],
+    )
+    def test_reconnects_on_stale_connection_request_not_sent(
+        self, mocker, mock_http_client_constructor, stale_error
+    ):
+        mock_client = mock_http_client_constructor.return_value
+        mock_client.getresponse.return_value.will_close = False
+        transport = HTTPTransport(hostname=fake_hostname)
+        transport.request("POST", fake_path, mocker.MagicMock()).result()
+
+        mock_client.request.side_effect = [stale_error, None]
+        cb = mocker.MagicMock()
+        transport.request("POST", fake_path, cb).result()
+
         assert mock_http_client_constructor.call_count == 2
+        assert mock_client.request.call_count == 3
+        assert cb.call_args[1]["response"]["status_code"] == 1234
+
+    @pytest.mark.it(
+        "Raises a ProtocolClientError without sending a non-idempotent request again if a reused connection fails while waiting for the response"
+    )
+    @pytest.mark.parametrize(
+        "stale_error",
+        [
+            pytest.param(http_client.BadStatusLine(""), id="BadStatusLine"),
+            pytest.param(socket.error("Connection reset"), id="socket.error"),
+        ],
+    )
+    def test_no_retry_post_after_sent(self, mocker, mock_http_client_constructor, stale_error):
+        mock_client = mock_http_client_constructor.return_value
+        mock_client.getresponse.return_value.will_close = False
+        transport = HTTPTransport(hostname=fake_hostname)
+        transport.request("POST", fake_path, mocker.MagicMock()).result()
+
+        mock_client.getresponse.side_effect = stale_error
+        cb = mocker.MagicMock()
+        transport.request("POST", fake_path, cb).result()
+
+        assert mock_http_client_constructor.call_count == 1
+        assert mock_client.request.call_count == 2
+        assert isinstance(cb.call_args[1]["error"], errors.ProtocolClientError)
+        assert cb.call_args[1]["error"].__cause__ is stale_error
+
+    @pytest.mark.it(
+        "Raises a ProtocolClientError with the original error if writing the request to a new connection fails"
+    )
+    def test_request_not_sent_on_new_connection(self, mocker, mock_http_client_constructor):
+        mock_client = mock_http_client_constructor.return_value
+        error = socket.error("Broken pipe")
+        mock_client.request.side_effect = error
+        transport = HTTPTransport(hostname=fake_hostname)
+        cb = mocker.MagicMock()
+
+        transport.request("POST", fake_path, cb).result()
+
+        assert mock_http_client_constructor.call_count == 1
+        assert isinstance(cb.call_args[1]["error"], errors.ProtocolClientError)
+        assert cb.call_args[1]["error"].__cause__ is error
+
+    @pytest.mark.it(
+        "Raises a ProtocolClientError without retrying if a newly created connection fails"
+    )
+    def test_no_retry_on_new_connection(self, mocker, mock_http_client_constructor):
+        mock_client = mock_http_client_constructor.return_value
+        mock_client.getresponse.side_effect = socket.error("Connection reset")
+        transport = HTTPTransport(hostname=fake_hostname)
+        cb = mocker.MagicMock()
+
+        transport.request(fake_method, fake_path, cb).result()
+
+        assert mock_http_client_constructor.call_count == 1
+        assert isinstance(cb.call_args[1]["error"], errors.ProtocolClientError)
 
     @pytest.mark.it("Uses the HTTP Transport SSL Context.")
     def test_uses_ssl_context(self, mocker, mock_http_client_constructor):
@@ -294,3 +447,191 @@ class TestRequest(HTTPTransportTestConfig):
         error = cb.call_args[1]["error"]
         assert isinstance(error, errors.ProtocolClientError)
         assert error.__cause__ is arbitrary_exception
+
+    @pytest.mark.it("Sends up to max_concurrent_requests requests at the same time")
+    def test_concurrent_requests(self, mocker, mock_http_client_constructor):
+        mock_client = mock_http_client_constructor.return_value
+        response = mock_client.getresponse.return_value
+        release = threading.Event()
+        lock = threading.Lock()
+        in_flight = [0]
+
+        def getresponse():
+            with lock:
+                in_flight[0] += 1
+            release.wait()
+            return response
+
+        mock_client.getresponse.side_effect = getresponse
+        transport = HTTPTransport(hostname=fake_hostname, max_concurrent_requests=3)
+        futures = [transport.request(fake_method, fake_path, mocker.MagicMock()) for _ in range(5)]
+
+        deadline = time.time() + 5
+        while in_flight[0] < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert in_flight[0] == 3
+
+        release.set()
+        for future in futures:
+            future.result()
+        assert in_flight[0] == 5
+
+    @pytest.mark.it(
+        "Calls the callback with a ProtocolClientError if max_queued_requests requests are already waiting"
+    )
+    def test_queue_full(self, mocker, mock_http_client_constructor):
+        mock_client = mock_http_client_constructor.return_value
+        response = mock_client.getresponse.return_value
+        started = threading.Event()
+        release = threading.Event()
+
+        def getresponse():
+            started.set()
+            release.wait()
+            return response
+
+        mock_client.getresponse.side_effect = getresponse
+        transport = HTTPTransport(
+            hostname=fake_hostname, max_concurrent_requests=1, max_queued_requests=1
+        )
+        running = transport.request(fake_method, fake_path, mocker.MagicMock())
+        assert started.wait(5)
+        queued = transport.request(fake_method, fake_path, mocker.MagicMock())
+
+        cb = mocker.MagicMock()
+        transport.request(fake_method, fake_path, cb).result()
+        assert cb.call_count == 1
+        assert isinstance(cb.call_args[1]["error"], errors.ProtocolClientError)
+        assert mock_client.request.call_count == 1
+
+        release.set()
+        running.result()
+        queued.result()
+        assert mock_client.request.call_count == 2
+
+    @pytest.mark.it("Shares worker threads between transports with the same request limits")
+    def test_shared_executor(self):
+        transport1 = HTTPTransport(hostname=fake_hostname, max_concurrent_requests=2)
+        transport2 = HTTPTransport(hostname=fake_hostname, max_concurrent_requests=2)
+        transport3 = HTTPTransport(hostname=fake_hostname, max_concurrent_requests=4)
+        assert transport1._executor is transport2._executor
+        assert transport1._executor is not transport3._executor
+
+
+@pytest.mark.describe("HTTPSConnectionPool")
+class TestHTTPSConnectionPool(object):
+    @pytest.fixture
+    def mock_connection_constructor(self, mocker):
+        return mocker.patch.object(
+            http_transport,
+            "PooledHTTPSConnection",
+            side_effect=lambda *args, **kwargs: mocker.MagicMock(),
+        )
+
+    @pytest.fixture
+    def pool(self, mocker, mock_connection_constructor):
+        return http_transport.HTTPSConnectionPool(
+            fake_hostname, mocker.MagicMock(), max_size=2, idle_timeout=60
+        )
+
+    @pytest.mark.it("Creates a new connection if there are no idle connections")
+    def test_new_connection(self, mocker, pool, mock_connection_constructor):
+        connection, reused = pool.get_connection()
+
+        assert mock_connection_constructor.call_count == 1
+        assert mock_connection_constructor.call_args == mocker.call(
+            fake_hostname, context=pool._ssl_context, tls_session=None
+        )
+        assert reused is False
+
+    @pytest.mark.it("Reuses released connections, most recently used first")
+    def test_reuse(self, pool, mock_connection_constructor):
+        connection1, _ = pool.get_connection()
+        connection2, _ = pool.get_connection()
+        pool.release_connection(connection1)
+        pool.release_connection(connection2)
+
+        assert pool.get_connection() == (connection2, True)
+        assert pool.get_connection() == (connection1, True)
+        assert mock_connection_constructor.call_count == 2
+
+    @pytest.mark.it("Closes released connections instead of keeping them if the pool is full")
+    def test_max_size(self, pool):
+        connections = [pool.get_connection()[0] for _ in range(3)]
+        for connection in connections:
+            pool.release_connection(connection)
+
+        assert connections[0].close.call_count == 0
+        assert connections[1].close.call_count == 0
+        assert connections[2].close.call_count == 1
+
+    @pytest.mark.it("Closes connections which have been idle for longer than the idle timeout")
+    def test_idle_eviction(self, mocker, pool, mock_connection_constructor):
+        mock_time = mocker.patch.object(time, "time", return_value=1000)
+        connection, _ = pool.get_connection()
+        pool.release_connection(connection)
+
+        mock_time.return_value = 1000 + pool.idle_timeout + 1
+        new_connection, reused = pool.get_connection()
+
+        assert connection.close.call_count == 1
+        assert new_connection is not connection
+        assert reused is False
+
+    @pytest.mark.it("Creates new connections with the TLS session of the last released connection")
+    def test_tls_session(self, pool, mock_connection_constructor):
+        connection, _ = pool.get_connection()
+        pool.release_connection(connection)
+        pool.clear()
+
+        pool.get_connection()
+
+        assert mock_connection_constructor.call_args[1]["tls_session"] is connection.sock.session
+
+    @pytest.mark.it("Closes all idle connections when cleared")
+    def test_clear(self, pool):
+        connections = [pool.get_connection()[0] for _ in range(2)]
+        for connection in connections:
+            pool.release_connection(connection)
+
+        pool.clear()
+
+        for connection in connections:
+            assert connection.close.call_count == 1
+        assert pool.get_connection()[1] is False
+
+
+@pytest.mark.describe("PooledHTTPSConnection - .connect()")
+class TestPooledHTTPSConnectionConnect(object):
+    @pytest.mark.it("Performs a regular connect if there is no TLS session to resume")
+    def test_no_session(self, mocker):
+        mock_connect = mocker.patch.object(http_client.HTTPSConnection, "connect")
+        connection = http_transport.PooledHTTPSConnection(fake_hostname, context=mocker.MagicMock())
+
+        connection.connect()
+
+        assert mock_connect.call_count == 1
+
+    @pytest.mark.it("Resumes the provided TLS session when performing the TLS handshake")
+    @pytest.mark.skipif(
+        not hasattr(ssl.SSLSocket, "session"), reason="TLS session resumption not supported"
+    )
+    def test_resumes_session(self, mocker):
+        mock_tcp_connect = mocker.patch.object(http_client.HTTPConnection, "connect")
+        mock_context = mocker.MagicMock()
+        tls_session = mocker.MagicMock()
+        connection = http_transport.PooledHTTPSConnection(
+            fake_hostname, context=mock_context, tls_session=tls_session
+        )
+        tcp_sock = mocker.MagicMock()
+        connection.sock = tcp_sock
+
+        connection.connect()
+
+        assert mock_tcp_connect.call_count == 1
+        assert mock_context.wrap_socket.call_count == 1
+        assert mock_context.wrap_socket.call_args == mocker.call(
+            tcp_sock, server_hostname=fake_hostname, session=tls_session
+        )
+        assert connection.sock is mock_context.wrap_socket.return_value
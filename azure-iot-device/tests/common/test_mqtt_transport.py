@@ -8,6 +8,7 @@ import azure.iot.device.common.mqtt_transport as mqtt_transport
 from azure.iot.device.common.mqtt_transport import MQTTTransport, OperationManager
 from azure.iot.device.common.models.x509 import X509
 from azure.iot.device.common import transport_exceptions as errors
+from azure.iot.device.common import ssl_context_cache
 import paho.mqtt.client as mqtt
 import ssl
 import copy
@@ -124,6 +125,14 @@ operation_return_codes = [
 ]
 
 
+@pytest.fixture(autouse=True)
+def clear_ssl_context_cache():
+    # Tests which mock SSLContext must not get a context cached by another test
+    ssl_context_cache.clear()
+    yield
+    ssl_context_cache.clear()
+
+
 @pytest.fixture
 def mock_mqtt_client(mocker, fake_paho_thread):
     mock = mocker.patch.object(mqtt, "Client")
@@ -223,9 +232,13 @@ class TestInstantiation(object):
         assert mock_ssl_context.check_hostname is True
         assert mock_ssl_context.verify_mode == ssl.CERT_REQUIRED
 
-        # Verify context has been set
+        # Verify context has been set, wrapped so that TLS sessions are resumed if supported
         assert mock_mqtt_client.tls_set_context.call_count == 1
-        assert mock_mqtt_client.tls_set_context.call_args == mocker.call(context=mock_ssl_context)
+        context = mock_mqtt_client.tls_set_context.call_args[1]["context"]
+        if mqtt_transport.TLS_SESSION_RESUMPTION_SUPPORTED:
+            assert context.ssl_context is mock_ssl_context
+        else:
+            assert context is mock_ssl_context
 
     @pytest.mark.it(
         "Configures TLS/SSL context using default certificates if protocol wrapper not instantiated with a server verification certificate"
@@ -299,6 +312,25 @@ class TestInstantiation(object):
             fake_client_cert.pass_phrase,
         )
 
+    @pytest.mark.it(
+        "Shares the TLS/SSL context with other transports using the same certificates and cipher"
+    )
+    def test_shares_tls_context(self, mocker):
+        mock_mqtt_client = mocker.patch.object(mqtt, "Client").return_value
+        mock_ssl_context_constructor = mocker.patch.object(ssl, "SSLContext")
+
+        MQTTTransport(client_id=fake_device_id, hostname=fake_hostname, username=fake_username)
+        MQTTTransport(client_id="other_device", hostname=fake_hostname, username=fake_username)
+
+        assert mock_ssl_context_constructor.call_count == 1
+        contexts = [
+            call[1]["context"].ssl_context
+            if mqtt_transport.TLS_SESSION_RESUMPTION_SUPPORTED
+            else call[1]["context"]
+            for call in mock_mqtt_client.tls_set_context.call_args_list
+        ]
+        assert contexts == [mock_ssl_context_constructor.return_value] * 2
+
     @pytest.mark.it("Sets Paho MQTT Client callbacks")
     def test_sets_paho_callbacks(self, mocker):
         mock_mqtt_client = mocker.patch.object(mqtt, "Client").return_value
@@ -768,6 +800,129 @@ class TestEventConnectComplete(object):
         assert e_info.value is arbitrary_base_exception
 
 
+@pytest.mark.skipif(
+    not mqtt_transport.TLS_SESSION_RESUMPTION_SUPPORTED,
+    reason="TLS session resumption requires Python 3.6+",
+)
+@pytest.mark.describe("MQTTTransport - TLS session resumption")
+class TestTLSSessionResumption(object):
+    @pytest.fixture
+    def mock_ssl_context(self, mocker):
+        return mocker.patch.object(ssl, "SSLContext").return_value
+
+    @pytest.fixture
+    def context(self, mocker, mock_mqtt_client, mock_ssl_context):
+        MQTTTransport(client_id=fake_device_id, hostname=fake_hostname, username=fake_username)
+        return mock_mqtt_client.tls_set_context.call_args[1]["context"]
+
+    @pytest.fixture
+    def transport(self, mock_mqtt_client, mock_ssl_context):
+        return MQTTTransport(
+            client_id=fake_device_id, hostname=fake_hostname, username=fake_username
+        )
+
+    @pytest.mark.it("Wraps sockets without a TLS session before the first connection")
+    def test_first_connection(self, mocker, context, mock_ssl_context):
+        sock = mocker.MagicMock()
+        context.wrap_socket(sock, server_hostname=fake_hostname)
+        assert mock_ssl_context.wrap_socket.call_args == mocker.call(
+            sock, server_hostname=fake_hostname
+        )
+
+    @pytest.mark.it("Wraps sockets with the saved TLS session to resume it")
+    def test_resumes_session(self, mocker, context, mock_ssl_context):
+        sock = mocker.MagicMock()
+        context.session = mocker.sentinel.session
+        context.wrap_socket(sock, server_hostname=fake_hostname)
+        assert mock_ssl_context.wrap_socket.call_args == mocker.call(
+            sock, server_hostname=fake_hostname, session=mocker.sentinel.session
+        )
+
+    @pytest.mark.it(
+        "Wraps sockets before the first connection with the TLS session saved by another transport using the same SSLContext and hostname"
+    )
+    def test_resumes_shared_session(self, mocker, context, mock_ssl_context):
+        sock = mocker.MagicMock()
+        ssl_context_cache.save_tls_session(
+            mock_ssl_context, fake_hostname, mocker.sentinel.shared_session
+        )
+        context.wrap_socket(sock, server_hostname=fake_hostname)
+        assert mock_ssl_context.wrap_socket.call_args == mocker.call(
+            sock, server_hostname=fake_hostname, session=mocker.sentinel.shared_session
+        )
+
+    @pytest.mark.it("Prefers its own saved TLS session over one saved by another transport")
+    def test_own_session_preferred(self, mocker, context, mock_ssl_context):
+        sock = mocker.MagicMock()
+        ssl_context_cache.save_tls_session(
+            mock_ssl_context, fake_hostname, mocker.sentinel.shared_session
+        )
+        context.session = mocker.sentinel.session
+        context.wrap_socket(sock, server_hostname=fake_hostname)
+        assert mock_ssl_context.wrap_socket.call_args == mocker.call(
+            sock, server_hostname=fake_hostname, session=mocker.sentinel.session
+        )
+
+    @pytest.mark.it("Does not use a TLS session saved for a different hostname")
+    def test_other_hostname(self, mocker, context, mock_ssl_context):
+        sock = mocker.MagicMock()
+        ssl_context_cache.save_tls_session(
+            mock_ssl_context, "other.hostname", mocker.sentinel.shared_session
+        )
+        context.wrap_socket(sock, server_hostname=fake_hostname)
+        assert mock_ssl_context.wrap_socket.call_args == mocker.call(
+            sock, server_hostname=fake_hostname
+        )
+
+    @pytest.mark.it("Exposes the attributes of the wrapped SSLContext")
+    def test_attributes(self, context, mock_ssl_context):
+        assert context.check_hostname is mock_ssl_context.check_hostname
+
+    @pytest.mark.it("Saves the TLS session of the connection upon successful connect completion")
+    def test_saves_session(self, mocker, mock_mqtt_client, transport):
+        sock = mocker.MagicMock(spec=["session", "session_reused"])
+        mock_mqtt_client.socket.return_value = sock
+
+        mock_mqtt_client.on_connect(client=mock_mqtt_client, userdata=None, flags=None, rc=fake_rc)
+
+        assert transport._ssl_context.session is sock.session
+
+    @pytest.mark.it(
+        "Shares the TLS session of the connection with other transports using the same SSLContext"
+    )
+    def test_shares_session(self, mocker, mock_mqtt_client, transport, mock_ssl_context):
+        sock = mocker.MagicMock(spec=["session", "session_reused"])
+        mock_mqtt_client.socket.return_value = sock
+
+        mock_mqtt_client.on_connect(client=mock_mqtt_client, userdata=None, flags=None, rc=fake_rc)
+
+        assert ssl_context_cache.get_tls_session(mock_ssl_context, fake_hostname) is sock.session
+
+    @pytest.mark.it("Saves the TLS session of the socket wrapped by Paho when using websockets")
+    def test_saves_session_websockets(self, mocker, mock_mqtt_client, transport):
+        ws_wrapper = mocker.MagicMock(spec=["_socket"])
+        mock_mqtt_client.socket.return_value = ws_wrapper
+
+        mock_mqtt_client.on_connect(client=mock_mqtt_client, userdata=None, flags=None, rc=fake_rc)
+
+        assert transport._ssl_context.session is ws_wrapper._socket.session
+
+    @pytest.mark.it("Does not save a TLS session upon connection failure")
+    def test_connection_failure(self, mocker, mock_mqtt_client, transport):
+        mock_mqtt_client.on_connect(
+            client=mock_mqtt_client, userdata=None, flags=None, rc=failed_connack_rc
+        )
+        assert transport._ssl_context.session is None
+
+    @pytest.mark.it("Wraps the real SSLContext, keeping its settings")
+    def test_real_context(self, mock_mqtt_client):
+        MQTTTransport(client_id=fake_device_id, hostname=fake_hostname, username=fake_username)
+        context = mock_mqtt_client.tls_set_context.call_args[1]["context"]
+        assert isinstance(context.ssl_context, ssl.SSLContext)
+        assert context.check_hostname is True
+        assert context.verify_mode == ssl.CERT_REQUIRED
+
+
 @pytest.mark.describe("MQTTTransport - OCCURANCE: Connection Failure")
 class TestEventConnectionFailure(object):
     @pytest.mark.parametrize(
@@ -2110,6 +2265,125 @@ class TestMessageReceived(object):
         assert e_info.value is arbitrary_base_exception
 
 
+@pytest.mark.describe("MQTTTransport - Driven by an event loop")
+class TestEventLoopDriven(object):
+    @pytest.fixture
+    def event_loop(self, mocker):
+        return mocker.MagicMock()
+
+    @pytest.fixture
+    def transport(self, mock_mqtt_client, event_loop):
+        return MQTTTransport(
+            client_id=fake_device_id,
+            hostname=fake_hostname,
+            username=fake_username,
+            event_loop=event_loop,
+        )
+
+    @pytest.fixture
+    def fake_socket(self, mocker):
+        sock = mocker.MagicMock()
+        sock.pending.return_value = 0
+        return sock
+
+    @pytest.mark.it("Does not start the Paho network loop thread upon connect")
+    def test_no_loop_start(self, mock_mqtt_client, transport):
+        transport.connect(fake_password)
+
+        assert mock_mqtt_client.connect.call_count == 1
+        assert mock_mqtt_client.loop_start.call_count == 0
+
+    @pytest.mark.it("Starts the Paho network loop thread upon connect if no event loop is provided")
+    def test_loop_start_without_event_loop(self, mock_mqtt_client):
+        transport = MQTTTransport(
+            client_id=fake_device_id, hostname=fake_hostname, username=fake_username
+        )
+        transport.connect(fake_password)
+
+        assert mock_mqtt_client.loop_start.call_count == 1
+
+    @pytest.mark.it("Registers the socket for reading with the event loop when Paho opens it")
+    def test_socket_open(self, mocker, mock_mqtt_client, transport, event_loop, fake_socket):
+        mock_mqtt_client.on_socket_open(mock_mqtt_client, None, fake_socket)
+
+        assert event_loop.add_reader.call_count == 1
+        assert event_loop.add_reader.call_args == mocker.call(fake_socket, mocker.ANY)
+        # Keepalive processing is scheduled as well
+        assert event_loop.call_later.call_count == 1
+
+    @pytest.mark.it("Unregisters the socket from the event loop when Paho closes it")
+    def test_socket_close(self, mocker, mock_mqtt_client, transport, event_loop, fake_socket):
+        mock_mqtt_client.on_socket_open(mock_mqtt_client, None, fake_socket)
+        misc_timer = event_loop.call_later.return_value
+        mock_mqtt_client.on_socket_close(mock_mqtt_client, None, fake_socket)
+
+        assert event_loop.remove_reader.call_count == 1
+        assert event_loop.remove_reader.call_args == mocker.call(fake_socket)
+        assert misc_timer.cancel.call_count == 1
+
+    @pytest.mark.it(
+        "Registers and unregisters the socket for writing with the event loop when Paho requests it"
+    )
+    def test_socket_write(self, mocker, mock_mqtt_client, transport, event_loop, fake_socket):
+        mock_mqtt_client.on_socket_register_write(mock_mqtt_client, None, fake_socket)
+        assert event_loop.add_writer.call_count == 1
+        assert event_loop.add_writer.call_args == mocker.call(fake_socket, mocker.ANY)
+
+        mock_mqtt_client.on_socket_unregister_write(mock_mqtt_client, None, fake_socket)
+        assert event_loop.remove_writer.call_count == 1
+        assert event_loop.remove_writer.call_args == mocker.call(fake_socket)
+
+    @pytest.mark.it("Has Paho read from the socket when the event loop reports it readable")
+    def test_readable(self, mock_mqtt_client, transport, event_loop, fake_socket):
+        mock_mqtt_client.loop_read.return_value = mqtt.MQTT_ERR_SUCCESS
+        mock_mqtt_client.socket.return_value = fake_socket
+        mock_mqtt_client.on_socket_open(mock_mqtt_client, None, fake_socket)
+        on_readable = event_loop.add_reader.call_args[0][1]
+
+        on_readable()
+
+        assert mock_mqtt_client.loop_read.call_count == 1
+        assert event_loop.call_soon.call_count == 0
+
+    @pytest.mark.it("Reads again if the TLS layer still holds buffered data after a read")
+    def test_readable_pending(self, mock_mqtt_client, transport, event_loop, fake_socket):
+        mock_mqtt_client.loop_read.return_value = mqtt.MQTT_ERR_SUCCESS
+        mock_mqtt_client.socket.return_value = fake_socket
+        fake_socket.pending.return_value = 100
+        mock_mqtt_client.on_socket_open(mock_mqtt_client, None, fake_socket)
+        on_readable = event_loop.add_reader.call_args[0][1]
+
+        on_readable()
+
+        assert event_loop.call_soon.call_count == 1
+        assert event_loop.call_soon.call_args[0][0] is on_readable
+
+    @pytest.mark.it("Has Paho write to the socket when the event loop reports it writable")
+    def test_writable(self, mock_mqtt_client, transport, event_loop, fake_socket):
+        mock_mqtt_client.on_socket_register_write(mock_mqtt_client, None, fake_socket)
+        on_writable = event_loop.add_writer.call_args[0][1]
+
+        on_writable()
+
+        assert mock_mqtt_client.loop_write.call_count == 1
+
+    @pytest.mark.it("Periodically runs Paho's keepalive processing while connected")
+    def test_misc(self, mock_mqtt_client, transport, event_loop, fake_socket):
+        mock_mqtt_client.on_socket_open(mock_mqtt_client, None, fake_socket)
+        assert event_loop.call_later.call_args[0][0] == mqtt_transport.MISC_LOOP_INTERVAL
+        on_misc_timer = event_loop.call_later.call_args[0][1]
+
+        mock_mqtt_client.loop_misc.return_value = mqtt.MQTT_ERR_SUCCESS
+        on_misc_timer()
+        assert mock_mqtt_client.loop_misc.call_count == 1
+        assert event_loop.call_later.call_count == 2
+
+        # Stops once the connection is gone
+        mock_mqtt_client.loop_misc.return_value = mqtt.MQTT_ERR_NO_CONN
+        on_misc_timer()
+        assert event_loop.call_later.call_count == 2
+
+
 @pytest.mark.describe("MQTTTransport - Misc.")
 class TestMisc(object):
     @pytest.mark.it(
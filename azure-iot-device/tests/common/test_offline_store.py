@@ -0,0 +1,222 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import pytest
+import logging
+import os
+import time
+from six.moves import queue
+from azure.iot.device.common import offline_store
+from azure.iot.device.common.offline_store import OfflineStore
+
+logging.basicConfig(level=logging.DEBUG)
+
+fake_topic = "devices/fake_device/messages/events/"
+
+
+@pytest.fixture
+def store_path(tmpdir):
+    return str(tmpdir.join("store"))
+
+
+def create_store(store_path, **kwargs):
+    kwargs.setdefault("max_size", 64 * 1024)
+    kwargs.setdefault("segment_size", 1024)
+    return OfflineStore(store_path, **kwargs)
+
+
+def make_payload(index):
+    # Roughly 100 bytes per record
+    return "{:04d}".format(index) * 20
+
+
+def append_records(store, start, count):
+    for i in range(start, start + count):
+        store.append(fake_topic, make_payload(i))
+
+
+def read_all(store):
+    records = []
+    while True:
+        batch = store.read(10)
+        if not batch:
+            return records
+        records.extend(batch)
+
+
+def get_segment_files(store_path):
+    return sorted(name for name in os.listdir(store_path) if name.endswith(".seg"))
+
+
+@pytest.mark.describe("OfflineStore - Instantiation")
+class TestOfflineStoreInstantiation(object):
+    @pytest.mark.it("Creates the directory if it does not exist")
+    def test_creates_directory(self, store_path):
+        create_store(store_path)
+        assert os.path.isdir(store_path)
+
+    @pytest.mark.it("Recovers the unacknowledged records of a previous store, in order")
+    def test_recovers_records(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 30)
+        for record in store.read(12):
+            store.ack(record.position)
+        store.close()
+
+        store = create_store(store_path)
+        assert len(store) == 18
+        assert [record.payload for record in read_all(store)] == [
+            make_payload(i).encode("utf-8") for i in range(12, 30)
+        ]
+
+    @pytest.mark.it("Discards a torn record at the end of the last segment")
+    def test_torn_record(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 3)
+        store.close()
+        last_segment = os.path.join(store_path, get_segment_files(store_path)[-1])
+        size = os.path.getsize(last_segment)
+        with open(last_segment, "r+b") as f:
+            f.truncate(size - 10)
+
+        store = create_store(store_path)
+        assert len(store) == 2
+        append_records(store, 3, 1)
+        assert [record.payload[:4] for record in read_all(store)] == [b"0000", b"0001", b"0003"]
+
+
+@pytest.mark.describe("OfflineStore - .append() and .read()")
+class TestOfflineStoreAppendAndRead(object):
+    @pytest.mark.it("Returns the records in the order they were appended, across segments")
+    def test_order(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 30)
+        assert len(get_segment_files(store_path)) > 1
+        records = read_all(store)
+        assert [record.topic for record in records] == [fake_topic] * 30
+        assert [record.payload for record in records] == [
+            make_payload(i).encode("utf-8") for i in range(30)
+        ]
+
+    @pytest.mark.it("Returns at most max_count records, continuing where the previous read stopped")
+    def test_max_count(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 5)
+        assert [record.payload[:4] for record in store.read(3)] == [b"0000", b"0001", b"0002"]
+        assert [record.payload[:4] for record in store.read(3)] == [b"0003", b"0004"]
+        assert store.read(3) == []
+
+    @pytest.mark.it("Returns records appended after a previous read")
+    def test_append_after_read(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 2)
+        read_all(store)
+        assert not store.has_unread_records()
+        append_records(store, 2, 1)
+        assert store.has_unread_records()
+        assert [record.payload[:4] for record in store.read(10)] == [b"0002"]
+
+    @pytest.mark.it("Accepts bytes payloads")
+    def test_bytes_payload(self, store_path):
+        store = create_store(store_path)
+        store.append(fake_topic, b"\x00\x01\xff")
+        assert store.read(1)[0].payload == b"\x00\x01\xff"
+
+    @pytest.mark.it("Stores payloads which aren't bytes in the same way paho would send them")
+    @pytest.mark.parametrize(
+        "payload, expected_payload",
+        [
+            pytest.param(u"some payload", b"some payload", id="str"),
+            pytest.param(bytearray(b"\x00\x01"), b"\x00\x01", id="bytearray"),
+            pytest.param(memoryview(b"\x00\x01"), b"\x00\x01", id="memoryview"),
+            pytest.param(5, b"5", id="int"),
+            pytest.param(1.5, b"1.5", id="float"),
+            pytest.param(None, b"", id="None"),
+        ],
+    )
+    def test_converted_payload(self, store_path, payload, expected_payload):
+        store = create_store(store_path)
+        store.append(fake_topic, payload)
+        assert store.read(1)[0].payload == expected_payload
+
+    @pytest.mark.it("Raises a TypeError for payloads of any other type, without storing them")
+    def test_invalid_payload(self, store_path):
+        store = create_store(store_path)
+        with pytest.raises(TypeError):
+            store.append(fake_topic, {"some": "dict"})
+        assert not store.has_unread_records()
+
+    @pytest.mark.it("Skips records older than max_age")
+    def test_max_age(self, mocker, store_path):
+        store = create_store(store_path, max_age=60)
+        now = time.time()
+        mocker.patch.object(offline_store.time, "time", return_value=now - 120)
+        append_records(store, 0, 2)
+        offline_store.time.time.return_value = now
+        append_records(store, 2, 1)
+        assert [record.payload[:4] for record in read_all(store)] == [b"0002"]
+        assert store.expired_count == 2
+
+
+@pytest.mark.describe("OfflineStore - Size limits")
+class TestOfflineStoreSizeLimits(object):
+    @pytest.mark.it(
+        "Drops the oldest segments to make room if the overflow policy is 'drop_oldest'"
+    )
+    def test_drop_oldest(self, store_path):
+        store = create_store(store_path, max_size=4096, overflow_policy="drop_oldest")
+        append_records(store, 0, 100)
+        assert store.size <= 4096
+        assert store.dropped_count > 0
+        payloads = [record.payload for record in read_all(store)]
+        assert len(payloads) + store.dropped_count == 100
+        assert payloads[-1] == make_payload(99).encode("utf-8")
+
+    @pytest.mark.it(
+        "Raises queue.Full when the store is full if the overflow policy is 'reject_new'"
+    )
+    def test_reject_new(self, store_path):
+        store = create_store(store_path, max_size=4096, overflow_policy="reject_new")
+        with pytest.raises(queue.Full):
+            append_records(store, 0, 100)
+        count = len(store)
+        assert store.read(1)[0].payload == make_payload(0).encode("utf-8")
+        assert store.size <= 4096
+        assert count > 0
+
+
+@pytest.mark.describe("OfflineStore - .ack() and .rewind()")
+class TestOfflineStoreAckAndRewind(object):
+    @pytest.mark.it("Deletes segments once all of their records have been acknowledged")
+    def test_deletes_segments(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 30)
+        segment_count = len(get_segment_files(store_path))
+        for record in read_all(store):
+            store.ack(record.position)
+        assert len(store) == 0
+        assert len(get_segment_files(store_path)) == 1 < segment_count
+
+    @pytest.mark.it(
+        "Only moves past acknowledged records that are not preceded by unacknowledged ones"
+    )
+    def test_out_of_order_ack(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 3)
+        first, second, third = store.read(3)
+        store.ack(second.position)
+        store.ack(third.position)
+        assert len(store) == 3
+        store.rewind()
+        assert [record.payload[:4] for record in read_all(store)] == [b"0000", b"0001", b"0002"]
+
+    @pytest.mark.it("Reads the unacknowledged records again after a rewind")
+    def test_rewind(self, store_path):
+        store = create_store(store_path)
+        append_records(store, 0, 3)
+        first, second, third = store.read(3)
+        store.ack(first.position)
+        store.rewind()
+        assert [record.payload[:4] for record in read_all(store)] == [b"0001", b"0002"]
@@ -132,3 +132,38 @@ class TestSasToken(object):
         sastoken.refresh()
         new_token_string = str(sastoken)
         assert old_token_string != new_token_string
+
+    @pytest.mark.it("Decodes the key only once, however many times it is refreshed")
+    def test_decodes_key_once(self, mocker):
+        b64decode = mocker.spy(base64, "b64decode")
+        s = SasToken(uri, key)
+        tokens = []
+        for i in range(3):
+            mocker.patch.object(time, "time", return_value=1000 + i)
+            s.refresh()
+            tokens.append((str(s), s.expiry_time))
+        assert b64decode.call_count == 1
+
+        for token, expiry_time in tokens:
+            signature = generate_signature(s._uri, key, expiry_time)
+            assert token == "SharedAccessSignature sr={}&sig={}&se={}".format(
+                s._uri, signature, expiry_time
+            )
+
+    @pytest.mark.it(
+        "Needs a refresh once the given fraction of its TTL has elapsed since it was refreshed"
+    )
+    @pytest.mark.parametrize(
+        "elapsed,expected",
+        [
+            pytest.param(0, False, id="Just refreshed"),
+            pytest.param(2699, False, id="Before the fraction has elapsed"),
+            pytest.param(2700, True, id="Once the fraction has elapsed"),
+            pytest.param(4000, True, id="Expired"),
+        ],
+    )
+    def test_needs_refresh(self, mocker, sastoken, elapsed, expected):
+        mock_time = mocker.patch.object(time, "time", return_value=1000)
+        sastoken.refresh()
+        mock_time.return_value = 1000 + elapsed
+        assert sastoken.needs_refresh(0.75) is expected
@@ -0,0 +1,190 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import pytest
+import logging
+import ssl
+import gc
+import os
+from azure.iot.device.common import ssl_context_cache
+from azure.iot.device.common.models.x509 import X509
+
+logging.basicConfig(level=logging.DEBUG)
+
+fake_server_verification_cert = "__fake_server_verification_cert__"
+fake_cipher = "DHE-RSA-AES128-SHA"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ssl_context_cache.clear()
+    yield
+    ssl_context_cache.clear()
+
+
+@pytest.fixture
+def mock_ssl_context_constructor(mocker):
+    # Return a new context for each call, like the real constructor
+    return mocker.patch.object(ssl, "SSLContext", side_effect=lambda **kwargs: mocker.MagicMock())
+
+
+@pytest.fixture
+def x509_cert(tmpdir):
+    cert_file = tmpdir.join("cert.pem")
+    cert_file.write("cert")
+    key_file = tmpdir.join("key.pem")
+    key_file.write("key")
+    return X509(str(cert_file), str(key_file), "pass phrase")
+
+
+@pytest.mark.describe("SSL Context Cache - .get_ssl_context()")
+class TestGetSSLContext(object):
+    @pytest.mark.it(
+        "Creates a context which uses TLS 1.2, requires certificates and checks hostname"
+    )
+    def test_creates_context(self, mocker, mock_ssl_context_constructor):
+        ssl_context = ssl_context_cache.get_ssl_context()
+
+        assert mock_ssl_context_constructor.call_count == 1
+        assert mock_ssl_context_constructor.call_args == mocker.call(protocol=ssl.PROTOCOL_TLSv1_2)
+        assert ssl_context.check_hostname is True
+        assert ssl_context.verify_mode == ssl.CERT_REQUIRED
+        assert ssl_context.load_default_certs.call_count == 1
+
+    @pytest.mark.it("Configures the context with the given certificates and cipher")
+    def test_configures_context(self, mocker, mock_ssl_context_constructor, x509_cert):
+        ssl_context = ssl_context_cache.get_ssl_context(
+            server_verification_cert=fake_server_verification_cert,
+            cipher=fake_cipher,
+            x509_cert=x509_cert,
+        )
+
+        assert ssl_context.load_verify_locations.call_args == mocker.call(
+            cadata=fake_server_verification_cert
+        )
+        assert ssl_context.load_default_certs.call_count == 0
+        assert ssl_context.set_ciphers.call_args == mocker.call(fake_cipher)
+        assert ssl_context.load_cert_chain.call_args == mocker.call(
+            x509_cert.certificate_file, x509_cert.key_file, x509_cert.pass_phrase
+        )
+
+    @pytest.mark.it("Returns the same context to every caller using the same settings")
+    def test_shared(self, mock_ssl_context_constructor, x509_cert):
+        ssl_context1 = ssl_context_cache.get_ssl_context(
+            fake_server_verification_cert, fake_cipher, x509_cert
+        )
+        ssl_context2 = ssl_context_cache.get_ssl_context(
+            fake_server_verification_cert,
+            fake_cipher,
+            X509(x509_cert.certificate_file, x509_cert.key_file, x509_cert.pass_phrase),
+        )
+
+        assert ssl_context1 is ssl_context2
+        assert mock_ssl_context_constructor.call_count == 1
+
+    @pytest.mark.it("Returns a different context to callers using different settings")
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            pytest.param({"server_verification_cert": "other cert"}, id="Different trust store"),
+            pytest.param({"cipher": "AES256-SHA"}, id="Different cipher"),
+            pytest.param({"x509_cert": None}, id="No client certificate"),
+        ],
+    )
+    def test_not_shared(self, mock_ssl_context_constructor, x509_cert, kwargs):
+        settings = {
+            "server_verification_cert": fake_server_verification_cert,
+            "cipher": fake_cipher,
+            "x509_cert": x509_cert,
+        }
+        ssl_context1 = ssl_context_cache.get_ssl_context(**settings)
+        settings.update(kwargs)
+        ssl_context2 = ssl_context_cache.get_ssl_context(**settings)
+
+        assert ssl_context1 is not ssl_context2
+
+    @pytest.mark.it("Returns a different context once the client certificate file is replaced")
+    def test_cert_file_replaced(self, mock_ssl_context_constructor, x509_cert):
+        ssl_context1 = ssl_context_cache.get_ssl_context(x509_cert=x509_cert)
+        with open(x509_cert.certificate_file, "w") as f:
+            f.write("new cert")
+        stat = os.stat(x509_cert.certificate_file)
+        os.utime(x509_cert.certificate_file, (stat.st_atime, stat.st_mtime + 10))
+        ssl_context2 = ssl_context_cache.get_ssl_context(x509_cert=x509_cert)
+
+        assert ssl_context1 is not ssl_context2
+
+    @pytest.mark.it("Does not keep a context once no caller is using it")
+    def test_not_kept(self, mock_ssl_context_constructor):
+        ssl_context_cache.get_ssl_context()
+        gc.collect()
+        ssl_context_cache.get_ssl_context()
+
+        assert mock_ssl_context_constructor.call_count == 2
+
+    @pytest.mark.it("Does not cache a context if configuring it fails")
+    def test_failure(self, mocker, arbitrary_exception):
+        ssl_context = mocker.MagicMock()
+        ssl_context.set_ciphers.side_effect = [arbitrary_exception, None]
+        constructor = mocker.patch.object(ssl, "SSLContext", return_value=ssl_context)
+
+        with pytest.raises(type(arbitrary_exception)):
+            ssl_context_cache.get_ssl_context(cipher=fake_cipher)
+        assert ssl_context_cache.get_ssl_context(cipher=fake_cipher) is ssl_context
+        assert constructor.call_count == 2
+
+    @pytest.mark.it("Creates a real SSLContext")
+    def test_real_context(self):
+        ssl_context = ssl_context_cache.get_ssl_context()
+
+        assert isinstance(ssl_context, ssl.SSLContext)
+        assert ssl_context.check_hostname is True
+        assert ssl_context.verify_mode == ssl.CERT_REQUIRED
+        assert ssl_context_cache.get_ssl_context() is ssl_context
+
+
+@pytest.mark.describe("SSL Context Cache - TLS sessions")
+class TestTLSSessions(object):
+    @pytest.mark.it("Returns None if no TLS session was saved for the context and hostname")
+    def test_no_session(self, mocker):
+        assert ssl_context_cache.get_tls_session(mocker.MagicMock(), "hostname") is None
+
+    @pytest.mark.it("Returns the latest TLS session saved for the context and hostname")
+    def test_saved_session(self, mocker):
+        ssl_context = mocker.MagicMock()
+        ssl_context_cache.save_tls_session(ssl_context, "hostname", mocker.sentinel.session1)
+        ssl_context_cache.save_tls_session(ssl_context, "hostname", mocker.sentinel.session2)
+
+        assert (
+            ssl_context_cache.get_tls_session(ssl_context, "hostname") is mocker.sentinel.session2
+        )
+
+    @pytest.mark.it("Does not share TLS sessions between contexts or hostnames")
+    def test_not_shared(self, mocker):
+        ssl_context = mocker.MagicMock()
+        ssl_context_cache.save_tls_session(ssl_context, "hostname", mocker.sentinel.session)
+
+        assert ssl_context_cache.get_tls_session(mocker.MagicMock(), "hostname") is None
+        assert ssl_context_cache.get_tls_session(ssl_context, "other.hostname") is None
+
+    @pytest.mark.it("Does not keep the TLS sessions of a context once it is no longer used")
+    def test_not_kept(self, mocker):
+        ssl_context = mocker.MagicMock()
+        ssl_context_cache.save_tls_session(ssl_context, "hostname", mocker.sentinel.session)
+        assert len(ssl_context_cache._tls_sessions) == 1
+
+        del ssl_context
+        gc.collect()
+
+        assert len(ssl_context_cache._tls_sessions) == 0
+
+    @pytest.mark.it("Forgets all TLS sessions when cleared")
+    def test_clear(self, mocker):
+        ssl_context = mocker.MagicMock()
+        ssl_context_cache.save_tls_session(ssl_context, "hostname", mocker.sentinel.session)
+
+        ssl_context_cache.clear()
+
+        assert ssl_context_cache.get_tls_session(ssl_context, "hostname") is None
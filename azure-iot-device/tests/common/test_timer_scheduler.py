@@ -0,0 +1,127 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import pytest
+import threading
+import logging
+from azure.iot.device.common import timer_scheduler
+from azure.iot.device.common.timer_scheduler import Timer, TimerScheduler
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+@pytest.fixture
+def scheduler():
+    return TimerScheduler(thread_name="timer_test")
+
+
+@pytest.mark.describe("Timer")
+class TestTimer(object):
+    @pytest.mark.it("Calls the function with the given arguments on the scheduler thread")
+    def test_calls_function(self, scheduler):
+        called = threading.Event()
+        result = []
+
+        def function(*args, **kwargs):
+            result.append((args, kwargs, threading.current_thread().name))
+            called.set()
+
+        Timer(0.01, function, args=[1, 2], kwargs={"x": 3}, scheduler=scheduler).start()
+        assert called.wait(5)
+        assert result == [((1, 2), {"x": 3}, "timer_test")]
+
+    @pytest.mark.it("Does not call the function if cancelled before the interval has passed")
+    def test_cancel(self, scheduler, mocker):
+        function = mocker.MagicMock()
+        timer = Timer(0.05, function, scheduler=scheduler)
+        timer.start()
+        timer.cancel()
+        called = threading.Event()
+        Timer(0.1, called.set, scheduler=scheduler).start()
+        assert called.wait(5)
+        assert function.call_count == 0
+
+    @pytest.mark.it("Does nothing if cancelled after the function has been called")
+    def test_cancel_after_finished(self, scheduler):
+        called = threading.Event()
+        timer = Timer(0, called.set, scheduler=scheduler)
+        timer.start()
+        assert called.wait(5)
+        timer.cancel()
+        assert len(scheduler) == 0
+
+    @pytest.mark.it("Raises RuntimeError if started more than once")
+    def test_start_twice(self, scheduler):
+        timer = Timer(10, lambda: None, scheduler=scheduler)
+        timer.start()
+        with pytest.raises(RuntimeError):
+            timer.start()
+        timer.cancel()
+
+    @pytest.mark.it("Uses the process-wide scheduler by default")
+    def test_default_scheduler(self, mocker):
+        schedule = mocker.patch.object(timer_scheduler._default_scheduler, "schedule")
+        timer = Timer(10, lambda: None)
+        timer.start()
+        assert schedule.call_args == mocker.call(timer)
+
+
+@pytest.mark.describe("TimerScheduler")
+class TestTimerScheduler(object):
+    @pytest.mark.it("Runs timers in deadline order, regardless of the order they were started in")
+    def test_deadline_order(self, scheduler):
+        order = []
+        done = threading.Event()
+        Timer(0.15, lambda: (order.append(3), done.set()), scheduler=scheduler).start()
+        Timer(0.05, order.append, args=[1], scheduler=scheduler).start()
+        Timer(0.1, order.append, args=[2], scheduler=scheduler).start()
+        assert done.wait(5)
+        assert order == [1, 2, 3]
+
+    @pytest.mark.it("Runs all timers from a single thread")
+    def test_single_thread(self, scheduler):
+        threads = set()
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def function():
+            with lock:
+                threads.add(threading.current_thread())
+                if len(called) == 49:
+                    done.set()
+                called.append(None)
+
+        called = []
+        for i in range(50):
+            Timer(0.001 * (i % 5), function, scheduler=scheduler).start()
+        assert done.wait(5)
+        assert len(threads) == 1
+
+    @pytest.mark.it("Keeps running timers after a timer function raises an exception")
+    def test_exception(self, scheduler, mocker, arbitrary_exception):
+        background_exception_handler = mocker.patch.object(
+            timer_scheduler.handle_exceptions, "handle_background_exception"
+        )
+
+        def raise_exception():
+            raise arbitrary_exception
+
+        called = threading.Event()
+        Timer(0, raise_exception, scheduler=scheduler).start()
+        Timer(0.01, called.set, scheduler=scheduler).start()
+        assert called.wait(5)
+        assert background_exception_handler.call_args == mocker.call(arbitrary_exception)
+
+    @pytest.mark.it("Removes cancelled timers once they make up most of the pending timers")
+    def test_compacts_cancelled_timers(self, scheduler):
+        count = timer_scheduler.MIN_CANCELLED_TIMERS_TO_COMPACT * 2
+        timers = [Timer(60, lambda: None, scheduler=scheduler) for _ in range(count)]
+        for timer in timers:
+            timer.start()
+        for timer in timers[: count - 1]:
+            timer.cancel()
+        assert len(scheduler) == 1
+        assert len(scheduler._heap) < count / 2
+        timers[-1].cancel()
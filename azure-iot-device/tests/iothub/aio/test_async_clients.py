@@ -21,6 +21,7 @@ from azure.iot.device.common import async_adapter
 from azure.iot.device.iothub.auth import IoTEdgeError
 import sys
 from azure.iot.device import constant as device_constant
+from azure.iot.device import OfflineStoreOptions, InboxOptions, RetryPolicy
 
 pytestmark = pytest.mark.asyncio
 logging.basicConfig(level=logging.DEBUG)
@@ -79,6 +80,24 @@ class SharedClientInstantiationTests(object):
         assert client._mqtt_pipeline.on_disconnected is not None
         assert client._mqtt_pipeline.on_disconnected == client._on_disconnected
 
+    @pytest.mark.it(
+        "Pauses or resumes features on the MQTTPipeline, as the InboxManager wants, when the InboxManager asks it to"
+    )
+    async def test_sets_feature_pause_handler_in_inbox_manager(
+        self, mocker, client_class, mqtt_pipeline, http_pipeline
+    ):
+        client = client_class(mqtt_pipeline, http_pipeline)
+        mocker.patch.object(client._inbox_manager, "is_feature_pause_wanted", return_value=True)
+
+        client._inbox_manager.on_feature_pause_changed(constant.C2D_MSG)
+        assert mqtt_pipeline.update_feature_pause.call_count == 1
+        assert mqtt_pipeline.update_feature_pause.call_args[0][0] == constant.C2D_MSG
+        is_pause_wanted = mqtt_pipeline.update_feature_pause.call_args[1]["is_pause_wanted"]
+        assert is_pause_wanted() is True
+        assert client._inbox_manager.is_feature_pause_wanted.call_args == mocker.call(
+            constant.C2D_MSG
+        )
+
     @pytest.mark.it("Sets on_method_request_received handler in the MQTTPipeline")
     async def test_sets_on_method_request_received_handler_in_pipleline(
         self, client_class, mqtt_pipeline, http_pipeline
@@ -161,6 +180,145 @@ class SharedClientCreateMethodUserOptionTests(object):
 
         assert config.cipher == cipher
 
+    @pytest.mark.it(
+        "Sets the 'offline_store_options' user option parameter on the PipelineConfig, if provided"
+    )
+    async def test_offline_store_options_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        offline_store_options = OfflineStoreOptions(path="/some/path")
+        client_create_method(*create_method_args, offline_store_options=offline_store_options)
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.offline_store_options is offline_store_options
+
+    @pytest.mark.it(
+        "Sets the 'retry_policy' user option parameter on the PipelineConfig, if provided"
+    )
+    async def test_retry_policy_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        retry_policy = RetryPolicy(max_retries=3)
+        client_create_method(*create_method_args, retry_policy=retry_policy)
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.retry_policy is retry_policy
+
+    @pytest.mark.it(
+        "Sets the 'nonblocking_reauthorization' user option parameter on the PipelineConfig, if provided"
+    )
+    async def test_nonblocking_reauthorization_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(*create_method_args, nonblocking_reauthorization=True)
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.nonblocking_reauthorization is True
+
+    @pytest.mark.it(
+        "Sets the 'executor_group' user option parameter on the PipelineConfig, if provided"
+    )
+    async def test_executor_group_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(*create_method_args, executor_group="shard-1")
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.executor_group == "shard-1"
+
+    @pytest.mark.it(
+        "Sets the 'pipeline_engine' user option parameter on the PipelineConfig, if provided"
+    )
+    async def test_pipeline_engine_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(*create_method_args, pipeline_engine="asyncio")
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.pipeline_engine == "asyncio"
+
+    @pytest.mark.it(
+        "Sets the 'http_max_concurrent_requests' and 'http_max_queued_requests' user option parameters on the PipelineConfig, if provided"
+    )
+    async def test_http_request_limit_options(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(
+            *create_method_args, http_max_concurrent_requests=50, http_max_queued_requests=200
+        )
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.http_max_concurrent_requests == 50
+        assert config.http_max_queued_requests == 200
+
+    @pytest.mark.it(
+        "Limits the client's message inboxes with the 'inbox_options' user option parameter, if provided"
+    )
+    async def test_inbox_options_option(
+        self, option_test_required_patching, client_create_method, create_method_args
+    ):
+        inbox_options = InboxOptions(max_size=10, overflow_policy="drop_newest")
+        client = client_create_method(*create_method_args, inbox_options=inbox_options)
+
+        assert client._inbox_options is inbox_options
+        inbox = client._inbox_manager.get_c2d_message_inbox()
+        assert inbox.max_size == 10
+        assert inbox.overflow_policy == "drop_newest"
+
     @pytest.mark.it(
         "Sets the 'server_verification_cert' user option parameter on the AuthenticationProvider, if provided"
     )
@@ -193,6 +351,15 @@ class SharedClientCreateMethodUserOptionTests(object):
         with pytest.raises(TypeError):
             client_create_method(*create_method_args, invalid_option="some_value")
 
+    @pytest.mark.it(
+        "Raises a TypeError if the 'handler_max_workers' user option parameter is provided"
+    )
+    async def test_handler_max_workers_option(
+        self, option_test_required_patching, client_create_method, create_method_args
+    ):
+        with pytest.raises(TypeError):
+            client_create_method(*create_method_args, handler_max_workers=4)
+
     @pytest.mark.it("Sets default user options if none are provided")
     async def test_default_options(
         self,
@@ -545,12 +712,9 @@ class SharedClientSendD2CMessageTests(object):
 
     @pytest.mark.it("Does not raises error when message data size is equal to 256 KB")
     async def test_raises_error_when_message_data_equal_to_256(self, client, mqtt_pipeline):
-        data_input = "a" * 262095
+        data_input = "a" * device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT
         message = Message(data_input)
-        # This check was put as message class may undergo the default content type encoding change
-        # and the above calculation will change.
-        if message.get_size() != device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
-            assert False
+        assert message.get_size() == device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT
 
         await client.send_message(message)
 
@@ -560,6 +724,116 @@ class SharedClientSendD2CMessageTests(object):
         assert sent_message.data == data_input
 
 
+class SharedClientSendMessageBatchTests(object):
+    @pytest.mark.it("Begins a 'send_message' pipeline operation for each message, in order")
+    async def test_calls_pipeline_send_message_per_message(self, client, mqtt_pipeline):
+        messages = [Message("Accio"), Message("Lumos"), Message("Nox")]
+        await client.send_message_batch(messages)
+        assert mqtt_pipeline.send_message.call_count == len(messages)
+        for i, message in enumerate(messages):
+            assert mqtt_pipeline.send_message.call_args_list[i][0][0] is message
+
+    @pytest.mark.it("Returns a list containing None for each successfully sent message")
+    async def test_returns_none_for_successes(self, client, mqtt_pipeline):
+        results = await client.send_message_batch([Message("Accio"), Message("Lumos")])
+        assert results == [None, None]
+
+    @pytest.mark.it(
+        "Does not allow more than 'max_in_flight' 'send_message' operations to be pending at once"
+    )
+    async def test_limits_in_flight(self, mocker, client, mqtt_pipeline):
+        max_in_flight = 2
+        pending_callbacks = []
+        peak = []
+
+        def send_message(message, callback):
+            pending_callbacks.append(callback)
+            peak.append(len(pending_callbacks))
+            # Complete the oldest pending operation from another thread after a short delay
+            threading.Timer(0.01, pending_callbacks.pop(0), kwargs={"error": None}).start()
+
+        mqtt_pipeline.send_message = mocker.MagicMock(side_effect=send_message)
+        results = await client.send_message_batch(
+            [Message(str(i)) for i in range(6)], max_in_flight=max_in_flight
+        )
+        assert results == [None] * 6
+        assert max(peak) <= max_in_flight
+
+    @pytest.mark.it(
+        "Returns a client error in place of each message whose 'send_message' operation calls back with a pipeline error"
+    )
+    @pytest.mark.parametrize(
+        "pipeline_error,client_error",
+        [
+            pytest.param(
+                pipeline_exceptions.ConnectionDroppedError,
+                client_exceptions.ConnectionDroppedError,
+                id="ConnectionDroppedError->ConnectionDroppedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ConnectionFailedError,
+                client_exceptions.ConnectionFailedError,
+                id="ConnectionFailedError->ConnectionFailedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.UnauthorizedError,
+                client_exceptions.CredentialError,
+                id="UnauthorizedError->CredentialError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ProtocolClientError,
+                client_exceptions.ClientError,
+                id="ProtocolClientError->ClientError",
+            ),
+            pytest.param(Exception, client_exceptions.ClientError, id="Exception->ClientError"),
+        ],
+    )
+    async def test_returns_error_on_pipeline_op_error(
+        self, mocker, client, mqtt_pipeline, pipeline_error, client_error
+    ):
+        my_pipeline_error = pipeline_error()
+        failing_message = Message("Expelliarmus")
+
+        def send_message(message, callback):
+            if message is failing_message:
+                callback(error=my_pipeline_error)
+            else:
+                callback(error=None)
+
+        mqtt_pipeline.send_message = mocker.MagicMock(side_effect=send_message)
+        results = await client.send_message_batch(
+            [Message("Accio"), failing_message, Message("Nox")]
+        )
+        assert results[0] is None
+        assert isinstance(results[1], client_error)
+        assert results[1].__cause__ is my_pipeline_error
+        assert results[2] is None
+
+    @pytest.mark.it("Wraps each item in a Message object if it is not a Message object")
+    async def test_wraps_data_in_message(self, client, mqtt_pipeline):
+        await client.send_message_batch(["Accio", 222])
+        assert mqtt_pipeline.send_message.call_count == 2
+        sent_messages = [call[0][0] for call in mqtt_pipeline.send_message.call_args_list]
+        assert all(isinstance(m, Message) for m in sent_messages)
+        assert [m.data for m in sent_messages] == ["Accio", 222]
+
+    @pytest.mark.it(
+        "Raises error without sending any messages when any message size is greater than 256 KB"
+    )
+    async def test_raises_error_when_message_size_greater_than_256(self, client, mqtt_pipeline):
+        messages = [Message("Accio"), Message("serpensortia" * 25600)]
+        with pytest.raises(ValueError) as e_info:
+            await client.send_message_batch(messages)
+        assert "256 KB" in e_info.value.args[0]
+        assert mqtt_pipeline.send_message.call_count == 0
+
+    @pytest.mark.it("Raises error when 'max_in_flight' is less than 1")
+    async def test_raises_error_on_invalid_max_in_flight(self, client, mqtt_pipeline):
+        with pytest.raises(ValueError):
+            await client.send_message_batch([Message("Accio")], max_in_flight=0)
+        assert mqtt_pipeline.send_message.call_count == 0
+
+
 class SharedClientReceiveMethodRequestTests(object):
     @pytest.mark.it("Implicitly enables methods feature if not already enabled")
     @pytest.mark.parametrize(
@@ -1133,6 +1407,13 @@ class TestIoTHubDeviceClientSendD2CMessage(
     pass
 
 
+@pytest.mark.describe("IoTHubDeviceClient (Asynchronous) - .send_message_batch()")
+class TestIoTHubDeviceClientSendMessageBatch(
+    IoTHubDeviceClientTestsConfig, SharedClientSendMessageBatchTests
+):
+    pass
+
+
 @pytest.mark.describe("IoTHubDeviceClient (Asynchronous) - .receive_message()")
 class TestIoTHubDeviceClientReceiveC2DMessage(IoTHubDeviceClientTestsConfig):
     @pytest.mark.it("Implicitly enables C2D messaging feature if not already enabled")
@@ -1171,6 +1452,37 @@ class TestIoTHubDeviceClientReceiveC2DMessage(IoTHubDeviceClientTestsConfig):
         assert received_message is message
 
 
+@pytest.mark.describe("IoTHubDeviceClient (Asynchronous) - .receive_messages()")
+class TestIoTHubDeviceClientReceiveC2DMessages(IoTHubDeviceClientTestsConfig):
+    @pytest.mark.it("Implicitly enables C2D messaging feature if not already enabled")
+    async def test_enables_c2d_messaging_only_if_not_already_enabled(
+        self, mocker, client, mqtt_pipeline
+    ):
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False  # C2D will appear disabled
+        await client.receive_messages(10, timeout=0.01)
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.C2D_MSG
+
+    @pytest.mark.it("Returns up to max_count messages from the C2D inbox, in the order received")
+    async def test_returns_messages_from_c2d_inbox(self, client):
+        c2d_inbox = client._inbox_manager.get_c2d_message_inbox()
+        messages = [Message("message {}".format(i)) for i in range(5)]
+        for message in messages:
+            c2d_inbox._put(message)
+
+        assert await client.receive_messages(3) == messages[:3]
+        assert await client.receive_messages(3) == messages[3:]
+
+    @pytest.mark.it("Returns an empty list after a timeout, if a timeout is specified")
+    async def test_times_out_waiting_for_message(self, client):
+        assert await client.receive_messages(10, timeout=0.01) == []
+
+    @pytest.mark.it("Raises a ValueError if max_count is less than 1")
+    async def test_invalid_max_count(self, client):
+        with pytest.raises(ValueError):
+            await client.receive_messages(0)
+
+
 @pytest.mark.describe("IoTHubDeviceClient (Asynchronous) - .receive_method_request()")
 class TestIoTHubDeviceClientReceiveMethodRequest(
     IoTHubDeviceClientTestsConfig, SharedClientReceiveMethodRequestTests
@@ -1935,6 +2247,13 @@ class TestIoTHubNModuleClientSendD2CMessage(
     pass
 
 
+@pytest.mark.describe("IoTHubModuleClient (Asynchronous) - .send_message_batch()")
+class TestIoTHubModuleClientSendMessageBatch(
+    IoTHubModuleClientTestsConfig, SharedClientSendMessageBatchTests
+):
+    pass
+
+
 @pytest.mark.describe("IoTHubModuleClient (Asynchronous) - .send_message_to_output()")
 class TestIoTHubModuleClientSendToOutput(IoTHubModuleClientTestsConfig):
     @pytest.mark.it("Begins a 'send_output_event' pipeline operation")
@@ -2058,12 +2377,10 @@ class TestIoTHubModuleClientSendToOutput(IoTHubModuleClientTestsConfig):
         self, client, mqtt_pipeline
     ):
         output_name = "some_output"
-        data_input = "a" * 262095
+        # The output name is encoded as a property of the message, so it counts towards the size
+        overhead = Message("", output_name=output_name).get_size()
+        data_input = "a" * (device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT - overhead)
         message = Message(data_input)
-        # This check was put as message class may undergo the default content type encoding change
-        # and the above calculation will change.
-        if message.get_size() != device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
-            assert False
 
         await client.send_message_to_output(message, output_name)
 
@@ -2118,6 +2435,39 @@ class TestIoTHubModuleClientReceiveInputMessage(IoTHubModuleClientTestsConfig):
         assert received_message is message
 
 
+@pytest.mark.describe("IoTHubModuleClient (Asynchronous) - .receive_messages_on_input()")
+class TestIoTHubModuleClientReceiveInputMessages(IoTHubModuleClientTestsConfig):
+    @pytest.mark.it("Implicitly enables input messaging feature if not already enabled")
+    async def test_enables_input_messaging_only_if_not_already_enabled(
+        self, mocker, client, mqtt_pipeline
+    ):
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False  # Input will appear disabled
+        await client.receive_messages_on_input("some_input", 10, timeout=0.01)
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.INPUT_MSG
+
+    @pytest.mark.it(
+        "Returns up to max_count messages from the input inbox of the given input, in the order received"
+    )
+    async def test_returns_messages_from_input_inbox(self, client):
+        input_inbox = client._inbox_manager.get_input_message_inbox("some_input")
+        messages = [Message("message {}".format(i)) for i in range(5)]
+        for message in messages:
+            input_inbox._put(message)
+
+        assert await client.receive_messages_on_input("some_input", 3) == messages[:3]
+        assert await client.receive_messages_on_input("some_input", 3) == messages[3:]
+
+    @pytest.mark.it("Returns an empty list after a timeout, if a timeout is specified")
+    async def test_times_out_waiting_for_message(self, client):
+        assert await client.receive_messages_on_input("some_input", 10, timeout=0.01) == []
+
+    @pytest.mark.it("Raises a ValueError if max_count is less than 1")
+    async def test_invalid_max_count(self, client):
+        with pytest.raises(ValueError):
+            await client.receive_messages_on_input("some_input", 0)
+
+
 @pytest.mark.describe("IoTHubModuleClient (Asynchronous) - .receive_method_request()")
 class TestIoTHubModuleClientReceiveMethodRequest(
     IoTHubModuleClientTestsConfig, SharedClientReceiveMethodRequestTests
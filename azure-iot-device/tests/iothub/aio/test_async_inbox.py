@@ -123,3 +123,93 @@ class TestAsyncClientInboxClear(object):
 
         inbox.clear()
         assert inbox.empty()
+
+
+@pytest.mark.describe("AsyncClientInbox - Bounded")
+@pytest.mark.asyncio
+class TestAsyncClientInboxBounded(object):
+    @pytest.mark.it("Drops the oldest item to make room for a new one when full, by default")
+    async def test_drop_oldest(self):
+        inbox = AsyncClientInbox(max_size=2)
+        assert inbox._put(1)
+        assert inbox._put(2)
+        assert inbox._put(3)
+        assert inbox.dropped_count == 1
+        assert await inbox.get() == 2
+        assert await inbox.get() == 3
+        await asyncio.sleep(0.01)  # Do this to prevent RuntimeWarning from janus
+
+    @pytest.mark.it("Drops the new item when full, if using the 'drop_newest' overflow policy")
+    async def test_drop_newest(self):
+        inbox = AsyncClientInbox(max_size=2, overflow_policy="drop_newest")
+        assert inbox._put(1)
+        assert inbox._put(2)
+        assert not inbox._put(3)
+        assert inbox.dropped_count == 1
+        assert await inbox.get() == 1
+        assert await inbox.get() == 2
+        await asyncio.sleep(0.01)  # Do this to prevent RuntimeWarning from janus
+
+    @pytest.mark.it(
+        "Calls on_full when full and on_space_available once back down to the resume size, if using the 'pause' overflow policy"
+    )
+    async def test_pause(self, mocker):
+        inbox = AsyncClientInbox(max_size=2, overflow_policy="pause", resume_size=0)
+        inbox.on_full = mocker.MagicMock()
+        inbox.on_space_available = mocker.MagicMock()
+        inbox._put(1)
+        inbox._put(2)
+        assert inbox.on_full.call_count == 1
+        await inbox.get()
+        assert inbox.on_space_available.call_count == 0
+        await inbox.get()
+        assert inbox.on_space_available.call_count == 1
+        await asyncio.sleep(0.01)  # Do this to prevent RuntimeWarning from janus
+
+
+@pytest.mark.describe("AsyncClientInbox - .get_batch()")
+@pytest.mark.asyncio
+class TestAsyncClientInboxGetBatch(object):
+    @pytest.mark.it("Removes and returns up to max_count items, in the order they were added")
+    async def test_returns_items_in_order(self):
+        inbox = AsyncClientInbox()
+        for item in range(5):
+            inbox._put(item)
+        assert await inbox.get_batch(3) == [0, 1, 2]
+        assert await inbox.get_batch(3) == [3, 4]
+        assert inbox.empty()
+        await asyncio.sleep(0.01)  # Do this to prevent RuntimeWarning from janus
+
+    @pytest.mark.it("Only uses the public API of the janus queue, which is stable across versions")
+    async def test_public_janus_api(self):
+        class PublicQueue(object):
+            # Exposes only the public attributes of a janus.Queue
+            def __init__(self, janus_queue):
+                self.sync_q = janus_queue.sync_q
+                self.async_q = janus_queue.async_q
+
+        inbox = AsyncClientInbox()
+        inbox._queue = PublicQueue(inbox._queue)
+        for item in range(5):
+            inbox._put(item)
+        assert await inbox.get_batch(3) == [0, 1, 2]
+        assert await inbox.get_batch(3) == [3, 4]
+        await asyncio.sleep(0.01)  # Do this to prevent RuntimeWarning from janus
+
+    @pytest.mark.it("Waits on an empty inbox until an item is available")
+    async def test_waits_for_item(self):
+        inbox = AsyncClientInbox()
+
+        async def insert_item():
+            await asyncio.sleep(0.01)
+            inbox._put(1)
+
+        items, _ = await asyncio.gather(inbox.get_batch(10), insert_item())
+        assert items == [1]
+
+    @pytest.mark.it("Raises asyncio.TimeoutError if the inbox stays empty until the timeout")
+    async def test_timeout(self):
+        inbox = AsyncClientInbox()
+        with pytest.raises(asyncio.TimeoutError):
+            await inbox.get_batch(10, timeout=0.01)
+        await asyncio.sleep(0.01)  # Do this to prevent RuntimeWarning from janus
@@ -5,12 +5,14 @@
 # --------------------------------------------------------------------------
 import pytest
 import logging
+import threading
 from mock import MagicMock, patch
-from threading import Timer
+from azure.iot.device.common.timer_scheduler import Timer
 from azure.iot.device.iothub.auth.base_renewable_token_authentication_provider import (
     BaseRenewableTokenAuthenticationProvider,
     DEFAULT_TOKEN_VALIDITY_PERIOD,
     DEFAULT_TOKEN_RENEWAL_MARGIN,
+    DEFAULT_TOKEN_RENEWAL_RETRY_INTERVAL,
 )
 
 logging.basicConfig(level=logging.DEBUG)
@@ -166,11 +168,71 @@ def test_update_timer_generates_new_sas_token_and_calls_on_sas_token_updated_han
     timer_callback = fake_timer_object.call_args[0][1]
     device_auth_provider._sign.reset_mock()
     timer_callback()
+    device_auth_provider._token_renewal_thread.join()
     for x in update_callback_list:
         x.assert_called_once_with()
     assert device_auth_provider._sign.call_count == 1
 
 
+def test_update_timer_signs_new_sas_token_on_background_thread(
+    device_auth_provider, fake_timer_object
+):
+    signing_threads = []
+    device_auth_provider.generate_new_sas_token()
+    device_auth_provider._sign.side_effect = lambda *args: (
+        signing_threads.append(threading.current_thread()) or fake_signature
+    )
+    timer_callback = fake_timer_object.call_args[0][1]
+    timer_callback()
+    device_auth_provider._token_renewal_thread.join()
+    assert len(signing_threads) == 1
+    assert signing_threads[0] is device_auth_provider._token_renewal_thread
+    assert signing_threads[0] is not threading.current_thread()
+
+
+def test_update_timer_keeps_current_sas_token_and_retries_if_signing_fails(
+    mocker, device_auth_provider, fake_timer_object, arbitrary_exception
+):
+    mock_handle_background_exception = mocker.patch(
+        "azure.iot.device.iothub.auth.base_renewable_token_authentication_provider.handle_exceptions.handle_background_exception"
+    )
+    update_callback = MagicMock()
+    token = device_auth_provider.get_current_sas_token()
+    device_auth_provider.on_sas_token_updated_handler_list = [update_callback]
+    device_auth_provider._sign.side_effect = arbitrary_exception
+    timer_callback = fake_timer_object.call_args[0][1]
+    timer_callback()
+    device_auth_provider._token_renewal_thread.join()
+
+    assert device_auth_provider.get_current_sas_token() == token
+    assert update_callback.call_count == 0
+    assert mock_handle_background_exception.call_args == mocker.call(arbitrary_exception)
+    assert fake_timer_object.call_args[0][0] == DEFAULT_TOKEN_RENEWAL_RETRY_INTERVAL
+
+
+def test_update_timer_keeps_new_sas_token_and_does_not_retry_if_update_handler_fails(
+    mocker, device_auth_provider, fake_timer_object, arbitrary_exception
+):
+    mock_handle_background_exception = mocker.patch(
+        "azure.iot.device.iothub.auth.base_renewable_token_authentication_provider.handle_exceptions.handle_background_exception"
+    )
+    device_auth_provider.generate_new_sas_token()
+    device_auth_provider.on_sas_token_updated_handler_list = [
+        MagicMock(side_effect=arbitrary_exception)
+    ]
+    timer_callback = fake_timer_object.call_args[0][1]
+    device_auth_provider._sign.reset_mock()
+    timer_callback()
+    device_auth_provider._token_renewal_thread.join()
+
+    assert device_auth_provider._sign.call_count == 1
+    assert mock_handle_background_exception.call_args == mocker.call(arbitrary_exception)
+    assert (
+        fake_timer_object.call_args[0][0]
+        == DEFAULT_TOKEN_VALIDITY_PERIOD - DEFAULT_TOKEN_RENEWAL_MARGIN
+    )
+
+
 def test_finalizer_cancels_update_timer(fake_timer_object):
     # can't use the device_auth_provider fixture here because the fixture adds
     # to the object refcount and prevents del from calling the finalizer
@@ -10,6 +10,8 @@ import json
 import base64
 import logging
 import six.moves.urllib as urllib
+import requests_unixsocket
+from azure.iot.device.iothub.auth import iotedge_authentication_provider
 from azure.iot.device.iothub.auth.iotedge_authentication_provider import (
     IoTEdgeAuthenticationProvider,
     IoTEdgeHsm,
@@ -21,6 +23,25 @@ from azure.iot.device.product_info import ProductInfo
 logging.basicConfig(level=logging.DEBUG)
 
 
+@pytest.fixture(autouse=True)
+def import_requests():
+    # requests is imported and patched for unix sockets on first use.  Do it now, so that the
+    # tests can patch it afterwards.
+    iotedge_authentication_provider._import_requests()
+
+
+@pytest.fixture(autouse=True)
+def clear_trust_bundle_cache():
+    iotedge_authentication_provider._trust_bundle_cache.clear()
+    yield
+    iotedge_authentication_provider._trust_bundle_cache.clear()
+
+
+@pytest.fixture
+def mock_session(mocker):
+    return mocker.patch.object(requests_unixsocket, "Session").return_value
+
+
 @pytest.fixture
 def gateway_hostname():
     return "__FAKE_GATEWAY_HOSTNAME__"
@@ -184,12 +205,70 @@ class TestIoTEdgeHsmInstantiation(object):
     def test_api_version(self, hsm, api_version):
         assert hsm.api_version == api_version
 
+    @pytest.mark.it("Sets the trust_bundle_ttl parameter as an instance attribute")
+    def test_trust_bundle_ttl(self, module_id, module_generation_id, workload_uri, api_version):
+        hsm = IoTEdgeHsm(
+            module_id=module_id,
+            module_generation_id=module_generation_id,
+            workload_uri=workload_uri,
+            api_version=api_version,
+            trust_bundle_ttl=60,
+        )
+
+        assert hsm.trust_bundle_ttl == 60
+
+    @pytest.mark.it("Sets trust_bundle_ttl to DEFAULT_TRUST_BUNDLE_TTL if not provided")
+    def test_trust_bundle_ttl_default(self, hsm):
+        assert hsm.trust_bundle_ttl == iotedge_authentication_provider.DEFAULT_TRUST_BUNDLE_TTL
+
+
+@pytest.mark.describe("IoTEdgeHsm - requests import")
+class TestIoTEdgeHsmRequestsImport(object):
+    @pytest.mark.it("Imports requests only once")
+    def test_imports_once(self, mocker):
+        mocker.patch.object(iotedge_authentication_provider, "_requests", None)
+
+        assert iotedge_authentication_provider._import_requests() is requests
+        assert iotedge_authentication_provider._import_requests() is requests
+        assert iotedge_authentication_provider._requests_unixsocket is requests_unixsocket
+
+    @pytest.mark.it("Does not patch requests globally")
+    def test_does_not_patch(self, mocker):
+        mocker.patch.object(iotedge_authentication_provider, "_requests", None)
+        monkeypatch = mocker.patch.object(requests_unixsocket, "monkeypatch")
+
+        iotedge_authentication_provider._import_requests()
+
+        assert monkeypatch.call_count == 0
+
+
+@pytest.mark.describe("IoTEdgeHsm - Session")
+class TestIoTEdgeHsmSession(object):
+    @pytest.mark.it("Does not create a session until the first request is made")
+    def test_lazy_session(self, mock_session, hsm):
+        assert hsm._session is None
+
+    @pytest.mark.it("Creates a requests-unixsocket session, and uses it for every request")
+    def test_reuses_session(self, mocker, hsm):
+        mock_session_cls = mocker.patch.object(requests_unixsocket, "Session")
+        mock_session = mock_session_cls.return_value
+        mock_session.get.return_value.json.return_value = {"certificate": "cert"}
+        mock_session.post.return_value.json.return_value = {"digest": "somedigest"}
+
+        hsm.get_trust_bundle()
+        hsm.sign("somedata")
+        hsm.sign("someotherdata")
+
+        assert mock_session_cls.call_count == 1
+        assert mock_session.get.call_count == 1
+        assert mock_session.post.call_count == 2
+
 
 @pytest.mark.describe("IoTEdgeHsm - .get_trust_bundle()")
 class TestIoTEdgeHsmGetTrustBundle(object):
     @pytest.mark.it("Makes an HTTP request to EdgeHub for the trust bundle")
-    def test_requests_trust_bundle(self, mocker, hsm):
-        mock_request_get = mocker.patch.object(requests, "get")
+    def test_requests_trust_bundle(self, mocker, mock_session, hsm):
+        mock_request_get = mock_session.get
         expected_url = hsm.workload_uri + "trust-bundle"
         expected_params = {"api-version": hsm.api_version}
         expected_headers = {
@@ -204,8 +283,8 @@ class TestIoTEdgeHsmGetTrustBundle(object):
         )
 
     @pytest.mark.it("Returns the certificate from the trust bundle received from EdgeHub")
-    def test_returns_received_trust_bundle(self, mocker, hsm, certificate):
-        mock_request_get = mocker.patch.object(requests, "get")
+    def test_returns_received_trust_bundle(self, mocker, mock_session, hsm, certificate):
+        mock_request_get = mock_session.get
         mock_response = mock_request_get.return_value
         mock_response.json.return_value = {"certificate": certificate}
 
@@ -213,9 +292,68 @@ class TestIoTEdgeHsmGetTrustBundle(object):
 
         assert cert is certificate
 
+    @pytest.mark.it(
+        "Returns the previously received certificate, without making a request, until trust_bundle_ttl seconds have passed"
+    )
+    def test_caches_trust_bundle(self, mocker, mock_session, hsm, certificate):
+        mock_clock = mocker.patch.object(iotedge_authentication_provider, "_clock")
+        mock_clock.return_value = 1000
+        mock_session.get.return_value.json.return_value = {"certificate": certificate}
+        hsm.trust_bundle_ttl = 60
+
+        assert hsm.get_trust_bundle() is certificate
+        mock_clock.return_value = 1059
+        assert hsm.get_trust_bundle() is certificate
+        assert mock_session.get.call_count == 1
+
+        mock_clock.return_value = 1060
+        mock_session.get.return_value.json.return_value = {"certificate": "new_certificate"}
+        assert hsm.get_trust_bundle() == "new_certificate"
+        assert mock_session.get.call_count == 2
+
+    @pytest.mark.it(
+        "Shares the received certificate with other IoTEdgeHsm objects using the same workload_uri and api_version"
+    )
+    def test_shares_trust_bundle(
+        self, mocker, mock_session, hsm, module_generation_id, certificate
+    ):
+        mock_session.get.return_value.json.return_value = {"certificate": certificate}
+        other_hsm = IoTEdgeHsm(
+            module_id="other_module",
+            module_generation_id=module_generation_id,
+            workload_uri=hsm.workload_uri,
+            api_version=hsm.api_version,
+        )
+        other_api_version_hsm = IoTEdgeHsm(
+            module_id="other_module",
+            module_generation_id=module_generation_id,
+            workload_uri=hsm.workload_uri,
+            api_version="other_api_version",
+        )
+
+        hsm.get_trust_bundle()
+        assert other_hsm.get_trust_bundle() is certificate
+        assert mock_session.get.call_count == 1
+
+        other_api_version_hsm.get_trust_bundle()
+        assert mock_session.get.call_count == 2
+
+    @pytest.mark.it("Does not cache the result of a failed request")
+    def test_does_not_cache_failure(self, mocker, mock_session, hsm, certificate):
+        mock_response = mock_session.get.return_value
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError()
+
+        with pytest.raises(IoTEdgeError):
+            hsm.get_trust_bundle()
+
+        mock_response.raise_for_status.side_effect = None
+        mock_response.json.return_value = {"certificate": certificate}
+        assert hsm.get_trust_bundle() is certificate
+        assert mock_session.get.call_count == 2
+
     @pytest.mark.it("Raises IoTEdgeError if a bad request is made to EdgeHub")
-    def test_bad_request(self, mocker, hsm):
-        mock_request_get = mocker.patch.object(requests, "get")
+    def test_bad_request(self, mocker, mock_session, hsm):
+        mock_request_get = mock_session.get
         mock_response = mock_request_get.return_value
         error = requests.exceptions.HTTPError()
         mock_response.raise_for_status.side_effect = error
@@ -225,8 +363,8 @@ class TestIoTEdgeHsmGetTrustBundle(object):
         assert e_info.value.__cause__ is error
 
     @pytest.mark.it("Raises IoTEdgeError if there is an error in json decoding the trust bundle")
-    def test_bad_json(self, mocker, hsm):
-        mock_request_get = mocker.patch.object(requests, "get")
+    def test_bad_json(self, mocker, mock_session, hsm):
+        mock_request_get = mock_session.get
         mock_response = mock_request_get.return_value
         error = ValueError()
         mock_response.json.side_effect = error
@@ -236,8 +374,8 @@ class TestIoTEdgeHsmGetTrustBundle(object):
         assert e_info.value.__cause__ is error
 
     @pytest.mark.it("Raises IoTEdgeError if the certificate is missing from the trust bundle")
-    def test_bad_trust_bundle(self, mocker, hsm):
-        mock_request_get = mocker.patch.object(requests, "get")
+    def test_bad_trust_bundle(self, mocker, mock_session, hsm):
+        mock_request_get = mock_session.get
         mock_response = mock_request_get.return_value
         # Return an empty json dict with no 'certificate' key
         mock_response.json.return_value = {}
@@ -249,10 +387,10 @@ class TestIoTEdgeHsmGetTrustBundle(object):
 @pytest.mark.describe("IoTEdgeHsm - .sign()")
 class TestIoTEdgeHsmSign(object):
     @pytest.mark.it("Makes an HTTP request to EdgeHub to sign a piece of string data")
-    def test_requests_data_signing(self, mocker, hsm):
+    def test_requests_data_signing(self, mocker, mock_session, hsm):
         data_str = "somedata"
         data_str_b64 = "c29tZWRhdGE="
-        mock_request_post = mocker.patch.object(requests, "post")
+        mock_request_post = mock_session.post
         mock_request_post.return_value.json.return_value = {"digest": "somedigest"}
         expected_url = "{workload_uri}modules/{module_id}/genid/{module_generation_id}/sign".format(
             workload_uri=hsm.workload_uri,
@@ -269,16 +407,16 @@ class TestIoTEdgeHsmSign(object):
 
         assert mock_request_post.call_count == 1
         assert mock_request_post.call_args == mocker.call(
-            url=expected_url, params=expected_params, headers=expected_headers, data=expected_json
+            expected_url, params=expected_params, headers=expected_headers, data=expected_json
         )
 
     @pytest.mark.it("Base64 encodes the string data in the request")
-    def test_b64_encodes_data(self, mocker, hsm):
+    def test_b64_encodes_data(self, mocker, mock_session, hsm):
         # This test is actually implicitly tested in the first test, but it's
         # important to have an explicit test for it since it's a requirement
         data_str = "somedata"
         data_str_b64 = base64.b64encode(data_str.encode("utf-8")).decode()
-        mock_request_post = mocker.patch.object(requests, "post")
+        mock_request_post = mock_session.post
         mock_request_post.return_value.json.return_value = {"digest": "somedigest"}
 
         hsm.sign(data_str)
@@ -289,9 +427,9 @@ class TestIoTEdgeHsmSign(object):
         assert sent_data == data_str_b64
 
     @pytest.mark.it("Returns the signed data received from EdgeHub")
-    def test_returns_signed_data(self, mocker, hsm):
+    def test_returns_signed_data(self, mocker, mock_session, hsm):
         expected_digest = "somedigest"
-        mock_request_post = mocker.patch.object(requests, "post")
+        mock_request_post = mock_session.post
         mock_request_post.return_value.json.return_value = {"digest": expected_digest}
 
         signed_data = hsm.sign("somedata")
@@ -299,10 +437,10 @@ class TestIoTEdgeHsmSign(object):
         assert signed_data == expected_digest
 
     @pytest.mark.it("URL encodes the signed data before returning it")
-    def test_url_encodes_signed_data(self, mocker, hsm):
+    def test_url_encodes_signed_data(self, mocker, mock_session, hsm):
         raw_signed_data = "this digest will be encoded"
         expected_signed_data = urllib.parse.quote(raw_signed_data)
-        mock_request_post = mocker.patch.object(requests, "post")
+        mock_request_post = mock_session.post
         mock_request_post.return_value.json.return_value = {"digest": raw_signed_data}
 
         signed_data = hsm.sign("somedata")
@@ -311,8 +449,8 @@ class TestIoTEdgeHsmSign(object):
         assert signed_data == expected_signed_data
 
     @pytest.mark.it("Raises IoTEdgeError if a bad request is made to EdgeHub")
-    def test_bad_request(self, mocker, hsm):
-        mock_request_post = mocker.patch.object(requests, "post")
+    def test_bad_request(self, mocker, mock_session, hsm):
+        mock_request_post = mock_session.post
         mock_response = mock_request_post.return_value
         error = requests.exceptions.HTTPError()
         mock_response.raise_for_status.side_effect = error
@@ -322,8 +460,8 @@ class TestIoTEdgeHsmSign(object):
         assert e_info.value.__cause__ is error
 
     @pytest.mark.it("Raises IoTEdgeError if there is an error in json decoding the signed response")
-    def test_bad_json(self, mocker, hsm):
-        mock_request_post = mocker.patch.object(requests, "post")
+    def test_bad_json(self, mocker, mock_session, hsm):
+        mock_request_post = mock_session.post
         mock_response = mock_request_post.return_value
         error = ValueError()
         mock_response.json.side_effect = error
@@ -332,8 +470,8 @@ class TestIoTEdgeHsmSign(object):
         assert e_info.value.__cause__ is error
 
     @pytest.mark.it("Raises IoTEdgeError if the signed data is missing from the response")
-    def test_bad_response(self, mocker, hsm):
-        mock_request_post = mocker.patch.object(requests, "post")
+    def test_bad_response(self, mocker, mock_session, hsm):
+        mock_request_post = mock_session.post
         mock_response = mock_request_post.return_value
         mock_response.json.return_value = {}
 
@@ -141,3 +141,15 @@ def test_raises_when_auth_provider_created_from_connection_string_with_bad_keys(
     with pytest.raises(ValueError, match="Invalid Connection String - Invalid Key"):
         connection_string = "BadHostName=beauxbatons.academy-net;BadDeviceId=TheDeluminator;SharedAccessKey=Zm9vYmFy"
         SymmetricKeyAuthenticationProvider.parse(connection_string)
+
+
+def test_signature_uses_current_shared_access_key():
+    connection_string = connection_string_device_sk_format.format(
+        hostname, device_id, shared_access_key
+    )
+    sym_key_auth_provider = SymmetricKeyAuthenticationProvider.parse(connection_string)
+    signature = sym_key_auth_provider._sign("some_uri", 1000)
+    assert sym_key_auth_provider._sign("some_uri", 1000) == signature
+
+    sym_key_auth_provider.shared_access_key = "YmFyYmF6"
+    assert sym_key_auth_provider._sign("some_uri", 1000) != signature
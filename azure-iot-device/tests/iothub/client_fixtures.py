@@ -189,6 +189,9 @@ class FakeIoTHubPipeline:
     def disable_feature(self, feature_name, callback):
         callback()
 
+    def update_feature_pause(self, feature_name, is_pause_wanted, callback):
+        callback()
+
     def send_message(self, event, callback):
         callback()
 
@@ -0,0 +1,51 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import pytest
+import logging
+from azure.iot.device.iothub.models import InboxOptions
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+@pytest.mark.describe("InboxOptions")
+class TestInboxOptions(object):
+    @pytest.mark.it("Instantiates with the properties set to the values of the parameters")
+    def test_properties(self):
+        options = InboxOptions(max_size=100, overflow_policy="pause", resume_size=10)
+        assert options.max_size == 100
+        assert options.overflow_policy == "pause"
+        assert options.resume_size == 10
+
+    @pytest.mark.it("Instantiates with default values for the optional properties")
+    def test_defaults(self):
+        options = InboxOptions(max_size=100)
+        assert options.overflow_policy == "drop_oldest"
+        assert options.resume_size == 50
+
+    @pytest.mark.it("Maintains all properties as read-only")
+    @pytest.mark.parametrize("name", ["max_size", "overflow_policy", "resume_size"])
+    def test_read_only(self, name):
+        options = InboxOptions(max_size=100)
+        with pytest.raises(AttributeError):
+            setattr(options, name, "new value")
+
+    @pytest.mark.it("Raises a ValueError if given invalid options")
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            pytest.param({"max_size": 0}, id="Invalid max_size"),
+            pytest.param({"max_size": 10, "overflow_policy": "reject_new"}, id="Invalid policy"),
+            # Blocking the callback thread on a full inbox would also block the completion of
+            # the ops an application waits on while receiving, so it is not a policy
+            pytest.param({"max_size": 10, "overflow_policy": "block"}, id="Blocking policy"),
+            pytest.param({"max_size": 10, "resume_size": 10}, id="resume_size too large"),
+            pytest.param({"max_size": 10, "resume_size": -1}, id="Negative resume_size"),
+        ],
+    )
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            InboxOptions(**kwargs)
@@ -7,6 +7,8 @@
 import pytest
 import logging
 from azure.iot.device.iothub.models import Message
+from azure.iot.device.iothub.models import message as message_module
+from azure.iot.device.iothub.pipeline import mqtt_topic_iothub
 from azure.iot.device import constant
 
 logging.basicConfig(level=logging.DEBUG)
@@ -62,3 +64,139 @@ class TestMessage(object):
     def test_str_rep(self, data):
         msg = Message(data)
         assert str(msg) == str(data)
+
+    @pytest.mark.it("Provides a memoryview of binary data which does not copy it")
+    def test_data_view(self):
+        data = bytearray(b"some binary data")
+        msg = Message(data)
+        view = msg.data_view
+        assert view.tobytes() == b"some binary data"
+        data[0:4] = b"SOME"
+        assert view[0:4].tobytes() == b"SOME"
+
+    @pytest.mark.it("Decodes binary data according to the content encoding, defaulting to utf-8")
+    @pytest.mark.parametrize(
+        "encoding, expected_encoding",
+        [
+            pytest.param(None, "utf-8", id="No content encoding"),
+            pytest.param("utf-8", "utf-8", id="utf-8"),
+            pytest.param("utf-16", "utf-16", id="utf-16"),
+        ],
+    )
+    def test_decode_data(self, encoding, expected_encoding):
+        text = u"Ce n'est pas une pipe é"
+        msg = Message(text.encode(expected_encoding), content_encoding=encoding)
+        assert msg.decode_data() == text
+
+    @pytest.mark.it("Only decodes the data once, until the data is set again")
+    def test_decode_data_cached(self):
+        msg = Message(b"first")
+        decoded = msg.decode_data()
+        assert msg.decode_data() is decoded
+        msg.data = b"second"
+        assert msg.decode_data() == u"second"
+
+    @pytest.mark.it("Decodes mutable data again on every call, since it can be changed in place")
+    @pytest.mark.parametrize(
+        "make_data",
+        [
+            pytest.param(bytearray, id="bytearray"),
+            pytest.param(lambda value: memoryview(bytearray(value)), id="memoryview"),
+        ],
+    )
+    def test_decode_mutable_data(self, make_data):
+        data = make_data(b"abc")
+        msg = Message(data)
+        assert msg.decode_data() == u"abc"
+        data[0:3] = b"xyz"
+        assert msg.decode_data() == u"xyz"
+
+    @pytest.mark.it("Returns string data as is when decoding")
+    def test_decode_str_data(self):
+        msg = Message(u"text")
+        assert msg.decode_data() == u"text"
+
+    @pytest.mark.it("Does not allow setting attributes which are not message fields")
+    def test_slots(self):
+        msg = Message("data")
+        with pytest.raises(AttributeError):
+            msg.not_a_field = "value"
+
+
+@pytest.mark.describe("Message - .get_size()")
+class TestMessageGetSize(object):
+    @pytest.mark.it("Returns the number of bytes of the data, encoded as utf-8 if it is a string")
+    @pytest.mark.parametrize(
+        "data, expected_size",
+        [
+            pytest.param(b"\x00\x01\x02", 3, id="Bytes"),
+            pytest.param(bytearray(b"\x00\x01"), 2, id="Bytearray"),
+            pytest.param(memoryview(b"\x00\x01\x02\x03"), 4, id="Memoryview"),
+            pytest.param(u"abc", 3, id="ASCII string"),
+            pytest.param(u"éé", 4, id="Non-ASCII string"),
+            pytest.param(12345, 5, id="Integer"),
+            pytest.param(None, 0, id="None"),
+        ],
+    )
+    def test_data_size(self, data, expected_size):
+        assert Message(data).get_size() == expected_size
+
+    @pytest.mark.it(
+        "Includes the system and custom properties, as encoded on the topic the message is sent to"
+    )
+    def test_properties_size(self):
+        msg = Message(b"12345", message_id="id", content_type="application/json")
+        msg.custom_properties["key"] = "a value"
+        expected = len(b"12345") + len(
+            mqtt_topic_iothub.encode_message_properties_in_topic(msg, "")
+        )
+        assert msg.get_size() == expected
+
+    @pytest.mark.it("Only calculates the size again after the message has been changed")
+    @pytest.mark.parametrize(
+        "change",
+        [
+            pytest.param(lambda msg: setattr(msg, "data", b"longer data"), id="Data"),
+            pytest.param(lambda msg: setattr(msg, "message_id", "an id"), id="Message id"),
+            pytest.param(lambda msg: setattr(msg, "output_name", "output"), id="Output name"),
+            pytest.param(lambda msg: msg.set_as_security_message(), id="Security message"),
+            pytest.param(
+                lambda msg: msg.custom_properties.update(key="value"), id="Custom property added"
+            ),
+            pytest.param(
+                lambda msg: msg.custom_properties.pop("existing"), id="Custom property removed"
+            ),
+            pytest.param(
+                lambda msg: setattr(msg, "custom_properties", {"new": "more properties"}),
+                id="Custom properties replaced",
+            ),
+        ],
+    )
+    def test_cached_until_changed(self, mocker, change):
+        msg = Message(b"data")
+        msg.custom_properties["existing"] = "value"
+        properties_size_spy = mocker.spy(message_module, "_get_properties_size")
+        size = msg.get_size()
+        assert msg.get_size() == size
+        assert properties_size_spy.call_count == 1
+
+        change(msg)
+        assert msg.get_size() != size
+        assert properties_size_spy.call_count == 2
+
+    @pytest.mark.it("Tracks changes made in place to bytearray data")
+    def test_bytearray_changed_in_place(self):
+        data = bytearray(b"abc")
+        msg = Message(data)
+        size = msg.get_size()
+        data[0:3] = b"xyzxyzxyz"
+        assert msg.get_size() == size + 6
+
+    @pytest.mark.it("Tracks changes made to a custom properties dictionary set by the user")
+    def test_user_custom_properties(self):
+        msg = Message(b"data")
+        custom_properties = {}
+        msg.custom_properties = custom_properties
+        size = msg.get_size()
+        custom_properties["key"] = "value"
+        assert msg.get_size() > size
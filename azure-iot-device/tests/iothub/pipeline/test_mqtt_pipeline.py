@@ -38,6 +38,9 @@ all_features = [
     constant.TWIN_PATCHES,
 ]
 
+# Features which can be paused because their inbox is full
+pausable_features = [constant.C2D_MSG, constant.INPUT_MSG]
+
 
 @pytest.fixture
 def auth_provider(mocker):
@@ -119,6 +122,7 @@ class TestMQTTPipelineInstantiation(object):
             pipeline_stages_iothub.TwinRequestResponseStage,
             pipeline_stages_base.CoordinateRequestAndResponseStage,
             pipeline_stages_iothub_mqtt.IoTHubMQTTTranslationStage,
+            pipeline_stages_base.StoreAndForwardStage,
             pipeline_stages_base.AutoConnectStage,
             pipeline_stages_base.ReconnectStage,
             pipeline_stages_base.ConnectionLockStage,
@@ -677,6 +681,110 @@ class TestMQTTPipelineDisableFeature(object):
         assert cb.call_args == mocker.call(error=arbitrary_exception)
 
 
+@pytest.mark.describe("MQTTPipeline - .update_feature_pause()")
+class TestMQTTPipelineUpdateFeaturePause(object):
+    @pytest.mark.it("Raises ValueError if the feature_name is invalid or can't be paused")
+    @pytest.mark.parametrize(
+        "feature_name", ["not-a-feature-name", constant.METHODS, constant.TWIN_PATCHES]
+    )
+    def test_invalid_feature_name(self, pipeline, mocker, feature_name):
+        with pytest.raises(ValueError):
+            pipeline.update_feature_pause(
+                feature_name, is_pause_wanted=lambda: True, callback=mocker.MagicMock()
+            )
+
+    @pytest.mark.it(
+        "Runs a DisableFeatureOperation with the provided feature_name on the pipeline, and triggers the callback upon its completion, if the feature should be paused"
+    )
+    @pytest.mark.parametrize("feature", pausable_features)
+    def test_pause(self, pipeline, feature, mocker):
+        pipeline.feature_enabled[feature] = True
+        cb = mocker.MagicMock()
+        pipeline.update_feature_pause(feature, is_pause_wanted=lambda: True, callback=cb)
+        op = pipeline._pipeline.run_op.call_args[0][0]
+
+        assert pipeline._pipeline.run_op.call_count == 1
+        assert isinstance(op, pipeline_ops_base.DisableFeatureOperation)
+        assert op.feature_name == feature
+        assert cb.call_count == 0
+        # Pausing doesn't disable the feature
+        assert pipeline.feature_enabled[feature]
+
+        op.complete(error=None)
+        assert cb.call_args == mocker.call(error=None)
+
+    @pytest.mark.it(
+        "Runs an EnableFeatureOperation with the provided feature_name on the pipeline, and triggers the callback upon its completion, if the feature is paused and shouldn't be anymore"
+    )
+    @pytest.mark.parametrize("feature", pausable_features)
+    def test_resume(self, pipeline, feature, mocker):
+        pipeline.feature_enabled[feature] = True
+        pipeline.update_feature_pause(
+            feature, is_pause_wanted=lambda: True, callback=mocker.MagicMock()
+        )
+        cb = mocker.MagicMock()
+        pipeline.update_feature_pause(feature, is_pause_wanted=lambda: False, callback=cb)
+        op = pipeline._pipeline.run_op.call_args[0][0]
+
+        assert pipeline._pipeline.run_op.call_count == 2
+        assert isinstance(op, pipeline_ops_base.EnableFeatureOperation)
+        assert op.feature_name == feature
+        assert cb.call_count == 0
+
+        op.complete(error=None)
+        assert cb.call_args == mocker.call(error=None)
+
+    @pytest.mark.it(
+        "Triggers the callback without running an operation when resuming, if the feature has been disabled"
+    )
+    @pytest.mark.parametrize("feature", pausable_features)
+    def test_resume_disabled_feature(self, pipeline, feature, mocker):
+        pipeline.feature_enabled[feature] = True
+        pipeline.update_feature_pause(
+            feature, is_pause_wanted=lambda: True, callback=mocker.MagicMock()
+        )
+        pipeline.feature_enabled[feature] = False
+        cb = mocker.MagicMock()
+        pipeline.update_feature_pause(feature, is_pause_wanted=lambda: False, callback=cb)
+
+        assert pipeline._pipeline.run_op.call_count == 1
+        assert cb.call_args == mocker.call(error=None)
+
+    @pytest.mark.it(
+        "Triggers the callback without running an operation, if the feature is already paused or resumed as wanted"
+    )
+    @pytest.mark.parametrize("feature", pausable_features)
+    def test_no_change(self, pipeline, feature, mocker):
+        pipeline.feature_enabled[feature] = True
+        cb = mocker.MagicMock()
+        pipeline.update_feature_pause(feature, is_pause_wanted=lambda: False, callback=cb)
+        assert pipeline._pipeline.run_op.call_count == 0
+        assert cb.call_args == mocker.call(error=None)
+
+        pipeline.update_feature_pause(
+            feature, is_pause_wanted=lambda: True, callback=mocker.MagicMock()
+        )
+        cb = mocker.MagicMock()
+        pipeline.update_feature_pause(feature, is_pause_wanted=lambda: True, callback=cb)
+        assert pipeline._pipeline.run_op.call_count == 1
+        assert cb.call_args == mocker.call(error=None)
+
+    @pytest.mark.it(
+        "Decides whether to pause based on what is_pause_wanted returns when the update runs, not on the order updates are requested in"
+    )
+    @pytest.mark.parametrize("feature", pausable_features)
+    def test_out_of_order_updates(self, pipeline, feature, mocker):
+        # An inbox became full and had space again right away, but the update for it becoming
+        # full reaches the pipeline last.  The feature must not be left paused.
+        pipeline.feature_enabled[feature] = True
+        pause_wanted = [False]
+        for _ in range(2):
+            pipeline.update_feature_pause(
+                feature, is_pause_wanted=lambda: pause_wanted[0], callback=mocker.MagicMock()
+            )
+        assert pipeline._pipeline.run_op.call_count == 0
+
+
 @pytest.mark.describe("MQTTPipeline - OCCURANCE: Connected")
 class TestMQTTPipelineEVENTConnect(object):
     @pytest.mark.it("Triggers the 'on_connected' handler")
@@ -1027,6 +1027,155 @@ class TestExtractMessagePropertiesFromTopic(object):
             mqtt_topic_iothub.extract_message_properties_from_topic(topic, msg)
 
 
+@pytest.mark.describe("IncomingTopicParser - .parse()")
+class TestIncomingTopicParserParse(object):
+    @pytest.fixture
+    def parser(self):
+        return mqtt_topic_iothub.IncomingTopicParser("fake$device", "fake module")
+
+    @pytest.mark.it("Classifies C2D message topics for the device and extracts their properties")
+    @pytest.mark.parametrize(
+        "topic, expected_properties",
+        [
+            pytest.param(
+                "devices/fake%24device/messages/devicebound/%24.mid=message%24id&custom+1=value%2F1",
+                {"$.mid": "message$id", "custom+1": "value/1"},
+                id="With properties",
+            ),
+            pytest.param("devices/fake%24device/messages/devicebound/", {}, id="No properties"),
+            pytest.param("devices/fake%24device/messages/devicebound", {}, id="No trailing '/'"),
+        ],
+    )
+    def test_c2d(self, parser, topic, expected_properties):
+        parsed_topic = parser.parse(topic)
+        assert parsed_topic.kind == mqtt_topic_iothub.C2D_TOPIC
+        assert parsed_topic.properties == expected_properties
+
+    @pytest.mark.it(
+        "Classifies input message topics for the module and extracts their input name and properties"
+    )
+    @pytest.mark.parametrize(
+        "topic, expected_properties",
+        [
+            pytest.param(
+                "devices/fake%24device/modules/fake%20module/inputs/fake%2Finput/%24.mid=message%24id&custom+1=value%2F1",
+                {"$.mid": "message$id", "custom+1": "value/1"},
+                id="With properties",
+            ),
+            pytest.param(
+                "devices/fake%24device/modules/fake%20module/inputs/fake%2Finput",
+                {},
+                id="No properties",
+            ),
+        ],
+    )
+    def test_input(self, parser, topic, expected_properties):
+        parsed_topic = parser.parse(topic)
+        assert parsed_topic.kind == mqtt_topic_iothub.INPUT_TOPIC
+        assert parsed_topic.input_name == "fake/input"
+        assert parsed_topic.properties == expected_properties
+
+    @pytest.mark.it(
+        "Classifies method request topics and extracts their method name and request id"
+    )
+    def test_method(self, parser):
+        parsed_topic = parser.parse("$iothub/methods/POST/fake%23method/?$rid=fake%24rid")
+        assert parsed_topic.kind == mqtt_topic_iothub.METHOD_TOPIC
+        assert parsed_topic.method_name == "fake#method"
+        assert parsed_topic.request_id == "fake$rid"
+
+    @pytest.mark.it("Classifies twin response topics and extracts their status code and request id")
+    def test_twin_response(self, parser):
+        parsed_topic = parser.parse("$iothub/twin/res/204/?$rid=fake%24rid&$version=2")
+        assert parsed_topic.kind == mqtt_topic_iothub.TWIN_RESPONSE_TOPIC
+        assert parsed_topic.status_code == 204
+        assert parsed_topic.request_id == "fake$rid"
+
+    @pytest.mark.it("Classifies twin desired property patch topics")
+    def test_twin_patch(self, parser):
+        parsed_topic = parser.parse("$iothub/twin/PATCH/properties/desired/?$version=2")
+        assert parsed_topic.kind == mqtt_topic_iothub.TWIN_PATCH_TOPIC
+
+    @pytest.mark.it("Classifies topics which are not meant for the client as unknown")
+    @pytest.mark.parametrize(
+        "topic",
+        [
+            pytest.param("not a topic", id="Not a topic"),
+            pytest.param("$iothub/unknown/topic", id="Unknown $iothub topic"),
+            pytest.param(
+                "devices/other_device/messages/devicebound/%24.mid=1", id="C2D for another device"
+            ),
+            pytest.param(
+                "devices/fake%24device/messages/deviceboundary/%24.mid=1", id="Malformed C2D topic"
+            ),
+            pytest.param(
+                "devices/fake%24device/modules/other_module/inputs/fake_input/%24.mid=1",
+                id="Input message for another module",
+            ),
+        ],
+    )
+    def test_unknown(self, parser, topic):
+        assert parser.parse(topic).kind == mqtt_topic_iothub.UNKNOWN_TOPIC
+
+    @pytest.mark.it("Does not classify C2D or input message topics if created without ids")
+    def test_no_ids(self):
+        parser = mqtt_topic_iothub.IncomingTopicParser()
+        assert (
+            parser.parse("devices/None/messages/devicebound/").kind
+            == mqtt_topic_iothub.UNKNOWN_TOPIC
+        )
+        assert (
+            parser.parse("$iothub/methods/POST/fake_method/?$rid=1").kind
+            == mqtt_topic_iothub.METHOD_TOPIC
+        )
+
+    @pytest.mark.it("Does not decode message properties until they are accessed")
+    def test_lazy_properties(self, parser, mocker):
+        decode = mocker.spy(mqtt_topic_iothub, "_decode_message_properties")
+        parsed_topic = parser.parse("devices/fake%24device/messages/devicebound/%24.mid=1")
+        assert decode.call_count == 0
+        assert parsed_topic.properties == {"$.mid": "1"}
+        assert parsed_topic.properties == {"$.mid": "1"}
+        assert decode.call_count == 1
+
+    @pytest.mark.it("Sets the message properties of the topic on a Message object")
+    def test_set_message_properties(self, parser):
+        parsed_topic = parser.parse(
+            "devices/fake%24device/messages/devicebound/%24.mid=message%24id&%24.ct=fake%23type&%24.to=%2Fdevices&iothub-ack=full&custom%2A=value%23"
+        )
+        msg = Message("fake message")
+        parsed_topic.set_message_properties(msg)
+        assert msg.message_id == "message$id"
+        assert msg.content_type == "fake#type"
+        assert msg.custom_properties == {"custom*": "value#"}
+
+    @pytest.mark.it("Raises an IndexError if the request id is missing from a request topic")
+    @pytest.mark.parametrize(
+        "topic",
+        [
+            pytest.param("$iothub/methods/POST/fake_method", id="Method request"),
+            pytest.param("$iothub/twin/res/200", id="Twin response"),
+        ],
+    )
+    def test_missing_request_id(self, parser, topic):
+        with pytest.raises(IndexError):
+            parser.parse(topic)
+
+    @pytest.mark.it(
+        "Raises a ValueError if the status code of a twin response topic is not numeric"
+    )
+    @pytest.mark.parametrize(
+        "topic",
+        [
+            pytest.param("$iothub/twin/res/?$rid=1", id="Missing status code"),
+            pytest.param("$iothub/twin/res/bad/?$rid=1", id="Bad status code"),
+        ],
+    )
+    def test_bad_status_code(self, parser, topic):
+        with pytest.raises(ValueError):
+            parser.parse(topic)
+
+
 @pytest.mark.describe(".encode_message_properties_in_topic()")
 class TestEncodeMessagePropertiesInTopic(object):
     def create_message(self, system_properties, custom_properties):
@@ -1194,3 +1343,41 @@ class TestEncodeMessagePropertiesInTopic(object):
 
         with pytest.raises(ValueError):
             mqtt_topic_iothub.encode_message_properties_in_topic(message, message_topic)
+
+    @pytest.mark.it(
+        "Encodes the current property values of each message when encoding messages with the same properties repeatedly"
+    )
+    def test_repeated_encoding(self, message_topic):
+        for i in range(3):
+            system_properties = {"mid": "id#{}".format(i), "ct": "type", "on": "out#{}".format(i)}
+            custom_properties = {"b key": "value {}".format(i), "a/key": "same"}
+            expected_encoding = "%24.on=out%23{i}&%24.mid=id%23{i}&%24.ct=type&a%2Fkey=same&b%20key=value%20{i}".format(
+                i=i
+            )
+            message = self.create_message(system_properties, custom_properties)
+            encoded_topic = mqtt_topic_iothub.encode_message_properties_in_topic(
+                message, message_topic
+            )
+            assert encoded_topic == message_topic + expected_encoding
+
+    @pytest.mark.it(
+        "Raises ValueError every time duplicate keys exist in custom properties, even after a previous failure"
+    )
+    def test_duplicate_keys_repeated(self, message_topic):
+        message = self.create_message({}, {1: "val1", "1": "val2"})
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                mqtt_topic_iothub.encode_message_properties_in_topic(message, message_topic)
+
+    @pytest.mark.it("Keeps the number of cached encodings bounded")
+    def test_cache_bounded(self, mocker, message_topic):
+        mocker.patch.object(mqtt_topic_iothub._custom_property_value_cache, "_max_size", 10)
+        mocker.patch.object(mqtt_topic_iothub._custom_property_layout_cache, "_max_size", 10)
+        for i in range(50):
+            message = self.create_message({}, {"key{}".format(i): "value{}".format(i)})
+            encoded_topic = mqtt_topic_iothub.encode_message_properties_in_topic(
+                message, message_topic
+            )
+            assert encoded_topic == message_topic + "key{i}=value{i}".format(i=i)
+            assert len(mqtt_topic_iothub._custom_property_value_cache) <= 10
+            assert len(mqtt_topic_iothub._custom_property_layout_cache) <= 10
@@ -940,6 +940,16 @@ class TestIoTHubMQTTConverterForPublishOps(IoTHubMQTTTranslationStageTestBase):
         new_op = stage.next._run_op.call_args[0][0]
         assert new_op.payload == params["publish_payload"]
 
+    @pytest.mark.it(
+        "Marks the MQTT publish operation as durable if it sends telemetry, so that it can be stored while disconnected"
+    )
+    def test_durable(self, stage, stages_configured_for_both, params, op):
+        stage.run_op(op)
+        new_op = stage.next._run_op.call_args[0][0]
+        assert new_op.durable is (
+            params["op_class"] is not pipeline_ops_iothub.SendMethodResponseOperation
+        )
+
 
 feature_name_to_subscribe_topic = [
     {
@@ -1074,6 +1084,14 @@ class TestIoTHubMQTTConverterHandlePipelineEventC2D(IoTHubMQTTTranslationStageTe
         new_event = stage.previous.handle_pipeline_event.call_args[0][0]
         assert isinstance(new_event.message, Message)
 
+    @pytest.mark.it("Uses the mqtt payload object as the data of the Message, without copying it")
+    def test_message_data_is_payload(
+        self, mocker, stage, stage_configured_for_device, add_pipeline_root, c2d_event
+    ):
+        stage.handle_pipeline_event(c2d_event)
+        new_event = stage.previous.handle_pipeline_event.call_args[0][0]
+        assert new_event.message.data is c2d_event.payload
+
     @pytest.mark.it("Extracts message properties from the mqtt topic for c2d messages")
     def test_extracts_c2d_message_properties_from_topic_name(
         self, mocker, stage, stage_configured_for_device, add_pipeline_root
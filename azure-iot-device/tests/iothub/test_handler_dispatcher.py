@@ -0,0 +1,206 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import pytest
+import logging
+import threading
+from azure.iot.device.iothub.handler_dispatcher import HandlerDispatcher
+from azure.iot.device.iothub.sync_inbox import SyncClientInbox
+
+logging.basicConfig(level=logging.DEBUG)
+
+TIMEOUT = 5
+
+
+class Inboxes(dict):
+    """The inbox of each key, created the first time it is needed"""
+
+    def __missing__(self, key):
+        inbox = self[key] = SyncClientInbox()
+        return inbox
+
+
+class Recorder(object):
+    """Handler recording its calls, and signalling once it has been called a number of times"""
+
+    def __init__(self, expected_calls):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.expected_calls = expected_calls
+
+    def __call__(self, *args):
+        with self.lock:
+            self.calls.append(args)
+            if len(self.calls) == self.expected_calls:
+                self.done.set()
+
+
+@pytest.mark.describe("HandlerDispatcher - Instantiation")
+class TestHandlerDispatcherInstantiation(object):
+    @pytest.mark.it("Raises a ValueError if max_workers is less than 1")
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError):
+            HandlerDispatcher(max_workers=0)
+
+    @pytest.mark.it("Does not start any worker thread until a call is dispatched")
+    def test_lazy_pool(self):
+        dispatcher = HandlerDispatcher()
+        assert dispatcher._pool is None
+
+
+@pytest.mark.describe("HandlerDispatcher - .dispatch()")
+class TestHandlerDispatcherDispatch(object):
+    @pytest.mark.it("Calls the handler with the given arguments on a worker thread")
+    def test_calls_handler(self):
+        calling_threads = []
+        done = threading.Event()
+
+        def handler(*args):
+            calling_threads.append((threading.current_thread(), args))
+            done.set()
+
+        HandlerDispatcher().dispatch("key", SyncClientInbox(), handler, "arg1", "arg2")
+
+        assert done.wait(TIMEOUT)
+        assert calling_threads[0][0] is not threading.current_thread()
+        assert calling_threads[0][1] == ("arg1", "arg2")
+
+    @pytest.mark.it("Calls the handler for calls with the same key one at a time, in order")
+    def test_same_key_ordered(self):
+        dispatcher = HandlerDispatcher(max_workers=4)
+        inboxes = Inboxes()
+        running = []
+        recorder = Recorder(expected_calls=50)
+
+        def handler(item):
+            running.append(item)
+            assert len(running) == 1
+            running.remove(item)
+            recorder(item)
+
+        for item in range(50):
+            dispatcher.dispatch("key", inboxes["key"], handler, item)
+
+        assert recorder.done.wait(TIMEOUT)
+        assert recorder.calls == [(item,) for item in range(50)]
+
+    @pytest.mark.it("Keeps handling calls for other keys while a handler is blocked")
+    def test_other_keys_not_blocked(self):
+        dispatcher = HandlerDispatcher(max_workers=2)
+        inboxes = Inboxes()
+        unblock = threading.Event()
+        recorder = Recorder(expected_calls=10)
+
+        dispatcher.dispatch("slow", inboxes["slow"], unblock.wait, TIMEOUT)
+        dispatcher.dispatch("slow", inboxes["slow"], recorder, "slow")
+        for item in range(10):
+            dispatcher.dispatch("fast", inboxes["fast"], recorder, item)
+
+        assert recorder.done.wait(TIMEOUT)
+        assert ("slow",) not in recorder.calls
+        unblock.set()
+
+    @pytest.mark.it("Runs at most max_workers handlers at the same time")
+    def test_max_workers(self):
+        dispatcher = HandlerDispatcher(max_workers=2)
+        inboxes = Inboxes()
+        lock = threading.Lock()
+        state = {"running": 0, "max_running": 0}
+        recorder = Recorder(expected_calls=20)
+        unblock = threading.Event()
+
+        def handler(item):
+            with lock:
+                state["running"] += 1
+                state["max_running"] = max(state["max_running"], state["running"])
+                if state["running"] == 2:
+                    unblock.set()
+            unblock.wait(TIMEOUT)
+            with lock:
+                state["running"] -= 1
+            recorder(item)
+
+        for item in range(20):
+            dispatcher.dispatch(item % 5, inboxes[item % 5], handler, item)
+
+        assert recorder.done.wait(TIMEOUT)
+        assert state["max_running"] == 2
+
+    @pytest.mark.it("Keeps calling the handler after it raises an exception")
+    def test_handler_exception(self, arbitrary_exception):
+        dispatcher = HandlerDispatcher()
+        inboxes = Inboxes()
+        recorder = Recorder(expected_calls=1)
+
+        def failing_handler():
+            raise arbitrary_exception
+
+        dispatcher.dispatch("key", inboxes["key"], failing_handler)
+        dispatcher.dispatch("key", inboxes["key"], recorder, "after")
+
+        assert recorder.done.wait(TIMEOUT)
+        assert recorder.calls == [("after",)]
+
+    @pytest.mark.it(
+        "Applies the overflow policy of the key's inbox to the calls waiting for a worker, and returns False for dropped calls"
+    )
+    @pytest.mark.parametrize(
+        "overflow_policy, expected_calls",
+        [
+            pytest.param("drop_newest", ["blocker", 0, 1], id="drop_newest"),
+            pytest.param("drop_oldest", ["blocker", 2, 3], id="drop_oldest"),
+        ],
+    )
+    def test_bounded_inbox(self, overflow_policy, expected_calls):
+        dispatcher = HandlerDispatcher()
+        inbox = SyncClientInbox(max_size=2, overflow_policy=overflow_policy)
+        started = threading.Event()
+        unblock = threading.Event()
+        recorder = Recorder(expected_calls=3)
+
+        def blocker(item):
+            started.set()
+            unblock.wait(TIMEOUT)
+            recorder(item)
+
+        assert dispatcher.dispatch("key", inbox, blocker, "blocker")
+        assert started.wait(TIMEOUT)
+        results = [dispatcher.dispatch("key", inbox, recorder, item) for item in range(4)]
+        assert inbox.dropped_count == 2
+        if overflow_policy == "drop_newest":
+            assert results == [True, True, False, False]
+        else:
+            assert results == [True, True, True, True]
+
+        unblock.set()
+        assert recorder.done.wait(TIMEOUT)
+        assert recorder.calls == [(item,) for item in expected_calls]
+
+    @pytest.mark.it(
+        "Marks the key's inbox as full while too many calls are waiting for a worker, if it uses the 'pause' overflow policy"
+    )
+    def test_pause_inbox(self):
+        dispatcher = HandlerDispatcher()
+        inbox = SyncClientInbox(max_size=2, overflow_policy="pause", resume_size=0)
+        started = threading.Event()
+        unblock = threading.Event()
+        recorder = Recorder(expected_calls=4)
+
+        def blocker(item):
+            started.set()
+            unblock.wait(TIMEOUT)
+            recorder(item)
+
+        dispatcher.dispatch("key", inbox, blocker, "blocker")
+        assert started.wait(TIMEOUT)
+        for item in range(3):
+            assert dispatcher.dispatch("key", inbox, recorder, item)
+        assert inbox.full
+
+        unblock.set()
+        assert recorder.done.wait(TIMEOUT)
+        assert not inbox.full
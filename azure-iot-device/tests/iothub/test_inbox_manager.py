@@ -10,7 +10,8 @@ import sys
 import six
 import abc
 from azure.iot.device.iothub.inbox_manager import InboxManager
-from azure.iot.device.iothub.models import Message, MethodRequest
+from azure.iot.device.iothub.models import Message, MethodRequest, InboxOptions
+from azure.iot.device.iothub.pipeline import constant
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -313,3 +314,228 @@ class TestInboxManagerRouteMethodRequest(object):
         # Method Request 2 was delivered to its corresponding named inbox since the method name is known
         assert method_request2 in named_method_inbox
         assert method_request2 not in generic_method_inbox
+
+
+@pytest.mark.describe("InboxManager - Bounded message inboxes")
+class TestInboxManagerBoundedMessageInboxes(object):
+    @pytest.mark.it("Instantiates with unbounded message inboxes if no options are provided")
+    def test_unbounded_by_default(self, manager):
+        assert manager.get_c2d_message_inbox().max_size == 0
+        assert manager.get_input_message_inbox("some_input").max_size == 0
+
+    @pytest.mark.it(
+        "Limits the C2D message inbox and input message inboxes with the provided options"
+    )
+    def test_bounded(self, inbox_type):
+        options = InboxOptions(max_size=10, overflow_policy="drop_newest")
+        manager = InboxManager(inbox_type=inbox_type, message_inbox_options=options)
+        for inbox in (
+            manager.get_c2d_message_inbox(),
+            manager.get_input_message_inbox("some_input"),
+        ):
+            assert inbox.max_size == 10
+            assert inbox.overflow_policy == "drop_newest"
+        assert manager.generic_method_request_inbox.max_size == 0
+
+    @pytest.mark.it(
+        "Returns False when routing a Message that is dropped because its inbox is full"
+    )
+    def test_route_dropped_message(self, inbox_type, message):
+        options = InboxOptions(max_size=1, overflow_policy="drop_newest")
+        manager = InboxManager(inbox_type=inbox_type, message_inbox_options=options)
+        manager.get_input_message_inbox("some_input")
+        assert manager.route_c2d_message(message)
+        assert not manager.route_c2d_message(message)
+        assert manager.route_input_message("some_input", message)
+        assert not manager.route_input_message("some_input", message)
+
+    @pytest.mark.it(
+        "Pauses a feature when one of its inboxes is full, and resumes it once none of its inboxes are full, if using the 'pause' overflow policy"
+    )
+    def test_pause_and_resume(self, mocker, inbox_type, message):
+        options = InboxOptions(max_size=1, overflow_policy="pause", resume_size=0)
+        manager = InboxManager(inbox_type=inbox_type, message_inbox_options=options)
+        manager.on_feature_pause_changed = mocker.MagicMock()
+        input_inbox1 = manager.get_input_message_inbox("input1")
+        input_inbox2 = manager.get_input_message_inbox("input2")
+
+        manager.route_input_message("input1", message)
+        assert manager.on_feature_pause_changed.call_args_list == [mocker.call(constant.INPUT_MSG)]
+        assert manager.is_feature_pause_wanted(constant.INPUT_MSG)
+        manager.route_input_message("input2", message)
+        assert manager.is_feature_pause_wanted(constant.INPUT_MSG)
+        assert not manager.is_feature_pause_wanted(constant.C2D_MSG)
+
+        manager.on_feature_pause_changed.reset_mock()
+        input_inbox1.clear()
+        assert manager.on_feature_pause_changed.call_args_list == [mocker.call(constant.INPUT_MSG)]
+        assert manager.is_feature_pause_wanted(constant.INPUT_MSG)
+        input_inbox2.clear()
+        assert not manager.is_feature_pause_wanted(constant.INPUT_MSG)
+
+        manager.on_feature_pause_changed.reset_mock()
+        manager.route_c2d_message(message)
+        assert manager.on_feature_pause_changed.call_args_list == [mocker.call(constant.C2D_MSG)]
+        assert manager.is_feature_pause_wanted(constant.C2D_MSG)
+        assert not manager.is_feature_pause_wanted(constant.INPUT_MSG)
+
+    @pytest.mark.it("Never wants features without message inbox options to be paused")
+    @pytest.mark.parametrize(
+        "feature_name", [constant.C2D_MSG, constant.INPUT_MSG, constant.METHODS, constant.TWIN]
+    )
+    def test_no_pause_wanted(self, inbox_type, feature_name):
+        manager = InboxManager(inbox_type=inbox_type)
+        manager.get_input_message_inbox("some_input")
+        assert not manager.is_feature_pause_wanted(feature_name)
+
+
+@pytest.mark.describe("InboxManager - Handlers")
+class TestInboxManagerHandlers(object):
+    @pytest.fixture
+    def dispatcher(self, mocker):
+        return mocker.MagicMock()
+
+    @pytest.fixture
+    def manager(self, inbox_type, dispatcher):
+        return InboxManager(inbox_type=inbox_type, handler_dispatcher=dispatcher)
+
+    @pytest.mark.it("Instantiates with no handlers")
+    def test_no_handlers(self, manager):
+        assert manager.c2d_message_handler is None
+        assert manager.input_message_handlers == {}
+        assert manager.generic_method_request_handler is None
+        assert manager.named_method_request_handlers == {}
+        assert manager.twin_patch_handler is None
+
+    @pytest.mark.it("Dispatches a C2D message to the C2D message handler instead of the inbox")
+    def test_c2d_message(self, mocker, manager, dispatcher, message):
+        handler = mocker.MagicMock()
+        manager.c2d_message_handler = handler
+
+        assert manager.route_c2d_message(message)
+        assert dispatcher.dispatch.call_args == mocker.call(
+            constant.C2D_MSG, mocker.ANY, handler, message
+        )
+        assert manager.get_c2d_message_inbox().empty()
+
+    @pytest.mark.it(
+        "Dispatches an input message to the handler for its input, keyed by the input name"
+    )
+    def test_input_message(self, mocker, manager, dispatcher, message):
+        handler = mocker.MagicMock()
+        manager.input_message_handlers["some_input"] = handler
+        other_inbox = manager.get_input_message_inbox("other_input")
+
+        assert manager.route_input_message("some_input", message)
+        assert dispatcher.dispatch.call_args == mocker.call(
+            (constant.INPUT_MSG, "some_input"), mocker.ANY, handler, message
+        )
+        assert manager.route_input_message("other_input", message)
+        assert dispatcher.dispatch.call_count == 1
+        assert message in other_inbox
+
+    @pytest.mark.it("Dispatches a method request to the handler for its method name, if any")
+    def test_named_method_request(self, mocker, manager, dispatcher, method_request):
+        handler = mocker.MagicMock()
+        manager.named_method_request_handlers[method_request.name] = handler
+        manager.generic_method_request_handler = mocker.MagicMock()
+
+        assert manager.route_method_request(method_request)
+        assert dispatcher.dispatch.call_args == mocker.call(
+            (constant.METHODS, method_request.name), mocker.ANY, handler, method_request
+        )
+
+    @pytest.mark.it(
+        "Adds a method request to the inbox for its method name rather than dispatching it to the generic handler"
+    )
+    def test_named_inbox_before_generic_handler(self, mocker, manager, dispatcher, method_request):
+        manager.generic_method_request_handler = mocker.MagicMock()
+        named_method_inbox = manager.get_method_request_inbox(method_request.name)
+
+        assert manager.route_method_request(method_request)
+        assert dispatcher.dispatch.call_count == 0
+        assert method_request in named_method_inbox
+
+    @pytest.mark.it(
+        "Dispatches a method request without a handler or inbox for its method name to the generic handler"
+    )
+    def test_generic_method_request(self, mocker, manager, dispatcher, method_request):
+        handler = mocker.MagicMock()
+        manager.generic_method_request_handler = handler
+
+        assert manager.route_method_request(method_request)
+        assert dispatcher.dispatch.call_args == mocker.call(
+            (constant.METHODS, method_request.name), mocker.ANY, handler, method_request
+        )
+        assert manager.get_method_request_inbox().empty()
+
+    @pytest.mark.it("Dispatches a twin patch to the twin patch handler instead of the inbox")
+    def test_twin_patch(self, mocker, manager, dispatcher):
+        handler = mocker.MagicMock()
+        manager.twin_patch_handler = handler
+        patch = {"key": "value"}
+
+        assert manager.route_twin_patch(patch)
+        assert dispatcher.dispatch.call_args == mocker.call(
+            constant.TWIN_PATCHES, mocker.ANY, handler, patch
+        )
+        assert manager.get_twin_patch_inbox().empty()
+
+    @pytest.mark.it("Holds the data for each handler in an Inbox of the manager's Inbox type")
+    def test_handler_inbox(self, mocker, inbox_type, manager, dispatcher, message):
+        handler = mocker.MagicMock()
+        manager.c2d_message_handler = handler
+        manager.route_c2d_message(message)
+        manager.route_c2d_message(message)
+
+        assert dispatcher.dispatch.call_count == 2
+        inbox = dispatcher.dispatch.call_args_list[0][0][1]
+        assert isinstance(inbox, inbox_type)
+        assert dispatcher.dispatch.call_args_list[1][0][1] is inbox
+
+    @pytest.mark.it(
+        "Limits the Messages waiting for a C2D or input message handler with the message inbox options"
+    )
+    def test_bounded_handler_inbox(self, mocker, inbox_type, dispatcher, message):
+        options = InboxOptions(max_size=10, overflow_policy="drop_newest")
+        manager = InboxManager(
+            inbox_type=inbox_type, message_inbox_options=options, handler_dispatcher=dispatcher
+        )
+        manager.c2d_message_handler = mocker.MagicMock()
+        manager.input_message_handlers["some_input"] = mocker.MagicMock()
+        manager.route_c2d_message(message)
+        manager.route_input_message("some_input", message)
+
+        c2d_inbox = dispatcher.dispatch.call_args_list[0][0][1]
+        input_inbox = dispatcher.dispatch.call_args_list[1][0][1]
+        assert c2d_inbox is not input_inbox
+        for inbox in (c2d_inbox, input_inbox):
+            assert inbox.max_size == 10
+            assert inbox.overflow_policy == "drop_newest"
+
+    @pytest.mark.it("Returns False when routing a Message that the dispatcher drops")
+    def test_dropped_message(self, mocker, manager, dispatcher, message):
+        dispatcher.dispatch.return_value = False
+        manager.c2d_message_handler = mocker.MagicMock()
+        manager.input_message_handlers["some_input"] = mocker.MagicMock()
+
+        assert not manager.route_c2d_message(message)
+        assert not manager.route_input_message("some_input", message)
+
+    @pytest.mark.it(
+        "Wants a feature to be paused while too many Messages are waiting for one of its handlers, if using the 'pause' overflow policy"
+    )
+    def test_pause_wanted(self, mocker, inbox_type, dispatcher, message):
+        options = InboxOptions(max_size=1, overflow_policy="pause", resume_size=0)
+        manager = InboxManager(
+            inbox_type=inbox_type, message_inbox_options=options, handler_dispatcher=dispatcher
+        )
+        manager.input_message_handlers["some_input"] = mocker.MagicMock()
+        manager.route_input_message("some_input", message)
+        assert not manager.is_feature_pause_wanted(constant.INPUT_MSG)
+
+        # The mock dispatcher does not add the Message to the Inbox, so add it directly
+        input_inbox = dispatcher.dispatch.call_args[0][1]
+        input_inbox._put(message)
+        assert manager.is_feature_pause_wanted(constant.INPUT_MSG)
+        assert not manager.is_feature_pause_wanted(constant.C2D_MSG)
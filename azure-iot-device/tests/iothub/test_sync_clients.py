@@ -19,6 +19,8 @@ from azure.iot.device.iothub.models import Message, MethodRequest
 from azure.iot.device.iothub.sync_inbox import SyncClientInbox
 from azure.iot.device.iothub.auth import IoTEdgeError
 from azure.iot.device import constant as device_constant
+from azure.iot.device import OfflineStoreOptions, InboxOptions, RetryPolicy
+from concurrent.futures import Future
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -73,6 +75,24 @@ class SharedClientInstantiationTests(object):
         assert client._mqtt_pipeline.on_disconnected is not None
         assert client._mqtt_pipeline.on_disconnected == client._on_disconnected
 
+    @pytest.mark.it(
+        "Pauses or resumes features on the MQTTPipeline, as the InboxManager wants, when the InboxManager asks it to"
+    )
+    def test_sets_feature_pause_handler_in_inbox_manager(
+        self, mocker, client_class, mqtt_pipeline, http_pipeline
+    ):
+        client = client_class(mqtt_pipeline, http_pipeline)
+        mocker.patch.object(client._inbox_manager, "is_feature_pause_wanted", return_value=True)
+
+        client._inbox_manager.on_feature_pause_changed(constant.C2D_MSG)
+        assert mqtt_pipeline.update_feature_pause.call_count == 1
+        assert mqtt_pipeline.update_feature_pause.call_args[0][0] == constant.C2D_MSG
+        is_pause_wanted = mqtt_pipeline.update_feature_pause.call_args[1]["is_pause_wanted"]
+        assert is_pause_wanted() is True
+        assert client._inbox_manager.is_feature_pause_wanted.call_args == mocker.call(
+            constant.C2D_MSG
+        )
+
     @pytest.mark.it("Sets on_method_request_received handler in the MQTTPipeline")
     def test_sets_on_method_request_received_handler_in_pipleline(
         self, client_class, mqtt_pipeline, http_pipeline
@@ -160,6 +180,162 @@ class SharedClientCreateMethodUserOptionTests(object):
 
         assert config.cipher == cipher
 
+    @pytest.mark.it(
+        "Sets the 'offline_store_options' user option parameter on the PipelineConfig, if provided"
+    )
+    def test_offline_store_options_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        offline_store_options = OfflineStoreOptions(path="/some/path")
+        client_create_method(*create_method_args, offline_store_options=offline_store_options)
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.offline_store_options is offline_store_options
+
+    @pytest.mark.it(
+        "Sets the 'retry_policy' user option parameter on the PipelineConfig, if provided"
+    )
+    def test_retry_policy_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        retry_policy = RetryPolicy(max_retries=3)
+        client_create_method(*create_method_args, retry_policy=retry_policy)
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.retry_policy is retry_policy
+
+    @pytest.mark.it(
+        "Sets the 'nonblocking_reauthorization' user option parameter on the PipelineConfig, if provided"
+    )
+    def test_nonblocking_reauthorization_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(*create_method_args, nonblocking_reauthorization=True)
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.nonblocking_reauthorization is True
+
+    @pytest.mark.it(
+        "Sets the 'executor_group' user option parameter on the PipelineConfig, if provided"
+    )
+    def test_executor_group_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(*create_method_args, executor_group="shard-1")
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.executor_group == "shard-1"
+
+    @pytest.mark.it(
+        "Sets the 'pipeline_engine' user option parameter on the PipelineConfig, if provided"
+    )
+    def test_pipeline_engine_option(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(*create_method_args, pipeline_engine="asyncio")
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.pipeline_engine == "asyncio"
+
+    @pytest.mark.it(
+        "Sets the 'http_max_concurrent_requests' and 'http_max_queued_requests' user option parameters on the PipelineConfig, if provided"
+    )
+    def test_http_request_limit_options(
+        self,
+        option_test_required_patching,
+        client_create_method,
+        create_method_args,
+        mock_mqtt_pipeline_init,
+        mock_http_pipeline_init,
+    ):
+        client_create_method(
+            *create_method_args, http_max_concurrent_requests=50, http_max_queued_requests=200
+        )
+
+        # Get configuration object, and ensure it was used for both protocol pipelines
+        assert mock_mqtt_pipeline_init.call_count == 1
+        config = mock_mqtt_pipeline_init.call_args[0][1]
+        assert config == mock_http_pipeline_init.call_args[0][1]
+
+        assert config.http_max_concurrent_requests == 50
+        assert config.http_max_queued_requests == 200
+
+    @pytest.mark.it(
+        "Limits the client's message inboxes with the 'inbox_options' user option parameter, if provided"
+    )
+    def test_inbox_options_option(
+        self, option_test_required_patching, client_create_method, create_method_args
+    ):
+        inbox_options = InboxOptions(max_size=10, overflow_policy="drop_newest")
+        client = client_create_method(*create_method_args, inbox_options=inbox_options)
+
+        assert client._inbox_options is inbox_options
+        inbox = client._inbox_manager.get_c2d_message_inbox()
+        assert inbox.max_size == 10
+        assert inbox.overflow_policy == "drop_newest"
+
+    @pytest.mark.it(
+        "Limits the number of handlers running at the same time with the 'handler_max_workers' user option parameter, if provided"
+    )
+    def test_handler_max_workers_option(
+        self, option_test_required_patching, client_create_method, create_method_args
+    ):
+        client = client_create_method(*create_method_args, handler_max_workers=10)
+
+        assert client._handler_dispatcher._max_workers == 10
+
+    @pytest.mark.it("Raises a ValueError if the 'handler_max_workers' user option parameter is 0")
+    def test_handler_max_workers_zero(
+        self, option_test_required_patching, client_create_method, create_method_args
+    ):
+        with pytest.raises(ValueError):
+            client_create_method(*create_method_args, handler_max_workers=0)
+
     @pytest.mark.it(
         "Sets the 'server_verification_cert' user option parameter on the AuthenticationProvider, if provided"
     )
@@ -540,13 +716,9 @@ class SharedClientSendD2CMessageTests(WaitsForEventCompletion):
 
     @pytest.mark.it("Does not raises error when message data size is equal to 256 KB")
     def test_raises_error_when_message_data_equal_to_256(self, client, mqtt_pipeline):
-        data_input = "a" * 262095
+        data_input = "a" * device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT
         message = Message(data_input)
-        # This check was put as message class may undergo the default content type encoding change
-        # and the above calculation will change.
-        # Had to do greater than check for python 2. Ideally should be not equal check
-        if message.get_size() > device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
-            assert False
+        assert message.get_size() == device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT
 
         client.send_message(message)
 
@@ -556,6 +728,134 @@ class SharedClientSendD2CMessageTests(WaitsForEventCompletion):
         assert sent_message.data == data_input
 
 
+class SharedClientSendMessageBatchTests(object):
+    @pytest.mark.it("Begins a 'send_message' MQTTPipeline operation for each message, in order")
+    def test_calls_pipeline_send_message_per_message(self, client, mqtt_pipeline):
+        messages = [Message("Accio"), Message("Lumos"), Message("Nox")]
+        client.send_message_batch(messages)
+        assert mqtt_pipeline.send_message.call_count == len(messages)
+        for i, message in enumerate(messages):
+            assert mqtt_pipeline.send_message.call_args_list[i][0][0] is message
+
+    @pytest.mark.it("Returns a list containing None for each successfully sent message")
+    def test_returns_none_for_successes(self, client, mqtt_pipeline):
+        results = client.send_message_batch([Message("Accio"), Message("Lumos")])
+        assert results == [None, None]
+
+    @pytest.mark.it(
+        "Sends subsequent messages without waiting for earlier 'send_message' operations to complete"
+    )
+    def test_does_not_wait_for_each_completion(self, client_manual_cb, mqtt_pipeline_manual_cb):
+        pending_callbacks = []
+
+        def send_message(message, callback):
+            pending_callbacks.append(callback)
+            if len(pending_callbacks) == 3:
+                for cb in pending_callbacks:
+                    cb(error=None)
+
+        mqtt_pipeline_manual_cb.send_message.side_effect = send_message
+        results = client_manual_cb.send_message_batch(
+            [Message("Accio"), Message("Lumos"), Message("Nox")], max_in_flight=3
+        )
+        assert results == [None, None, None]
+
+    @pytest.mark.it(
+        "Does not allow more than 'max_in_flight' 'send_message' operations to be pending at once"
+    )
+    def test_limits_in_flight(self, client_manual_cb, mqtt_pipeline_manual_cb):
+        max_in_flight = 2
+        pending_callbacks = []
+        peak = []
+
+        def send_message(message, callback):
+            pending_callbacks.append(callback)
+            peak.append(len(pending_callbacks))
+            # Complete the oldest pending operation from another thread after a short delay
+            threading.Timer(0.01, pending_callbacks.pop(0), kwargs={"error": None}).start()
+
+        mqtt_pipeline_manual_cb.send_message.side_effect = send_message
+        results = client_manual_cb.send_message_batch(
+            [Message(str(i)) for i in range(6)], max_in_flight=max_in_flight
+        )
+        assert results == [None] * 6
+        assert max(peak) <= max_in_flight
+
+    @pytest.mark.it(
+        "Returns a client error in place of each message whose 'send_message' operation calls back with a pipeline error"
+    )
+    @pytest.mark.parametrize(
+        "pipeline_error,client_error",
+        [
+            pytest.param(
+                pipeline_exceptions.ConnectionDroppedError,
+                client_exceptions.ConnectionDroppedError,
+                id="ConnectionDroppedError->ConnectionDroppedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ConnectionFailedError,
+                client_exceptions.ConnectionFailedError,
+                id="ConnectionFailedError->ConnectionFailedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.UnauthorizedError,
+                client_exceptions.CredentialError,
+                id="UnauthorizedError->CredentialError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ProtocolClientError,
+                client_exceptions.ClientError,
+                id="ProtocolClientError->ClientError",
+            ),
+            pytest.param(Exception, client_exceptions.ClientError, id="Exception->ClientError"),
+        ],
+    )
+    def test_returns_error_on_pipeline_op_error(
+        self, client_manual_cb, mqtt_pipeline_manual_cb, pipeline_error, client_error
+    ):
+        my_pipeline_error = pipeline_error()
+        failing_message = Message("Expelliarmus")
+
+        def send_message(message, callback):
+            if message is failing_message:
+                callback(error=my_pipeline_error)
+            else:
+                callback(error=None)
+
+        mqtt_pipeline_manual_cb.send_message.side_effect = send_message
+        results = client_manual_cb.send_message_batch(
+            [Message("Accio"), failing_message, Message("Nox")]
+        )
+        assert results[0] is None
+        assert isinstance(results[1], client_error)
+        assert results[1].__cause__ is my_pipeline_error
+        assert results[2] is None
+
+    @pytest.mark.it("Wraps each item in a Message object if it is not a Message object")
+    def test_wraps_data_in_message(self, client, mqtt_pipeline):
+        client.send_message_batch(["Accio", 222])
+        assert mqtt_pipeline.send_message.call_count == 2
+        sent_messages = [call[0][0] for call in mqtt_pipeline.send_message.call_args_list]
+        assert all(isinstance(m, Message) for m in sent_messages)
+        assert [m.data for m in sent_messages] == ["Accio", 222]
+
+    @pytest.mark.it(
+        "Raises error without sending any messages when any message size is greater than 256 KB"
+    )
+    def test_raises_error_when_message_size_greater_than_256(self, client, mqtt_pipeline):
+        messages = [Message("Accio"), Message("serpensortia" * 25600)]
+        with pytest.raises(ValueError) as e_info:
+            client.send_message_batch(messages)
+        assert "256 KB" in e_info.value.args[0]
+        assert mqtt_pipeline.send_message.call_count == 0
+
+    @pytest.mark.it("Raises error when 'max_in_flight' is less than 1")
+    def test_raises_error_on_invalid_max_in_flight(self, client, mqtt_pipeline):
+        with pytest.raises(ValueError):
+            client.send_message_batch([Message("Accio")], max_in_flight=0)
+        assert mqtt_pipeline.send_message.call_count == 0
+
+
 class SharedClientReceiveMethodRequestTests(object):
     @pytest.mark.it("Implicitly enables methods feature if not already enabled")
     @pytest.mark.parametrize(
@@ -1055,24 +1355,354 @@ class SharedClientReceiveTwinDesiredPropertiesPatchTests(object):
         insertion_thread = threading.Thread(target=insert_item_after_delay)
         insertion_thread.start()
 
-        received_patch = client.receive_twin_desired_properties_patch(block=True)
-        assert received_patch is twin_patch_desired
-        # This proves that the blocking happens because 'received_patch' can't be
-        # 'twin_patch_desired' until after a 10 millisecond delay on the insert. But because the
-        # 'received_patch' IS 'twin_patch_desired', it means that client.receive_twin_desired_properties_patch
-        # did not return until after the delay.
+        received_patch = client.receive_twin_desired_properties_patch(block=True)
+        assert received_patch is twin_patch_desired
+        # This proves that the blocking happens because 'received_patch' can't be
+        # 'twin_patch_desired' until after a 10 millisecond delay on the insert. But because the
+        # 'received_patch' IS 'twin_patch_desired', it means that client.receive_twin_desired_properties_patch
+        # did not return until after the delay.
+
+    @pytest.mark.it(
+        "Returns None after a timeout while blocking, in blocking mode with a specified timeout"
+    )
+    def test_times_out_waiting_for_message_blocking_mode(self, client):
+        result = client.receive_twin_desired_properties_patch(block=True, timeout=0.01)
+        assert result is None
+
+    @pytest.mark.it("Returns None immediately if there are no patches, in nonblocking mode")
+    def test_no_message_in_inbox_nonblocking_mode(self, client):
+        result = client.receive_twin_desired_properties_patch(block=False)
+        assert result is None
+
+
+class SharedClientSetMethodRequestHandlerTests(object):
+    @pytest.mark.it("Implicitly enables methods feature if not already enabled")
+    @pytest.mark.parametrize(
+        "method_name",
+        [pytest.param(None, id="Generic Method"), pytest.param("method_x", id="Named Method")],
+    )
+    def test_enables_methods_only_if_not_already_enabled(
+        self, mocker, client, mqtt_pipeline, method_name
+    ):
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False
+        client.set_method_request_handler(mocker.MagicMock(), method_name)
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.METHODS
+
+        mqtt_pipeline.enable_feature.reset_mock()
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = True
+        client.set_method_request_handler(mocker.MagicMock(), method_name)
+        assert mqtt_pipeline.enable_feature.call_count == 0
+
+    @pytest.mark.it("Sets the generic method request handler when called without method name")
+    def test_generic(self, mocker, client):
+        handler = mocker.MagicMock()
+        client.set_method_request_handler(handler)
+        assert client._inbox_manager.generic_method_request_handler is handler
+
+        client.set_method_request_handler(None)
+        assert client._inbox_manager.generic_method_request_handler is None
+
+    @pytest.mark.it("Sets the handler for the method name when called with a method name")
+    def test_named(self, mocker, client):
+        handler = mocker.MagicMock()
+        client.set_method_request_handler(handler, "method_x")
+        assert client._inbox_manager.named_method_request_handlers == {"method_x": handler}
+
+        client.set_method_request_handler(None, "method_x")
+        assert client._inbox_manager.named_method_request_handlers == {}
+
+    @pytest.mark.it("Calls the handler on a worker thread with method requests received")
+    def test_calls_handler(self, client, mqtt_pipeline):
+        received = []
+        done = threading.Event()
+
+        def handler(method_request):
+            received.append(method_request)
+            done.set()
+
+        client.set_method_request_handler(handler, "method_x")
+        request = MethodRequest(request_id="1", name="method_x", payload={"key": "value"})
+        mqtt_pipeline.on_method_request_received(request)
+
+        assert done.wait(5)
+        assert received == [request]
+
+
+class SharedClientSetTwinDesiredPropertiesPatchHandlerTests(object):
+    @pytest.mark.it(
+        "Implicitly enables Twin desired properties patch feature if not already enabled"
+    )
+    def test_enables_twin_patches_only_if_not_already_enabled(self, mocker, client, mqtt_pipeline):
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False
+        client.set_twin_desired_properties_patch_handler(mocker.MagicMock())
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.TWIN_PATCHES
+
+        mqtt_pipeline.enable_feature.reset_mock()
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = True
+        client.set_twin_desired_properties_patch_handler(mocker.MagicMock())
+        assert mqtt_pipeline.enable_feature.call_count == 0
+
+    @pytest.mark.it("Calls the handler on a worker thread with patches received")
+    def test_calls_handler(self, client, mqtt_pipeline, twin_patch_desired):
+        received = []
+        done = threading.Event()
+
+        def handler(patch):
+            received.append(patch)
+            done.set()
+
+        client.set_twin_desired_properties_patch_handler(handler)
+        mqtt_pipeline.on_twin_patch_received(twin_patch_desired)
+
+        assert done.wait(5)
+        assert received == [twin_patch_desired]
+
+    @pytest.mark.it("Stops calling the handler once it is removed")
+    def test_remove(self, mocker, client):
+        client.set_twin_desired_properties_patch_handler(mocker.MagicMock())
+        client.set_twin_desired_properties_patch_handler(None)
+        assert client._inbox_manager.twin_patch_handler is None
+
+
+class SharedClientBeginSendMessageTests(object):
+    @pytest.mark.it("Begins a 'send_message' pipeline operation")
+    def test_calls_pipeline(self, client, mqtt_pipeline, message):
+        client.begin_send_message(message)
+        assert mqtt_pipeline.send_message.call_count == 1
+
+    @pytest.mark.it(
+        "Returns a Future that is not completed until the 'send_message' pipeline operation completes"
+    )
+    def test_returns_pending_future(self, client_manual_cb, mqtt_pipeline_manual_cb, message):
+        future = client_manual_cb.begin_send_message(message)
+        assert isinstance(future, Future)
+        assert not future.done()
+
+        mqtt_pipeline_manual_cb.send_message.call_args[1]["callback"]()
+        assert future.done()
+        assert future.result() is None
+
+    @pytest.mark.it("Returns a Future that cannot be cancelled")
+    def test_future_not_cancellable(self, client_manual_cb, mqtt_pipeline_manual_cb, message):
+        future = client_manual_cb.begin_send_message(message)
+        assert not future.cancel()
+
+    @pytest.mark.it(
+        "Completes the Future with a client error if the 'send_message' pipeline operation calls back with a pipeline error"
+    )
+    @pytest.mark.parametrize(
+        "pipeline_error,client_error",
+        [
+            pytest.param(
+                pipeline_exceptions.ConnectionDroppedError,
+                client_exceptions.ConnectionDroppedError,
+                id="ConnectionDroppedError->ConnectionDroppedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ConnectionFailedError,
+                client_exceptions.ConnectionFailedError,
+                id="ConnectionFailedError->ConnectionFailedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.UnauthorizedError,
+                client_exceptions.CredentialError,
+                id="UnauthorizedError->CredentialError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ProtocolClientError,
+                client_exceptions.ClientError,
+                id="ProtocolClientError->ClientError",
+            ),
+            pytest.param(Exception, client_exceptions.ClientError, id="Exception->ClientError"),
+        ],
+    )
+    def test_future_has_error_on_pipeline_op_error(
+        self, client_manual_cb, mqtt_pipeline_manual_cb, message, pipeline_error, client_error
+    ):
+        my_pipeline_error = pipeline_error()
+        future = client_manual_cb.begin_send_message(message)
+        mqtt_pipeline_manual_cb.send_message.call_args[1]["callback"](error=my_pipeline_error)
+
+        with pytest.raises(client_error) as e_info:
+            future.result()
+        assert e_info.value.__cause__ is my_pipeline_error
+
+    @pytest.mark.it("Raises error when message size is greater than 256 KB")
+    def test_raises_error_when_message_size_greater_than_256(self, client, mqtt_pipeline):
+        message = Message("serpensortia" * 25600)
+        with pytest.raises(ValueError) as e_info:
+            client.begin_send_message(message)
+        assert "256 KB" in e_info.value.args[0]
+        assert mqtt_pipeline.send_message.call_count == 0
+
+
+class SharedClientBeginSendMethodResponseTests(object):
+    @pytest.mark.it("Begins a 'send_method_response' pipeline operation")
+    def test_calls_pipeline(self, client, mqtt_pipeline, method_response):
+        client.begin_send_method_response(method_response)
+        assert mqtt_pipeline.send_method_response.call_count == 1
+
+    @pytest.mark.it(
+        "Returns a Future that is not completed until the 'send_method_response' pipeline operation completes"
+    )
+    def test_returns_pending_future(
+        self, client_manual_cb, mqtt_pipeline_manual_cb, method_response
+    ):
+        future = client_manual_cb.begin_send_method_response(method_response)
+        assert isinstance(future, Future)
+        assert not future.done()
+
+        mqtt_pipeline_manual_cb.send_method_response.call_args[1]["callback"]()
+        assert future.done()
+        assert future.result() is None
+
+    @pytest.mark.it("Returns a Future that cannot be cancelled")
+    def test_future_not_cancellable(
+        self, client_manual_cb, mqtt_pipeline_manual_cb, method_response
+    ):
+        future = client_manual_cb.begin_send_method_response(method_response)
+        assert not future.cancel()
+
+    @pytest.mark.it(
+        "Completes the Future with a client error if the 'send_method_response' pipeline operation calls back with a pipeline error"
+    )
+    @pytest.mark.parametrize(
+        "pipeline_error,client_error",
+        [
+            pytest.param(
+                pipeline_exceptions.ConnectionDroppedError,
+                client_exceptions.ConnectionDroppedError,
+                id="ConnectionDroppedError->ConnectionDroppedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ConnectionFailedError,
+                client_exceptions.ConnectionFailedError,
+                id="ConnectionFailedError->ConnectionFailedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.UnauthorizedError,
+                client_exceptions.CredentialError,
+                id="UnauthorizedError->CredentialError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ProtocolClientError,
+                client_exceptions.ClientError,
+                id="ProtocolClientError->ClientError",
+            ),
+            pytest.param(Exception, client_exceptions.ClientError, id="Exception->ClientError"),
+        ],
+    )
+    def test_future_has_error_on_pipeline_op_error(
+        self,
+        client_manual_cb,
+        mqtt_pipeline_manual_cb,
+        method_response,
+        pipeline_error,
+        client_error,
+    ):
+        my_pipeline_error = pipeline_error()
+        future = client_manual_cb.begin_send_method_response(method_response)
+        mqtt_pipeline_manual_cb.send_method_response.call_args[1]["callback"](
+            error=my_pipeline_error
+        )
+
+        with pytest.raises(client_error) as e_info:
+            future.result()
+        assert e_info.value.__cause__ is my_pipeline_error
+
+
+class SharedClientBeginPatchTwinReportedPropertiesTests(object):
+    @pytest.mark.it("Implicitly enables twin messaging feature if not already enabled")
+    def test_enables_twin_only_if_not_already_enabled(
+        self, client, mqtt_pipeline, twin_patch_reported
+    ):
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False
+        client.begin_patch_twin_reported_properties(twin_patch_reported)
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.TWIN
+
+        mqtt_pipeline.enable_feature.reset_mock()
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = True
+        client.begin_patch_twin_reported_properties(twin_patch_reported)
+        assert mqtt_pipeline.enable_feature.call_count == 0
+
+    @pytest.mark.it("Begins a 'patch_twin_reported_properties' pipeline operation")
+    def test_calls_pipeline(self, client, mqtt_pipeline, twin_patch_reported):
+        client.begin_patch_twin_reported_properties(twin_patch_reported)
+        assert mqtt_pipeline.patch_twin_reported_properties.call_count == 1
+
+    @pytest.mark.it(
+        "Returns a Future that is not completed until the 'patch_twin_reported_properties' pipeline operation completes"
+    )
+    def test_returns_pending_future(
+        self, client_manual_cb, mqtt_pipeline_manual_cb, twin_patch_reported
+    ):
+        future = client_manual_cb.begin_patch_twin_reported_properties(twin_patch_reported)
+        assert isinstance(future, Future)
+        assert not future.done()
+
+        mqtt_pipeline_manual_cb.patch_twin_reported_properties.call_args[1]["callback"]()
+        assert future.done()
+        assert future.result() is None
+
+    @pytest.mark.it("Returns a Future that cannot be cancelled")
+    def test_future_not_cancellable(
+        self, client_manual_cb, mqtt_pipeline_manual_cb, twin_patch_reported
+    ):
+        future = client_manual_cb.begin_patch_twin_reported_properties(twin_patch_reported)
+        assert not future.cancel()
 
     @pytest.mark.it(
-        "Returns None after a timeout while blocking, in blocking mode with a specified timeout"
+        "Completes the Future with a client error if the 'patch_twin_reported_properties' pipeline operation calls back with a pipeline error"
     )
-    def test_times_out_waiting_for_message_blocking_mode(self, client):
-        result = client.receive_twin_desired_properties_patch(block=True, timeout=0.01)
-        assert result is None
+    @pytest.mark.parametrize(
+        "pipeline_error,client_error",
+        [
+            pytest.param(
+                pipeline_exceptions.ConnectionDroppedError,
+                client_exceptions.ConnectionDroppedError,
+                id="ConnectionDroppedError->ConnectionDroppedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ConnectionFailedError,
+                client_exceptions.ConnectionFailedError,
+                id="ConnectionFailedError->ConnectionFailedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.UnauthorizedError,
+                client_exceptions.CredentialError,
+                id="UnauthorizedError->CredentialError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ProtocolClientError,
+                client_exceptions.ClientError,
+                id="ProtocolClientError->ClientError",
+            ),
+            pytest.param(Exception, client_exceptions.ClientError, id="Exception->ClientError"),
+        ],
+    )
+    def test_future_has_error_on_pipeline_op_error(
+        self,
+        client_manual_cb,
+        mqtt_pipeline_manual_cb,
+        twin_patch_reported,
+        pipeline_error,
+        client_error,
+    ):
+        my_pipeline_error = pipeline_error()
+        future = client_manual_cb.begin_patch_twin_reported_properties(twin_patch_reported)
+        mqtt_pipeline_manual_cb.patch_twin_reported_properties.call_args[1]["callback"](
+            error=my_pipeline_error
+        )
 
-    @pytest.mark.it("Returns None immediately if there are no patches, in nonblocking mode")
-    def test_no_message_in_inbox_nonblocking_mode(self, client):
-        result = client.receive_twin_desired_properties_patch(block=False)
-        assert result is None
+        with pytest.raises(client_error) as e_info:
+            future.result()
+        assert e_info.value.__cause__ is my_pipeline_error
 
 
 class SharedClientPROPERTYConnectedTests(object):
@@ -1334,6 +1964,53 @@ class TestIoTHubDeviceClientSendD2CMessage(
     pass
 
 
+@pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .send_message_batch()")
+class TestIoTHubDeviceClientSendMessageBatch(
+    IoTHubDeviceClientTestsConfig, SharedClientSendMessageBatchTests
+):
+    pass
+
+
+@pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .set_message_handler()")
+class TestIoTHubDeviceClientSetMessageHandler(IoTHubDeviceClientTestsConfig):
+    @pytest.mark.it("Implicitly enables C2D messaging feature if not already enabled")
+    def test_enables_c2d_messaging_only_if_not_already_enabled(self, mocker, client, mqtt_pipeline):
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False
+        client.set_message_handler(mocker.MagicMock())
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.C2D_MSG
+
+        mqtt_pipeline.enable_feature.reset_mock()
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = True
+        client.set_message_handler(mocker.MagicMock())
+        assert mqtt_pipeline.enable_feature.call_count == 0
+
+    @pytest.mark.it("Calls the handler on a worker thread with C2D messages received")
+    def test_calls_handler(self, client, mqtt_pipeline, message):
+        received = []
+        done = threading.Event()
+
+        def handler(message):
+            received.append(message)
+            done.set()
+
+        client.set_message_handler(handler)
+        mqtt_pipeline.on_c2d_message_received(message)
+
+        assert done.wait(5)
+        assert received == [message]
+        assert client._inbox_manager.get_c2d_message_inbox().empty()
+
+    @pytest.mark.it("Adds C2D messages received to the inbox again once the handler is removed")
+    def test_remove(self, mocker, client, mqtt_pipeline, message):
+        client.set_message_handler(mocker.MagicMock())
+        client.set_message_handler(None)
+        mqtt_pipeline.on_c2d_message_received(message)
+
+        assert message in client._inbox_manager.get_c2d_message_inbox()
+
+
 @pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .receive_message()")
 class TestIoTHubDeviceClientReceiveC2DMessage(IoTHubDeviceClientTestsConfig):
     @pytest.mark.it("Implicitly enables C2D messaging feature if not already enabled")
@@ -1424,6 +2101,64 @@ class TestIoTHubDeviceClientReceiveC2DMessage(IoTHubDeviceClientTestsConfig):
         assert result is None
 
 
+@pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .receive_messages()")
+class TestIoTHubDeviceClientReceiveC2DMessages(IoTHubDeviceClientTestsConfig):
+    @pytest.mark.it("Implicitly enables C2D messaging feature if not already enabled")
+    def test_enables_c2d_messaging_only_if_not_already_enabled(self, mocker, client, mqtt_pipeline):
+        mocker.patch.object(SyncClientInbox, "get_batch")  # patch this so it won't block
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False  # C2D will appear disabled
+        client.receive_messages(10)
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.C2D_MSG
+
+        mqtt_pipeline.enable_feature.reset_mock()
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = True  # C2D will appear enabled
+        client.receive_messages(10)
+        assert mqtt_pipeline.enable_feature.call_count == 0
+
+    @pytest.mark.it("Returns up to max_count messages from the C2D inbox, in the order received")
+    def test_returns_messages_from_c2d_inbox(self, client):
+        c2d_inbox = client._inbox_manager.get_c2d_message_inbox()
+        messages = [Message("message {}".format(i)) for i in range(5)]
+        for message in messages:
+            c2d_inbox._put(message)
+
+        assert client.receive_messages(3) == messages[:3]
+        assert client.receive_messages(3) == messages[3:]
+
+    @pytest.mark.it("Blocks until a message is available, in blocking mode")
+    def test_no_message_in_inbox_blocking_mode(self, client, message):
+        c2d_inbox = client._inbox_manager.get_c2d_message_inbox()
+
+        def insert_item_after_delay():
+            time.sleep(0.01)
+            c2d_inbox._put(message)
+
+        insertion_thread = threading.Thread(target=insert_item_after_delay)
+        insertion_thread.start()
+
+        assert client.receive_messages(10, block=True) == [message]
+
+    @pytest.mark.it(
+        "Returns an empty list after a timeout while blocking, in blocking mode with a specified timeout"
+    )
+    def test_times_out_waiting_for_message_blocking_mode(self, client):
+        assert client.receive_messages(10, block=True, timeout=0.01) == []
+
+    @pytest.mark.it(
+        "Returns an empty list immediately if there are no messages, in nonblocking mode"
+    )
+    def test_no_message_in_inbox_nonblocking_mode(self, client):
+        assert client.receive_messages(10, block=False) == []
+
+    @pytest.mark.it("Raises a ValueError if max_count is less than 1")
+    def test_invalid_max_count(self, client):
+        with pytest.raises(ValueError):
+            client.receive_messages(0)
+
+
 @pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .receive_method_request()")
 class TestIoTHubDeviceClientReceiveMethodRequest(
     IoTHubDeviceClientTestsConfig, SharedClientReceiveMethodRequestTests
@@ -1450,6 +2185,27 @@ class TestIoTHubDeviceClientPatchTwinReportedProperties(
     pass
 
 
+@pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .begin_send_message()")
+class TestIoTHubDeviceClientBeginSendMessage(
+    IoTHubDeviceClientTestsConfig, SharedClientBeginSendMessageTests
+):
+    pass
+
+
+@pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .begin_send_method_response()")
+class TestIoTHubDeviceClientBeginSendMethodResponse(
+    IoTHubDeviceClientTestsConfig, SharedClientBeginSendMethodResponseTests
+):
+    pass
+
+
+@pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .begin_patch_twin_reported_properties()")
+class TestIoTHubDeviceClientBeginPatchTwinReportedProperties(
+    IoTHubDeviceClientTestsConfig, SharedClientBeginPatchTwinReportedPropertiesTests
+):
+    pass
+
+
 @pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .receive_twin_desired_properties_patch()")
 class TestIoTHubDeviceClientReceiveTwinDesiredPropertiesPatch(
     IoTHubDeviceClientTestsConfig, SharedClientReceiveTwinDesiredPropertiesPatchTests
@@ -1457,6 +2213,22 @@ class TestIoTHubDeviceClientReceiveTwinDesiredPropertiesPatch(
     pass
 
 
+@pytest.mark.describe(
+    "IoTHubDeviceClient (Synchronous) - .set_twin_desired_properties_patch_handler()"
+)
+class TestIoTHubDeviceClientSetTwinDesiredPropertiesPatchHandler(
+    IoTHubDeviceClientTestsConfig, SharedClientSetTwinDesiredPropertiesPatchHandlerTests
+):
+    pass
+
+
+@pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .set_method_request_handler()")
+class TestIoTHubDeviceClientSetMethodRequestHandler(
+    IoTHubDeviceClientTestsConfig, SharedClientSetMethodRequestHandlerTests
+):
+    pass
+
+
 @pytest.mark.describe("IoTHubDeviceClient (Synchronous) - .get_storage_info_for_blob()")
 class TestIoTHubDeviceClientGetStorageInfo(WaitsForEventCompletion, IoTHubDeviceClientTestsConfig):
     @pytest.mark.it("Begins a 'get_storage_info_for_blob' HTTPPipeline operation")
@@ -2200,6 +2972,13 @@ class TestIoTHubNModuleClientSendD2CMessage(
     pass
 
 
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .send_message_batch()")
+class TestIoTHubModuleClientSendMessageBatch(
+    IoTHubModuleClientTestsConfig, SharedClientSendMessageBatchTests
+):
+    pass
+
+
 @pytest.mark.describe("IoTHubModuleClient (Synchronous) - .send_message_to_output()")
 class TestIoTHubModuleClientSendToOutput(IoTHubModuleClientTestsConfig, WaitsForEventCompletion):
     @pytest.mark.it("Begins a 'send_output_event' pipeline operation")
@@ -2319,13 +3098,10 @@ class TestIoTHubModuleClientSendToOutput(IoTHubModuleClientTestsConfig, WaitsFor
     @pytest.mark.it("Does not raises error when message data size is equal to 256 KB")
     def test_raises_error_when_message_to_output_data_equal_to_256(self, client, mqtt_pipeline):
         output_name = "some_output"
-        data_input = "a" * 262095
+        # The output name is encoded as a property of the message, so it counts towards the size
+        overhead = Message("", output_name=output_name).get_size()
+        data_input = "a" * (device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT - overhead)
         message = Message(data_input)
-        # This check was put as message class may undergo the default content type encoding change
-        # and the above calculation will change.
-        # Had to do greater than check for python 2. Ideally should be not equal check
-        if message.get_size() > device_constant.TELEMETRY_MESSAGE_SIZE_LIMIT:
-            assert False
 
         client.send_message_to_output(message, output_name)
 
@@ -2335,6 +3111,119 @@ class TestIoTHubModuleClientSendToOutput(IoTHubModuleClientTestsConfig, WaitsFor
         assert sent_message.data == data_input
 
 
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .begin_send_message_to_output()")
+class TestIoTHubModuleClientBeginSendToOutput(IoTHubModuleClientTestsConfig):
+    @pytest.mark.it("Begins a 'send_output_event' pipeline operation")
+    def test_calls_pipeline_send_message_to_output(self, client, mqtt_pipeline, message):
+        output_name = "some_output"
+        client.begin_send_message_to_output(message, output_name)
+        assert mqtt_pipeline.send_output_event.call_count == 1
+        assert mqtt_pipeline.send_output_event.call_args[0][0] is message
+        assert message.output_name == output_name
+
+    @pytest.mark.it(
+        "Returns a Future that is not completed until the 'send_output_event' pipeline operation completes"
+    )
+    def test_returns_pending_future(self, client_manual_cb, mqtt_pipeline_manual_cb, message):
+        future = client_manual_cb.begin_send_message_to_output(message, "some_output")
+        assert isinstance(future, Future)
+        assert not future.done()
+
+        mqtt_pipeline_manual_cb.send_output_event.call_args[1]["callback"]()
+        assert future.done()
+        assert future.result() is None
+
+    @pytest.mark.it(
+        "Completes the Future with a client error if the 'send_output_event' pipeline operation calls back with a pipeline error"
+    )
+    @pytest.mark.parametrize(
+        "pipeline_error,client_error",
+        [
+            pytest.param(
+                pipeline_exceptions.ConnectionDroppedError,
+                client_exceptions.ConnectionDroppedError,
+                id="ConnectionDroppedError->ConnectionDroppedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ConnectionFailedError,
+                client_exceptions.ConnectionFailedError,
+                id="ConnectionFailedError->ConnectionFailedError",
+            ),
+            pytest.param(
+                pipeline_exceptions.UnauthorizedError,
+                client_exceptions.CredentialError,
+                id="UnauthorizedError->CredentialError",
+            ),
+            pytest.param(
+                pipeline_exceptions.ProtocolClientError,
+                client_exceptions.ClientError,
+                id="ProtocolClientError->ClientError",
+            ),
+            pytest.param(Exception, client_exceptions.ClientError, id="Exception->ClientError"),
+        ],
+    )
+    def test_future_has_error_on_pipeline_op_error(
+        self, client_manual_cb, mqtt_pipeline_manual_cb, message, pipeline_error, client_error
+    ):
+        my_pipeline_error = pipeline_error()
+        future = client_manual_cb.begin_send_message_to_output(message, "some_output")
+        mqtt_pipeline_manual_cb.send_output_event.call_args[1]["callback"](error=my_pipeline_error)
+
+        with pytest.raises(client_error) as e_info:
+            future.result()
+        assert e_info.value.__cause__ is my_pipeline_error
+
+    @pytest.mark.it("Raises error when message size is greater than 256 KB")
+    def test_raises_error_when_message_size_greater_than_256(self, client, mqtt_pipeline):
+        message = Message("serpensortia" * 25600)
+        with pytest.raises(ValueError) as e_info:
+            client.begin_send_message_to_output(message, "some_output")
+        assert "256 KB" in e_info.value.args[0]
+        assert mqtt_pipeline.send_output_event.call_count == 0
+
+
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .set_input_message_handler()")
+class TestIoTHubModuleClientSetInputMessageHandler(IoTHubModuleClientTestsConfig):
+    @pytest.mark.it("Implicitly enables input messaging feature if not already enabled")
+    def test_enables_input_messaging_only_if_not_already_enabled(
+        self, mocker, client, mqtt_pipeline
+    ):
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False
+        client.set_input_message_handler("some_input", mocker.MagicMock())
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.INPUT_MSG
+
+        mqtt_pipeline.enable_feature.reset_mock()
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = True
+        client.set_input_message_handler("some_input", mocker.MagicMock())
+        assert mqtt_pipeline.enable_feature.call_count == 0
+
+    @pytest.mark.it("Calls the handler for an input on a worker thread with messages for the input")
+    def test_calls_handler(self, mocker, client, mqtt_pipeline, message):
+        received = []
+        done = threading.Event()
+
+        def handler(message):
+            received.append(message)
+            done.set()
+
+        other_handler = mocker.MagicMock()
+        client.set_input_message_handler("some_input", handler)
+        client.set_input_message_handler("other_input", other_handler)
+        mqtt_pipeline.on_input_message_received("some_input", message)
+
+        assert done.wait(5)
+        assert received == [message]
+        assert other_handler.call_count == 0
+
+    @pytest.mark.it("Removes the handler for the input when given None")
+    def test_remove(self, mocker, client):
+        client.set_input_message_handler("some_input", mocker.MagicMock())
+        client.set_input_message_handler("some_input", None)
+        assert client._inbox_manager.input_message_handlers == {}
+
+
 @pytest.mark.describe("IoTHubModuleClient (Synchronous) - .receive_message_on_input()")
 class TestIoTHubModuleClientReceiveInputMessage(IoTHubModuleClientTestsConfig):
     @pytest.mark.it("Implicitly enables input messaging feature if not already enabled")
@@ -2446,6 +3335,55 @@ class TestIoTHubModuleClientReceiveInputMessage(IoTHubModuleClientTestsConfig):
         assert result is None
 
 
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .receive_messages_on_input()")
+class TestIoTHubModuleClientReceiveInputMessages(IoTHubModuleClientTestsConfig):
+    @pytest.mark.it("Implicitly enables input messaging feature if not already enabled")
+    def test_enables_input_messaging_only_if_not_already_enabled(
+        self, mocker, client, mqtt_pipeline
+    ):
+        mocker.patch.object(SyncClientInbox, "get_batch")  # patch this so it won't block
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = False  # Input will appear disabled
+        client.receive_messages_on_input("some_input", 10)
+        assert mqtt_pipeline.enable_feature.call_count == 1
+        assert mqtt_pipeline.enable_feature.call_args[0][0] == constant.INPUT_MSG
+
+        mqtt_pipeline.enable_feature.reset_mock()
+
+        mqtt_pipeline.feature_enabled.__getitem__.return_value = True  # Input will appear enabled
+        client.receive_messages_on_input("some_input", 10)
+        assert mqtt_pipeline.enable_feature.call_count == 0
+
+    @pytest.mark.it(
+        "Returns up to max_count messages from the input inbox of the given input, in the order received"
+    )
+    def test_returns_messages_from_input_inbox(self, client):
+        input_inbox = client._inbox_manager.get_input_message_inbox("some_input")
+        messages = [Message("message {}".format(i)) for i in range(5)]
+        for message in messages:
+            input_inbox._put(message)
+
+        assert client.receive_messages_on_input("some_input", 3) == messages[:3]
+        assert client.receive_messages_on_input("some_input", 3) == messages[3:]
+
+    @pytest.mark.it(
+        "Returns an empty list after a timeout while blocking, in blocking mode with a specified timeout"
+    )
+    def test_times_out_waiting_for_message_blocking_mode(self, client):
+        assert client.receive_messages_on_input("some_input", 10, timeout=0.01) == []
+
+    @pytest.mark.it(
+        "Returns an empty list immediately if there are no messages, in nonblocking mode"
+    )
+    def test_no_message_in_inbox_nonblocking_mode(self, client):
+        assert client.receive_messages_on_input("some_input", 10, block=False) == []
+
+    @pytest.mark.it("Raises a ValueError if max_count is less than 1")
+    def test_invalid_max_count(self, client):
+        with pytest.raises(ValueError):
+            client.receive_messages_on_input("some_input", 0)
+
+
 @pytest.mark.describe("IoTHubModuleClient (Synchronous) - .receive_method_request()")
 class TestIoTHubModuleClientReceiveMethodRequest(
     IoTHubModuleClientTestsConfig, SharedClientReceiveMethodRequestTests
@@ -2472,6 +3410,27 @@ class TestIoTHubModuleClientPatchTwinReportedProperties(
     pass
 
 
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .begin_send_message()")
+class TestIoTHubModuleClientBeginSendMessage(
+    IoTHubModuleClientTestsConfig, SharedClientBeginSendMessageTests
+):
+    pass
+
+
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .begin_send_method_response()")
+class TestIoTHubModuleClientBeginSendMethodResponse(
+    IoTHubModuleClientTestsConfig, SharedClientBeginSendMethodResponseTests
+):
+    pass
+
+
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .begin_patch_twin_reported_properties()")
+class TestIoTHubModuleClientBeginPatchTwinReportedProperties(
+    IoTHubModuleClientTestsConfig, SharedClientBeginPatchTwinReportedPropertiesTests
+):
+    pass
+
+
 @pytest.mark.describe("IoTHubModuleClient (Synchronous) - .receive_twin_desired_properties_patch()")
 class TestIoTHubModuleClientReceiveTwinDesiredPropertiesPatch(
     IoTHubModuleClientTestsConfig, SharedClientReceiveTwinDesiredPropertiesPatchTests
@@ -2479,6 +3438,22 @@ class TestIoTHubModuleClientReceiveTwinDesiredPropertiesPatch(
     pass
 
 
+@pytest.mark.describe(
+    "IoTHubModuleClient (Synchronous) - .set_twin_desired_properties_patch_handler()"
+)
+class TestIoTHubModuleClientSetTwinDesiredPropertiesPatchHandler(
+    IoTHubModuleClientTestsConfig, SharedClientSetTwinDesiredPropertiesPatchHandlerTests
+):
+    pass
+
+
+@pytest.mark.describe("IoTHubModuleClient (Synchronous) - .set_method_request_handler()")
+class TestIoTHubModuleClientSetMethodRequestHandler(
+    IoTHubModuleClientTestsConfig, SharedClientSetMethodRequestHandlerTests
+):
+    pass
+
+
 @pytest.mark.describe("IoTHubModuleClient (Synchronous) - .invoke_method()")
 class TestIoTHubModuleClientInvokeMethod(WaitsForEventCompletion, IoTHubModuleClientTestsConfig):
     @pytest.mark.it("Begins a 'invoke_method' HTTPPipeline operation where the target is a device")
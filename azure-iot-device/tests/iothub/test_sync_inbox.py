@@ -132,3 +132,146 @@ class TestSyncClientInboxClear(object):
 
         inbox.clear()
         assert inbox.empty()
+
+
+@pytest.mark.describe("SyncClientInbox - Bounded")
+class TestSyncClientInboxBounded(object):
+    @pytest.mark.it("Drops the oldest item to make room for a new one when full, by default")
+    def test_drop_oldest(self):
+        inbox = SyncClientInbox(max_size=2)
+        assert inbox._put(1)
+        assert inbox._put(2)
+        assert inbox._put(3)
+        assert inbox.dropped_count == 1
+        assert inbox.get(block=False) == 2
+        assert inbox.get(block=False) == 3
+
+    @pytest.mark.it("Drops the new item when full, if using the 'drop_newest' overflow policy")
+    def test_drop_newest(self):
+        inbox = SyncClientInbox(max_size=2, overflow_policy="drop_newest")
+        assert inbox._put(1)
+        assert inbox._put(2)
+        assert not inbox._put(3)
+        assert inbox.dropped_count == 1
+        assert inbox.get(block=False) == 1
+        assert inbox.get(block=False) == 2
+
+    @pytest.mark.it(
+        "Keeps all items, and calls on_full once when full and on_space_available once back down to the resume size, if using the 'pause' overflow policy"
+    )
+    def test_pause(self, mocker):
+        inbox = SyncClientInbox(max_size=3, overflow_policy="pause", resume_size=1)
+        inbox.on_full = mocker.MagicMock()
+        inbox.on_space_available = mocker.MagicMock()
+        for item in range(4):
+            assert inbox._put(item)
+        assert inbox.on_full.call_count == 1
+        assert inbox.dropped_count == 0
+
+        inbox.get(block=False)
+        inbox.get(block=False)
+        assert inbox.on_space_available.call_count == 0
+        inbox.get(block=False)
+        assert inbox.on_space_available.call_count == 1
+        inbox.get(block=False)
+        assert inbox.on_space_available.call_count == 1
+
+        for item in range(3):
+            inbox._put(item)
+        assert inbox.on_full.call_count == 2
+        inbox.clear()
+        assert inbox.on_space_available.call_count == 2
+
+    @pytest.mark.it(
+        "Is not left full if an item is removed while the inbox is becoming full, if using the 'pause' overflow policy"
+    )
+    def test_pause_item_removed_while_becoming_full(self, mocker):
+        inbox = SyncClientInbox(max_size=1, overflow_policy="pause", resume_size=0)
+        inbox.on_full = mocker.MagicMock()
+        inbox.on_space_available = mocker.MagicMock()
+        consumer = threading.Thread(target=inbox.get)
+        qsize = inbox._qsize
+
+        def qsize_then_remove_item():
+            # The consumer takes the item right after the inbox has checked its size
+            size = qsize()
+            if not consumer.is_alive() and consumer.ident is None:
+                consumer.start()
+                consumer.join(0.1)
+            return size
+
+        mocker.patch.object(inbox, "_qsize", side_effect=qsize_then_remove_item)
+        inbox._put("item")
+        consumer.join()
+
+        assert inbox.empty()
+        assert not inbox.full
+        assert inbox.on_full.call_count == 1
+        assert inbox.on_space_available.call_count == 1
+
+    @pytest.mark.it("Keeps track of the largest number of items it has held")
+    def test_high_water_mark(self):
+        inbox = SyncClientInbox(max_size=5)
+        inbox._put(1)
+        inbox._put(2)
+        inbox.get(block=False)
+        inbox._put(3)
+        assert inbox.high_water_mark == 2
+
+
+@pytest.mark.describe("SyncClientInbox - .get_batch()")
+class TestSyncClientInboxGetBatch(object):
+    @pytest.mark.it("Removes and returns up to max_count items, in the order they were added")
+    def test_returns_items_in_order(self):
+        inbox = SyncClientInbox()
+        for item in range(5):
+            inbox._put(item)
+        assert inbox.get_batch(3) == [0, 1, 2]
+        assert inbox.get_batch(3) == [3, 4]
+        assert inbox.empty()
+
+    @pytest.mark.it("Blocks on an empty inbox until an item is available, in blocking mode")
+    def test_waits_for_item(self):
+        inbox = SyncClientInbox()
+
+        def insert_item_after_delay():
+            time.sleep(0.01)
+            inbox._put(1)
+
+        threading.Thread(target=insert_item_after_delay).start()
+        assert inbox.get_batch(10) == [1]
+
+    @pytest.mark.it(
+        "Raises InboxEmpty exception if the inbox is empty, when using non-blocking mode or after a timeout"
+    )
+    def test_empty(self):
+        inbox = SyncClientInbox()
+        with pytest.raises(InboxEmpty):
+            inbox.get_batch(10, block=False)
+        with pytest.raises(InboxEmpty):
+            inbox.get_batch(10, timeout=0.01)
+
+    @pytest.mark.it("Only uses the public API of the underlying queue")
+    def test_public_queue_api(self):
+        class PublicQueue(object):
+            # Exposes only the public methods of a queue.Queue
+            def __init__(self, q):
+                self.put = q.put
+                self.put_nowait = q.put_nowait
+                self.get = q.get
+                self.get_nowait = q.get_nowait
+                self.qsize = q.qsize
+                self.empty = q.empty
+
+        inbox = SyncClientInbox()
+        inbox._queue = PublicQueue(inbox._queue)
+        for item in range(5):
+            inbox._put(item)
+        assert inbox.get_batch(3) == [0, 1, 2]
+        assert inbox.get_batch(3) == [3, 4]
+
+    @pytest.mark.it("Raises a ValueError if max_count is less than 1")
+    def test_invalid_max_count(self):
+        inbox = SyncClientInbox()
+        with pytest.raises(ValueError):
+            inbox.get_batch(0)
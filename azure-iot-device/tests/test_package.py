@@ -0,0 +1,82 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import pytest
+import os
+import subprocess
+import sys
+import azure.iot.device
+from azure.iot.device import iothub, provisioning, common
+
+lazy_import_supported = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="Lazy imports require Python 3.7+"
+)
+
+
+def imported_modules_after(statement):
+    """Get the names of the modules imported by a statement in a new interpreter"""
+    output = subprocess.check_output(
+        [sys.executable, "-c", statement + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+        universal_newlines=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)),
+    )
+    return set(output.split())
+
+
+@pytest.mark.describe("azure.iot.device")
+class TestPackage(object):
+    @pytest.mark.it("Exposes every item exposed by the iothub, provisioning and common subpackages")
+    def test_all(self):
+        assert azure.iot.device.__all__ == iothub.__all__ + provisioning.__all__ + common.__all__
+        for name in azure.iot.device.__all__:
+            assert getattr(azure.iot.device, name) is not None
+
+    @pytest.mark.it("Patches the clients to add documentation for their inherited methods")
+    def test_patched(self):
+        assert "connect" in vars(azure.iot.device.IoTHubDeviceClient)
+        assert "create_from_symmetric_key" in vars(azure.iot.device.ProvisioningDeviceClient)
+
+    @pytest.mark.it("Raises an AttributeError for an unknown item")
+    def test_unknown(self):
+        with pytest.raises(AttributeError):
+            azure.iot.device.NotAClient
+
+    @pytest.mark.it("Does not import any subpackage until one of its items is used")
+    @lazy_import_supported
+    def test_lazy(self):
+        modules = imported_modules_after("import azure.iot.device")
+        assert "azure.iot.device.iothub" not in modules
+        assert "azure.iot.device.provisioning" not in modules
+        assert "paho" not in modules
+
+    @pytest.mark.it("Imports only the subpackage of an item when it is used")
+    @lazy_import_supported
+    def test_lazy_item(self):
+        modules = imported_modules_after("from azure.iot.device import IoTHubDeviceClient")
+        assert "azure.iot.device.iothub" in modules
+        assert "azure.iot.device.provisioning" not in modules
+        assert "requests" not in modules
+
+
+@pytest.mark.describe("azure.iot.device.aio")
+class TestAioPackage(object):
+    @pytest.mark.it("Exposes every item exposed by the iothub and provisioning aio subpackages")
+    def test_all(self):
+        import azure.iot.device.aio
+        from azure.iot.device.iothub import aio as iothub_aio
+        from azure.iot.device.provisioning import aio as provisioning_aio
+
+        assert azure.iot.device.aio.__all__ == iothub_aio.__all__ + provisioning_aio.__all__
+        for name in azure.iot.device.aio.__all__:
+            assert getattr(azure.iot.device.aio, name) is getattr(
+                iothub_aio if name in iothub_aio.__all__ else provisioning_aio, name
+            )
+
+    @pytest.mark.it("Does not import any aio subpackage until one of its items is used")
+    @lazy_import_supported
+    def test_lazy(self):
+        modules = imported_modules_after("import azure.iot.device.aio")
+        assert "azure.iot.device.iothub.aio" not in modules
+        assert "janus" not in modules
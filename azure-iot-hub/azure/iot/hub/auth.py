@@ -7,6 +7,7 @@
 """Provides authentication classes for use with the msrest library
 """
 
+import threading
 from msrest.authentication import Authentication
 from .connection_string import ConnectionString
 from .connection_string import HOST_NAME, SHARED_ACCESS_KEY_NAME, SHARED_ACCESS_KEY
@@ -14,17 +15,39 @@ from .sastoken import SasToken
 
 __all__ = ["ConnectionStringAuthentication"]
 
+# Time to live of the SasTokens used for requests, in seconds
+DEFAULT_TOKEN_TTL = 3600
+# Fraction of a SasToken's time to live after which it is refreshed, instead of being reused
+DEFAULT_TOKEN_REFRESH_FRACTION = 0.5
+
 
 class ConnectionStringAuthentication(ConnectionString, Authentication):
     """ConnectionString class that can be used with msrest to provide SasToken authentication
 
+    The same SasToken is used for every request until refresh_fraction of its time to live has
+    elapsed, at which point it is refreshed.
+
     :param connection_string: The connection string to generate SasToken with
+    :param int token_ttl: Time to live of the SasTokens, in seconds (optional)
+    :param float token_refresh_fraction: Fraction of the time to live after which a SasToken is
+        refreshed, between 0 and 1 (optional)
     """
 
-    def __init__(self, connection_string):
+    def __init__(
+        self,
+        connection_string,
+        token_ttl=DEFAULT_TOKEN_TTL,
+        token_refresh_fraction=DEFAULT_TOKEN_REFRESH_FRACTION,
+    ):
         super(ConnectionStringAuthentication, self).__init__(
             connection_string
         )  # ConnectionString __init__
+        if not 0 <= token_refresh_fraction <= 1:
+            raise ValueError("token_refresh_fraction must be between 0 and 1")
+        self.token_ttl = token_ttl
+        self.token_refresh_fraction = token_refresh_fraction
+        self._sastoken = None
+        self._sastoken_lock = threading.Lock()
 
     @classmethod
     def create_with_parsed_values(cls, host_name, shared_access_key_name, shared_access_key):
@@ -56,7 +79,20 @@ class ConnectionStringAuthentication(ConnectionString, Authentication):
         session = super(ConnectionStringAuthentication, self).signed_session(session)
 
         # Authorization header
-        sastoken = SasToken(self[HOST_NAME], self[SHARED_ACCESS_KEY], self[SHARED_ACCESS_KEY_NAME])
-        session.headers[self.header] = str(sastoken)
+        session.headers[self.header] = self._get_sastoken()
 
         return session
+
+    def _get_sastoken(self):
+        """Get the current SasToken string, refreshing the SasToken if it is due"""
+        with self._sastoken_lock:
+            if self._sastoken is None:
+                self._sastoken = SasToken(
+                    self[HOST_NAME],
+                    self[SHARED_ACCESS_KEY],
+                    self[SHARED_ACCESS_KEY_NAME],
+                    ttl=self.token_ttl,
+                )
+            elif self._sastoken.needs_refresh(self.token_refresh_fraction):
+                self._sastoken.refresh()
+            return str(self._sastoken)
@@ -0,0 +1,166 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""This module contains a helper which sends many IoTHub REST requests concurrently, for bulk
+registry and twin operations.
+"""
+
+import logging
+import time
+import email.utils
+from concurrent import futures
+from msrest.exceptions import HttpOperationError
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of devices the service accepts in a single bulk registry request
+MAX_DEVICES_PER_BULK_REQUEST = 100
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+# Maximum number of times a throttled request is retried
+DEFAULT_MAX_THROTTLE_RETRIES = 5
+# Number of seconds to wait before retrying a throttled request without a Retry-After header.
+# This doubles with each retry.
+DEFAULT_THROTTLE_RETRY_INTERVAL = 1.0
+
+HTTP_TOO_MANY_REQUESTS = 429
+
+
+class BulkResult(object):
+    """The result of a bulk operation for a single device.
+
+    :ivar str device_id: The Id of the device.
+    :ivar result: The result returned for the device, if any (e.g. the updated Twin).
+    :ivar error: The error for the device, if the operation failed for it. Either the
+        DeviceRegistryOperationError returned by the service, or the exception raised by the
+        request for the device.
+    :ivar warning: The DeviceRegistryOperationWarning returned by the service for the device, if any.
+    """
+
+    def __init__(self, device_id, result=None, error=None, warning=None):
+        self.device_id = device_id
+        self.result = result
+        self.error = error
+        self.warning = warning
+
+    @property
+    def is_successful(self):
+        return self.error is None
+
+
+def _get_retry_after(response):
+    """Get the number of seconds to wait given by the Retry-After header of a response, if any"""
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    # The header can also be an HTTP date
+    date = email.utils.parsedate_tz(retry_after)
+    if date is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(date) - time.time())
+
+
+class BulkExecutor(object):
+    """Sends requests concurrently on a pool of worker threads, retrying throttled requests.
+
+    Each worker thread keeps its own keep-alive connection to the IoTHub, so requests don't pay
+    for a new connection and TLS handshake each time.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_requests=DEFAULT_MAX_CONCURRENT_REQUESTS,
+        max_throttle_retries=DEFAULT_MAX_THROTTLE_RETRIES,
+        throttle_retry_interval=DEFAULT_THROTTLE_RETRY_INTERVAL,
+    ):
+        """Initializer for a BulkExecutor
+
+        :param int max_concurrent_requests: Maximum number of requests sent at the same time.
+        :param int max_throttle_retries: Maximum number of times a request is retried after the
+            service responds with 429 (Too Many Requests).
+        :param float throttle_retry_interval: Number of seconds to wait before the first retry of
+            a throttled request, if the service doesn't give a Retry-After header. This doubles
+            with each retry.
+
+        :raises: ValueError if max_concurrent_requests is less than 1.
+        """
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1")
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_throttle_retries = max_throttle_retries
+        self.throttle_retry_interval = throttle_retry_interval
+        self._pool = futures.ThreadPoolExecutor(max_workers=max_concurrent_requests)
+
+    def shutdown(self):
+        """Stop the worker threads once the requests already sent are done"""
+        self._pool.shutdown(wait=False)
+
+    def call(self, function, *args):
+        """Call a function sending a request, retrying it if the service throttles the request.
+
+        :returns: The return value of the function.
+        :raises: The exception raised by the last call of the function.
+        """
+        retries = 0
+        while True:
+            try:
+                return function(*args)
+            except HttpOperationError as e:
+                status_code = getattr(e.response, "status_code", None)
+                if status_code != HTTP_TOO_MANY_REQUESTS or retries >= self.max_throttle_retries:
+                    raise
+                delay = _get_retry_after(e.response)
+                if delay is None:
+                    delay = self.throttle_retry_interval * (2 ** retries)
+                retries += 1
+                logger.info(
+                    "Request throttled. Retrying in {} seconds (retry {})".format(delay, retries)
+                )
+                time.sleep(delay)
+
+    def submit(self, function, *args):
+        """Call a function sending a request on a worker thread, retrying it if the service
+        throttles the request.
+
+        :returns: A Future for the return value of the function.
+        """
+        return self._pool.submit(self.call, function, *args)
+
+    def map(self, function, items):
+        """Call a function sending a request for each item, concurrently.
+
+        The items are consumed as requests complete, so that only a few more items than
+        max_concurrent_requests are held at a time. If the returned iterator is not consumed to
+        the end, the requests not yet sent are cancelled when it is closed.
+
+        :param function: The function to call with each item.
+        :param items: Iterable of items.
+
+        :returns: Iterator of (item, return value, exception) tuples, in the order the requests
+            complete. Either the return value or the exception is None.
+        """
+        items = iter(items)
+        pending = {}
+        max_pending = 2 * self.max_concurrent_requests
+        try:
+            while True:
+                for item in items:
+                    pending[self.submit(function, item)] = item
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+                done, _ = futures.wait(list(pending), return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    error = future.exception()
+                    yield (item, None if error else future.result(), error)
+        finally:
+            for future in pending:
+                future.cancel()
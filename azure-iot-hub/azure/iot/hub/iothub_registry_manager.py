@@ -3,8 +3,10 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # --------------------------------------------------------------------------
+import itertools
 from .iothub_amqp_client import IoTHubAmqpClient as iothub_amqp_client
 from .auth import ConnectionStringAuthentication
+from .bulk_executor import BulkExecutor, BulkResult, MAX_DEVICES_PER_BULK_REQUEST
 from .protocol.iot_hub_gateway_service_ap_is import IotHubGatewayServiceAPIs as protocol_client
 from .protocol.models import (
     Device,
@@ -66,16 +68,27 @@ class IoTHubRegistryManager(object):
         """
         self.auth = ConnectionStringAuthentication(connection_string)
         self.protocol = protocol_client(self.auth, "https://" + self.auth["HostName"])
+        # Keep the HTTP connections open between requests, instead of connecting to the IoTHub
+        # again for each one
+        self.protocol.config.keep_alive = True
         self.amqp_svc_client = iothub_amqp_client(
             self.auth["HostName"], self.auth["SharedAccessKeyName"], self.auth["SharedAccessKey"]
         )
+        self._bulk_executor = None
 
     def __del__(self):
         """
         Deinitializer for a Registry Manager Service client.
         """
+        if self._bulk_executor:
+            self._bulk_executor.shutdown()
         self.amqp_svc_client.disconnect_sync()
 
+    def _get_bulk_executor(self):
+        if self._bulk_executor is None:
+            self._bulk_executor = BulkExecutor()
+        return self._bulk_executor
+
     def create_device_with_sas(self, device_id, primary_key, secondary_key, status, iot_edge=False):
         """Creates a device identity on IoTHub using SAS authentication.
 
@@ -540,6 +553,45 @@ class IoTHubRegistryManager(object):
         """
         return self.protocol.registry_manager.bulk_device_crud(devices)
 
+    def bulk_create_or_update_devices_in_chunks(self, devices):
+        """Create, update, or delete the identities of any number of devices from the
+           IoTHub identity registry.
+
+           The devices are split into chunks of 100 devices, which are sent concurrently.
+           Requests throttled by the IoTHub are retried after the time given by the
+           IoTHub. A device identity can be specified only once.
+
+        :param devices: The device objects to operate on.
+        :type devices: iterable of ExportImportDevice
+
+        :returns: Iterator of BulkResult objects, one for each device, in the order the
+            requests complete. If the request for a chunk fails, the result for each device in
+            the chunk has the exception raised as its error.
+        """
+
+        def chunk_devices():
+            iterator = iter(devices)
+            while True:
+                chunk = list(itertools.islice(iterator, MAX_DEVICES_PER_BULK_REQUEST))
+                if not chunk:
+                    return
+                yield chunk
+
+        results = self._get_bulk_executor().map(
+            self.protocol.registry_manager.bulk_device_crud, chunk_devices()
+        )
+        for chunk, bulk_result, exception in results:
+            if exception is not None:
+                for device in chunk:
+                    yield BulkResult(device.id, error=exception)
+                continue
+            errors = dict((error.device_id, error) for error in bulk_result.errors or [])
+            warnings = dict((warning.device_id, warning) for warning in bulk_result.warnings or [])
+            for device in chunk:
+                yield BulkResult(
+                    device.id, error=errors.get(device.id), warning=warnings.get(device.id)
+                )
+
     def query_iot_hub(self, query_specification, continuation_token=None, max_item_count=None):
         """Query an IoTHub to retrieve information regarding device twins using a
            SQL-like language.
@@ -568,6 +620,45 @@ class IoTHubRegistryManager(object):
 
         return queryResult
 
+    def iter_query_iot_hub(self, query_specification, max_item_count=None):
+        """Query an IoTHub to retrieve information regarding device twins using a
+           SQL-like language, going through all the pages of results.
+           See https://docs.microsoft.com/azure/iot-hub/iot-hub-devguide-query-language
+           for more information.
+
+           The next page of results is fetched in the background while the items of
+           the current page are consumed, so that only two pages are held at a time.
+           Requests throttled by the IoTHub are retried after the time given by the
+           IoTHub.
+
+        :param QuerySpecification query: The query specification.
+        :param str max_item_count: Maximum number of device twins in each page
+
+        :raises: `HttpOperationError<msrest.exceptions.HttpOperationError>`
+            if the HTTP response status is not in [200].
+
+        :returns: Iterator of the query result items.
+        """
+        executor = self._get_bulk_executor()
+        future = executor.submit(self.query_iot_hub, query_specification, None, max_item_count)
+        try:
+            while future is not None:
+                query_result = future.result()
+                if query_result.continuation_token:
+                    future = executor.submit(
+                        self.query_iot_hub,
+                        query_specification,
+                        query_result.continuation_token,
+                        max_item_count,
+                    )
+                else:
+                    future = None
+                for item in query_result.items or []:
+                    yield item
+        finally:
+            if future is not None:
+                future.cancel()
+
     def get_twin(self, device_id):
         """Gets a device twin.
 
@@ -607,6 +698,28 @@ class IoTHubRegistryManager(object):
         """
         return self.protocol.twin.update_device_twin(device_id, device_twin, etag)
 
+    def bulk_update_twins(self, twin_updates):
+        """Updates the Device Twins of any number of devices concurrently.
+
+           Requests throttled by the IoTHub are retried after the time given by the
+           IoTHub.
+
+        :param twin_updates: The updates to make.
+        :type twin_updates: iterable of (str, Twin, str) tuples, giving the name (Id) of a
+            device, the twin containing the properties to update and the etag of the twin.
+
+        :returns: Iterator of BulkResult objects, one for each device, in the order the
+            requests complete. The result of each is the updated Twin, or the error is the
+            exception raised by the request.
+        """
+
+        def update_twin(twin_update):
+            return self.protocol.twin.update_device_twin(*twin_update)
+
+        results = self._get_bulk_executor().map(update_twin, twin_updates)
+        for twin_update, twin, exception in results:
+            yield BulkResult(twin_update[0], result=twin, error=exception)
+
     def get_module_twin(self, device_id, module_id):
         """Gets a module twin.
 
@@ -0,0 +1,76 @@
+# --------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import pytest
+import time
+from azure.iot.hub.auth import ConnectionStringAuthentication
+from azure.iot.hub import sastoken
+
+"""---Constants---"""
+
+fake_hostname = "beauxbatons.academy-net"
+fake_shared_access_key_name = "alohomora"
+fake_shared_access_key = "Zm9vYmFy"
+fake_connection_string = "HostName={hostname};SharedAccessKeyName={skn};SharedAccessKey={sk}".format(
+    hostname=fake_hostname, skn=fake_shared_access_key_name, sk=fake_shared_access_key
+)
+
+
+"""----Shared fixtures----"""
+
+
+@pytest.fixture(scope="function")
+def mock_time(mocker):
+    return mocker.patch.object(time, "time", return_value=1000.0)
+
+
+@pytest.fixture(scope="function")
+def auth(mock_time):
+    return ConnectionStringAuthentication(fake_connection_string, token_ttl=100)
+
+
+@pytest.mark.describe("ConnectionStringAuthentication - .signed_session()")
+class TestConnectionStringAuthenticationSignedSession(object):
+    @pytest.mark.it("Sets a SasToken for the connection string in the Authorization header")
+    def test_sets_header(self, auth):
+        session = auth.signed_session()
+        token = session.headers["Authorization"]
+        assert token.startswith("SharedAccessSignature sr=" + fake_hostname)
+        assert "skn=" + fake_shared_access_key_name in token
+        assert "se=1100" in token
+
+    @pytest.mark.it("Reuses the same SasToken until the refresh fraction of its TTL has elapsed")
+    def test_reuses_token(self, mocker, auth, mock_time):
+        sastoken_init = mocker.spy(sastoken.SasToken, "__init__")
+        first_token = auth.signed_session().headers["Authorization"]
+        mock_time.return_value = 1049.0
+        second_token = auth.signed_session().headers["Authorization"]
+
+        assert second_token == first_token
+        assert sastoken_init.call_count == 1
+
+    @pytest.mark.it("Refreshes the SasToken once the refresh fraction of its TTL has elapsed")
+    def test_refreshes_token(self, auth, mock_time):
+        first_token = auth.signed_session().headers["Authorization"]
+        mock_time.return_value = 1050.0
+        second_token = auth.signed_session().headers["Authorization"]
+
+        assert second_token != first_token
+        assert "se=1150" in second_token
+
+    @pytest.mark.it("Uses a refresh fraction of 0.5 and a TTL of 3600 seconds by default")
+    def test_defaults(self):
+        auth = ConnectionStringAuthentication(fake_connection_string)
+        assert auth.token_refresh_fraction == 0.5
+        assert auth.token_ttl == 3600
+
+    @pytest.mark.it("Raises a ValueError if given a refresh fraction not between 0 and 1")
+    @pytest.mark.parametrize("token_refresh_fraction", [-0.1, 1.1])
+    def test_invalid_refresh_fraction(self, token_refresh_fraction):
+        with pytest.raises(ValueError):
+            ConnectionStringAuthentication(
+                fake_connection_string, token_refresh_fraction=token_refresh_fraction
+            )
@@ -0,0 +1,157 @@
+# --------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+import pytest
+import threading
+import time
+from email.utils import formatdate
+from msrest.exceptions import HttpOperationError
+from azure.iot.hub import bulk_executor
+from azure.iot.hub.bulk_executor import BulkExecutor
+
+"""----Shared fixtures----"""
+
+
+@pytest.fixture(scope="function")
+def executor():
+    executor = BulkExecutor(max_concurrent_requests=4, throttle_retry_interval=0.5)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture(scope="function")
+def mock_sleep(mocker):
+    return mocker.patch.object(bulk_executor.time, "sleep")
+
+
+def throttled_error(mocker, headers=None):
+    response = mocker.MagicMock(status_code=429, headers=headers or {})
+    error = HttpOperationError.__new__(HttpOperationError)
+    error.response = response
+    return error
+
+
+def http_error(mocker, status_code):
+    error = HttpOperationError.__new__(HttpOperationError)
+    error.response = mocker.MagicMock(status_code=status_code, headers={})
+    return error
+
+
+@pytest.mark.describe("BulkExecutor - Instantiation")
+class TestBulkExecutorInstantiation(object):
+    @pytest.mark.it("Raises a ValueError if max_concurrent_requests is less than 1")
+    def test_invalid_max_concurrent_requests(self):
+        with pytest.raises(ValueError):
+            BulkExecutor(max_concurrent_requests=0)
+
+
+@pytest.mark.describe("BulkExecutor - .call()")
+class TestBulkExecutorCall(object):
+    @pytest.mark.it("Returns the return value of the function")
+    def test_returns(self, mocker, executor):
+        function = mocker.MagicMock(return_value="result")
+        assert executor.call(function, "arg") == "result"
+        assert function.call_args == mocker.call("arg")
+
+    @pytest.mark.it("Retries after the number of seconds given by the Retry-After header of a 429")
+    def test_retry_after_seconds(self, mocker, executor, mock_sleep):
+        function = mocker.MagicMock(
+            side_effect=[throttled_error(mocker, {"Retry-After": "7"}), "result"]
+        )
+        assert executor.call(function) == "result"
+        assert function.call_count == 2
+        assert mock_sleep.call_args == mocker.call(7.0)
+
+    @pytest.mark.it("Retries after the date given by the Retry-After header of a 429")
+    def test_retry_after_date(self, mocker, executor, mock_sleep):
+        retry_after = formatdate(time.time() + 30, usegmt=True)
+        function = mocker.MagicMock(
+            side_effect=[throttled_error(mocker, {"Retry-After": retry_after}), "result"]
+        )
+        assert executor.call(function) == "result"
+        assert 25 <= mock_sleep.call_args[0][0] <= 30
+
+    @pytest.mark.it("Doubles the wait after each retry of a 429 without a Retry-After header")
+    def test_backoff(self, mocker, executor, mock_sleep):
+        function = mocker.MagicMock(
+            side_effect=[throttled_error(mocker) for _ in range(3)] + ["result"]
+        )
+        assert executor.call(function) == "result"
+        assert mock_sleep.call_args_list == [mocker.call(0.5), mocker.call(1.0), mocker.call(2.0)]
+
+    @pytest.mark.it(
+        "Raises the 429 error once the request has been retried max_throttle_retries times"
+    )
+    def test_max_retries(self, mocker, mock_sleep):
+        executor = BulkExecutor(max_throttle_retries=2)
+        errors = [throttled_error(mocker) for _ in range(3)]
+        function = mocker.MagicMock(side_effect=errors)
+        with pytest.raises(HttpOperationError) as e_info:
+            executor.call(function)
+        assert e_info.value is errors[2]
+        assert function.call_count == 3
+        executor.shutdown()
+
+    @pytest.mark.it("Raises other errors without retrying")
+    def test_other_error(self, mocker, executor, mock_sleep):
+        error = http_error(mocker, 404)
+        function = mocker.MagicMock(side_effect=error)
+        with pytest.raises(HttpOperationError) as e_info:
+            executor.call(function)
+        assert e_info.value is error
+        assert function.call_count == 1
+        assert mock_sleep.call_count == 0
+
+
+@pytest.mark.describe("BulkExecutor - .map()")
+class TestBulkExecutorMap(object):
+    @pytest.mark.it("Returns the item, return value and exception of the call for each item")
+    def test_results(self, executor):
+        error = ValueError("odd")
+
+        def function(item):
+            if item % 2:
+                raise error
+            return item * 10
+
+        results = sorted(executor.map(function, range(10)), key=lambda result: result[0])
+        assert results == [
+            (item, None, error) if item % 2 else (item, item * 10, None) for item in range(10)
+        ]
+
+    @pytest.mark.it("Sends up to max_concurrent_requests requests at the same time")
+    def test_concurrent(self, executor):
+        lock = threading.Lock()
+        state = {"running": 0, "max_running": 0}
+        barrier = threading.Event()
+
+        def function(item):
+            with lock:
+                state["running"] += 1
+                state["max_running"] = max(state["max_running"], state["running"])
+                if state["running"] == 4:
+                    barrier.set()
+            barrier.wait(5)
+            with lock:
+                state["running"] -= 1
+            return item
+
+        assert len(list(executor.map(function, range(20)))) == 20
+        assert state["max_running"] == 4
+
+    @pytest.mark.it("Consumes the items as the requests complete")
+    def test_lazy(self, executor):
+        consumed = []
+
+        def items():
+            for item in range(100):
+                consumed.append(item)
+                yield item
+
+        results = executor.map(lambda item: item, items())
+        next(results)
+        assert len(consumed) <= 2 * executor.max_concurrent_requests
+        results.close()
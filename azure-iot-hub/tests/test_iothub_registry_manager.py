@@ -5,7 +5,13 @@
 # --------------------------------------------------------------------------
 
 import pytest
-from azure.iot.hub.protocol.models import AuthenticationMechanism
+from azure.iot.hub.protocol.models import (
+    AuthenticationMechanism,
+    BulkRegistryOperationResult,
+    DeviceRegistryOperationError,
+    DeviceRegistryOperationWarning,
+    ExportImportDevice,
+)
 from azure.iot.hub.iothub_registry_manager import IoTHubRegistryManager
 from azure.iot.hub.iothub_amqp_client import IoTHubAmqpClient as iothub_amqp_client
 
@@ -118,6 +124,11 @@ def mock_uamqp_disconnect_sync(mocker):
     return mocker.patch.object(iothub_amqp_client, "disconnect_sync")
 
 
+@pytest.fixture
+def arbitrary_exception():
+    return Exception("fake exception")
+
+
 @pytest.mark.describe("IoTHubRegistryManager - .create_device_with_sas()")
 class TestCreateDeviceWithSymmetricKey(object):
 
@@ -1055,6 +1066,62 @@ class TestBulkCreateUpdateDevices(object):
         )
 
 
+@pytest.mark.describe("IoTHubRegistryManager - .bulk_create_or_update_devices_in_chunks()")
+class TestBulkCreateUpdateDevicesInChunks(object):
+    @pytest.fixture
+    def devices(self):
+        return [ExportImportDevice(id="device{}".format(i)) for i in range(250)]
+
+    @pytest.mark.it("Sends the devices in chunks of 100 devices")
+    def test_chunks(self, mock_registry_manager_operations, iothub_registry_manager, devices):
+        mock_registry_manager_operations.bulk_device_crud.return_value = BulkRegistryOperationResult(
+            is_successful=True
+        )
+        results = list(iothub_registry_manager.bulk_create_or_update_devices_in_chunks(devices))
+
+        chunks = [
+            call[0][0] for call in mock_registry_manager_operations.bulk_device_crud.call_args_list
+        ]
+        assert sorted(len(chunk) for chunk in chunks) == [50, 100, 100]
+        assert sorted(device.id for chunk in chunks for device in chunk) == sorted(
+            device.id for device in devices
+        )
+        assert len(results) == 250
+        assert all(result.is_successful for result in results)
+
+    @pytest.mark.it("Returns the errors and warnings given by the IoTHub for each device")
+    def test_errors_and_warnings(self, mock_registry_manager_operations, iothub_registry_manager):
+        error = DeviceRegistryOperationError(device_id="device0", error_status="failed")
+        warning = DeviceRegistryOperationWarning(device_id="device1", warning_status="warned")
+        mock_registry_manager_operations.bulk_device_crud.return_value = BulkRegistryOperationResult(
+            is_successful=False, errors=[error], warnings=[warning]
+        )
+        devices = [ExportImportDevice(id="device{}".format(i)) for i in range(3)]
+        results = dict(
+            (result.device_id, result)
+            for result in iothub_registry_manager.bulk_create_or_update_devices_in_chunks(devices)
+        )
+
+        assert results["device0"].error is error
+        assert not results["device0"].is_successful
+        assert results["device1"].warning is warning
+        assert results["device1"].is_successful
+        assert results["device2"].is_successful
+
+    @pytest.mark.it(
+        "Returns the exception raised by the request of a chunk for each of its devices"
+    )
+    def test_request_fails(
+        self, mock_registry_manager_operations, iothub_registry_manager, arbitrary_exception
+    ):
+        mock_registry_manager_operations.bulk_device_crud.side_effect = arbitrary_exception
+        devices = [ExportImportDevice(id="device{}".format(i)) for i in range(3)]
+        results = list(iothub_registry_manager.bulk_create_or_update_devices_in_chunks(devices))
+
+        assert [result.device_id for result in results] == ["device0", "device1", "device2"]
+        assert all(result.error is arbitrary_exception for result in results)
+
+
 @pytest.mark.describe("IoTHubRegistryManager - .query_iot_hub()")
 class TestQueryIoTHub(object):
     @pytest.mark.it("Test query IoTHub")
@@ -1093,6 +1160,58 @@ class TestQueryIoTHubWithContinuationTokenAndMaxItermCount(object):
         )
 
 
+@pytest.mark.describe("IoTHubRegistryManager - .iter_query_iot_hub()")
+class TestIterQueryIoTHub(object):
+    @pytest.fixture
+    def pages(self, mocker, mock_registry_manager_operations):
+        pages = {
+            None: (["twin0", "twin1"], "token1"),
+            "token1": (["twin2"], "token2"),
+            "token2": (["twin3", "twin4"], None),
+        }
+
+        def query_iot_hub(query_specification, continuation_token, *args):
+            items, next_token = pages[continuation_token]
+            return mocker.MagicMock(
+                output=items, headers={"x-ms-item-type": "twin", "x-ms-continuation": next_token}
+            )
+
+        mock_registry_manager_operations.query_iot_hub.side_effect = query_iot_hub
+        return pages
+
+    @pytest.mark.it("Yields the items of all the pages, following the continuation tokens")
+    def test_all_pages(
+        self, mocker, mock_registry_manager_operations, iothub_registry_manager, pages
+    ):
+        items = list(iothub_registry_manager.iter_query_iot_hub(fake_query_specification, 2))
+
+        assert items == ["twin0", "twin1", "twin2", "twin3", "twin4"]
+        assert mock_registry_manager_operations.query_iot_hub.call_args_list == [
+            mocker.call(fake_query_specification, None, 2, None, True),
+            mocker.call(fake_query_specification, "token1", 2, None, True),
+            mocker.call(fake_query_specification, "token2", 2, None, True),
+        ]
+
+    @pytest.mark.it("Fetches only the next page while the items of a page are consumed")
+    def test_prefetch(self, mock_registry_manager_operations, iothub_registry_manager, pages):
+        items = iothub_registry_manager.iter_query_iot_hub(fake_query_specification)
+        assert next(items) == "twin0"
+        iothub_registry_manager._bulk_executor.shutdown()
+        iothub_registry_manager._bulk_executor._pool.shutdown(wait=True)
+
+        assert mock_registry_manager_operations.query_iot_hub.call_count == 2
+        items.close()
+
+    @pytest.mark.it("Raises the exception raised by the request for a page")
+    def test_request_fails(
+        self, mock_registry_manager_operations, iothub_registry_manager, arbitrary_exception
+    ):
+        mock_registry_manager_operations.query_iot_hub.side_effect = arbitrary_exception
+        with pytest.raises(Exception) as e_info:
+            list(iothub_registry_manager.iter_query_iot_hub(fake_query_specification))
+        assert e_info.value is arbitrary_exception
+
+
 @pytest.mark.describe("IoTHubRegistryManager - .get_twin()")
 class TestGetTwin(object):
     @pytest.mark.it("Test get twin")
@@ -1124,6 +1243,46 @@ class TestUpdateTwin(object):
         )
 
 
+@pytest.mark.describe("IoTHubRegistryManager - .bulk_update_twins()")
+class TestBulkUpdateTwins(object):
+    @pytest.mark.it("Updates the twin of each device and returns the updated twins")
+    def test_bulk_update_twins(self, mocker, mock_twin_operations, iothub_registry_manager):
+        mock_twin_operations.update_device_twin.side_effect = lambda device_id, twin, etag: (
+            device_id + "_updated_twin"
+        )
+        twin_updates = [("device{}".format(i), fake_device_twin, fake_etag) for i in range(20)]
+        results = list(iothub_registry_manager.bulk_update_twins(twin_updates))
+
+        assert mock_twin_operations.update_device_twin.call_count == 20
+        for device_id, _, _ in twin_updates:
+            assert (
+                mocker.call(device_id, fake_device_twin, fake_etag)
+                in mock_twin_operations.update_device_twin.call_args_list
+            )
+        assert sorted(result.device_id for result in results) == sorted(
+            update[0] for update in twin_updates
+        )
+        for result in results:
+            assert result.is_successful
+            assert result.result == result.device_id + "_updated_twin"
+
+    @pytest.mark.it("Returns the exception raised by the request for a device as its error")
+    def test_request_fails(
+        self, mock_twin_operations, iothub_registry_manager, arbitrary_exception
+    ):
+        mock_twin_operations.update_device_twin.side_effect = arbitrary_exception
+        results = list(
+            iothub_registry_manager.bulk_update_twins(
+                [(fake_device_id, fake_device_twin, fake_etag)]
+            )
+        )
+
+        assert len(results) == 1
+        assert results[0].device_id == fake_device_id
+        assert results[0].error is arbitrary_exception
+        assert results[0].result is None
+
+
 @pytest.mark.describe("IoTHubRegistryManager - .get_module_twin()")
 class TestGetModuleTwin(object):
     @pytest.mark.it("Test get module twin")
@@ -0,0 +1,94 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""Measure the time taken to import azure.iot.device and its clients in a new interpreter.
+
+Each statement is run in a fresh Python process, several times, and the median time is reported
+along with which of the expensive dependencies it loaded.  Importing the package alone should not
+load any of them; the clients only load what they need.
+
+Use --max-ms to fail (exit code 1) when importing the package alone takes longer, so that an
+eager import creeping back in is caught.
+
+Usage:
+    python scripts/benchmark_import_time.py --runs 10 --max-ms 20
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import azure.iot.device",
+    "import azure.iot.device.aio",
+    "from azure.iot.device import Message",
+    "from azure.iot.device import IoTHubDeviceClient",
+    "from azure.iot.device import ProvisioningDeviceClient",
+    "from azure.iot.device.aio import IoTHubDeviceClient",
+]
+
+# Dependencies which should only be imported by the features using them
+DEPENDENCIES = [
+    "azure.iot.device.iothub",
+    "azure.iot.device.provisioning",
+    "paho",
+    "requests",
+    "janus",
+]
+
+MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure(statement):
+    output = subprocess.check_output(
+        [sys.executable, "-c", MEASURE.format(statement=statement)], universal_newlines=True
+    )
+    return json.loads(output.splitlines()[-1])
+
+
+def loaded_dependencies(modules):
+    return [
+        dependency
+        for dependency in DEPENDENCIES
+        if any(module == dependency or module.startswith(dependency + ".") for module in modules)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    results = {}
+    print("{:<56} {:>9}  {}".format("statement", "median", "dependencies loaded"))
+    for statement in STATEMENTS:
+        runs = [measure(statement) for _ in range(args.runs)]
+        median = sorted(run["ms"] for run in runs)[len(runs) // 2]
+        results[statement] = median
+        print(
+            "{:<56} {:>6.1f} ms  {}".format(
+                statement, median, ", ".join(loaded_dependencies(runs[0]["modules"])) or "-"
+            )
+        )
+
+    if args.max_ms is not None and results[STATEMENTS[0]] > args.max_ms:
+        print(
+            "'{}' took {:.1f} ms, more than {} ms".format(
+                STATEMENTS[0], results[STATEMENTS[0]], args.max_ms
+            )
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
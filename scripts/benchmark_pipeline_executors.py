@@ -0,0 +1,111 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""Measure pipeline throughput as the number of clients in a process grows.
+
+Each simulated client is a real pipeline (PipelineRootStage) whose bottom stage holds the
+pipeline thread for a short, fixed amount of time per operation, which stands in for the
+blocking socket writes done by the transport.  The benchmark compares all pipelines sharing
+the process-wide pipeline thread against giving each pipeline (or each shard of pipelines)
+its own executor group.
+
+Usage:
+    python scripts/benchmark_pipeline_executors.py --clients 1 10 50 --ops 200
+"""
+
+import argparse
+import threading
+import time
+from azure.iot.device.common.pipeline import (
+    config,
+    pipeline_ops_base,
+    pipeline_stages_base,
+    pipeline_thread,
+)
+
+
+class BenchmarkPipelineConfig(config.BasePipelineConfig):
+    pass
+
+
+class BenchmarkOperation(pipeline_ops_base.PipelineOperation):
+    pass
+
+
+class SimulatedTransportStage(pipeline_stages_base.PipelineStage):
+    def __init__(self, op_time):
+        super(SimulatedTransportStage, self).__init__()
+        self.op_time = op_time
+
+    @pipeline_thread.runs_on_pipeline_thread
+    def _run_op(self, op):
+        time.sleep(self.op_time)
+        op.complete()
+
+
+def create_pipeline(executor_group, op_time):
+    pipeline_configuration = BenchmarkPipelineConfig(executor_group=executor_group)
+    return pipeline_stages_base.PipelineRootStage(pipeline_configuration).append_stage(
+        SimulatedTransportStage(op_time)
+    )
+
+
+def run(client_count, ops_per_client, op_time, mode, shards):
+    if mode == "shared":
+        groups = [None] * client_count
+    elif mode == "per-pipeline":
+        groups = ["client-{}".format(i) for i in range(client_count)]
+    else:
+        groups = ["shard-{}".format(i % shards) for i in range(client_count)]
+    pipelines = [create_pipeline(group, op_time) for group in groups]
+
+    total_ops = client_count * ops_per_client
+    done = threading.Event()
+    completed = [0]
+    lock = threading.Lock()
+
+    def on_complete(op, error):
+        with lock:
+            completed[0] += 1
+            if completed[0] == total_ops:
+                done.set()
+
+    def client_proc(pipeline):
+        for _ in range(ops_per_client):
+            pipeline.run_op(BenchmarkOperation(callback=on_complete))
+
+    client_threads = [threading.Thread(target=client_proc, args=(p,)) for p in pipelines]
+    start = time.time()
+    for thread in client_threads:
+        thread.start()
+    done.wait()
+    elapsed = time.time() - start
+    for thread in client_threads:
+        thread.join()
+    return total_ops / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--ops", type=int, default=100, help="operations per client")
+    parser.add_argument(
+        "--op-time", type=float, default=0.001, help="seconds each op holds the pipeline thread"
+    )
+    parser.add_argument("--shards", type=int, default=8, help="number of shards in sharded mode")
+    args = parser.parse_args()
+
+    modes = ["shared", "sharded", "per-pipeline"]
+    print("{:>8} ".format("clients") + " ".join("{:>16}".format(mode) for mode in modes))
+    for client_count in args.clients:
+        results = [run(client_count, args.ops, args.op_time, mode, args.shards) for mode in modes]
+        print(
+            "{:>8} ".format(client_count)
+            + " ".join("{:>12.0f} op/s".format(result) for result in results)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""Measure the cost of encoding message properties into the topic of a telemetry publish.
+
+Every message gets a unique message id, while the other system properties and the custom
+property keys stay the same from message to message, as they do for typical telemetry.  The
+benchmark compares the current encoder against the previous implementation, which url-encoded
+every key and value of every message.
+
+Usage:
+    python scripts/benchmark_topic_encoding.py --messages 100000 --custom-properties 0 5 20
+"""
+
+import argparse
+import datetime
+import timeit
+import uuid
+from datetime import date
+import six.moves.urllib as urllib
+from azure.iot.device import Message
+from azure.iot.device.common import version_compat
+from azure.iot.device.iothub.pipeline import mqtt_topic_iothub
+
+TOPIC = "devices/fake_device/messages/events/"
+
+
+def previous_encode_message_properties_in_topic(message_to_send, topic):
+    system_properties = []
+    if message_to_send.output_name:
+        system_properties.append(("$.on", str(message_to_send.output_name)))
+    if message_to_send.message_id:
+        system_properties.append(("$.mid", str(message_to_send.message_id)))
+    if message_to_send.correlation_id:
+        system_properties.append(("$.cid", str(message_to_send.correlation_id)))
+    if message_to_send.user_id:
+        system_properties.append(("$.uid", str(message_to_send.user_id)))
+    if message_to_send.content_type:
+        system_properties.append(("$.ct", str(message_to_send.content_type)))
+    if message_to_send.content_encoding:
+        system_properties.append(("$.ce", str(message_to_send.content_encoding)))
+    if message_to_send.iothub_interface_id:
+        system_properties.append(("$.ifid", str(message_to_send.iothub_interface_id)))
+    if message_to_send.expiry_time_utc:
+        system_properties.append(
+            (
+                "$.exp",
+                message_to_send.expiry_time_utc.isoformat()
+                if isinstance(message_to_send.expiry_time_utc, date)
+                else message_to_send.expiry_time_utc,
+            )
+        )
+    topic += version_compat.urlencode(system_properties, quote_via=urllib.parse.quote)
+
+    if message_to_send.custom_properties and len(message_to_send.custom_properties) > 0:
+        if system_properties and len(system_properties) > 0:
+            topic += "&"
+        custom_prop_seq = [
+            (str(i[0]), str(i[1])) for i in list(message_to_send.custom_properties.items())
+        ]
+        custom_prop_seq.sort()
+        keys = [i[0] for i in custom_prop_seq]
+        if len(keys) != len(set(keys)):
+            raise ValueError("Duplicate keys in custom properties!")
+        topic += version_compat.urlencode(custom_prop_seq, quote_via=urllib.parse.quote)
+    return topic
+
+
+def create_messages(count, custom_property_count):
+    messages = []
+    for i in range(count):
+        message = Message("payload")
+        message.message_id = uuid.uuid4()
+        message.content_type = "application/json"
+        message.content_encoding = "utf-8"
+        message.expiry_time_utc = datetime.datetime(2030, 1, 1)
+        message.custom_properties = {
+            "property {}".format(j): "value/{}".format(i % 4) for j in range(custom_property_count)
+        }
+        messages.append(message)
+    return messages
+
+
+def run(encode, messages):
+    def encode_all():
+        for message in messages:
+            encode(message, TOPIC)
+
+    # Best of several runs, in microseconds per message
+    return min(timeit.repeat(encode_all, number=1, repeat=5)) / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--custom-properties", type=int, nargs="+", default=[0, 5, 20])
+    args = parser.parse_args()
+
+    print("{:>18} {:>14} {:>14}".format("custom properties", "previous", "current"))
+    for custom_property_count in args.custom_properties:
+        messages = create_messages(args.messages, custom_property_count)
+        for message in messages:
+            assert previous_encode_message_properties_in_topic(
+                message, TOPIC
+            ) == mqtt_topic_iothub.encode_message_properties_in_topic(message, TOPIC)
+        previous = run(previous_encode_message_properties_in_topic, messages)
+        current = run(mqtt_topic_iothub.encode_message_properties_in_topic, messages)
+        print(
+            "{:>18} {:>9.2f} us/msg {:>9.2f} us/msg".format(
+                custom_property_count, previous, current
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()